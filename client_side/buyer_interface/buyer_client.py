@@ -66,17 +66,31 @@ class BuyerClient:
     # ---------- Search / Browse ----------
 
     def search_items(self, category: int, keywords: list[str]):
+        """All matching items, fetched page by page."""
+        items = []
+        cursor = None
+        while True:
+            page, cursor = self.search_items_page(category, keywords, cursor=cursor)
+            items.extend(page)
+            if cursor is None:
+                return items
+
+    def search_items_page(self, category: int, keywords: list[str], cursor=None, limit=None):
+        """One page of results and the cursor for the next one (None on the last page)."""
         self._require_session()
         req = build_request(
             api="SearchItemsForSale",
             session_id=self.session_id,
             payload={
                 "category": category,
-                "keywords": keywords
+                "keywords": keywords,
+                "cursor": cursor,
+                "limit": limit
             }
         )
         resp = self.tcp.send_request(req)
-        return extract_payload(resp)["items"]
+        payload = extract_payload(resp)
+        return payload["items"], payload.get("next_cursor")
 
     def get_item(self, item_id: str):
         self._require_session()
@@ -90,6 +104,19 @@ class BuyerClient:
         resp = self.tcp.send_request(req)
         return extract_payload(resp)
 
+    def get_items(self, item_ids: list):
+        """Details for several items in one request; items that do not exist are left out."""
+        self._require_session()
+        req = build_request(
+            api="GetItems",
+            session_id=self.session_id,
+            payload={
+                "item_ids": list(item_ids)
+            }
+        )
+        resp = self.tcp.send_request(req)
+        return extract_payload(resp)["items"]
+
     # ---------- Cart Operations ----------
 
     def add_item_to_cart(self, item_id: str, quantity: int):
@@ -105,6 +132,32 @@ class BuyerClient:
         resp = self.tcp.send_request(req)
         return extract_payload(resp)
 
+    def add_items_to_cart(self, items: list):
+        """Add (item_id, quantity) pairs in one request; fails as a whole if any line is out of stock."""
+        self._require_session()
+        req = build_request(
+            api="AddItemsToCart",
+            session_id=self.session_id,
+            payload={
+                "items": [{"item_id": item_id, "quantity": quantity} for item_id, quantity in items]
+            }
+        )
+        resp = self.tcp.send_request(req)
+        return extract_payload(resp)
+
+    def update_cart(self, items: list):
+        """Set the quantity of (item_id, quantity) cart lines in one request; 0 removes a line."""
+        self._require_session()
+        req = build_request(
+            api="UpdateCart",
+            session_id=self.session_id,
+            payload={
+                "items": [{"item_id": item_id, "quantity": quantity} for item_id, quantity in items]
+            }
+        )
+        resp = self.tcp.send_request(req)
+        return extract_payload(resp)
+
     def remove_item_from_cart(self, item_id: str, quantity: int):
         self._require_session()
         req = build_request(
@@ -118,12 +171,13 @@ class BuyerClient:
         resp = self.tcp.send_request(req)
         return extract_payload(resp)
 
-    def display_cart(self):
+    def display_cart(self, details: bool = False):
+        """Cart lines; with details=True each line also carries its item ("item", None if gone)."""
         self._require_session()
         req = build_request(
             api="DisplayCart",
             session_id=self.session_id,
-            payload={}
+            payload={"details": True} if details else {}
         )
         resp = self.tcp.send_request(req)
         return extract_payload(resp)["cart"]
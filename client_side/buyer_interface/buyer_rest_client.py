@@ -1,25 +1,49 @@
-import requests
+from pathlib import Path
+import sys
+
+# for `client_side.*` imports resolve
+REPO_ROOT = Path(__file__).resolve().parents[2]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from client_side.common.http_session import AsyncPooledClient, PooledSession
+
+
+def _cart_lines(items):
+    """Request body lines for (item_id, quantity) pairs."""
+    return [{"item_id": item_id, "quantity": quantity} for item_id, quantity in items]
 
 
 class BuyerRestClient:
     """
     Lightweight REST client for the buyer FastAPI server.
+    Calls share one keep-alive connection pool (see client_side/common/http_session.py).
     """
 
-    def __init__(self, host: str = "127.0.0.1", port: int = 8001):
+    def __init__(self, host: str = "127.0.0.1", port: int = 8001, pool_size: int | None = None, retries: int | None = None):
         self.base = f"http://{host}:{port}"
+        self.http = PooledSession(pool_size=pool_size, retries=retries)
         self.session_id = None
         self.buyer_id = None
 
+    def close(self):
+        self.http.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
     # --- Auth ---
     def create_account(self, username: str, password: str) -> int:
-        resp = requests.post(f"{self.base}/buyer/account", json={"username": username, "password": password})
+        resp = self.http.post(f"{self.base}/buyer/account", json={"username": username, "password": password})
         resp.raise_for_status()
         self.buyer_id = resp.json()["buyer_id"]
         return self.buyer_id
 
     def login(self, username: str, password: str) -> int:
-        resp = requests.post(f"{self.base}/buyer/login", json={"username": username, "password": password})
+        resp = self.http.post(f"{self.base}/buyer/login", json={"username": username, "password": password})
         resp.raise_for_status()
         data = resp.json()
         self.session_id = data["session_id"]
@@ -32,29 +56,59 @@ class BuyerRestClient:
 
     # --- Items ---
     def search_items(self, category: int = 0, keywords=None):
+        items = []
+        cursor = None
+        while True:
+            page, cursor = self.search_items_page(category, keywords, cursor=cursor)
+            items.extend(page)
+            if cursor is None:
+                return items
+
+    def search_items_page(self, category: int = 0, keywords=None, cursor=None, limit=None):
         kw = ",".join(keywords) if keywords else ""
-        resp = requests.get(f"{self.base}/buyer/items", params={"category": category, "keywords": kw})
+        params = {"category": category, "keywords": kw}
+        if cursor:
+            params["cursor"] = cursor
+        if limit:
+            params["limit"] = limit
+        resp = self.http.get(f"{self.base}/buyer/items", params=params)
         resp.raise_for_status()
-        return resp.json().get("items", [])
+        data = resp.json()
+        return data.get("items", []), data.get("next_cursor")
 
     def get_item(self, item_id: int):
-        resp = requests.get(f"{self.base}/buyer/items/{item_id}")
+        resp = self.http.get(f"{self.base}/buyer/items/{item_id}")
         resp.raise_for_status()
         return resp.json()
 
+    def get_items(self, item_ids):
+        """Details for several items in one request; items that do not exist are left out."""
+        resp = self.http.get(f"{self.base}/buyer/items/batch", params={"ids": ",".join(str(i) for i in item_ids)})
+        resp.raise_for_status()
+        return resp.json().get("items", [])
+
     # --- Cart ---
     def add_to_cart(self, item_id: int, quantity: int):
         self._auth_post(f"{self.base}/buyer/cart", json={"item_id": item_id, "quantity": quantity})
 
-    def display_cart(self):
-        resp = self._auth_get(f"{self.base}/buyer/cart")
+    def add_items_to_cart(self, items):
+        """(item_id, quantity) pairs in one request."""
+        self._auth_post(f"{self.base}/buyer/cart/batch", json={"items": _cart_lines(items)})
+
+    def update_cart(self, items):
+        """Set the quantity of (item_id, quantity) cart lines in one request; 0 removes a line."""
+        self._auth_put(f"{self.base}/buyer/cart/batch", json={"items": _cart_lines(items)})
+
+    def display_cart(self, details: bool = False):
+        """Cart lines; with details=True each line also carries its item ("item", None if gone)."""
+        resp = self._auth_get(f"{self.base}/buyer/cart", params={"details": "true"} if details else None)
         return resp.json().get("cart", [])
 
     def save_cart(self):
         self._auth_post(f"{self.base}/buyer/cart/save")
 
     def clear_cart(self):
-        self._auth_delete(f"{self.base}/buyer/cart/all")
+        self._auth_delete(f"{self.base}/buyer/cart/clear")
 
     # --- Feedback ---
     def provide_feedback(self, item_id: int, is_positive: bool):
@@ -83,20 +137,154 @@ class BuyerRestClient:
     def _auth_post(self, url, **kwargs):
         headers = kwargs.pop("headers", {})
         headers.update(self._headers())
-        resp = requests.post(url, headers=headers, **kwargs)
+        resp = self.http.post(url, headers=headers, **kwargs)
         resp.raise_for_status()
         return resp
 
     def _auth_get(self, url, **kwargs):
         headers = kwargs.pop("headers", {})
         headers.update(self._headers())
-        resp = requests.get(url, headers=headers, **kwargs)
+        resp = self.http.get(url, headers=headers, **kwargs)
+        resp.raise_for_status()
+        return resp
+
+    def _auth_put(self, url, **kwargs):
+        headers = kwargs.pop("headers", {})
+        headers.update(self._headers())
+        resp = self.http.put(url, headers=headers, **kwargs)
         resp.raise_for_status()
         return resp
 
     def _auth_delete(self, url, **kwargs):
         headers = kwargs.pop("headers", {})
         headers.update(self._headers())
-        resp = requests.delete(url, headers=headers, **kwargs)
+        resp = self.http.delete(url, headers=headers, **kwargs)
+        resp.raise_for_status()
+        return resp
+
+
+class AsyncBuyerRestClient:
+    """
+    asyncio variant of BuyerRestClient (same method names, awaited), on a
+    pooled httpx.AsyncClient. Needs `pip install httpx`.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 8001, pool_size: int | None = None, retries: int | None = None):
+        self.base = f"http://{host}:{port}"
+        self.http = AsyncPooledClient(self.base, pool_size=pool_size, retries=retries)
+        self.session_id = None
+        self.buyer_id = None
+
+    async def close(self):
+        await self.http.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    # --- Auth ---
+    async def create_account(self, username: str, password: str) -> int:
+        resp = await self.http.request("POST", f"{self.base}/buyer/account", json={"username": username, "password": password})
+        resp.raise_for_status()
+        self.buyer_id = resp.json()["buyer_id"]
+        return self.buyer_id
+
+    async def login(self, username: str, password: str) -> int:
+        resp = await self.http.request("POST", f"{self.base}/buyer/login", json={"username": username, "password": password})
+        resp.raise_for_status()
+        data = resp.json()
+        self.session_id = data["session_id"]
+        self.buyer_id = data["buyer_id"]
+        return self.buyer_id
+
+    async def logout(self):
+        await self._auth("POST", f"{self.base}/buyer/logout")
+        self.session_id = None
+
+    # --- Items ---
+    async def search_items(self, category: int = 0, keywords=None):
+        items = []
+        cursor = None
+        while True:
+            page, cursor = await self.search_items_page(category, keywords, cursor=cursor)
+            items.extend(page)
+            if cursor is None:
+                return items
+
+    async def search_items_page(self, category: int = 0, keywords=None, cursor=None, limit=None):
+        kw = ",".join(keywords) if keywords else ""
+        params = {"category": category, "keywords": kw}
+        if cursor:
+            params["cursor"] = cursor
+        if limit:
+            params["limit"] = limit
+        resp = await self.http.request("GET", f"{self.base}/buyer/items", params=params)
+        resp.raise_for_status()
+        data = resp.json()
+        return data.get("items", []), data.get("next_cursor")
+
+    async def get_item(self, item_id: int):
+        resp = await self.http.request("GET", f"{self.base}/buyer/items/{item_id}")
+        resp.raise_for_status()
+        return resp.json()
+
+    async def get_items(self, item_ids):
+        resp = await self.http.request(
+            "GET", f"{self.base}/buyer/items/batch", params={"ids": ",".join(str(i) for i in item_ids)}
+        )
+        resp.raise_for_status()
+        return resp.json().get("items", [])
+
+    # --- Cart ---
+    async def add_to_cart(self, item_id: int, quantity: int):
+        await self._auth("POST", f"{self.base}/buyer/cart", json={"item_id": item_id, "quantity": quantity})
+
+    async def add_items_to_cart(self, items):
+        await self._auth("POST", f"{self.base}/buyer/cart/batch", json={"items": _cart_lines(items)})
+
+    async def update_cart(self, items):
+        await self._auth("PUT", f"{self.base}/buyer/cart/batch", json={"items": _cart_lines(items)})
+
+    async def display_cart(self, details: bool = False):
+        resp = await self._auth("GET", f"{self.base}/buyer/cart", params={"details": "true"} if details else None)
+        return resp.json().get("cart", [])
+
+    async def save_cart(self):
+        await self._auth("POST", f"{self.base}/buyer/cart/save")
+
+    async def clear_cart(self):
+        await self._auth("DELETE", f"{self.base}/buyer/cart/clear")
+
+    # --- Feedback ---
+    async def provide_feedback(self, item_id: int, is_positive: bool):
+        await self._auth("POST", f"{self.base}/buyer/feedback", json={"item_id": item_id, "is_positive": bool(is_positive)})
+
+    # --- Purchase ---
+    async def purchase(self, name: str, card_number: str, expiration_date: str, security_code: str):
+        resp = await self._auth(
+            "POST",
+            f"{self.base}/buyer/purchase",
+            json={
+                "name": name,
+                "card_number": card_number,
+                "expiration_date": expiration_date,
+                "security_code": security_code,
+            },
+        )
+        return resp.json()
+
+    # --- Helpers ---
+    def _headers(self):
+        h = {}
+        if self.session_id:
+            h["x-session-id"] = str(self.session_id)
+        return h
+
+    async def _auth(self, method: str, url: str, **kwargs):
+        headers = kwargs.pop("headers", {})
+        headers.update(self._headers())
+        resp = await self.http.request(method, url, headers=headers, **kwargs)
         resp.raise_for_status()
         return resp
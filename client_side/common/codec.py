@@ -0,0 +1,61 @@
+import json
+
+try:
+    import msgpack
+except ImportError:  # optional: JSON is always available
+    msgpack = None
+
+# Must match server_side/common/transport.py: the client opens the connection
+# with HANDSHAKE_MAGIC + one codec id byte and the server replies with the id
+# it picked. Without the handshake the server speaks JSON.
+HANDSHAKE_MAGIC = b"\xffMKC"
+
+
+class JSONCodec:
+    id = 0
+    name = "json"
+
+    @staticmethod
+    def encode(message: dict) -> bytes:
+        try:
+            return json.dumps(message, separators=(",", ":")).encode("utf-8")
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"Invalid JSON message: {e}")
+
+    @staticmethod
+    def decode(payload: bytes) -> dict:
+        try:
+            return json.loads(payload.decode("utf-8"))
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"Invalid JSON response: {e}")
+
+
+class MsgpackCodec:
+    id = 1
+    name = "msgpack"
+
+    @staticmethod
+    def encode(message: dict) -> bytes:
+        try:
+            return msgpack.packb(message, use_bin_type=True)
+        except (TypeError, ValueError, OverflowError) as e:
+            raise ValueError(f"Invalid MessagePack message: {e}")
+
+    @staticmethod
+    def decode(payload: bytes) -> dict:
+        try:
+            return msgpack.unpackb(payload, raw=False, strict_map_key=False)
+        except Exception as e:
+            raise ValueError(f"Invalid MessagePack response: {e}")
+
+
+CODECS = {JSONCodec.id: JSONCodec}
+if msgpack is not None:
+    CODECS[MsgpackCodec.id] = MsgpackCodec
+
+
+def get_codec(name: str):
+    for codec in CODECS.values():
+        if codec.name == name:
+            return codec
+    raise ValueError(f"Codec {name!r} is not available (install msgpack for 'msgpack')")
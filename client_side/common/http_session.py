@@ -0,0 +1,102 @@
+"""
+HTTP plumbing shared by the REST clients.
+
+Every client owns one keep-alive connection pool instead of calling the
+module-level `requests.get/post` (a new TCP connection per call). Idempotent
+calls are retried with exponential backoff on connection errors and 502/503/504;
+POST and PUT are not, since e.g. a quantity delta must not be applied twice.
+"""
+
+import asyncio
+import os
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import httpx
+except ImportError:  # optional: only the async clients need it
+    httpx = None
+
+REST_CLIENT_POOL_SIZE = int(os.getenv("REST_CLIENT_POOL_SIZE", "10"))
+REST_CLIENT_RETRIES = int(os.getenv("REST_CLIENT_RETRIES", "3"))
+REST_CLIENT_BACKOFF = float(os.getenv("REST_CLIENT_BACKOFF", "0.1"))
+REST_CLIENT_TIMEOUT = float(os.getenv("REST_CLIENT_TIMEOUT", "10"))
+
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "DELETE"})
+RETRY_STATUSES = (502, 503, 504)
+
+
+class PooledSession(requests.Session):
+    """requests.Session with a sized connection pool, retries and a default timeout."""
+
+    def __init__(
+        self,
+        pool_size: int | None = None,
+        retries: int | None = None,
+        backoff: float | None = None,
+        timeout: float | None = None,
+    ):
+        super().__init__()
+        pool_size = pool_size or REST_CLIENT_POOL_SIZE
+        retry = Retry(
+            total=REST_CLIENT_RETRIES if retries is None else retries,
+            backoff_factor=REST_CLIENT_BACKOFF if backoff is None else backoff,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=IDEMPOTENT_METHODS,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+        self.mount("http://", adapter)
+        self.mount("https://", adapter)
+        self.timeout = timeout or REST_CLIENT_TIMEOUT
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        return super().request(method, url, **kwargs)
+
+
+class AsyncPooledClient:
+    """httpx.AsyncClient counterpart of PooledSession, with the same retry policy."""
+
+    def __init__(
+        self,
+        base_url: str,
+        pool_size: int | None = None,
+        retries: int | None = None,
+        backoff: float | None = None,
+        timeout: float | None = None,
+    ):
+        if httpx is None:
+            raise RuntimeError("The async REST clients need httpx: pip install httpx")
+        pool_size = pool_size or REST_CLIENT_POOL_SIZE
+        self.retries = REST_CLIENT_RETRIES if retries is None else retries
+        self.backoff = REST_CLIENT_BACKOFF if backoff is None else backoff
+        self.client = httpx.AsyncClient(
+            base_url=base_url,
+            limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size),
+            timeout=timeout or REST_CLIENT_TIMEOUT,
+        )
+
+    async def request(self, method: str, url: str, **kwargs):
+        method = method.upper()
+        idempotent = method in IDEMPOTENT_METHODS
+        for attempt in range(self.retries + 1):
+            last = attempt == self.retries
+            try:
+                resp = await self.client.request(method, url, **kwargs)
+            except (httpx.ConnectError, httpx.ConnectTimeout):
+                # Nothing was sent, so any method is safe to retry.
+                if last:
+                    raise
+            except httpx.TransportError:
+                if last or not idempotent:
+                    raise
+            else:
+                if last or not idempotent or resp.status_code not in RETRY_STATUSES:
+                    return resp
+            await asyncio.sleep(self.backoff * (2 ** attempt))
+
+    async def aclose(self):
+        await self.client.aclose()
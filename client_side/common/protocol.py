@@ -1,13 +1,16 @@
 import uuid
 
 
-def build_request(api: str, session_id: str | None, payload: dict) -> dict:
-    return {
+def build_request(api: str, session_id: str | None, payload: dict, request_id=None) -> dict:
+    request = {
         "type": "request",
         "api": api,
         "session_id": session_id,
         "payload": payload
     }
+    if request_id is not None:
+        request["request_id"] = request_id
+    return request
 
 
 def is_error(response: dict) -> bool:
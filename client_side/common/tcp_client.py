@@ -1,20 +1,30 @@
+import itertools
 import socket
 import struct
-import json
+import threading
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+
+from client_side.common.codec import HANDSHAKE_MAGIC, CODECS, JSONCodec, get_codec
 
 
 class TCPClient:
-    def __init__(self, host: str, port: int, timeout: float = 5.0):
+    def __init__(self, host: str, port: int, timeout: float = 5.0, codec: str = "json"):
+        """`codec` other than "json" is negotiated on connect; the server may fall back to JSON."""
         self.host = host
         self.port = port
         self.timeout = timeout
         self.sock = None
+        self.requested_codec = get_codec(codec)
         self._connect()
 
     def _connect(self):
         self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         self.sock.settimeout(self.timeout)
         self.sock.connect((self.host, self.port))
+        self.codec = JSONCodec
+        if self.requested_codec is not JSONCodec:
+            self._send_all(HANDSHAKE_MAGIC + bytes([self.requested_codec.id]))
+            self.codec = CODECS.get(self._recv_all(1)[0], JSONCodec)
 
     def close(self):
         if self.sock:
@@ -45,14 +55,11 @@ class TCPClient:
     def send_request(self, message: dict) -> dict:
         """
         Sends a single request and waits for a single response.
-        Message must be a dict (JSON-serializable).
+        Message must be a dict (serializable by the negotiated codec).
         Returns parsed response dict.
         """
 
-        try:
-            payload = json.dumps(message).encode("utf-8")
-        except (TypeError, ValueError) as e:
-            raise ValueError(f"Invalid JSON message: {e}")
+        payload = self.codec.encode(message)
 
         length_prefix = struct.pack("!I", len(payload))
         self._send_all(length_prefix + payload)
@@ -61,9 +68,84 @@ class TCPClient:
         resp_len = struct.unpack("!I", resp_len_bytes)[0]
 
         resp_payload = self._recv_all(resp_len)
+        return self.codec.decode(resp_payload)
+
+
+class MultiplexedTCPClient(TCPClient):
+    """
+    TCPClient that keeps many requests in flight on one connection.
+
+    Every request is tagged with a request_id; a reader thread matches the
+    (possibly out-of-order) responses back to their Futures. send_request
+    keeps TCPClient's blocking signature, so BuyerClient/SellerClient work
+    unchanged; use submit()/send_many() to pipeline.
+    """
+
+    def __init__(self, host: str, port: int, timeout: float = 5.0, codec: str = "json"):
+        self._ids = itertools.count(1)
+        self._pending = {}
+        self._lock = threading.Lock()  # guards _pending and socket writes
+        super().__init__(host, port, timeout, codec)
+        # The reader blocks indefinitely; per-request timeouts apply to the futures instead.
+        self.sock.settimeout(None)
+        self._reader = threading.Thread(target=self._read_loop, name="tcp-mux-reader", daemon=True)
+        self._reader.start()
+
+    def submit(self, message: dict) -> Future:
+        """Send a request without waiting; the Future resolves to the response dict."""
+        request_id = next(self._ids)
+        payload = self.codec.encode(dict(message, request_id=request_id))
+        future = Future()
+        future.request_id = request_id
+        with self._lock:
+            if self.sock is None:
+                raise ConnectionError("Connection closed")
+            self._pending[request_id] = future
+            try:
+                self._send_all(struct.pack("!I", len(payload)) + payload)
+            except Exception:
+                self._pending.pop(request_id, None)
+                raise
+        return future
+
+    def send_request(self, message: dict) -> dict:
+        return self._result(self.submit(message))
+
+    def send_many(self, messages) -> list:
+        """Pipeline all messages, then collect the responses in request order."""
+        futures = [self.submit(m) for m in messages]
+        return [self._result(f) for f in futures]
+
+    def _result(self, future: Future) -> dict:
         try:
-            response = json.loads(resp_payload.decode("utf-8"))
-        except (TypeError, ValueError) as e:
-            raise ValueError(f"Invalid JSON response: {e}")
+            return future.result(timeout=self.timeout)
+        except FutureTimeout:
+            with self._lock:
+                self._pending.pop(future.request_id, None)
+            raise TimeoutError(f"No response to request {future.request_id} within {self.timeout}s")
 
-        return response
+    def _read_loop(self):
+        try:
+            while True:
+                resp_len = struct.unpack("!I", self._recv_all(4))[0]
+                response = self.codec.decode(self._recv_all(resp_len))
+                with self._lock:
+                    future = self._pending.pop(response.get("request_id"), None)
+                if future is not None:
+                    future.set_result(response)
+        except Exception as exc:
+            with self._lock:
+                pending, self._pending = list(self._pending.values()), {}
+            for future in pending:
+                future.set_exception(ConnectionError(f"Connection lost: {exc}"))
+
+    def close(self):
+        sock = self.sock
+        if sock:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        with self._lock:
+            super().close()
+        self._reader.join(timeout=self.timeout)
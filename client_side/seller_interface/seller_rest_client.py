@@ -1,26 +1,45 @@
-import requests
+from pathlib import Path
+import sys
+
+# for `client_side.*` imports resolve
+REPO_ROOT = Path(__file__).resolve().parents[2]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from client_side.common.http_session import AsyncPooledClient, PooledSession
 
 
 class SellerRestClient:
     """
     Lightweight REST client for the seller REST API (FastAPI).
-    Keeps behavior similar to the TCP SellerClient but communicates over HTTP.
+    Keeps behavior similar to the TCP SellerClient but communicates over HTTP,
+    reusing one keep-alive connection pool (see client_side/common/http_session.py).
     """
 
-    def __init__(self, host: str = "127.0.0.1", port: int = 8000):
+    def __init__(self, host: str = "127.0.0.1", port: int = 8000, pool_size: int | None = None, retries: int | None = None):
         self.base = f"http://{host}:{port}"
+        self.http = PooledSession(pool_size=pool_size, retries=retries)
         self.session_id = None
         self.seller_id = None
 
+    def close(self):
+        self.http.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
     # --- Auth ---
     def create_account(self, username: str, password: str) -> int:
-        resp = requests.post(f"{self.base}/seller/account", json={"username": username, "password": password})
+        resp = self.http.post(f"{self.base}/seller/account", json={"username": username, "password": password})
         resp.raise_for_status()
         self.seller_id = resp.json()["seller_id"]
         return self.seller_id
 
     def login(self, username: str, password: str) -> int:
-        resp = requests.post(f"{self.base}/seller/login", json={"username": username, "password": password})
+        resp = self.http.post(f"{self.base}/seller/login", json={"username": username, "password": password})
         resp.raise_for_status()
         data = resp.json()
         self.session_id = data["session_id"]
@@ -56,7 +75,7 @@ class SellerRestClient:
         return resp.json().get("items", [])
 
     def get_item(self, item_id: int):
-        resp = requests.get(f"{self.base}/seller/items/{item_id}", headers=self._headers())
+        resp = self.http.get(f"{self.base}/seller/items/{item_id}", headers=self._headers())
         resp.raise_for_status()
         return resp.json()
 
@@ -74,20 +93,107 @@ class SellerRestClient:
     def _auth_post(self, url, **kwargs):
         headers = kwargs.pop("headers", {})
         headers.update(self._headers())
-        resp = requests.post(url, headers=headers, **kwargs)
+        resp = self.http.post(url, headers=headers, **kwargs)
         resp.raise_for_status()
         return resp
 
     def _auth_put(self, url, **kwargs):
         headers = kwargs.pop("headers", {})
         headers.update(self._headers())
-        resp = requests.put(url, headers=headers, **kwargs)
+        resp = self.http.put(url, headers=headers, **kwargs)
         resp.raise_for_status()
         return resp
 
     def _auth_get(self, url, **kwargs):
         headers = kwargs.pop("headers", {})
         headers.update(self._headers())
-        resp = requests.get(url, headers=headers, **kwargs)
+        resp = self.http.get(url, headers=headers, **kwargs)
+        resp.raise_for_status()
+        return resp
+
+
+class AsyncSellerRestClient:
+    """
+    asyncio variant of SellerRestClient (same method names, awaited), on a
+    pooled httpx.AsyncClient. Needs `pip install httpx`.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 8000, pool_size: int | None = None, retries: int | None = None):
+        self.base = f"http://{host}:{port}"
+        self.http = AsyncPooledClient(self.base, pool_size=pool_size, retries=retries)
+        self.session_id = None
+        self.seller_id = None
+
+    async def close(self):
+        await self.http.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    # --- Auth ---
+    async def create_account(self, username: str, password: str) -> int:
+        resp = await self.http.request("POST", f"{self.base}/seller/account", json={"username": username, "password": password})
+        resp.raise_for_status()
+        self.seller_id = resp.json()["seller_id"]
+        return self.seller_id
+
+    async def login(self, username: str, password: str) -> int:
+        resp = await self.http.request("POST", f"{self.base}/seller/login", json={"username": username, "password": password})
+        resp.raise_for_status()
+        data = resp.json()
+        self.session_id = data["session_id"]
+        self.seller_id = data["seller_id"]
+        return self.seller_id
+
+    async def logout(self):
+        await self._auth("POST", f"{self.base}/seller/logout")
+        self.session_id = None
+
+    # --- Items ---
+    async def register_item_for_sale(self, item_name: str, category: int, keywords, condition: str, price: float, quantity: int) -> int:
+        body = {
+            "item_name": item_name,
+            "category": int(category),
+            "keywords": list(keywords),
+            "condition": condition,
+            "price": float(price),
+            "quantity": int(quantity),
+        }
+        resp = await self._auth("POST", f"{self.base}/seller/items", json=body)
+        return resp.json()["item_id"]
+
+    async def change_item_price(self, item_id: int, new_price: float):
+        await self._auth("PUT", f"{self.base}/seller/items/{item_id}/price", json={"price": float(new_price)})
+
+    async def update_units_for_sale(self, item_id: int, quantity_delta: int):
+        resp = await self._auth("PUT", f"{self.base}/seller/items/{item_id}/quantity", json={"quantity_delta": int(quantity_delta)})
+        return resp.json().get("new_quantity")
+
+    async def display_items_for_sale(self):
+        resp = await self._auth("GET", f"{self.base}/seller/items")
+        return resp.json().get("items", [])
+
+    async def get_item(self, item_id: int):
+        resp = await self._auth("GET", f"{self.base}/seller/items/{item_id}")
+        return resp.json()
+
+    async def get_rating(self):
+        resp = await self._auth("GET", f"{self.base}/seller/rating")
+        return resp.json()
+
+    # --- Helpers ---
+    def _headers(self):
+        headers = {}
+        if self.session_id:
+            headers["x-session-id"] = str(self.session_id)
+        return headers
+
+    async def _auth(self, method: str, url: str, **kwargs):
+        headers = kwargs.pop("headers", {})
+        headers.update(self._headers())
+        resp = await self.http.request(method, url, headers=headers, **kwargs)
         resp.raise_for_status()
         return resp
@@ -45,11 +45,13 @@ echo Instance IP: %IP%
 set "PSQL=psql ""host=%IP% user=%DB_USER% password=%ROOT_PW% sslmode=require"""
 
 echo Applying customer-database schema...
-call %PSQL% -d customer-database -c "CREATE TABLE IF NOT EXISTS buyers (buyer_id SERIAL PRIMARY KEY, username VARCHAR(255) NOT NULL, password TEXT NOT NULL, items_purchased INTEGER NOT NULL DEFAULT 0); CREATE TABLE IF NOT EXISTS sellers (seller_id SERIAL PRIMARY KEY, seller_feedback INTEGER[] DEFAULT '{0,0}', items_sold INTEGER DEFAULT 0, username VARCHAR(255) NOT NULL, password VARCHAR(255) NOT NULL); CREATE TABLE IF NOT EXISTS sessions (session_id SERIAL PRIMARY KEY, role VARCHAR(16) NOT NULL CHECK (role IN ('seller','buyer')), user_id INTEGER NOT NULL, last_access_timestamp TIMESTAMPTZ NOT NULL DEFAULT NOW()); CREATE INDEX IF NOT EXISTS idx_sessions_user_role ON sessions(user_id, role);" || goto :fail
+call %PSQL% -d customer-database -c "CREATE TABLE IF NOT EXISTS buyers (buyer_id SERIAL PRIMARY KEY, username VARCHAR(255) NOT NULL, password TEXT NOT NULL, items_purchased INTEGER NOT NULL DEFAULT 0); CREATE TABLE IF NOT EXISTS sellers (seller_id SERIAL PRIMARY KEY, seller_feedback INTEGER[] DEFAULT '{0,0}', items_sold INTEGER DEFAULT 0, username VARCHAR(255) NOT NULL, password VARCHAR(255) NOT NULL); CREATE TABLE IF NOT EXISTS sessions (session_id TEXT PRIMARY KEY, role VARCHAR(16) NOT NULL CHECK (role IN ('seller','buyer')), user_id INTEGER NOT NULL, last_access_timestamp TIMESTAMPTZ NOT NULL DEFAULT NOW()); CREATE INDEX IF NOT EXISTS idx_sessions_user_role ON sessions(user_id, role);" || goto :fail
 
 echo Applying product-database schema...
-call %PSQL% -d product-database -c "CREATE TABLE IF NOT EXISTS items (item_id SERIAL PRIMARY KEY, item_name VARCHAR(255) NOT NULL, category INTEGER NOT NULL DEFAULT 0, keywords TEXT[] NULL, condition_is_new BOOLEAN DEFAULT TRUE, sale_price NUMERIC DEFAULT 0, quantity INTEGER DEFAULT 0, item_feedback INTEGER[] DEFAULT '{0,0}', seller_id INTEGER NOT NULL); CREATE TABLE IF NOT EXISTS cart_items (cart_item_id SERIAL PRIMARY KEY, buyer_id INTEGER NOT NULL, session_id VARCHAR NOT NULL DEFAULT '', item_id INTEGER NOT NULL, quantity INTEGER NOT NULL, is_saved BOOLEAN NOT NULL DEFAULT FALSE, CONSTRAINT cart_items_buyer_session_item_saved_uniq UNIQUE (buyer_id, session_id, item_id, is_saved)); CREATE TABLE IF NOT EXISTS purchases (purchase_id SERIAL PRIMARY KEY, buyer_id INTEGER NOT NULL, item_id INTEGER NOT NULL, quantity INTEGER NOT NULL, purchased_at TIMESTAMPTZ NOT NULL DEFAULT NOW());" || goto :fail
+call %PSQL% -d product-database -c "CREATE TABLE IF NOT EXISTS items (item_id SERIAL PRIMARY KEY, item_name VARCHAR(255) NOT NULL, category INTEGER NOT NULL DEFAULT 0, keywords TEXT[] NULL, condition_is_new BOOLEAN DEFAULT TRUE, sale_price NUMERIC DEFAULT 0, quantity INTEGER DEFAULT 0, item_feedback INTEGER[] DEFAULT '{0,0}', seller_id INTEGER NOT NULL); ALTER TABLE items ADD COLUMN IF NOT EXISTS name_tsv tsvector GENERATED ALWAYS AS (to_tsvector('simple', item_name)) STORED; CREATE INDEX IF NOT EXISTS idx_items_keywords ON items USING GIN (keywords); CREATE INDEX IF NOT EXISTS idx_items_name_tsv ON items USING GIN (name_tsv); CREATE INDEX IF NOT EXISTS idx_items_category ON items(category, item_id); CREATE TABLE IF NOT EXISTS cart_items (cart_item_id SERIAL PRIMARY KEY, buyer_id INTEGER NOT NULL, session_id VARCHAR NOT NULL DEFAULT '', item_id INTEGER NOT NULL, quantity INTEGER NOT NULL, is_saved BOOLEAN NOT NULL DEFAULT FALSE, CONSTRAINT cart_items_buyer_session_item_saved_uniq UNIQUE (buyer_id, session_id, item_id, is_saved)); CREATE TABLE IF NOT EXISTS purchases (purchase_id SERIAL PRIMARY KEY, buyer_id INTEGER NOT NULL, item_id INTEGER NOT NULL, quantity INTEGER NOT NULL, purchased_at TIMESTAMPTZ NOT NULL DEFAULT NOW());" || goto :fail
 
+echo Schema created. Add the indexes with:
+echo   set PGHOST=%IP%, PGPORT=5432, PGUSER=%DB_USER%, PGPASSWORD=%ROOT_PW%, PGSSLMODE=require, then run: python database\migrate.py
 echo Done.
 echo Connect with:
 echo   psql "host=%IP% user=%DB_USER% password=%ROOT_PW% dbname=customer-database sslmode=require"
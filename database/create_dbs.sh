@@ -51,7 +51,7 @@ CREATE TABLE IF NOT EXISTS sellers (
   password VARCHAR(255) NOT NULL
 );
 CREATE TABLE IF NOT EXISTS sessions (
-  session_id SERIAL PRIMARY KEY,
+  session_id TEXT PRIMARY KEY,
   role VARCHAR(16) NOT NULL CHECK (role IN ('seller','buyer')),
   user_id INTEGER NOT NULL,
   last_access_timestamp TIMESTAMPTZ NOT NULL DEFAULT NOW()
@@ -72,6 +72,12 @@ CREATE TABLE IF NOT EXISTS items (
   item_feedback INTEGER[] DEFAULT '{0,0}',
   seller_id INTEGER NOT NULL
 );
+-- Search (server_side/data_access_layer/search.py): keyword overlap and item-name full text are GIN-indexed.
+ALTER TABLE items ADD COLUMN IF NOT EXISTS name_tsv tsvector
+  GENERATED ALWAYS AS (to_tsvector('simple', item_name)) STORED;
+CREATE INDEX IF NOT EXISTS idx_items_keywords ON items USING GIN (keywords);
+CREATE INDEX IF NOT EXISTS idx_items_name_tsv ON items USING GIN (name_tsv);
+CREATE INDEX IF NOT EXISTS idx_items_category ON items(category, item_id);
 CREATE TABLE IF NOT EXISTS cart_items (
   cart_item_id SERIAL PRIMARY KEY,
   buyer_id INTEGER NOT NULL,
@@ -90,6 +96,8 @@ CREATE TABLE IF NOT EXISTS purchases (
 );
 SQL
 
+echo "Schema created. Add the indexes with:"
+echo "  PGHOST=${IP} PGPORT=5432 PGUSER=${DB_USER} PGPASSWORD=${ROOT_PW} PGSSLMODE=require python database/migrate.py"
 echo "Done. Connect with:"
 echo "  psql \"host=${IP} user=${DB_USER} password=${ROOT_PW} dbname=customer-database sslmode=require\""
 echo "  psql \"host=${IP} user=${DB_USER} password=${ROOT_PW} dbname=product-database sslmode=require\""
@@ -0,0 +1,444 @@
+"""
+Versioned schema migrations for the customer and product databases.
+
+Each database has an ordered list of migrations. Applied versions are recorded
+in its `schema_migrations` table, so running the tool again only applies what
+is missing. Every migration is idempotent (IF NOT EXISTS), so a database built
+by create_dbs.sh, which already has the baseline tables, simply records them
+as applied.
+
+Indexes are built with CREATE INDEX CONCURRENTLY, which does not block writes
+on a live table. It cannot run inside a transaction, so it is recorded as
+applied only after the build succeeds. A build that failed part way leaves an
+INVALID index behind; the next run drops it and builds it again. A session
+advisory lock stops two runners from migrating the same database at once.
+
+`--check` EXPLAINs the hot queries of the DB service with sequential scans
+disabled. The planner then only picks a sequential scan when no index can
+serve the query, so any Seq Scan left in a plan is a missing index, even on a
+near-empty local database.
+
+Connection settings match the DB service: CUSTOMER_PGHOST / PRODUCT_PGHOST
+(and _PGPORT, _PGUSER, _PGPASSWORD), falling back to PGHOST/PGPORT/PGUSER/
+PGPASSWORD, and CUSTOMER_DB_NAME / PRODUCT_DB_NAME for the database names.
+
+Run:
+    python database/migrate.py                  # apply pending migrations to both databases
+    python database/migrate.py --db product     # only one database
+    python database/migrate.py --status         # list applied and pending versions
+    python database/migrate.py --check          # verify hot queries use an index
+    python database/migrate.py --partition-sessions   # optional: hourly session partitions
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+from dataclasses import dataclass
+from datetime import timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import psycopg2
+
+# for `server_side.*` imports resolve
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from server_side.data_access_layer import search, session_reaper, statements
+
+try:
+    from dotenv import load_dotenv
+    load_dotenv()
+except Exception:
+    pass
+
+DATABASES = ("customer", "product")
+
+# Arbitrary constant shared by every runner: pg_advisory_lock key
+MIGRATION_LOCK_KEY = 0x6D6B7470
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    description: str
+    sql: str
+    # Set for CREATE INDEX CONCURRENTLY migrations: the index name, so an INVALID
+    # leftover from a failed build can be dropped before retrying.
+    index: Optional[str] = None
+
+
+def create_index(version: int, name: str, table: str, definition: str) -> Migration:
+    return Migration(
+        version,
+        f"index {name}",
+        f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {table} {definition}",
+        index=name,
+    )
+
+
+# --- Migrations (append only; never edit or renumber an applied one) ---
+MIGRATIONS: Dict[str, List[Migration]] = {
+    "customer": [
+        Migration(1, "baseline tables", """
+            CREATE TABLE IF NOT EXISTS buyers (
+              buyer_id SERIAL PRIMARY KEY,
+              username VARCHAR(255) NOT NULL,
+              password TEXT NOT NULL,
+              items_purchased INTEGER NOT NULL DEFAULT 0
+            );
+            CREATE TABLE IF NOT EXISTS sellers (
+              seller_id SERIAL PRIMARY KEY,
+              seller_feedback INTEGER[] DEFAULT '{0,0}',
+              items_sold INTEGER DEFAULT 0,
+              username VARCHAR(255) NOT NULL,
+              password VARCHAR(255) NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS sessions (
+              session_id SERIAL PRIMARY KEY,
+              role VARCHAR(16) NOT NULL CHECK (role IN ('seller','buyer')),
+              user_id INTEGER NOT NULL,
+              last_access_timestamp TIMESTAMPTZ NOT NULL DEFAULT NOW()
+            );
+        """),
+        create_index(2, "idx_sessions_user_role", "sessions", "(user_id, role)"),
+        # Login: AUTHENTICATE looks accounts up by username.
+        create_index(3, "idx_buyers_username", "buyers", "(username)"),
+        create_index(4, "idx_sellers_username", "sellers", "(username)"),
+        # Session expiry: finding sessions idle past the timeout.
+        create_index(5, "idx_sessions_last_access", "sessions", "(last_access_timestamp)"),
+        # Login: session ids become random tokens (statements.LOGIN) instead of a guessable SERIAL.
+        # Rewrites `sessions` under an exclusive lock; the reaper keeps it down to live sessions.
+        Migration(6, "random session tokens", """
+            ALTER TABLE sessions ALTER COLUMN session_id DROP DEFAULT;
+            ALTER TABLE sessions ALTER COLUMN session_id TYPE TEXT USING session_id::text;
+            DROP SEQUENCE IF EXISTS sessions_session_id_seq;
+        """),
+    ],
+    "product": [
+        Migration(1, "baseline tables", """
+            CREATE TABLE IF NOT EXISTS items (
+              item_id SERIAL PRIMARY KEY,
+              item_name VARCHAR(255) NOT NULL,
+              category INTEGER NOT NULL DEFAULT 0,
+              keywords TEXT[] NULL,
+              condition_is_new BOOLEAN DEFAULT TRUE,
+              sale_price NUMERIC DEFAULT 0,
+              quantity INTEGER DEFAULT 0,
+              item_feedback INTEGER[] DEFAULT '{0,0}',
+              seller_id INTEGER NOT NULL
+            );
+            ALTER TABLE items ADD COLUMN IF NOT EXISTS name_tsv tsvector
+              GENERATED ALWAYS AS (to_tsvector('simple', item_name)) STORED;
+            CREATE TABLE IF NOT EXISTS cart_items (
+              cart_item_id SERIAL PRIMARY KEY,
+              buyer_id INTEGER NOT NULL,
+              session_id VARCHAR NOT NULL DEFAULT '',
+              item_id INTEGER NOT NULL,
+              quantity INTEGER NOT NULL,
+              is_saved BOOLEAN NOT NULL DEFAULT FALSE,
+              CONSTRAINT cart_items_buyer_session_item_saved_uniq UNIQUE (buyer_id, session_id, item_id, is_saved)
+            );
+            CREATE TABLE IF NOT EXISTS purchases (
+              purchase_id SERIAL PRIMARY KEY,
+              buyer_id INTEGER NOT NULL,
+              item_id INTEGER NOT NULL,
+              quantity INTEGER NOT NULL,
+              purchased_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+            );
+        """),
+        # Search: keyword overlap, item-name full text, category listing.
+        create_index(2, "idx_items_keywords", "items", "USING GIN (keywords)"),
+        create_index(3, "idx_items_name_tsv", "items", "USING GIN (name_tsv)"),
+        create_index(4, "idx_items_category", "items", "(category, item_id)"),
+        # GetItemsBySeller and the seller's ownership checks.
+        create_index(5, "idx_items_seller_id", "items", "(seller_id)"),
+        # GetPurchaseHistory, newest first.
+        create_index(6, "idx_purchases_buyer_id", "purchases", "(buyer_id, purchased_at DESC)"),
+    ],
+}
+
+
+# --- Hot queries checked by --check: (statement, sample params) ---
+def _hot_queries() -> Dict[str, List[Tuple[statements.Statement, Sequence[Any]]]]:
+    search_queries = [
+        search.build_query(category, keywords, None, None, in_stock)[:2]
+        for category, keywords, in_stock in ((1, None, False), (1, ["phone"], False), (None, ["phone", "case"], True))
+    ]
+    return {
+        "customer": [
+            (statements.LOGIN["buyer"], ("token", "alice", "secret")),
+            (statements.LOGIN["seller"], ("token", "alice", "secret")),
+            (statements.ACCOUNT_PASSWORD["buyer"], ("alice",)),
+            (statements.ACCOUNT_PASSWORD["seller"], ("alice",)),
+            (statements.REHASH_PASSWORD["buyer"], ("hash", 1, "secret")),
+            (statements.REHASH_PASSWORD["seller"], ("hash", 1, "secret")),
+            (statements.SESSION_OWNER, ("token",)),
+            (statements.TOUCH_SESSION, ("token",)),
+            (statements.DELETE_SESSION, ("token",)),
+            (statements.DELETE_USER_SESSIONS, (1, "buyer")),
+            (statements.REAP_SESSIONS, (360, 500)),
+            (statements.SELLER_FEEDBACK, (1,)),
+            (statements.SELLER_FEEDBACK_INCREMENT[1], (1,)),
+            (statements.ADD_ITEMS_PURCHASED, (1, 1)),
+            (statements.ADD_ITEMS_SOLD, (1, 1)),
+        ],
+        "product": [
+            (statements.GET_ITEM, (1,)),
+            (statements.GET_ITEMS, ([1, 2],)),
+            (statements.GET_ITEM_SELLER, (1,)),
+            (statements.SELLER_ITEMS_WITH_SELLER, (1,)),
+            (statements.UPDATE_ITEM_PRICE, (10, 1, 1)),
+            (statements.GET_OWNED_ITEM_QUANTITY, (1, 1)),
+            (statements.SET_OWNED_ITEM_QUANTITY, (1, 1, 1)),
+            (statements.ITEM_FEEDBACK[1], (1,)),
+            (statements.CART_ITEM_QUANTITY, (1, "1", 1)),
+            (statements.SET_CART_ITEM_QUANTITY, (1, 1, "1", 1)),
+            (statements.DELETE_CART_ITEM, (1, "1", 1)),
+            (statements.ADD_TO_CART_BATCH, (1, "1", [1, 2], [1, 1])),
+            (statements.UPDATE_CART_BATCH, (1, "1", [1, 2], [0, 1])),
+            (statements.SAVE_CART, (1, "1")),
+            (statements.DELETE_UNSAVED_CARTS, (1,)),
+            (statements.CLEAR_SESSION_CART, (1, "1")),
+            (statements.CLEAR_SAVED_CART, (1,)),
+            (statements.LIST_SESSION_CART, (1, "1")),
+            (statements.LIST_SAVED_CART, (1,)),
+            (statements.REAP_SESSION_CARTS, ([1, 2], ["1", "2"])),
+            (statements.BUYER_PURCHASES, (1,)),
+            (statements.BUYER_PURCHASES_UNORDERED, (1,)),
+            *search_queries,
+        ],
+    }
+
+
+# --- Connections ---
+def connect(db: str):
+    prefix = db.upper()
+
+    def env(name: str, default: Optional[str] = None) -> Optional[str]:
+        return os.getenv(f"{prefix}_{name}") or os.getenv(name, default)
+
+    conn = psycopg2.connect(
+        dbname=os.getenv(f"{prefix}_DB_NAME", f"{db}-database"),
+        host=env("PGHOST", "localhost"),
+        port=int(env("PGPORT", "5434")),
+        user=env("PGUSER", "postgres"),
+        password=env("PGPASSWORD"),
+    )
+    conn.autocommit = True
+    return conn
+
+
+def _applied_versions(cur) -> Dict[int, Any]:
+    cur.execute("SELECT version, applied_at FROM schema_migrations")
+    return dict(cur.fetchall())
+
+
+def _ensure_migrations_table(cur):
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+          version INTEGER PRIMARY KEY,
+          description TEXT NOT NULL,
+          applied_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+        )
+        """
+    )
+
+
+# --- Applying ---
+def _apply(conn, migration: Migration):
+    record = "INSERT INTO schema_migrations (version, description) VALUES (%s, %s) ON CONFLICT DO NOTHING"
+    if migration.index is None:
+        conn.autocommit = False
+        try:
+            with conn, conn.cursor() as cur:
+                cur.execute(migration.sql)
+                cur.execute(record, (migration.version, migration.description))
+        finally:
+            conn.autocommit = True
+        return
+    with conn.cursor() as cur:
+        cur.execute(
+            """
+            SELECT NOT ix.indisvalid
+            FROM pg_index ix JOIN pg_class c ON c.oid = ix.indexrelid
+            WHERE c.relname = %s AND pg_table_is_visible(c.oid)
+            """,
+            (migration.index,),
+        )
+        row = cur.fetchone()
+        if row and row[0]:
+            print(f"  dropping invalid index {migration.index} left by an earlier failed build")
+            cur.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {migration.index}")
+        cur.execute(migration.sql)
+        cur.execute(record, (migration.version, migration.description))
+
+
+def migrate(db: str) -> int:
+    """Apply pending migrations to `db`; returns how many were applied."""
+    conn = connect(db)
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT pg_advisory_lock(%s)", (MIGRATION_LOCK_KEY,))
+            _ensure_migrations_table(cur)
+            applied = _applied_versions(cur)
+        count = 0
+        for migration in MIGRATIONS[db]:
+            if migration.version in applied:
+                continue
+            print(f"{db}: applying {migration.version:03d} {migration.description}")
+            _apply(conn, migration)
+            count += 1
+        print(f"{db}: {count} migration(s) applied, at version {MIGRATIONS[db][-1].version}")
+        return count
+    finally:
+        conn.close()
+
+
+def status(db: str):
+    conn = connect(db)
+    try:
+        with conn.cursor() as cur:
+            _ensure_migrations_table(cur)
+            applied = _applied_versions(cur)
+    finally:
+        conn.close()
+    print(f"{db}:")
+    for migration in MIGRATIONS[db]:
+        when = applied.get(migration.version)
+        state = f"applied {when:%Y-%m-%d %H:%M:%S}" if when else "pending"
+        print(f"  {migration.version:03d} {migration.description:<32} {state}")
+
+
+# --- Partitioned sessions (optional layout, see data_access_layer.session_reaper) ---
+def partition_sessions() -> bool:
+    """Rebuild `sessions` as hourly range partitions; only unexpired sessions are copied."""
+    migrate("customer")
+    conn = connect("customer")
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT relkind = 'p', NOW() FROM pg_class WHERE oid = to_regclass('sessions')")
+            partitioned, now = cur.fetchone()
+        if partitioned:
+            print("customer: sessions is already partitioned")
+            return True
+        max_idle = session_reaper.SESSION_TIMEOUT + session_reaper.SESSION_REAPER_GRACE
+        first = session_reaper.partition_start(now - timedelta(seconds=max_idle))
+        starts = [first]
+        while starts[-1] < session_reaper.upcoming_partitions(now)[-1]:
+            starts.append(starts[-1] + session_reaper.PARTITION_WIDTH)
+        conn.autocommit = False
+        with conn, conn.cursor() as cur:
+            # Logins and touches wait here until the swap commits; the copy is only the live sessions.
+            cur.execute("LOCK TABLE sessions IN ACCESS EXCLUSIVE MODE")
+            cur.execute(
+                """
+                CREATE TABLE sessions_partitioned (LIKE sessions INCLUDING DEFAULTS INCLUDING CONSTRAINTS)
+                  PARTITION BY RANGE (last_access_timestamp);
+                ALTER TABLE sessions_partitioned ADD PRIMARY KEY (session_id, last_access_timestamp);
+                ALTER TABLE sessions RENAME TO sessions_unpartitioned;
+                ALTER TABLE sessions_partitioned RENAME TO sessions;
+                CREATE TABLE sessions_default PARTITION OF sessions DEFAULT;
+                """
+            )
+            for start in starts:
+                cur.execute(session_reaper.create_partition_sql(start))
+            cur.execute(
+                "INSERT INTO sessions SELECT * FROM sessions_unpartitioned "
+                "WHERE last_access_timestamp > NOW() - make_interval(secs => %s)",
+                (max_idle,),
+            )
+            copied = cur.rowcount
+            cur.execute(
+                """
+                DROP TABLE sessions_unpartitioned;
+                ALTER INDEX sessions_partitioned_pkey RENAME TO sessions_pkey;
+                CREATE INDEX idx_sessions_user_role ON sessions (user_id, role);
+                CREATE INDEX idx_sessions_last_access ON sessions (last_access_timestamp);
+                """
+            )
+        print(f"customer: sessions partitioned by hour ({len(starts)} partitions, {copied} live sessions kept)")
+        return True
+    finally:
+        conn.close()
+
+
+# --- Index check ---
+def _seq_scans(plan: Dict[str, Any]) -> List[str]:
+    found = [plan["Relation Name"]] if plan.get("Node Type") == "Seq Scan" else []
+    for child in plan.get("Plans", ()):
+        found.extend(_seq_scans(child))
+    return found
+
+
+def _indexes_used(plan: Dict[str, Any]) -> List[str]:
+    found = [plan["Index Name"]] if "Index Name" in plan else []
+    for child in plan.get("Plans", ()):
+        found.extend(_indexes_used(child))
+    return found
+
+
+def check(db: str) -> bool:
+    """EXPLAIN each hot query of `db`; False if any of them still needs a sequential scan."""
+    conn = connect(db)
+    ok = True
+    try:
+        for stmt, params in _hot_queries()[db]:
+            conn.autocommit = False
+            try:
+                with conn.cursor() as cur:
+                    cur.execute("SET LOCAL enable_seqscan = off")
+                    cur.execute("EXPLAIN (FORMAT JSON) " + stmt.sql, params)
+                    plan = cur.fetchone()[0]
+            finally:
+                conn.rollback()
+                conn.autocommit = True
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            root = plan[0]["Plan"]
+            scans = _seq_scans(root)
+            if scans:
+                ok = False
+                print(f"  FAIL {stmt.name:<32} seq scan on {', '.join(sorted(set(scans)))}")
+            else:
+                print(f"  ok   {stmt.name:<32} {', '.join(sorted(set(_indexes_used(root)))) or '-'}")
+    finally:
+        conn.close()
+    return ok
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Apply versioned schema migrations to the marketplace databases.")
+    parser.add_argument("--db", choices=DATABASES + ("all",), default="all", help="database to migrate (default: all)")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--status", action="store_true", help="list applied and pending migrations")
+    mode.add_argument("--check", action="store_true", help="EXPLAIN hot queries and fail on a sequential scan")
+    mode.add_argument("--partition-sessions", action="store_true",
+                      help="convert the customer sessions table to hourly partitions (see session_reaper)")
+    args = parser.parse_args(argv)
+
+    dbs = DATABASES if args.db == "all" else (args.db,)
+    if args.status:
+        for db in dbs:
+            status(db)
+        return 0
+    if args.partition_sessions:
+        return 0 if partition_sessions() else 1
+    if args.check:
+        results = []
+        for db in dbs:
+            print(f"{db}:")
+            results.append(check(db))
+        return 0 if all(results) else 1
+    for db in dbs:
+        migrate(db)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -59,6 +59,11 @@ class DatabaseServiceStub(object):
                 request_serializer=database__pb2.SearchItemsRequest.SerializeToString,
                 response_deserializer=database__pb2.SearchItemsResponse.FromString,
                 _registered_method=True)
+        self.StreamSearchItems = channel.unary_stream(
+                '/marketplace.DatabaseService/StreamSearchItems',
+                request_serializer=database__pb2.SearchItemsRequest.SerializeToString,
+                response_deserializer=database__pb2.SearchItemsResponse.FromString,
+                _registered_method=True)
         self.GetItem = channel.unary_unary(
                 '/marketplace.DatabaseService/GetItem',
                 request_serializer=database__pb2.GetItemRequest.SerializeToString,
@@ -84,6 +89,11 @@ class DatabaseServiceStub(object):
                 request_serializer=database__pb2.GetItemsBySellerRequest.SerializeToString,
                 response_deserializer=database__pb2.SearchItemsResponse.FromString,
                 _registered_method=True)
+        self.GetItems = channel.unary_unary(
+                '/marketplace.DatabaseService/GetItems',
+                request_serializer=database__pb2.GetItemsRequest.SerializeToString,
+                response_deserializer=database__pb2.SearchItemsResponse.FromString,
+                _registered_method=True)
         self.AddToCart = channel.unary_unary(
                 '/marketplace.DatabaseService/AddToCart',
                 request_serializer=database__pb2.AddToCartRequest.SerializeToString,
@@ -134,6 +144,16 @@ class DatabaseServiceStub(object):
                 request_serializer=database__pb2.ClearSavedCartRequest.SerializeToString,
                 response_deserializer=database__pb2.Empty.FromString,
                 _registered_method=True)
+        self.AddToCartBatch = channel.unary_unary(
+                '/marketplace.DatabaseService/AddToCartBatch',
+                request_serializer=database__pb2.AddToCartBatchRequest.SerializeToString,
+                response_deserializer=database__pb2.Empty.FromString,
+                _registered_method=True)
+        self.UpdateCartBatch = channel.unary_unary(
+                '/marketplace.DatabaseService/UpdateCartBatch',
+                request_serializer=database__pb2.UpdateCartBatchRequest.SerializeToString,
+                response_deserializer=database__pb2.Empty.FromString,
+                _registered_method=True)
         self.ProvideFeedback = channel.unary_unary(
                 '/marketplace.DatabaseService/ProvideFeedback',
                 request_serializer=database__pb2.ProvideFeedbackRequest.SerializeToString,
@@ -154,6 +174,11 @@ class DatabaseServiceStub(object):
                 request_serializer=database__pb2.CreatePurchaseRequest.SerializeToString,
                 response_deserializer=database__pb2.Empty.FromString,
                 _registered_method=True)
+        self.Checkout = channel.unary_unary(
+                '/marketplace.DatabaseService/Checkout',
+                request_serializer=database__pb2.CheckoutRequest.SerializeToString,
+                response_deserializer=database__pb2.CheckoutResponse.FromString,
+                _registered_method=True)
 
 
 class DatabaseServiceServicer(object):
@@ -191,6 +216,12 @@ class DatabaseServiceServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def StreamSearchItems(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
     def GetItem(self, request, context):
         """Missing associated documentation comment in .proto file."""
         context.set_code(grpc.StatusCode.UNIMPLEMENTED)
@@ -221,6 +252,12 @@ class DatabaseServiceServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def GetItems(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
     def AddToCart(self, request, context):
         """--- Cart Operations ---
         """
@@ -282,6 +319,18 @@ class DatabaseServiceServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def AddToCartBatch(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def UpdateCartBatch(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
     def ProvideFeedback(self, request, context):
         """--- Feedback / Rating ---
         """
@@ -308,6 +357,12 @@ class DatabaseServiceServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def Checkout(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
 
 def add_DatabaseServiceServicer_to_server(servicer, server):
     rpc_method_handlers = {
@@ -336,6 +391,11 @@ def add_DatabaseServiceServicer_to_server(servicer, server):
                     request_deserializer=database__pb2.SearchItemsRequest.FromString,
                     response_serializer=database__pb2.SearchItemsResponse.SerializeToString,
             ),
+            'StreamSearchItems': grpc.unary_stream_rpc_method_handler(
+                    servicer.StreamSearchItems,
+                    request_deserializer=database__pb2.SearchItemsRequest.FromString,
+                    response_serializer=database__pb2.SearchItemsResponse.SerializeToString,
+            ),
             'GetItem': grpc.unary_unary_rpc_method_handler(
                     servicer.GetItem,
                     request_deserializer=database__pb2.GetItemRequest.FromString,
@@ -361,6 +421,11 @@ def add_DatabaseServiceServicer_to_server(servicer, server):
                     request_deserializer=database__pb2.GetItemsBySellerRequest.FromString,
                     response_serializer=database__pb2.SearchItemsResponse.SerializeToString,
             ),
+            'GetItems': grpc.unary_unary_rpc_method_handler(
+                    servicer.GetItems,
+                    request_deserializer=database__pb2.GetItemsRequest.FromString,
+                    response_serializer=database__pb2.SearchItemsResponse.SerializeToString,
+            ),
             'AddToCart': grpc.unary_unary_rpc_method_handler(
                     servicer.AddToCart,
                     request_deserializer=database__pb2.AddToCartRequest.FromString,
@@ -411,6 +476,16 @@ def add_DatabaseServiceServicer_to_server(servicer, server):
                     request_deserializer=database__pb2.ClearSavedCartRequest.FromString,
                     response_serializer=database__pb2.Empty.SerializeToString,
             ),
+            'AddToCartBatch': grpc.unary_unary_rpc_method_handler(
+                    servicer.AddToCartBatch,
+                    request_deserializer=database__pb2.AddToCartBatchRequest.FromString,
+                    response_serializer=database__pb2.Empty.SerializeToString,
+            ),
+            'UpdateCartBatch': grpc.unary_unary_rpc_method_handler(
+                    servicer.UpdateCartBatch,
+                    request_deserializer=database__pb2.UpdateCartBatchRequest.FromString,
+                    response_serializer=database__pb2.Empty.SerializeToString,
+            ),
             'ProvideFeedback': grpc.unary_unary_rpc_method_handler(
                     servicer.ProvideFeedback,
                     request_deserializer=database__pb2.ProvideFeedbackRequest.FromString,
@@ -431,6 +506,11 @@ def add_DatabaseServiceServicer_to_server(servicer, server):
                     request_deserializer=database__pb2.CreatePurchaseRequest.FromString,
                     response_serializer=database__pb2.Empty.SerializeToString,
             ),
+            'Checkout': grpc.unary_unary_rpc_method_handler(
+                    servicer.Checkout,
+                    request_deserializer=database__pb2.CheckoutRequest.FromString,
+                    response_serializer=database__pb2.CheckoutResponse.SerializeToString,
+            ),
     }
     generic_handler = grpc.method_handlers_generic_handler(
             'marketplace.DatabaseService', rpc_method_handlers)
@@ -577,6 +657,33 @@ class DatabaseService(object):
             metadata,
             _registered_method=True)
 
+    @staticmethod
+    def StreamSearchItems(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(
+            request,
+            target,
+            '/marketplace.DatabaseService/StreamSearchItems',
+            database__pb2.SearchItemsRequest.SerializeToString,
+            database__pb2.SearchItemsResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
     @staticmethod
     def GetItem(request,
             target,
@@ -712,6 +819,33 @@ class DatabaseService(object):
             metadata,
             _registered_method=True)
 
+    @staticmethod
+    def GetItems(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/marketplace.DatabaseService/GetItems',
+            database__pb2.GetItemsRequest.SerializeToString,
+            database__pb2.SearchItemsResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
     @staticmethod
     def AddToCart(request,
             target,
@@ -982,6 +1116,60 @@ class DatabaseService(object):
             metadata,
             _registered_method=True)
 
+    @staticmethod
+    def AddToCartBatch(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/marketplace.DatabaseService/AddToCartBatch',
+            database__pb2.AddToCartBatchRequest.SerializeToString,
+            database__pb2.Empty.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def UpdateCartBatch(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/marketplace.DatabaseService/UpdateCartBatch',
+            database__pb2.UpdateCartBatchRequest.SerializeToString,
+            database__pb2.Empty.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
     @staticmethod
     def ProvideFeedback(request,
             target,
@@ -1089,3 +1277,30 @@ class DatabaseService(object):
             timeout,
             metadata,
             _registered_method=True)
+
+    @staticmethod
+    def Checkout(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/marketplace.DatabaseService/Checkout',
+            database__pb2.CheckoutRequest.SerializeToString,
+            database__pb2.CheckoutResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
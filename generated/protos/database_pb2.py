@@ -24,7 +24,7 @@ _sym_db = _symbol_database.Default()
 
 
 
-DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x0e\x64\x61tabase.proto\x12\x0bmarketplace\"\x07\n\x05\x45mpty\"H\n\x14\x43reateAccountRequest\x12\x0c\n\x04role\x18\x01 \x01(\t\x12\x10\n\x08username\x18\x02 \x01(\t\x12\x10\n\x08password\x18\x03 \x01(\t\"(\n\x15\x43reateAccountResponse\x12\x0f\n\x07user_id\x18\x01 \x01(\x05\"G\n\x13\x41uthenticateRequest\x12\x0c\n\x04role\x18\x01 \x01(\t\x12\x10\n\x08username\x18\x02 \x01(\t\x12\x10\n\x08password\x18\x03 \x01(\t\";\n\x14\x41uthenticateResponse\x12\x0f\n\x07user_id\x18\x01 \x01(\x05\x12\x12\n\nsession_id\x18\x02 \x01(\t\"*\n\x14VerifySessionRequest\x12\x12\n\nsession_id\x18\x01 \x01(\t\"6\n\x15VerifySessionResponse\x12\x0f\n\x07user_id\x18\x01 \x01(\x05\x12\x0c\n\x04role\x18\x02 \x01(\t\"Y\n\x15\x44\x65leteSessionsRequest\x12\x12\n\nsession_id\x18\x01 \x01(\t\x12\x0f\n\x07user_id\x18\x02 \x01(\x05\x12\x0c\n\x04role\x18\x03 \x01(\t\x12\r\n\x05scope\x18\x04 \x01(\t\"8\n\x12SearchItemsRequest\x12\x10\n\x08\x63\x61tegory\x18\x01 \x01(\x05\x12\x10\n\x08keywords\x18\x02 \x03(\t\"\x9c\x01\n\x04Item\x12\x0f\n\x07item_id\x18\x01 \x01(\x05\x12\x11\n\titem_name\x18\x02 \x01(\t\x12\x10\n\x08\x63\x61tegory\x18\x03 \x01(\x05\x12\x10\n\x08keywords\x18\x04 \x03(\t\x12\x18\n\x10\x63ondition_is_new\x18\x05 \x01(\x08\x12\r\n\x05price\x18\x06 \x01(\x02\x12\x10\n\x08quantity\x18\x07 \x01(\x05\x12\x11\n\tseller_id\x18\x08 \x01(\x05\"7\n\x13SearchItemsResponse\x12 \n\x05items\x18\x01 \x03(\x0b\x32\x11.marketplace.Item\"!\n\x0eGetItemRequest\x12\x0f\n\x07item_id\x18\x01 \x01(\x05\"\x93\x01\n\x13RegisterItemRequest\x12\x11\n\titem_name\x18\x01 \x01(\t\x12\x10\n\x08\x63\x61tegory\x18\x02 \x01(\x05\x12\x10\n\x08keywords\x18\x03 \x03(\t\x12\x11\n\tcondition\x18\x04 \x01(\t\x12\r\n\x05price\x18\x05 \x01(\x02\x12\x10\n\x08quantity\x18\x06 \x01(\x05\x12\x11\n\tseller_id\x18\x07 \x01(\x05\"\'\n\x14RegisterItemResponse\x12\x0f\n\x07item_id\x18\x01 \x01(\x05\"K\n\x16UpdateItemPriceRequest\x12\x0f\n\x07item_id\x18\x01 \x01(\x05\x12\x11\n\tseller_id\x18\x02 \x01(\x05\x12\r\n\x05price\x18\x03 \x01(\x02\"W\n\x19UpdateItemQuantityRequest\x12\x0f\n\x07item_id\x18\x01 \x01(\x05\x12\x11\n\tseller_id\x18\x02 \x01(\x05\x12\x16\n\x0equantity_delta\x18\x03 \x01(\x05\"2\n\x1aUpdateItemQuantityResponse\x12\x14\n\x0cnew_quantity\x18\x01 \x01(\x05\",\n\x17GetItemsBySellerRequest\x12\x11\n\tseller_id\x18\x01 \x01(\x05\"[\n\x10\x41\x64\x64ToCartRequest\x12\x10\n\x08\x62uyer_id\x18\x01 \x01(\x05\x12\x12\n\nsession_id\x18\x02 \x01(\t\x12\x0f\n\x07item_id\x18\x03 \x01(\x05\x12\x10\n\x08quantity\x18\x04 \x01(\x05\"N\n\x15RemoveFromCartRequest\x12\x10\n\x08\x62uyer_id\x18\x01 \x01(\x05\x12\x12\n\nsession_id\x18\x02 \x01(\t\x12\x0f\n\x07item_id\x18\x03 \x01(\x05\"S\n\x1aGetCartItemQuantityRequest\x12\x10\n\x08\x62uyer_id\x18\x01 \x01(\x05\x12\x12\n\nsession_id\x18\x02 \x01(\t\x12\x0f\n\x07item_id\x18\x03 \x01(\x05\"$\n\x10QuantityResponse\x12\x10\n\x08quantity\x18\x01 \x01(\x05\"`\n\x15UpdateCartItemRequest\x12\x10\n\x08\x62uyer_id\x18\x01 \x01(\x05\x12\x12\n\nsession_id\x18\x02 \x01(\t\x12\x0f\n\x07item_id\x18\x03 \x01(\x05\x12\x10\n\x08quantity\x18\x04 \x01(\x05\"7\n\x0fSaveCartRequest\x12\x10\n\x08\x62uyer_id\x18\x01 \x01(\x05\x12\x12\n\nsession_id\x18\x02 \x01(\t\"8\n\x10\x43learCartRequest\x12\x10\n\x08\x62uyer_id\x18\x01 \x01(\x05\x12\x12\n\nsession_id\x18\x02 \x01(\t\"7\n\x0fListCartRequest\x12\x10\n\x08\x62uyer_id\x18\x01 \x01(\x05\x12\x12\n\nsession_id\x18\x02 \x01(\t\"-\n\x08\x43\x61rtItem\x12\x0f\n\x07item_id\x18\x01 \x01(\x05\x12\x10\n\x08quantity\x18\x02 \x01(\x05\"8\n\x10\x43\x61rtListResponse\x12$\n\x05items\x18\x01 \x03(\x0b\x32\x15.marketplace.CartItem\"@\n\x18\x44\x65leteUnsavedCartRequest\x12\x10\n\x08\x62uyer_id\x18\x01 \x01(\x05\x12\x12\n\nsession_id\x18\x02 \x01(\t\"(\n\x14ListSavedCartRequest\x12\x10\n\x08\x62uyer_id\x18\x01 \x01(\x05\")\n\x15\x43learSavedCartRequest\x12\x10\n\x08\x62uyer_id\x18\x01 \x01(\x05\"P\n\x16ProvideFeedbackRequest\x12\x0f\n\x07item_id\x18\x01 \x01(\x05\x12\x10\n\x08\x62uyer_id\x18\x02 \x01(\x05\x12\x13\n\x0bis_positive\x18\x03 \x01(\x08\"+\n\x16GetSellerRatingRequest\x12\x11\n\tseller_id\x18\x01 \x01(\x05\"0\n\x14SellerRatingResponse\x12\x0b\n\x03pos\x18\x01 \x01(\x05\x12\x0b\n\x03neg\x18\x02 \x01(\x05\"-\n\x19GetPurchaseHistoryRequest\x12\x10\n\x08\x62uyer_id\x18\x01 \x01(\x05\"I\n\x0ePurchaseRecord\x12\x0f\n\x07item_id\x18\x01 \x01(\x05\x12\x10\n\x08quantity\x18\x02 \x01(\x05\x12\x14\n\x0cpurchased_at\x18\x03 \x01(\t\"G\n\x17PurchaseHistoryResponse\x12,\n\x07records\x18\x01 \x03(\x0b\x32\x1b.marketplace.PurchaseRecord\"L\n\x15\x43reatePurchaseRequest\x12\x10\n\x08\x62uyer_id\x18\x01 \x01(\x05\x12\x0f\n\x07item_id\x18\x02 \x01(\x05\x12\x10\n\x08quantity\x18\x03 \x01(\x05\x32\x91\x0f\n\x0f\x44\x61tabaseService\x12V\n\rCreateAccount\x12!.marketplace.CreateAccountRequest\x1a\".marketplace.CreateAccountResponse\x12W\n\x10\x41uthenticateUser\x12 .marketplace.AuthenticateRequest\x1a!.marketplace.AuthenticateResponse\x12V\n\rVerifySession\x12!.marketplace.VerifySessionRequest\x1a\".marketplace.VerifySessionResponse\x12H\n\x0e\x44\x65leteSessions\x12\".marketplace.DeleteSessionsRequest\x1a\x12.marketplace.Empty\x12P\n\x0bSearchItems\x12\x1f.marketplace.SearchItemsRequest\x1a .marketplace.SearchItemsResponse\x12\x39\n\x07GetItem\x12\x1b.marketplace.GetItemRequest\x1a\x11.marketplace.Item\x12S\n\x0cRegisterItem\x12 .marketplace.RegisterItemRequest\x1a!.marketplace.RegisterItemResponse\x12J\n\x0fUpdateItemPrice\x12#.marketplace.UpdateItemPriceRequest\x1a\x12.marketplace.Empty\x12\x65\n\x12UpdateItemQuantity\x12&.marketplace.UpdateItemQuantityRequest\x1a\'.marketplace.UpdateItemQuantityResponse\x12Z\n\x10GetItemsBySeller\x12$.marketplace.GetItemsBySellerRequest\x1a .marketplace.SearchItemsResponse\x12>\n\tAddToCart\x12\x1d.marketplace.AddToCartRequest\x1a\x12.marketplace.Empty\x12H\n\x0eRemoveFromCart\x12\".marketplace.RemoveFromCartRequest\x1a\x12.marketplace.Empty\x12]\n\x13GetCartItemQuantity\x12\'.marketplace.GetCartItemQuantityRequest\x1a\x1d.marketplace.QuantityResponse\x12H\n\x0eUpdateCartItem\x12\".marketplace.UpdateCartItemRequest\x1a\x12.marketplace.Empty\x12<\n\x08SaveCart\x12\x1c.marketplace.SaveCartRequest\x1a\x12.marketplace.Empty\x12>\n\tClearCart\x12\x1d.marketplace.ClearCartRequest\x1a\x12.marketplace.Empty\x12G\n\x08ListCart\x12\x1c.marketplace.ListCartRequest\x1a\x1d.marketplace.CartListResponse\x12N\n\x11\x44\x65leteUnsavedCart\x12%.marketplace.DeleteUnsavedCartRequest\x1a\x12.marketplace.Empty\x12Q\n\rListSavedCart\x12!.marketplace.ListSavedCartRequest\x1a\x1d.marketplace.CartListResponse\x12H\n\x0e\x43learSavedCart\x12\".marketplace.ClearSavedCartRequest\x1a\x12.marketplace.Empty\x12J\n\x0fProvideFeedback\x12#.marketplace.ProvideFeedbackRequest\x1a\x12.marketplace.Empty\x12Y\n\x0fGetSellerRating\x12#.marketplace.GetSellerRatingRequest\x1a!.marketplace.SellerRatingResponse\x12\x62\n\x12GetPurchaseHistory\x12&.marketplace.GetPurchaseHistoryRequest\x1a$.marketplace.PurchaseHistoryResponse\x12H\n\x0e\x43reatePurchase\x12\".marketplace.CreatePurchaseRequest\x1a\x12.marketplace.Emptyb\x06proto3')
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x0e\x64\x61tabase.proto\x12\x0bmarketplace\"\x07\n\x05\x45mpty\"H\n\x14\x43reateAccountRequest\x12\x0c\n\x04role\x18\x01 \x01(\t\x12\x10\n\x08username\x18\x02 \x01(\t\x12\x10\n\x08password\x18\x03 \x01(\t\"(\n\x15\x43reateAccountResponse\x12\x0f\n\x07user_id\x18\x01 \x01(\x05\"G\n\x13\x41uthenticateRequest\x12\x0c\n\x04role\x18\x01 \x01(\t\x12\x10\n\x08username\x18\x02 \x01(\t\x12\x10\n\x08password\x18\x03 \x01(\t\";\n\x14\x41uthenticateResponse\x12\x0f\n\x07user_id\x18\x01 \x01(\x05\x12\x12\n\nsession_id\x18\x02 \x01(\t\"*\n\x14VerifySessionRequest\x12\x12\n\nsession_id\x18\x01 \x01(\t\"6\n\x15VerifySessionResponse\x12\x0f\n\x07user_id\x18\x01 \x01(\x05\x12\x0c\n\x04role\x18\x02 \x01(\t\"Y\n\x15\x44\x65leteSessionsRequest\x12\x12\n\nsession_id\x18\x01 \x01(\t\x12\x0f\n\x07user_id\x18\x02 \x01(\x05\x12\x0c\n\x04role\x18\x03 \x01(\t\x12\r\n\x05scope\x18\x04 \x01(\t\"W\n\x12SearchItemsRequest\x12\x10\n\x08\x63\x61tegory\x18\x01 \x01(\x05\x12\x10\n\x08keywords\x18\x02 \x03(\t\x12\r\n\x05limit\x18\x03 \x01(\x05\x12\x0e\n\x06\x63ursor\x18\x04 \x01(\t\"\x9c\x01\n\x04Item\x12\x0f\n\x07item_id\x18\x01 \x01(\x05\x12\x11\n\titem_name\x18\x02 \x01(\t\x12\x10\n\x08\x63\x61tegory\x18\x03 \x01(\x05\x12\x10\n\x08keywords\x18\x04 \x03(\t\x12\x18\n\x10\x63ondition_is_new\x18\x05 \x01(\x08\x12\r\n\x05price\x18\x06 \x01(\x02\x12\x10\n\x08quantity\x18\x07 \x01(\x05\x12\x11\n\tseller_id\x18\x08 \x01(\x05\"L\n\x13SearchItemsResponse\x12 \n\x05items\x18\x01 \x03(\x0b\x32\x11.marketplace.Item\x12\x13\n\x0bnext_cursor\x18\x02 \x01(\t\"!\n\x0eGetItemRequest\x12\x0f\n\x07item_id\x18\x01 \x01(\x05\"\x93\x01\n\x13RegisterItemRequest\x12\x11\n\titem_name\x18\x01 \x01(\t\x12\x10\n\x08\x63\x61tegory\x18\x02 \x01(\x05\x12\x10\n\x08keywords\x18\x03 \x03(\t\x12\x11\n\tcondition\x18\x04 \x01(\t\x12\r\n\x05price\x18\x05 \x01(\x02\x12\x10\n\x08quantity\x18\x06 \x01(\x05\x12\x11\n\tseller_id\x18\x07 \x01(\x05\"\'\n\x14RegisterItemResponse\x12\x0f\n\x07item_id\x18\x01 \x01(\x05\"K\n\x16UpdateItemPriceRequest\x12\x0f\n\x07item_id\x18\x01 \x01(\x05\x12\x11\n\tseller_id\x18\x02 \x01(\x05\x12\r\n\x05price\x18\x03 \x01(\x02\"W\n\x19UpdateItemQuantityRequest\x12\x0f\n\x07item_id\x18\x01 \x01(\x05\x12\x11\n\tseller_id\x18\x02 \x01(\x05\x12\x16\n\x0equantity_delta\x18\x03 \x01(\x05\"2\n\x1aUpdateItemQuantityResponse\x12\x14\n\x0cnew_quantity\x18\x01 \x01(\x05\",\n\x17GetItemsBySellerRequest\x12\x11\n\tseller_id\x18\x01 \x01(\x05\"2\n\x0fGetItemsRequest\x12\x10\n\x08item_ids\x18\x01 \x03(\x05\x12\r\n\x05\x66resh\x18\x02 \x01(\x08\"[\n\x10\x41\x64\x64ToCartRequest\x12\x10\n\x08\x62uyer_id\x18\x01 \x01(\x05\x12\x12\n\nsession_id\x18\x02 \x01(\t\x12\x0f\n\x07item_id\x18\x03 \x01(\x05\x12\x10\n\x08quantity\x18\x04 \x01(\x05\"N\n\x15RemoveFromCartRequest\x12\x10\n\x08\x62uyer_id\x18\x01 \x01(\x05\x12\x12\n\nsession_id\x18\x02 \x01(\t\x12\x0f\n\x07item_id\x18\x03 \x01(\x05\"S\n\x1aGetCartItemQuantityRequest\x12\x10\n\x08\x62uyer_id\x18\x01 \x01(\x05\x12\x12\n\nsession_id\x18\x02 \x01(\t\x12\x0f\n\x07item_id\x18\x03 \x01(\x05\"$\n\x10QuantityResponse\x12\x10\n\x08quantity\x18\x01 \x01(\x05\"`\n\x15UpdateCartItemRequest\x12\x10\n\x08\x62uyer_id\x18\x01 \x01(\x05\x12\x12\n\nsession_id\x18\x02 \x01(\t\x12\x0f\n\x07item_id\x18\x03 \x01(\x05\x12\x10\n\x08quantity\x18\x04 \x01(\x05\"7\n\x0fSaveCartRequest\x12\x10\n\x08\x62uyer_id\x18\x01 \x01(\x05\x12\x12\n\nsession_id\x18\x02 \x01(\t\"8\n\x10\x43learCartRequest\x12\x10\n\x08\x62uyer_id\x18\x01 \x01(\x05\x12\x12\n\nsession_id\x18\x02 \x01(\t\"7\n\x0fListCartRequest\x12\x10\n\x08\x62uyer_id\x18\x01 \x01(\x05\x12\x12\n\nsession_id\x18\x02 \x01(\t\"-\n\x08\x43\x61rtItem\x12\x0f\n\x07item_id\x18\x01 \x01(\x05\x12\x10\n\x08quantity\x18\x02 \x01(\x05\"8\n\x10\x43\x61rtListResponse\x12$\n\x05items\x18\x01 \x03(\x0b\x32\x15.marketplace.CartItem\"c\n\x15\x41\x64\x64ToCartBatchRequest\x12\x10\n\x08\x62uyer_id\x18\x01 \x01(\x05\x12\x12\n\nsession_id\x18\x02 \x01(\t\x12$\n\x05items\x18\x03 \x03(\x0b\x32\x15.marketplace.CartItem\"d\n\x16UpdateCartBatchRequest\x12\x10\n\x08\x62uyer_id\x18\x01 \x01(\x05\x12\x12\n\nsession_id\x18\x02 \x01(\t\x12$\n\x05items\x18\x03 \x03(\x0b\x32\x15.marketplace.CartItem\"@\n\x18\x44\x65leteUnsavedCartRequest\x12\x10\n\x08\x62uyer_id\x18\x01 \x01(\x05\x12\x12\n\nsession_id\x18\x02 \x01(\t\"(\n\x14ListSavedCartRequest\x12\x10\n\x08\x62uyer_id\x18\x01 \x01(\x05\")\n\x15\x43learSavedCartRequest\x12\x10\n\x08\x62uyer_id\x18\x01 \x01(\x05\"P\n\x16ProvideFeedbackRequest\x12\x0f\n\x07item_id\x18\x01 \x01(\x05\x12\x10\n\x08\x62uyer_id\x18\x02 \x01(\x05\x12\x13\n\x0bis_positive\x18\x03 \x01(\x08\"+\n\x16GetSellerRatingRequest\x12\x11\n\tseller_id\x18\x01 \x01(\x05\"0\n\x14SellerRatingResponse\x12\x0b\n\x03pos\x18\x01 \x01(\x05\x12\x0b\n\x03neg\x18\x02 \x01(\x05\"-\n\x19GetPurchaseHistoryRequest\x12\x10\n\x08\x62uyer_id\x18\x01 \x01(\x05\"I\n\x0ePurchaseRecord\x12\x0f\n\x07item_id\x18\x01 \x01(\x05\x12\x10\n\x08quantity\x18\x02 \x01(\x05\x12\x14\n\x0cpurchased_at\x18\x03 \x01(\t\"G\n\x17PurchaseHistoryResponse\x12,\n\x07records\x18\x01 \x03(\x0b\x32\x1b.marketplace.PurchaseRecord\"L\n\x15\x43reatePurchaseRequest\x12\x10\n\x08\x62uyer_id\x18\x01 \x01(\x05\x12\x0f\n\x07item_id\x18\x02 \x01(\x05\x12\x10\n\x08quantity\x18\x03 \x01(\x05\"`\n\x0bPaymentCard\x12\x0c\n\x04name\x18\x01 \x01(\t\x12\x13\n\x0b\x63\x61rd_number\x18\x02 \x01(\t\x12\x17\n\x0f\x65xpiration_date\x18\x03 \x01(\t\x12\x15\n\rsecurity_code\x18\x04 \x01(\t\"b\n\x0f\x43heckoutRequest\x12\x10\n\x08\x62uyer_id\x18\x01 \x01(\x05\x12\x15\n\rvalidate_only\x18\x02 \x01(\x08\x12&\n\x04\x63\x61rd\x18\x03 \x01(\x0b\x32\x18.marketplace.PaymentCard\"8\n\x10\x43heckoutResponse\x12$\n\x05items\x18\x01 \x03(\x0b\x32\x15.marketplace.CartItem2\x96\x12\n\x0f\x44\x61tabaseService\x12V\n\rCreateAccount\x12!.marketplace.CreateAccountRequest\x1a\".marketplace.CreateAccountResponse\x12W\n\x10\x41uthenticateUser\x12 .marketplace.AuthenticateRequest\x1a!.marketplace.AuthenticateResponse\x12V\n\rVerifySession\x12!.marketplace.VerifySessionRequest\x1a\".marketplace.VerifySessionResponse\x12H\n\x0e\x44\x65leteSessions\x12\".marketplace.DeleteSessionsRequest\x1a\x12.marketplace.Empty\x12P\n\x0bSearchItems\x12\x1f.marketplace.SearchItemsRequest\x1a .marketplace.SearchItemsResponse\x12X\n\x11StreamSearchItems\x12\x1f.marketplace.SearchItemsRequest\x1a .marketplace.SearchItemsResponse0\x01\x12\x39\n\x07GetItem\x12\x1b.marketplace.GetItemRequest\x1a\x11.marketplace.Item\x12S\n\x0cRegisterItem\x12 .marketplace.RegisterItemRequest\x1a!.marketplace.RegisterItemResponse\x12J\n\x0fUpdateItemPrice\x12#.marketplace.UpdateItemPriceRequest\x1a\x12.marketplace.Empty\x12\x65\n\x12UpdateItemQuantity\x12&.marketplace.UpdateItemQuantityRequest\x1a\'.marketplace.UpdateItemQuantityResponse\x12Z\n\x10GetItemsBySeller\x12$.marketplace.GetItemsBySellerRequest\x1a .marketplace.SearchItemsResponse\x12J\n\x08GetItems\x12\x1c.marketplace.GetItemsRequest\x1a .marketplace.SearchItemsResponse\x12>\n\tAddToCart\x12\x1d.marketplace.AddToCartRequest\x1a\x12.marketplace.Empty\x12H\n\x0eRemoveFromCart\x12\".marketplace.RemoveFromCartRequest\x1a\x12.marketplace.Empty\x12]\n\x13GetCartItemQuantity\x12\'.marketplace.GetCartItemQuantityRequest\x1a\x1d.marketplace.QuantityResponse\x12H\n\x0eUpdateCartItem\x12\".marketplace.UpdateCartItemRequest\x1a\x12.marketplace.Empty\x12<\n\x08SaveCart\x12\x1c.marketplace.SaveCartRequest\x1a\x12.marketplace.Empty\x12>\n\tClearCart\x12\x1d.marketplace.ClearCartRequest\x1a\x12.marketplace.Empty\x12G\n\x08ListCart\x12\x1c.marketplace.ListCartRequest\x1a\x1d.marketplace.CartListResponse\x12N\n\x11\x44\x65leteUnsavedCart\x12%.marketplace.DeleteUnsavedCartRequest\x1a\x12.marketplace.Empty\x12Q\n\rListSavedCart\x12!.marketplace.ListSavedCartRequest\x1a\x1d.marketplace.CartListResponse\x12H\n\x0e\x43learSavedCart\x12\".marketplace.ClearSavedCartRequest\x1a\x12.marketplace.Empty\x12H\n\x0e\x41\x64\x64ToCartBatch\x12\".marketplace.AddToCartBatchRequest\x1a\x12.marketplace.Empty\x12J\n\x0fUpdateCartBatch\x12#.marketplace.UpdateCartBatchRequest\x1a\x12.marketplace.Empty\x12J\n\x0fProvideFeedback\x12#.marketplace.ProvideFeedbackRequest\x1a\x12.marketplace.Empty\x12Y\n\x0fGetSellerRating\x12#.marketplace.GetSellerRatingRequest\x1a!.marketplace.SellerRatingResponse\x12\x62\n\x12GetPurchaseHistory\x12&.marketplace.GetPurchaseHistoryRequest\x1a$.marketplace.PurchaseHistoryResponse\x12H\n\x0e\x43reatePurchase\x12\".marketplace.CreatePurchaseRequest\x1a\x12.marketplace.Empty\x12G\n\x08\x43heckout\x12\x1c.marketplace.CheckoutRequest\x1a\x1d.marketplace.CheckoutResponseb\x06proto3')
 
 _globals = globals()
 _builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
@@ -48,65 +48,77 @@ if not _descriptor._USE_C_DESCRIPTORS:
   _globals['_DELETESESSIONSREQUEST']._serialized_start=390
   _globals['_DELETESESSIONSREQUEST']._serialized_end=479
   _globals['_SEARCHITEMSREQUEST']._serialized_start=481
-  _globals['_SEARCHITEMSREQUEST']._serialized_end=537
-  _globals['_ITEM']._serialized_start=540
-  _globals['_ITEM']._serialized_end=696
-  _globals['_SEARCHITEMSRESPONSE']._serialized_start=698
-  _globals['_SEARCHITEMSRESPONSE']._serialized_end=753
-  _globals['_GETITEMREQUEST']._serialized_start=755
-  _globals['_GETITEMREQUEST']._serialized_end=788
-  _globals['_REGISTERITEMREQUEST']._serialized_start=791
-  _globals['_REGISTERITEMREQUEST']._serialized_end=938
-  _globals['_REGISTERITEMRESPONSE']._serialized_start=940
-  _globals['_REGISTERITEMRESPONSE']._serialized_end=979
-  _globals['_UPDATEITEMPRICEREQUEST']._serialized_start=981
-  _globals['_UPDATEITEMPRICEREQUEST']._serialized_end=1056
-  _globals['_UPDATEITEMQUANTITYREQUEST']._serialized_start=1058
-  _globals['_UPDATEITEMQUANTITYREQUEST']._serialized_end=1145
-  _globals['_UPDATEITEMQUANTITYRESPONSE']._serialized_start=1147
-  _globals['_UPDATEITEMQUANTITYRESPONSE']._serialized_end=1197
-  _globals['_GETITEMSBYSELLERREQUEST']._serialized_start=1199
-  _globals['_GETITEMSBYSELLERREQUEST']._serialized_end=1243
-  _globals['_ADDTOCARTREQUEST']._serialized_start=1245
-  _globals['_ADDTOCARTREQUEST']._serialized_end=1336
-  _globals['_REMOVEFROMCARTREQUEST']._serialized_start=1338
-  _globals['_REMOVEFROMCARTREQUEST']._serialized_end=1416
-  _globals['_GETCARTITEMQUANTITYREQUEST']._serialized_start=1418
-  _globals['_GETCARTITEMQUANTITYREQUEST']._serialized_end=1501
-  _globals['_QUANTITYRESPONSE']._serialized_start=1503
-  _globals['_QUANTITYRESPONSE']._serialized_end=1539
-  _globals['_UPDATECARTITEMREQUEST']._serialized_start=1541
-  _globals['_UPDATECARTITEMREQUEST']._serialized_end=1637
-  _globals['_SAVECARTREQUEST']._serialized_start=1639
-  _globals['_SAVECARTREQUEST']._serialized_end=1694
-  _globals['_CLEARCARTREQUEST']._serialized_start=1696
-  _globals['_CLEARCARTREQUEST']._serialized_end=1752
-  _globals['_LISTCARTREQUEST']._serialized_start=1754
-  _globals['_LISTCARTREQUEST']._serialized_end=1809
-  _globals['_CARTITEM']._serialized_start=1811
-  _globals['_CARTITEM']._serialized_end=1856
-  _globals['_CARTLISTRESPONSE']._serialized_start=1858
-  _globals['_CARTLISTRESPONSE']._serialized_end=1914
-  _globals['_DELETEUNSAVEDCARTREQUEST']._serialized_start=1916
-  _globals['_DELETEUNSAVEDCARTREQUEST']._serialized_end=1980
-  _globals['_LISTSAVEDCARTREQUEST']._serialized_start=1982
-  _globals['_LISTSAVEDCARTREQUEST']._serialized_end=2022
-  _globals['_CLEARSAVEDCARTREQUEST']._serialized_start=2024
-  _globals['_CLEARSAVEDCARTREQUEST']._serialized_end=2065
-  _globals['_PROVIDEFEEDBACKREQUEST']._serialized_start=2067
-  _globals['_PROVIDEFEEDBACKREQUEST']._serialized_end=2147
-  _globals['_GETSELLERRATINGREQUEST']._serialized_start=2149
-  _globals['_GETSELLERRATINGREQUEST']._serialized_end=2192
-  _globals['_SELLERRATINGRESPONSE']._serialized_start=2194
-  _globals['_SELLERRATINGRESPONSE']._serialized_end=2242
-  _globals['_GETPURCHASEHISTORYREQUEST']._serialized_start=2244
-  _globals['_GETPURCHASEHISTORYREQUEST']._serialized_end=2289
-  _globals['_PURCHASERECORD']._serialized_start=2291
-  _globals['_PURCHASERECORD']._serialized_end=2364
-  _globals['_PURCHASEHISTORYRESPONSE']._serialized_start=2366
-  _globals['_PURCHASEHISTORYRESPONSE']._serialized_end=2437
-  _globals['_CREATEPURCHASEREQUEST']._serialized_start=2439
-  _globals['_CREATEPURCHASEREQUEST']._serialized_end=2515
-  _globals['_DATABASESERVICE']._serialized_start=2518
-  _globals['_DATABASESERVICE']._serialized_end=4455
+  _globals['_SEARCHITEMSREQUEST']._serialized_end=568
+  _globals['_ITEM']._serialized_start=571
+  _globals['_ITEM']._serialized_end=727
+  _globals['_SEARCHITEMSRESPONSE']._serialized_start=729
+  _globals['_SEARCHITEMSRESPONSE']._serialized_end=805
+  _globals['_GETITEMREQUEST']._serialized_start=807
+  _globals['_GETITEMREQUEST']._serialized_end=840
+  _globals['_REGISTERITEMREQUEST']._serialized_start=843
+  _globals['_REGISTERITEMREQUEST']._serialized_end=990
+  _globals['_REGISTERITEMRESPONSE']._serialized_start=992
+  _globals['_REGISTERITEMRESPONSE']._serialized_end=1031
+  _globals['_UPDATEITEMPRICEREQUEST']._serialized_start=1033
+  _globals['_UPDATEITEMPRICEREQUEST']._serialized_end=1108
+  _globals['_UPDATEITEMQUANTITYREQUEST']._serialized_start=1110
+  _globals['_UPDATEITEMQUANTITYREQUEST']._serialized_end=1197
+  _globals['_UPDATEITEMQUANTITYRESPONSE']._serialized_start=1199
+  _globals['_UPDATEITEMQUANTITYRESPONSE']._serialized_end=1249
+  _globals['_GETITEMSBYSELLERREQUEST']._serialized_start=1251
+  _globals['_GETITEMSBYSELLERREQUEST']._serialized_end=1295
+  _globals['_GETITEMSREQUEST']._serialized_start=1297
+  _globals['_GETITEMSREQUEST']._serialized_end=1347
+  _globals['_ADDTOCARTREQUEST']._serialized_start=1349
+  _globals['_ADDTOCARTREQUEST']._serialized_end=1440
+  _globals['_REMOVEFROMCARTREQUEST']._serialized_start=1442
+  _globals['_REMOVEFROMCARTREQUEST']._serialized_end=1520
+  _globals['_GETCARTITEMQUANTITYREQUEST']._serialized_start=1522
+  _globals['_GETCARTITEMQUANTITYREQUEST']._serialized_end=1605
+  _globals['_QUANTITYRESPONSE']._serialized_start=1607
+  _globals['_QUANTITYRESPONSE']._serialized_end=1643
+  _globals['_UPDATECARTITEMREQUEST']._serialized_start=1645
+  _globals['_UPDATECARTITEMREQUEST']._serialized_end=1741
+  _globals['_SAVECARTREQUEST']._serialized_start=1743
+  _globals['_SAVECARTREQUEST']._serialized_end=1798
+  _globals['_CLEARCARTREQUEST']._serialized_start=1800
+  _globals['_CLEARCARTREQUEST']._serialized_end=1856
+  _globals['_LISTCARTREQUEST']._serialized_start=1858
+  _globals['_LISTCARTREQUEST']._serialized_end=1913
+  _globals['_CARTITEM']._serialized_start=1915
+  _globals['_CARTITEM']._serialized_end=1960
+  _globals['_CARTLISTRESPONSE']._serialized_start=1962
+  _globals['_CARTLISTRESPONSE']._serialized_end=2018
+  _globals['_ADDTOCARTBATCHREQUEST']._serialized_start=2020
+  _globals['_ADDTOCARTBATCHREQUEST']._serialized_end=2119
+  _globals['_UPDATECARTBATCHREQUEST']._serialized_start=2121
+  _globals['_UPDATECARTBATCHREQUEST']._serialized_end=2221
+  _globals['_DELETEUNSAVEDCARTREQUEST']._serialized_start=2223
+  _globals['_DELETEUNSAVEDCARTREQUEST']._serialized_end=2287
+  _globals['_LISTSAVEDCARTREQUEST']._serialized_start=2289
+  _globals['_LISTSAVEDCARTREQUEST']._serialized_end=2329
+  _globals['_CLEARSAVEDCARTREQUEST']._serialized_start=2331
+  _globals['_CLEARSAVEDCARTREQUEST']._serialized_end=2372
+  _globals['_PROVIDEFEEDBACKREQUEST']._serialized_start=2374
+  _globals['_PROVIDEFEEDBACKREQUEST']._serialized_end=2454
+  _globals['_GETSELLERRATINGREQUEST']._serialized_start=2456
+  _globals['_GETSELLERRATINGREQUEST']._serialized_end=2499
+  _globals['_SELLERRATINGRESPONSE']._serialized_start=2501
+  _globals['_SELLERRATINGRESPONSE']._serialized_end=2549
+  _globals['_GETPURCHASEHISTORYREQUEST']._serialized_start=2551
+  _globals['_GETPURCHASEHISTORYREQUEST']._serialized_end=2596
+  _globals['_PURCHASERECORD']._serialized_start=2598
+  _globals['_PURCHASERECORD']._serialized_end=2671
+  _globals['_PURCHASEHISTORYRESPONSE']._serialized_start=2673
+  _globals['_PURCHASEHISTORYRESPONSE']._serialized_end=2744
+  _globals['_CREATEPURCHASEREQUEST']._serialized_start=2746
+  _globals['_CREATEPURCHASEREQUEST']._serialized_end=2822
+  _globals['_PAYMENTCARD']._serialized_start=2824
+  _globals['_PAYMENTCARD']._serialized_end=2920
+  _globals['_CHECKOUTREQUEST']._serialized_start=2922
+  _globals['_CHECKOUTREQUEST']._serialized_end=3020
+  _globals['_CHECKOUTRESPONSE']._serialized_start=3022
+  _globals['_CHECKOUTRESPONSE']._serialized_end=3078
+  _globals['_DATABASESERVICE']._serialized_start=3081
+  _globals['_DATABASESERVICE']._serialized_end=5407
 # @@protoc_insertion_point(module_scope)
@@ -10,6 +10,8 @@ if str(REPO_ROOT) not in sys.path:
 from server_side.seller_interface.seller_server import SellerServer
 from server_side.buyer_interface.buyer_server import BuyerServer
 from server_side.buyer_interface import buyer_rest_server
+from server_side.common.metrics import start_metrics_server
+from server_side.common.workers import WorkerSupervisor
 from server_side.seller_interface import seller_rest_server
 from client_side.common.tcp_client import TCPClient
 from client_side.seller_interface.seller_client import SellerClient
@@ -21,19 +23,41 @@ import client_side.buyer_interface.buyer_rest_cli as buyer_rest_cli
 import uvicorn
 
 
+def _start_tcp_server(server, args):
+    if args.metrics_port:
+        start_metrics_server(args.metrics_port)
+    if args.engine == "asyncio":
+        server.start_async(max_workers=args.max_workers)
+    else:
+        server.start()
+
+
+def _run_tcp_workers(server_cls, args):
+    supervisor = WorkerSupervisor(
+        lambda: server_cls(args.host, args.port, reuse_port=True),
+        lambda server: _start_tcp_server(server, args),
+        args.workers,
+    )
+    supervisor.run()
+
+
 def run_seller_server(args):
+    if args.workers > 1:
+        return _run_tcp_workers(SellerServer, args)
     server = SellerServer(args.host, args.port)
     try:
-        server.start()
+        _start_tcp_server(server, args)
     except KeyboardInterrupt:
         print("Shutting down seller server...")
         server.stop()
 
 
 def run_buyer_server(args):
+    if args.workers > 1:
+        return _run_tcp_workers(BuyerServer, args)
     server = BuyerServer(args.host, args.port)
     try:
-        server.start()
+        _start_tcp_server(server, args)
     except KeyboardInterrupt:
         print("Shutting down buyer server...")
         server.stop()
@@ -45,6 +69,9 @@ def run_buyer_rest_server(args):
         host=args.host,
         port=args.port,
         reload=False,
+        # Route uvicorn's loggers through the queue-backed root handler (server_side/common/logging_config.py)
+        log_config=None,
+        access_log=args.access_log,
     )
 
 
@@ -54,6 +81,9 @@ def run_seller_rest_server(args):
         host=args.host,
         port=args.port,
         reload=False,
+        # Route uvicorn's loggers through the queue-backed root handler (server_side/common/logging_config.py)
+        log_config=None,
+        access_log=args.access_log,
     )
 
 
@@ -97,12 +127,28 @@ def main():
     p = sub.add_parser("seller-server", help="Run seller server")
     p.add_argument("--host", default="127.0.0.1")
     p.add_argument("--port", type=int, default=8080)
+    p.add_argument("--engine", choices=("thread", "asyncio"), default="thread",
+                   help="thread-per-connection (default) or a single asyncio event loop")
+    p.add_argument("--max-workers", type=int, default=None,
+                   help="handler thread pool size for --engine asyncio")
+    p.add_argument("--workers", type=int, default=1,
+                   help="pre-fork N server processes sharing the port via SO_REUSEPORT")
+    p.add_argument("--metrics-port", type=int, default=None,
+                   help="serve Prometheus metrics at http://0.0.0.0:PORT/metrics (+worker index with --workers)")
     p.set_defaults(func=run_seller_server)
 
     # buyer server
     p = sub.add_parser("buyer-server", help="Run buyer server")
     p.add_argument("--host", default="127.0.0.1")
     p.add_argument("--port", type=int, default=8081)
+    p.add_argument("--engine", choices=("thread", "asyncio"), default="thread",
+                   help="thread-per-connection (default) or a single asyncio event loop")
+    p.add_argument("--max-workers", type=int, default=None,
+                   help="handler thread pool size for --engine asyncio")
+    p.add_argument("--workers", type=int, default=1,
+                   help="pre-fork N server processes sharing the port via SO_REUSEPORT")
+    p.add_argument("--metrics-port", type=int, default=None,
+                   help="serve Prometheus metrics at http://0.0.0.0:PORT/metrics (+worker index with --workers)")
     p.set_defaults(func=run_buyer_server)
 
     # seller client demo
@@ -145,12 +191,14 @@ def main():
     p = sub.add_parser("buyer-rest-server", help="Run buyer REST server (FastAPI)")
     p.add_argument("--host", default="0.0.0.0")
     p.add_argument("--port", type=int, default=8001)
+    p.add_argument("--access-log", action="store_true", help="log every HTTP request (off by default)")
     p.set_defaults(func=run_buyer_rest_server)
 
     # seller REST server (FastAPI)
     p = sub.add_parser("seller-rest-server", help="Run seller REST server (FastAPI)")
     p.add_argument("--host", default="0.0.0.0")
     p.add_argument("--port", type=int, default=8000)
+    p.add_argument("--access-log", action="store_true", help="log every HTTP request (off by default)")
     p.set_defaults(func=run_seller_rest_server)
 
     args = parser.parse_args()
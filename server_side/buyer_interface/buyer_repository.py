@@ -1,68 +1,39 @@
-from typing import Any, Iterable, List, Optional, Tuple
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
 
+from server_side.data_access_layer import statements
+from server_side.data_access_layer.credentials import get_credentials
 from server_side.data_access_layer.db import Database_Connection
+from server_side.data_access_layer.item_cache import get_item_cache
+from server_side.data_access_layer.search_cache import get_search_cache
 
 
 # ---------- Account / Session ----------
 
 def create_buyer(customer_db: Database_Connection, username: str, password: str) -> Optional[int]:
+    """Raises CredentialsBusy if the password hashing queue is full."""
     row = customer_db.execute(
-        "INSERT INTO buyers (username, password, items_purchased) VALUES (%s, %s, 0) RETURNING buyer_id",
-        (username, password),
+        statements.CREATE_BUYER,
+        (username, get_credentials(customer_db).hash(password)),
         fetch=True,
     )
     return row[0][0] if row else None
 
 
-def authenticate_buyer(customer_db: Database_Connection, username: str, password: str) -> Optional[int]:
-    row = customer_db.execute(
-        "SELECT buyer_id FROM buyers WHERE username = %s AND password = %s",
-        (username, password),
-        fetch=True,
-    )
-    return row[0][0] if row else None
-
-
-def create_session(customer_db: Database_Connection, buyer_id: int) -> Optional[str]:
-    customer_db.execute(
-        "INSERT INTO sessions (role, user_id, last_access_timestamp) VALUES (%s, %s, NOW())",
-        ("buyer", buyer_id),
-        fetch=False,
-    )
-    row = customer_db.execute(
-        "SELECT session_id FROM sessions WHERE role = %s AND user_id = %s ORDER BY last_access_timestamp DESC LIMIT 1",
-        ("buyer", buyer_id),
-        fetch=True,
-    )
-    return row[0][0] if row else None
-
-
-def fetch_session(customer_db: Database_Connection, session_id: str) -> Optional[Tuple[int, str]]:
-    row = customer_db.execute(
-        """
-        UPDATE sessions 
-        SET last_access_timestamp = NOW() 
-        WHERE session_id = %s 
-          AND last_access_timestamp > NOW() - INTERVAL '5 minutes'
-        RETURNING user_id, role
-        """,
-        (session_id,),
-        fetch=True,
-    )
-    return row[0] if row else None
-
+def login(customer_db: Database_Connection, username: str, password: str) -> Optional[Tuple[str, int]]:
+    """Check the password and create a session: (session_id, buyer_id), or None. Raises CredentialsBusy."""
+    return get_credentials(customer_db).login("buyer", username, password)
 
 
 def delete_sessions(customer_db: Database_Connection, session_id: str, user_id: int, role: str, scope: str):
     if scope == "all":
         customer_db.execute(
-            "DELETE FROM sessions WHERE user_id = %s AND role = %s",
+            statements.DELETE_USER_SESSIONS,
             (user_id, role),
             fetch=False,
         )
     else:
         customer_db.execute(
-            "DELETE FROM sessions WHERE session_id = %s",
+            statements.DELETE_SESSION,
             (session_id,),
             fetch=False,
         )
@@ -70,59 +41,72 @@ def delete_sessions(customer_db: Database_Connection, session_id: str, user_id:
 
 # ---------- Items ----------
 
-def search_items(product_db: Database_Connection, category: Any = None, keywords: List[str] | None = None):
-    params: List[Any] = []
-    clauses: List[str] = []
-    if category is not None:
-        clauses.append("category = %s")
-        params.append(category)
-    if keywords:
-        clauses.append("%s = ANY(keywords)")
-        params.append(keywords[0])
-    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
-    return product_db.execute(
-        f"SELECT item_id, item_name, category, keywords, condition_is_new, sale_price, quantity, seller_id FROM items {where}",
-        tuple(params),
-        fetch=True,
-    ) or []
+def search_items(
+    product_db: Database_Connection,
+    category: Any = None,
+    keywords: List[str] | None = None,
+    cursor: Any = None,
+    limit: Any = None,
+):
+    """One ranked page of matches: returns (rows, next_cursor). See data_access_layer.search / search_cache."""
+    return get_search_cache(product_db).search(category, keywords, cursor=cursor, limit=limit)
 
 
 def get_item(product_db: Database_Connection, item_id: Any):
-    row = product_db.execute(
-        "SELECT item_id, item_name, category, keywords, condition_is_new, sale_price, quantity, seller_id FROM items WHERE item_id = %s",
-        (item_id,),
-        fetch=True,
-    )
-    return row[0] if row else None
+    """Served from the item cache; see data_access_layer.item_cache."""
+    return get_item_cache(product_db).get(item_id)
+
+
+def get_items(product_db: Database_Connection, item_ids: Iterable[Any]) -> Dict[int, Any]:
+    """item_id -> row for the items that exist; item cache misses are fetched in one query."""
+    return get_item_cache(product_db).get_many(item_ids)
+
+
+def get_items_stock(product_db: Database_Connection, item_ids: Iterable[Any]) -> Dict[int, int]:
+    """item_id -> quantity from the primary, bypassing the item cache: for validating cart lines."""
+    rows = product_db.execute(statements.GET_ITEMS_STOCK, (list(item_ids),), fetch=True)
+    return {item_id: qty for item_id, qty in rows}
 
 
 def get_item_stock(product_db: Database_Connection, item_id: Any) -> Optional[int]:
-    row = product_db.execute(
-        "SELECT quantity FROM items WHERE item_id = %s",
-        (item_id,),
-        fetch=True,
-    )
-    return row[0][0] if row else None
+    row = get_item_cache(product_db).get(item_id)
+    return row[6] if row else None
 
 
 # ---------- Cart ----------
 
 def add_item_to_cart(product_db: Database_Connection, buyer_id: int, session_id: str, item_id: Any, qty: int):
     product_db.execute(
-        """
-        INSERT INTO cart_items (buyer_id, session_id, item_id, quantity, is_saved)
-        VALUES (%s, %s, %s, %s, FALSE)
-        ON CONFLICT (buyer_id, session_id, item_id, is_saved) DO UPDATE
-        SET quantity = cart_items.quantity + EXCLUDED.quantity
-        """,
+        statements.ADD_TO_CART,
         (buyer_id, session_id, item_id, qty),
         fetch=False,
+        session=("buyer", buyer_id),
+    )
+
+
+def add_items_to_cart(product_db: Database_Connection, buyer_id: int, session_id: str, lines: List[Tuple[int, int]]):
+    """(item_id, qty) lines in one statement; repeated items are summed."""
+    product_db.execute(
+        statements.ADD_TO_CART_BATCH,
+        (buyer_id, session_id, [item_id for item_id, _ in lines], [qty for _, qty in lines]),
+        fetch=False,
+        session=("buyer", buyer_id),
+    )
+
+
+def update_cart_items(product_db: Database_Connection, buyer_id: int, session_id: str, lines: List[Tuple[int, int]]):
+    """Set (item_id, new_qty) lines in one statement; new_qty <= 0 removes the line."""
+    product_db.execute(
+        statements.UPDATE_CART_BATCH,
+        (buyer_id, session_id, [item_id for item_id, _ in lines], [qty for _, qty in lines]),
+        fetch=False,
+        session=("buyer", buyer_id),
     )
 
 
 def get_cart_item_quantity(product_db: Database_Connection, buyer_id: int, session_id: str, item_id: Any) -> Optional[int]:
     row = product_db.execute(
-        "SELECT quantity FROM cart_items WHERE buyer_id = %s AND session_id = %s AND item_id = %s AND is_saved = FALSE",
+        statements.CART_ITEM_QUANTITY,
         (buyer_id, session_id, item_id),
         fetch=True,
     )
@@ -132,78 +116,82 @@ def get_cart_item_quantity(product_db: Database_Connection, buyer_id: int, sessi
 def update_cart_item(product_db: Database_Connection, buyer_id: int, session_id: str, item_id: Any, new_qty: int):
     if new_qty <= 0:
         product_db.execute(
-            "DELETE FROM cart_items WHERE buyer_id = %s AND session_id = %s AND item_id = %s AND is_saved = FALSE",
+            statements.DELETE_CART_ITEM,
             (buyer_id, session_id, item_id),
             fetch=False,
+            session=("buyer", buyer_id),
         )
     else:
         product_db.execute(
-            "UPDATE cart_items SET quantity = %s WHERE buyer_id = %s AND session_id = %s AND item_id = %s AND is_saved = FALSE",
+            statements.SET_CART_ITEM_QUANTITY,
             (new_qty, buyer_id, session_id, item_id),
             fetch=False,
+            session=("buyer", buyer_id),
         )
 
 
-def save_cart(product_db: Database_Connection, buyer_id: int, session_id: str):
+def save_cart_steps(buyer_id: int, session_id: str) -> statements.Steps:
+    """SaveCart for both drivers (see statements.run_steps); run in one transaction."""
     # Move this session's cart into saved bucket
-    product_db.execute(
-        """
-        INSERT INTO cart_items (buyer_id, session_id, item_id, quantity, is_saved)
-        SELECT buyer_id, '', item_id, quantity, TRUE
-        FROM cart_items
-        WHERE buyer_id = %s AND session_id = %s AND is_saved = FALSE
-        ON CONFLICT (buyer_id, session_id, item_id, is_saved)
-        DO UPDATE SET quantity = cart_items.quantity + EXCLUDED.quantity
-        """,
-        (buyer_id, session_id),
-        fetch=False,
-    )
+    yield statements.SAVE_CART, (buyer_id, session_id)
     # Clear all unsaved carts for this buyer across sessions
-    product_db.execute(
-        "DELETE FROM cart_items WHERE buyer_id = %s AND is_saved = FALSE",
-        (buyer_id,),
-        fetch=False,
-    )
+    yield statements.DELETE_UNSAVED_CARTS, (buyer_id,)
+
+
+def save_cart(product_db: Database_Connection, buyer_id: int, session_id: str):
+    with product_db.transaction(session=("buyer", buyer_id)) as cur:
+        statements.run_steps(cur, save_cart_steps(buyer_id, session_id))
 
 
 def delete_unsaved_cart(product_db: Database_Connection, buyer_id: int, session_id: str):
     product_db.execute(
-        "DELETE FROM cart_items WHERE buyer_id = %s AND is_saved = FALSE",
+        statements.DELETE_UNSAVED_CARTS,
         (buyer_id,),
         fetch=False,
+        session=("buyer", buyer_id),
     )
 
 
 def clear_cart(product_db: Database_Connection, buyer_id: int, session_id: str):
     product_db.execute(
-        "DELETE FROM cart_items WHERE buyer_id = %s AND session_id = %s AND is_saved = FALSE",
+        statements.CLEAR_SESSION_CART,
         (buyer_id, session_id),
         fetch=False,
+        session=("buyer", buyer_id),
     )
 
 
 def list_cart(product_db: Database_Connection, buyer_id: int, session_id: str):
     return product_db.execute(
-        "SELECT item_id, quantity FROM cart_items WHERE buyer_id = %s AND session_id = %s AND is_saved = FALSE",
+        statements.LIST_SESSION_CART,
         (buyer_id, session_id),
         fetch=True,
+        replica=True,
+        session=("buyer", buyer_id),
     ) or []
 
 
-def list_saved_cart(product_db: Database_Connection, buyer_id: int):
+def list_saved_cart_with_stock(product_db: Database_Connection, buyer_id: int):
+    """Saved cart lines as (item_id, quantity, stock); stock is None for deleted items."""
     return product_db.execute(
-        "SELECT item_id, quantity FROM cart_items WHERE buyer_id = %s AND is_saved = TRUE",
+        statements.LIST_SAVED_CART_WITH_STOCK,
         (buyer_id,),
         fetch=True,
     ) or []
 
 
+def check_cart_stock(lines: Iterable[Tuple[Any, int, Optional[int]]]):
+    for item_id, qty, stock in lines:
+        if stock is None or stock < qty:
+            raise ValueError(f"ITEM_OUT_OF_STOCK:{item_id}")
+
+
 # ---------- Feedback / Rating ----------
 
 def provide_feedback(product_db: Database_Connection, customer_db: Database_Connection, item_id: Any, buyer_id: int, is_positive: bool):
     # Find seller_id for the item
     row = product_db.execute(
-        "SELECT seller_id FROM items WHERE item_id = %s",
+        statements.GET_ITEM_SELLER,
         (item_id,),
         fetch=True,
     )
@@ -213,24 +201,20 @@ def provide_feedback(product_db: Database_Connection, customer_db: Database_Conn
 
     # Update aggregated seller_feedback array: [positive_count, negative_count]
     customer_db.execute(
-        """
-        UPDATE sellers
-        SET seller_feedback = ARRAY[
-            COALESCE(seller_feedback[1], 0) + CASE WHEN %s THEN 1 ELSE 0 END,
-            COALESCE(seller_feedback[2], 0) + CASE WHEN %s THEN 0 ELSE 1 END
-        ]
-        WHERE seller_id = %s
-        """,
+        statements.RECORD_SELLER_FEEDBACK,
         (is_positive, is_positive, seller_id),
         fetch=False,
+        session=("seller", seller_id),
     )
 
 
 def seller_feedback_counts(customer_db: Database_Connection, seller_id: int):
     row = customer_db.execute(
-        "SELECT seller_feedback FROM sellers WHERE seller_id = %s",
+        statements.SELLER_FEEDBACK,
         (seller_id,),
         fetch=True,
+        replica=True,
+        session=("seller", seller_id),
     )
     if not row:
         return None
@@ -245,25 +229,74 @@ def seller_feedback_counts(customer_db: Database_Connection, seller_id: int):
 
 def buyer_purchases(product_db: Database_Connection, buyer_id: int):
     return product_db.execute(
-        "SELECT item_id, quantity, purchased_at FROM purchases WHERE buyer_id = %s ORDER BY purchased_at DESC",
+        statements.BUYER_PURCHASES,
         (buyer_id,),
         fetch=True,
+        replica=True,
+        session=("buyer", buyer_id),
     ) or []
 
 
 # ---------- Purchase ----------
 
-def create_purchase(product_db: Database_Connection, buyer_id: int, item_id: Any, quantity: int):
-    product_db.execute(
-        "INSERT INTO purchases (buyer_id, item_id, quantity) VALUES (%s, %s, %s)",
-        (buyer_id, item_id, quantity),
-        fetch=False,
-    )
-
-
-def update_item_quantity(product_db: Database_Connection, item_id: Any, quantity_delta: int):
-    product_db.execute(
-        "UPDATE items SET quantity = quantity + %s WHERE item_id = %s",
-        (quantity_delta, item_id),
-        fetch=False,
-    )
+def checkout_saved_cart(
+    product_db: Database_Connection,
+    buyer_id: int,
+    authorize: Optional[Callable[[], bool]] = None,
+) -> List[Tuple[int, int, int]]:
+    """
+    Turn the buyer's saved cart into purchases in one transaction.
+
+    The saved cart is claimed (deleted) first so concurrent checkouts cannot
+    both consume it; items are locked in id order, decremented with a single
+    guarded UPDATE and recorded with a single INSERT. Any shortfall raises
+    ValueError and rolls everything back. Returns (item_id, quantity, seller_id).
+
+    `authorize` (the payment call) runs last, while the stock is still locked:
+    the transaction commits only if it approves, so a buyer is never charged
+    for a checkout that fails. A decline raises ValueError("PAYMENT_DECLINED");
+    PaymentServiceUnavailable propagates. Both roll back.
+    """
+    with product_db.transaction(session=("buyer", buyer_id)) as cur:
+        purchased = statements.run_steps(cur, checkout_steps(buyer_id))
+        if authorize is not None and not authorize():
+            raise ValueError("PAYMENT_DECLINED")
+    get_item_cache(product_db).invalidate(*(r[0] for r in purchased))
+    return purchased
+
+
+def checkout_steps(buyer_id: int) -> statements.Steps:
+    """The statements of checkout_saved_cart, for both drivers (see statements.run_steps)."""
+    cart = yield statements.CLAIM_SAVED_CART, (buyer_id,)
+    if not cart:
+        raise ValueError("CART_NOT_SAVED")
+    item_ids = [r[0] for r in cart]
+    quantities = [r[1] for r in cart]
+
+    yield statements.LOCK_ITEMS, (item_ids,)
+    purchased = yield statements.DECREMENT_STOCK, (item_ids, quantities)
+    if len(purchased) != len(cart):
+        done = {r[0] for r in purchased}
+        missing = next(i for i in item_ids if i not in done)
+        raise ValueError(f"ITEM_OUT_OF_STOCK:{missing}")
+
+    yield statements.CREATE_PURCHASES, (buyer_id, item_ids, quantities)
+    return purchased
+
+
+def record_purchase_counts(customer_db: Database_Connection, buyer_id: int, purchased: Iterable[Tuple[int, int, int]]):
+    """Bump buyers.items_purchased and sellers.items_sold for a completed checkout."""
+    with customer_db.transaction() as cur:
+        statements.run_steps(cur, purchase_count_steps(buyer_id, purchased))
+
+
+def purchase_count_steps(buyer_id: int, purchased: Iterable[Tuple[int, int, int]]) -> statements.Steps:
+    per_seller: Dict[int, int] = {}
+    total = 0
+    for _, qty, seller_id in purchased:
+        per_seller[seller_id] = per_seller.get(seller_id, 0) + qty
+        total += qty
+    if not total:
+        return
+    yield statements.ADD_ITEMS_PURCHASED, (total, buyer_id)
+    yield statements.ADD_ITEMS_SOLD_BATCH, (list(per_seller.keys()), list(per_seller.values()))
@@ -1,7 +1,9 @@
 import os
 import sys
+from contextlib import asynccontextmanager
+
 import grpc
-from typing import List, Optional
+from typing import Dict, List, Optional
 from fastapi import FastAPI, Header, HTTPException, Body
 from pydantic import BaseModel
 
@@ -11,14 +13,35 @@ sys.path.append(os.path.join(REPO_ROOT, 'generated'))
 
 from protos import database_pb2
 from protos import database_pb2_grpc
-from zeep import Client as SoapClient
 
-app = FastAPI(title="Marketplace Buyer API")
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+from server_side.common.logging_config import configure_logging
+from server_side.common.metrics import instrument_app
+
+configure_logging()
 
-# gRPC Setup
+# gRPC Setup: one grpc.aio channel per process, opened/closed with the app
 DB_SERVICE_ADDR = os.getenv("DB_SERVICE_ADDR", "localhost:50051")
-channel = grpc.insecure_channel(DB_SERVICE_ADDR)
-db_stub = database_pb2_grpc.DatabaseServiceStub(channel)
+# Same cap the DB service applies to GetItems / AddToCartBatch / UpdateCartBatch
+BATCH_MAX_ITEMS = int(os.getenv("BATCH_MAX_ITEMS", "1000"))
+db_stub: Optional[database_pb2_grpc.DatabaseServiceStub] = None
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global db_stub
+    channel = grpc.aio.insecure_channel(DB_SERVICE_ADDR)
+    db_stub = database_pb2_grpc.DatabaseServiceStub(channel)
+    try:
+        yield
+    finally:
+        db_stub = None
+        await channel.close()
+
+
+app = FastAPI(title="Marketplace Buyer API", lifespan=lifespan)
+instrument_app(app, "rest_buyer")
 
 # --- Models ---
 class CreateAccountModel(BaseModel):
@@ -33,6 +56,9 @@ class AddToCartModel(BaseModel):
     item_id: int
     quantity: int
 
+class CartLinesModel(BaseModel):
+    items: List[AddToCartModel]
+
 class FeedbackModel(BaseModel):
     item_id: int
     is_positive: bool
@@ -44,57 +70,120 @@ class PurchaseModel(BaseModel):
     security_code: str
 
 # --- Helpers ---
-def verify_session(session_id: str):
+async def verify_session(session_id: str):
     if not session_id:
         raise HTTPException(status_code=401, detail="Session ID required")
     try:
-        resp = db_stub.VerifySession(database_pb2.VerifySessionRequest(session_id=session_id))
+        resp = await db_stub.VerifySession(database_pb2.VerifySessionRequest(session_id=session_id))
         return resp.user_id, resp.role
     except grpc.RpcError as e:
         if e.code() == grpc.StatusCode.UNAUTHENTICATED:
             raise HTTPException(status_code=401, detail="Invalid or expired session")
         raise HTTPException(status_code=500, detail=str(e))
 
+def _item_json(item) -> dict:
+    return {
+        "item_id": item.item_id,
+        "item_name": item.item_name,
+        "category": item.category,
+        "keywords": list(item.keywords),
+        "condition_is_new": item.condition_is_new,
+        "price": item.price,
+        "quantity": item.quantity,
+        "seller_id": item.seller_id
+    }
+
+def _batch_error(e: grpc.RpcError) -> HTTPException:
+    if e.code() == grpc.StatusCode.INVALID_ARGUMENT:
+        return HTTPException(status_code=400, detail=e.details())
+    return HTTPException(status_code=500, detail=str(e))
+
+def _check_batch(lines: list):
+    if len(lines) > BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=400, detail=f"At most {BATCH_MAX_ITEMS} items per request")
+
+async def _check_stock(lines: List[AddToCartModel]):
+    """One uncached GetItems for every line; 404 for a missing item, 400 if the lines for an item add up to more than is in stock."""
+    wanted: Dict[int, int] = {}
+    for line in lines:
+        wanted[line.item_id] = wanted.get(line.item_id, 0) + line.quantity
+    try:
+        resp = await db_stub.GetItems(database_pb2.GetItemsRequest(item_ids=list(wanted), fresh=True))
+    except grpc.RpcError as e:
+        raise _batch_error(e)
+    stock = {item.item_id: item.quantity for item in resp.items}
+    for item_id, quantity in wanted.items():
+        if item_id not in stock:
+            raise HTTPException(status_code=404, detail=f"Item {item_id} not found")
+        if stock[item_id] < quantity:
+            raise HTTPException(status_code=400, detail=f"Insufficient quantity available for item {item_id}")
+
+async def _checkout(buyer_id: int, validate_only: bool = False, card: database_pb2.PaymentCard | None = None):
+    try:
+        return await db_stub.Checkout(database_pb2.CheckoutRequest(
+            buyer_id=buyer_id, validate_only=validate_only, card=card
+        ))
+    except grpc.RpcError as e:
+        if e.code() == grpc.StatusCode.UNAVAILABLE and (e.details() or "").startswith("PAYMENT_SERVICE_UNAVAILABLE"):
+            raise HTTPException(status_code=503, detail="Financial service unavailable")
+        if e.code() == grpc.StatusCode.FAILED_PRECONDITION:
+            detail = e.details() or ""
+            if detail == "PAYMENT_DECLINED":
+                raise HTTPException(status_code=402, detail="Payment authorization failed")
+            if detail == "CART_NOT_SAVED":
+                raise HTTPException(status_code=400, detail="Cart not saved")
+            if detail.startswith("ITEM_OUT_OF_STOCK:"):
+                raise HTTPException(status_code=400, detail=f"Item {detail.split(':', 1)[1]} out of stock")
+            raise HTTPException(status_code=400, detail=detail)
+        raise HTTPException(status_code=500, detail=str(e))
+
 # --- Endpoints ---
 
 @app.post("/buyer/account")
-def create_account(data: CreateAccountModel):
+async def create_account(data: CreateAccountModel):
     try:
-        resp = db_stub.CreateAccount(database_pb2.CreateAccountRequest(
+        resp = await db_stub.CreateAccount(database_pb2.CreateAccountRequest(
             role="buyer", username=data.username, password=data.password
         ))
         return {"buyer_id": resp.user_id}
     except grpc.RpcError as e:
+        if e.code() == grpc.StatusCode.RESOURCE_EXHAUSTED:
+            raise HTTPException(status_code=503, detail="Server busy, retry later")
         raise HTTPException(status_code=400, detail=e.details())
 
 @app.post("/buyer/login")
-def login(data: LoginModel):
+async def login(data: LoginModel):
     try:
-        resp = db_stub.AuthenticateUser(database_pb2.AuthenticateRequest(
+        resp = await db_stub.AuthenticateUser(database_pb2.AuthenticateRequest(
             role="buyer", username=data.username, password=data.password
         ))
         return {"session_id": resp.session_id, "buyer_id": resp.user_id}
     except grpc.RpcError as e:
+        if e.code() == grpc.StatusCode.RESOURCE_EXHAUSTED:
+            raise HTTPException(status_code=503, detail="Server busy, retry later")
         raise HTTPException(status_code=401, detail=e.details())
 
 @app.post("/buyer/logout")
-def logout(x_session_id: str = Header(None)):
-    user_id, role = verify_session(x_session_id)
+async def logout(x_session_id: str = Header(None)):
+    user_id, role = await verify_session(x_session_id)
     # Clear active cart on logout if not saved (PA1 requirement)
-    db_stub.DeleteUnsavedCart(database_pb2.DeleteUnsavedCartRequest(
+    await db_stub.DeleteUnsavedCart(database_pb2.DeleteUnsavedCartRequest(
         buyer_id=user_id, session_id=x_session_id
     ))
-    db_stub.DeleteSessions(database_pb2.DeleteSessionsRequest(
+    await db_stub.DeleteSessions(database_pb2.DeleteSessionsRequest(
         session_id=x_session_id, user_id=user_id, role=role, scope="single"
     ))
     return {"status": "success"}
 
 @app.get("/buyer/items")
-def search_items(category: int = 0, keywords: str = ""):
+async def search_items(category: int = 0, keywords: str = "", cursor: str = "", limit: int = 0):
     kw_list = [k.strip() for k in keywords.split(",") if k.strip()]
-    resp = db_stub.SearchItems(database_pb2.SearchItemsRequest(
-        category=category, keywords=kw_list
-    ))
+    try:
+        resp = await db_stub.SearchItems(database_pb2.SearchItemsRequest(
+            category=category, keywords=kw_list, cursor=cursor, limit=limit
+        ))
+    except grpc.RpcError as e:
+        raise HTTPException(status_code=400, detail=e.details())
     items = []
     for item in resp.items:
         items.append({
@@ -107,12 +196,26 @@ def search_items(category: int = 0, keywords: str = ""):
             "quantity": item.quantity,
             "seller_id": item.seller_id
         })
-    return {"items": items}
+    return {"items": items, "next_cursor": resp.next_cursor or None}
+
+@app.get("/buyer/items/batch")
+async def get_items(ids: str = ""):
+    # Declared before /buyer/items/{item_id}, which would otherwise match "batch"
+    try:
+        item_ids = [int(i) for i in ids.split(",") if i.strip()]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="ids must be comma-separated item ids")
+    _check_batch(item_ids)
+    try:
+        resp = await db_stub.GetItems(database_pb2.GetItemsRequest(item_ids=item_ids))
+    except grpc.RpcError as e:
+        raise _batch_error(e)
+    return {"items": [_item_json(item) for item in resp.items]}
 
 @app.get("/buyer/items/{item_id}")
-def get_item(item_id: int):
+async def get_item(item_id: int):
     try:
-        item = db_stub.GetItem(database_pb2.GetItemRequest(item_id=item_id))
+        item = await db_stub.GetItem(database_pb2.GetItemRequest(item_id=item_id))
         return {
             "item_id": item.item_id,
             "item_name": item.item_name,
@@ -129,78 +232,125 @@ def get_item(item_id: int):
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/buyer/cart")
-def add_to_cart(data: AddToCartModel, x_session_id: str = Header(None)):
-    user_id, _ = verify_session(x_session_id)
+async def add_to_cart(data: AddToCartModel, x_session_id: str = Header(None)):
+    user_id, _ = await verify_session(x_session_id)
     # Check availability first
     try:
-        item = db_stub.GetItem(database_pb2.GetItemRequest(item_id=data.item_id))
+        item = await db_stub.GetItem(database_pb2.GetItemRequest(item_id=data.item_id))
         if item.quantity < data.quantity:
             raise HTTPException(status_code=400, detail="Insufficient quantity available")
         
-        db_stub.AddToCart(database_pb2.AddToCartRequest(
+        await db_stub.AddToCart(database_pb2.AddToCartRequest(
             buyer_id=user_id, session_id=x_session_id, item_id=data.item_id, quantity=data.quantity
         ))
         return {"status": "success"}
     except grpc.RpcError as e:
         raise HTTPException(status_code=404, detail="Item not found")
 
+@app.post("/buyer/cart/batch")
+async def add_items_to_cart(data: CartLinesModel, x_session_id: str = Header(None)):
+    user_id, _ = await verify_session(x_session_id)
+    _check_batch(data.items)
+    if data.items:
+        await _check_stock(data.items)
+        try:
+            await db_stub.AddToCartBatch(database_pb2.AddToCartBatchRequest(
+                buyer_id=user_id, session_id=x_session_id,
+                items=[database_pb2.CartItem(item_id=l.item_id, quantity=l.quantity) for l in data.items],
+            ))
+        except grpc.RpcError as e:
+            raise _batch_error(e)
+    return {"status": "success"}
+
+@app.put("/buyer/cart/batch")
+async def update_cart(data: CartLinesModel, x_session_id: str = Header(None)):
+    # New quantity per line; 0 or less removes the line
+    user_id, _ = await verify_session(x_session_id)
+    _check_batch(data.items)
+    if data.items:
+        # A repeated item_id takes its last quantity, as in UPDATE_CART_BATCH
+        final = {l.item_id: l for l in data.items}
+        await _check_stock([l for l in final.values() if l.quantity > 0])
+        try:
+            await db_stub.UpdateCartBatch(database_pb2.UpdateCartBatchRequest(
+                buyer_id=user_id, session_id=x_session_id,
+                items=[database_pb2.CartItem(item_id=l.item_id, quantity=l.quantity) for l in data.items],
+            ))
+        except grpc.RpcError as e:
+            raise _batch_error(e)
+    return {"status": "success"}
+
 @app.get("/buyer/cart")
-def display_cart(x_session_id: str = Header(None)):
-    user_id, _ = verify_session(x_session_id)
-    resp = db_stub.ListCart(database_pb2.ListCartRequest(
+async def display_cart(details: bool = False, x_session_id: str = Header(None)):
+    user_id, _ = await verify_session(x_session_id)
+    resp = await db_stub.ListCart(database_pb2.ListCartRequest(
         buyer_id=user_id, session_id=x_session_id
     ))
-    return {"cart": [{"item_id": i.item_id, "quantity": i.quantity} for i in resp.items]}
+    cart = [{"item_id": i.item_id, "quantity": i.quantity} for i in resp.items]
+    if details and cart:
+        # Item details in one GetItems per BATCH_MAX_ITEMS lines; None for an item that no longer exists
+        item_ids = [l["item_id"] for l in cart]
+        by_id = {}
+        for start in range(0, len(item_ids), BATCH_MAX_ITEMS):
+            try:
+                items = await db_stub.GetItems(database_pb2.GetItemsRequest(item_ids=item_ids[start:start + BATCH_MAX_ITEMS]))
+            except grpc.RpcError as e:
+                raise _batch_error(e)
+            by_id.update((item.item_id, _item_json(item)) for item in items.items)
+        for line in cart:
+            line["item"] = by_id.get(line["item_id"])
+    return {"cart": cart}
 
 @app.post("/buyer/cart/save")
-def save_cart(x_session_id: str = Header(None)):
-    user_id, _ = verify_session(x_session_id)
-    db_stub.SaveCart(database_pb2.SaveCartRequest(
+async def save_cart(x_session_id: str = Header(None)):
+    user_id, _ = await verify_session(x_session_id)
+    await db_stub.SaveCart(database_pb2.SaveCartRequest(
         buyer_id=user_id, session_id=x_session_id
     ))
     return {"status": "success"}
 
-@app.delete("/buyer/cart/{item_id}")
-def remove_from_cart(item_id: int, x_session_id: str = Header(None)):
-    user_id, _ = verify_session(x_session_id)
-    db_stub.RemoveFromCart(database_pb2.RemoveFromCartRequest(
-        buyer_id=user_id, session_id=x_session_id, item_id=item_id
+# Before /buyer/cart/{item_id}, which would otherwise match "clear"
+@app.delete("/buyer/cart/clear")
+async def clear_cart(x_session_id: str = Header(None)):
+    user_id, _ = await verify_session(x_session_id)
+    await db_stub.ClearCart(database_pb2.ClearCartRequest(
+        buyer_id=user_id, session_id=x_session_id
     ))
+    await db_stub.ClearSavedCart(database_pb2.ClearSavedCartRequest(buyer_id=user_id))
     return {"status": "success"}
 
-@app.delete("/buyer/cart/clear")
-def clear_cart(x_session_id: str = Header(None)):
-    user_id, _ = verify_session(x_session_id)
-    db_stub.ClearCart(database_pb2.ClearCartRequest(
-        buyer_id=user_id, session_id=x_session_id
+@app.delete("/buyer/cart/{item_id}")
+async def remove_from_cart(item_id: int, x_session_id: str = Header(None)):
+    user_id, _ = await verify_session(x_session_id)
+    await db_stub.RemoveFromCart(database_pb2.RemoveFromCartRequest(
+        buyer_id=user_id, session_id=x_session_id, item_id=item_id
     ))
-    db_stub.ClearSavedCart(database_pb2.ClearSavedCartRequest(buyer_id=user_id))
     return {"status": "success"}
 
 @app.post("/buyer/feedback")
-def provide_feedback(data: FeedbackModel, x_session_id: str = Header(None)):
-    user_id, _ = verify_session(x_session_id)
-    db_stub.ProvideFeedback(database_pb2.ProvideFeedbackRequest(
+async def provide_feedback(data: FeedbackModel, x_session_id: str = Header(None)):
+    user_id, _ = await verify_session(x_session_id)
+    await db_stub.ProvideFeedback(database_pb2.ProvideFeedbackRequest(
         item_id=data.item_id, buyer_id=user_id, is_positive=data.is_positive
     ))
     return {"status": "success"}
 
 @app.get("/seller/{seller_id}/rating")
-def get_seller_rating(seller_id: int):
-    resp = db_stub.GetSellerRating(database_pb2.GetSellerRatingRequest(seller_id=seller_id))
+async def get_seller_rating(seller_id: int):
+    resp = await db_stub.GetSellerRating(database_pb2.GetSellerRatingRequest(seller_id=seller_id))
     total = resp.pos + resp.neg
     rating = float(resp.pos) / total if total > 0 else 0.0
     return {"rating": rating, "pos": int(resp.pos), "neg": int(resp.neg)}
 
 @app.get("/buyer/purchases")
-def get_purchases(x_session_id: str = Header(None)):
-    user_id, _ = verify_session(x_session_id)
-    resp = db_stub.GetPurchaseHistory(database_pb2.GetPurchaseHistoryRequest(buyer_id=user_id))
+async def get_purchases(x_session_id: str = Header(None)):
+    user_id, _ = await verify_session(x_session_id)
+    resp = await db_stub.GetPurchaseHistory(database_pb2.GetPurchaseHistoryRequest(buyer_id=user_id))
     return {"purchases": [{"item_id": r.item_id, "quantity": r.quantity, "date": r.purchased_at} for r in resp.records]}
 
 @app.post("/buyer/purchase")
-def make_purchase(data: PurchaseModel, x_session_id: str = Header(None)):
-    user_id, _ = verify_session(x_session_id)
+async def make_purchase(data: PurchaseModel, x_session_id: str = Header(None)):
+    user_id, _ = await verify_session(x_session_id)
 
     # Basic card validation to return clear client errors (assignment requirement)
     def _bad(detail: str):
@@ -216,54 +366,16 @@ def make_purchase(data: PurchaseModel, x_session_id: str = Header(None)):
             _bad("Invalid expiration date format")
     # else accept other formats (e.g., YYYY or YYYY-MM) without strict parsing
 
-    # 1. Get saved cart (shared across sessions)
-    saved = db_stub.ListSavedCart(database_pb2.ListSavedCartRequest(buyer_id=user_id))
-    if not saved.items:
-        raise HTTPException(status_code=400, detail="Cart not saved")
+    # Saved cart, stock, purchase rows and the SOAP payment in one DB-service transaction:
+    # it commits only if the payment is approved (402 on a decline, 503 if the service is down)
+    card = database_pb2.PaymentCard(
+        name=data.name,
+        card_number=data.card_number,
+        expiration_date=data.expiration_date,
+        security_code=data.security_code,
+    )
+    await _checkout(user_id, card=card)
 
-    # 2. Check stock for all items
-    items_to_buy = []
-    for cart_item in saved.items:
-        try:
-            item = db_stub.GetItem(database_pb2.GetItemRequest(item_id=cart_item.item_id))
-            if item.quantity < cart_item.quantity:
-                raise HTTPException(status_code=400, detail=f"Item {cart_item.item_id} out of stock")
-            items_to_buy.append((item, cart_item.quantity))
-        except grpc.RpcError:
-            raise HTTPException(status_code=404, detail=f"Item {cart_item.item_id} not found")
-
-    # 3. Call SOAP Financial Service
-    FINANCIAL_SERVICE_WSDL = os.getenv("FINANCIAL_SERVICE_WSDL", "http://localhost:8002/?wsdl")
-    try:
-        soap_client = SoapClient(FINANCIAL_SERVICE_WSDL)
-        success = soap_client.service.AuthorizePayment(
-            username=data.name,
-            card_number=data.card_number,
-            expiration_date=data.expiration_date,
-            security_code=data.security_code
-        )
-    except Exception as e:
-        print(f"SOAP error: {e}")
-        # If SOAP service is down, fall back to mock or fail
-        raise HTTPException(status_code=503, detail="Financial service unavailable")
-    
-    if not success:
-        raise HTTPException(status_code=402, detail="Payment authorization failed")
-
-    # 4. Finalize Purchase
-    for item, qty in items_to_buy:
-        # Deduct quantity
-        db_stub.UpdateItemQuantity(database_pb2.UpdateItemQuantityRequest(
-            item_id=item.item_id, seller_id=item.seller_id, quantity_delta=qty
-        ))
-        # Create purchase record
-        db_stub.CreatePurchase(database_pb2.CreatePurchaseRequest(
-            buyer_id=user_id, item_id=item.item_id, quantity=qty
-        ))
-        
-    # 5. Clear saved cart
-    db_stub.ClearSavedCart(database_pb2.ClearSavedCartRequest(buyer_id=user_id))
-    
     return {"status": "success", "message": "Purchase completed successfully"}
 
 if __name__ == "__main__":
@@ -1,3 +1,4 @@
+import logging
 from pathlib import Path
 import sys
 from typing import Any, Dict
@@ -8,13 +9,18 @@ if str(REPO_ROOT) not in sys.path:
     sys.path.insert(0, str(REPO_ROOT))
 
 from server_side.common.protocol import build_response, build_error
+from server_side.common.logging_config import log_payload
+from server_side.common.metrics import instrument_handlers
 from server_side.common.server import Server
+from server_side.data_access_layer.credentials import CredentialsBusy
 from server_side.buyer_interface.handlers import HANDLERS
 
+logger = logging.getLogger(__name__)
+
 class BuyerServer(Server):
-    def __init__(self, host: str, port: int):
-        super().__init__(host, port)
-        self.handlers = HANDLERS
+    def __init__(self, host: str, port: int, reuse_port: bool = False):
+        super().__init__(host, port, reuse_port=reuse_port)
+        self.handlers = instrument_handlers("tcp_buyer", HANDLERS)
 
     def process_request(self, request: Dict[str, Any]) -> Dict[str, Any]:
         api = request.get("api")
@@ -32,8 +38,16 @@ class BuyerServer(Server):
         try:
             response_payload = handler(request, self.db_conns)
             session_id = response_payload.get("session_id")
-            print("response_payload", response_payload)
+            log_payload(logger, api, response_payload)
             return build_response(api=api, payload=response_payload, session_id=session_id)
+        except CredentialsBusy as exc:
+            # Password hashing queue is full; the client may retry later
+            return build_error(
+                api=api,
+                code="SERVER_BUSY",
+                message=str(exc),
+                session_id=session_id,
+            )
         except ValueError as exc:
             # Business/validation errors bubble up as client errors
             return build_error(
@@ -54,5 +68,5 @@ if __name__ == "__main__":
     try:
         server.start()
     except KeyboardInterrupt:
-        print("Shutting down server...")
+        logger.info("Shutting down server...")
         server.stop()
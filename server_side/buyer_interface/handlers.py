@@ -1,13 +1,14 @@
 import os
-from typing import Any, Dict, Iterable, List
+from typing import Any, Dict, Iterable, List, Tuple
 
+from server_side.data_access_layer import statements
 from server_side.data_access_layer.db import Database_Connection
+from server_side.data_access_layer.session_cache import get_session_cache
 from server_side.buyer_interface import buyer_repository as repo
-from zeep import Client as SoapClient
+from server_side.common.payment import PaymentServiceUnavailable, get_payment_client
 
 # "single", "all" - determines whether logout invalidates only the current session or all sessions
 LOGOUT_SCOPE = os.getenv("LOGOUT_SCOPE", "single").lower()
-FINANCIAL_SERVICE_WSDL = os.getenv("FINANCIAL_SERVICE_WSDL", "http://localhost:8002/?wsdl")
 
 
 # ---------- Common helpers ----------
@@ -25,18 +26,51 @@ def _require_fields(payload: Dict[str, Any], required: Iterable[str]):
         raise ValueError(f"Missing required fields: {', '.join(missing)}")
 
 
+def _int_list(value: Any, field: str) -> List[int]:
+    if not isinstance(value, list):
+        raise ValueError(f"{field} must be a list")
+    if len(value) > statements.BATCH_MAX_ITEMS:
+        raise ValueError(f"{field} may hold at most {statements.BATCH_MAX_ITEMS} entries")
+    try:
+        return [int(v) for v in value]
+    except (TypeError, ValueError):
+        raise ValueError(f"{field} must contain integers")
+
+
+def _cart_lines(payload: Dict[str, Any]) -> List[Tuple[int, int]]:
+    """(item_id, quantity) pairs from a payload "items" list of {"item_id", "quantity"}."""
+    lines = payload["items"]
+    if not isinstance(lines, list):
+        raise ValueError("items must be a list")
+    if len(lines) > statements.BATCH_MAX_ITEMS:
+        raise ValueError(f"items may hold at most {statements.BATCH_MAX_ITEMS} entries")
+    try:
+        return [(int(line["item_id"]), int(line["quantity"])) for line in lines]
+    except (KeyError, TypeError, ValueError):
+        raise ValueError("each item needs an integer item_id and quantity")
+
+
+def _item_payload(row) -> Dict[str, Any]:
+    return {
+        "item_id": row[0],
+        "item_name": row[1],
+        "category": row[2],
+        "keywords": row[3],
+        "condition_is_new": row[4],
+        "price": float(row[5]) if row[5] is not None else None,
+        "quantity": row[6],
+        "seller_id": row[7],
+    }
+
+
 def _require_buyer_session(dbs: Dict[str, Database_Connection], session_id: str) -> int:
     if not session_id:
         raise ValueError("session_id required")
     customer_db = _get_db(dbs, "customer")
-    row = repo.fetch_session(customer_db, session_id)
+    row = get_session_cache(customer_db).verify(session_id)
     if not row:
         raise ValueError("invalid session")
     user_id, role = row
-    if isinstance(role, memoryview):
-        role = role.tobytes()
-    if isinstance(role, bytes):
-        role = role.decode("utf-8")
     if role != "buyer":
         raise ValueError("invalid role for this operation")
     return user_id
@@ -62,11 +96,12 @@ def handle_login(request: Dict[str, Any], dbs: Dict[str, Database_Connection]) -
     password = payload["password"]
 
     customer_db = _get_db(dbs, "customer")
-    buyer_id = repo.authenticate_buyer(customer_db, username, password)
-    if buyer_id is None:
+    row = repo.login(customer_db, username, password)
+    if row is None:
         raise ValueError("invalid username or password")
 
-    session_id = repo.create_session(customer_db, buyer_id)
+    session_id, buyer_id = row
+    get_session_cache(customer_db).add(session_id, buyer_id, "buyer")
     return {"session_id": session_id, "buyer_id": buyer_id}
 
 
@@ -76,7 +111,8 @@ def handle_logout(request: Dict[str, Any], dbs: Dict[str, Database_Connection])
         raise ValueError("session_id required for logout")
 
     customer_db = _get_db(dbs, "customer")
-    row = repo.fetch_session(customer_db, session_id)
+    sessions = get_session_cache(customer_db)
+    row = sessions.verify(session_id)
     if not row:
         return {"status": "success"}  # idempotent
     user_id, role = row
@@ -87,6 +123,10 @@ def handle_logout(request: Dict[str, Any], dbs: Dict[str, Database_Connection])
     repo.delete_unsaved_cart(product_db, user_id, session_id)
 
     repo.delete_sessions(customer_db, session_id, user_id, role, LOGOUT_SCOPE)
+    if LOGOUT_SCOPE == "all":
+        sessions.invalidate_user(user_id, role)
+    else:
+        sessions.invalidate(session_id)
     return {"status": "success", "scope": LOGOUT_SCOPE}
 
 
@@ -100,7 +140,9 @@ def handle_search_items_for_sale(request: Dict[str, Any], dbs: Dict[str, Databas
     _require_buyer_session(dbs, session_id)
 
     product_db = _get_db(dbs, "product")
-    rows = repo.search_items(product_db, category, keywords)
+    rows, next_cursor = repo.search_items(
+        product_db, category, keywords, cursor=payload.get("cursor"), limit=payload.get("limit")
+    )
     items = [
         {
             "item_id": r[0],
@@ -114,7 +156,7 @@ def handle_search_items_for_sale(request: Dict[str, Any], dbs: Dict[str, Databas
         }
         for r in rows
     ]
-    return {"items": items}
+    return {"items": items, "next_cursor": next_cursor}
 
 
 def handle_get_item(request: Dict[str, Any], dbs: Dict[str, Database_Connection]) -> Dict[str, Any]:
@@ -128,16 +170,20 @@ def handle_get_item(request: Dict[str, Any], dbs: Dict[str, Database_Connection]
     row = repo.get_item(product_db, item_id)
     if not row:
         raise ValueError("item not found")
-    return {
-        "item_id": row[0],
-        "item_name": row[1],
-        "category": row[2],
-        "keywords": row[3],
-        "condition_is_new": row[4],
-        "price": float(row[5]) if row[5] is not None else None,
-        "quantity": row[6],
-        "seller_id": row[7],
-    }
+    return _item_payload(row)
+
+
+def handle_get_items(request: Dict[str, Any], dbs: Dict[str, Database_Connection]) -> Dict[str, Any]:
+    payload = request.get("payload", {})
+    _require_fields(payload, ("item_ids",))
+    item_ids = _int_list(payload["item_ids"], "item_ids")
+    session_id = request.get("session_id")
+    _require_buyer_session(dbs, session_id)
+
+    product_db = _get_db(dbs, "product")
+    rows = repo.get_items(product_db, item_ids)
+    # Request order; items that do not exist are left out
+    return {"items": [_item_payload(rows[i]) for i in dict.fromkeys(item_ids) if i in rows]}
 
 
 # ---------- Cart operations ----------
@@ -162,6 +208,54 @@ def handle_add_item_to_cart(request: Dict[str, Any], dbs: Dict[str, Database_Con
     return {"status": "success"}
 
 
+def handle_add_items_to_cart(request: Dict[str, Any], dbs: Dict[str, Database_Connection]) -> Dict[str, Any]:
+    payload = request.get("payload", {})
+    _require_fields(payload, ("items",))
+    lines = _cart_lines(payload)
+    session_id = request.get("session_id")
+    buyer_id = _require_buyer_session(dbs, session_id)
+
+    product_db = _get_db(dbs, "product")
+    _check_lines_stock(product_db, lines)
+    if lines:
+        repo.add_items_to_cart(product_db, buyer_id, str(session_id), lines)
+    return {"status": "success"}
+
+
+def handle_update_cart(request: Dict[str, Any], dbs: Dict[str, Database_Connection]) -> Dict[str, Any]:
+    """Set each line's quantity (0 or less removes it); items not in the cart are ignored."""
+    payload = request.get("payload", {})
+    _require_fields(payload, ("items",))
+    lines = _cart_lines(payload)
+    session_id = request.get("session_id")
+    buyer_id = _require_buyer_session(dbs, session_id)
+
+    product_db = _get_db(dbs, "product")
+    # A repeated item_id takes its last quantity, as in UPDATE_CART_BATCH
+    final = dict(lines)
+    _check_lines_stock(product_db, [(item_id, qty) for item_id, qty in final.items() if qty > 0])
+    if lines:
+        repo.update_cart_items(product_db, buyer_id, str(session_id), lines)
+    return {"status": "success"}
+
+
+def _check_lines_stock(product_db: Database_Connection, lines: List[Tuple[int, int]]):
+    """Same rule as AddItemToCart for every line at once; repeats add up.
+
+    Stock is read from the primary in one query, not through the item cache, so a
+    seller's change made in another process is seen at once.
+    """
+    wanted: Dict[int, int] = {}
+    for item_id, qty in lines:
+        wanted[item_id] = wanted.get(item_id, 0) + qty
+    stock = repo.get_items_stock(product_db, wanted)
+    for item_id, qty in wanted.items():
+        if item_id not in stock:
+            raise ValueError(f"item {item_id} not found")
+        if qty > stock[item_id]:
+            raise ValueError(f"ITEM_OUT_OF_STOCK:{item_id}")
+
+
 def handle_remove_item_from_cart(request: Dict[str, Any], dbs: Dict[str, Database_Connection]) -> Dict[str, Any]:
     payload = request.get("payload", {})
     _require_fields(payload, ("item_id", "quantity"))
@@ -205,6 +299,12 @@ def handle_display_cart(request: Dict[str, Any], dbs: Dict[str, Database_Connect
     product_db = _get_db(dbs, "product")
     rows = repo.list_cart(product_db, buyer_id, session_id_str)
     items = [{"item_id": r[0], "quantity": r[1]} for r in rows]
+    if request.get("payload", {}).get("details") and items:
+        # Item details for every line from one batch lookup; None for an item that no longer exists
+        details = repo.get_items(product_db, [line["item_id"] for line in items])
+        for line in items:
+            row = details.get(line["item_id"])
+            line["item"] = _item_payload(row) if row else None
     return {"cart": items}
 
 
@@ -258,45 +358,30 @@ def handle_make_purchase(request: Dict[str, Any], dbs: Dict[str, Database_Connec
 
     product_db = _get_db(dbs, "product")
 
-    # 1) Load saved cart (shared across sessions)
-    cart_rows = repo.list_saved_cart(product_db, buyer_id)
+    # 1) Load saved cart (shared across sessions) with current stock, one round trip
+    cart_rows = repo.list_saved_cart_with_stock(product_db, buyer_id)
     if not cart_rows:
         raise ValueError("CART_NOT_SAVED")
 
-    # 2) Check stock
-    cart_items = []
-    for item_id, qty in cart_rows:
-        stock = repo.get_item_stock(product_db, item_id)
-        if stock is None or stock < qty:
-            raise ValueError(f"ITEM_OUT_OF_STOCK:{item_id}")
-        cart_items.append((item_id, qty))
+    # 2) Check stock before locking anything (cheap early answer; the checkout re-checks under lock)
+    repo.check_cart_stock(cart_rows)
 
-    # 3) Call SOAP financial service
-    try:
-        soap_client = SoapClient(FINANCIAL_SERVICE_WSDL)
-        success = soap_client.service.AuthorizePayment(
+    # 3) One transaction: claim the saved cart, deduct stock, create purchases, then call the
+    #    SOAP financial service; it commits only if the payment is approved
+    def authorize() -> bool:
+        return get_payment_client().authorize(
             username=payload["name"],
             card_number=payload["card_number"],
             expiration_date=payload["expiration_date"],
             security_code=payload["security_code"],
         )
-    except Exception as e:
-        raise ValueError(f"PAYMENT_SERVICE_UNAVAILABLE:{e}")
-
-    if not success:
-        raise ValueError("PAYMENT_DECLINED")
-
-    # 4) Finalize: deduct stock, create purchases
-    for item_id, qty in cart_items:
-        repo.update_item_quantity(product_db, item_id, -qty)
-        repo.create_purchase(product_db, buyer_id, item_id, qty)
 
-    # 5) Clear saved cart after purchase
-    product_db.execute(
-        "DELETE FROM cart_items WHERE buyer_id = %s AND is_saved = TRUE",
-        (buyer_id,),
-        fetch=False,
-    )
+    try:
+        purchased = repo.checkout_saved_cart(product_db, buyer_id, authorize)
+    except PaymentServiceUnavailable as e:
+        raise ValueError(f"PAYMENT_SERVICE_UNAVAILABLE:{e}")
+    # 4) Count the purchase in buyers.items_purchased / sellers.items_sold, as the Checkout RPC does
+    repo.record_purchase_counts(_get_db(dbs, "customer"), buyer_id, purchased)
 
     return {"status": "success"}
 
@@ -309,7 +394,10 @@ HANDLERS = {
     "Logout": handle_logout,
     "SearchItemsForSale": handle_search_items_for_sale,
     "GetItem": handle_get_item,
+    "GetItems": handle_get_items,
     "AddItemToCart": handle_add_item_to_cart,
+    "AddItemsToCart": handle_add_items_to_cart,
+    "UpdateCart": handle_update_cart,
     "RemoveItemFromCart": handle_remove_item_from_cart,
     "SaveCart": handle_save_cart,
     "ClearCart": handle_clear_cart,
@@ -0,0 +1,149 @@
+"""
+Process-wide logging for every server in server_side.
+
+configure_logging() routes the root logger through a bounded in-memory queue.
+Request threads only enqueue the LogRecord; a single listener thread formats it
+and writes it to stderr. A slow terminal or pipe therefore never stalls request
+handling. When the queue is full, records are dropped and counted instead of
+blocking, and the count is reported once there is room again.
+
+Env:
+- LOG_LEVEL (INFO)
+- LOG_FORMAT: `text` or `json` (one object per line, including any `extra=` fields)
+- LOG_QUEUE_SIZE (10000)
+- LOG_PAYLOAD_SAMPLE: fraction of responses whose payload is logged (0 = never)
+- LOG_PAYLOAD_MAX_CHARS: cap on a logged payload (2000)
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import threading
+from typing import Any, Optional
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text").lower()
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+LOG_PAYLOAD_SAMPLE = float(os.getenv("LOG_PAYLOAD_SAMPLE", "0"))
+LOG_PAYLOAD_MAX_CHARS = int(os.getenv("LOG_PAYLOAD_MAX_CHARS", "2000"))
+
+TEXT_FORMAT = "%(asctime)s %(levelname)s %(process)d %(name)s: %(message)s"
+
+# LogRecord attributes that are not user-supplied `extra=` fields
+_RESERVED = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+_lock = threading.Lock()
+_listener: Optional[logging.handlers.QueueListener] = None
+_queue_handler: Optional["DroppingQueueHandler"] = None
+
+
+class JSONFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "pid": record.process,
+            "msg": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RESERVED and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that never blocks the caller and defers formatting to the listener."""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Same process, so the record can cross the queue as-is; only the traceback
+        # must be rendered now, while its frames still exist.
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            if self.dropped:
+                dropped, self.dropped = self.dropped, 0
+                notice = logging.LogRecord(
+                    __name__, logging.WARNING, __file__, 0, "Dropped %s log records (queue full)", (dropped,), None
+                )
+                self.queue.put_nowait(notice)
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def _build_stream_handler() -> logging.Handler:
+    handler = logging.StreamHandler(sys.stderr)
+    handler.setFormatter(JSONFormatter() if LOG_FORMAT == "json" else logging.Formatter(TEXT_FORMAT))
+    return handler
+
+
+def configure_logging(level: Optional[str] = None):
+    """Install the queue-backed root handler once per process (safe to call repeatedly)."""
+    global _listener, _queue_handler
+    with _lock:
+        if _listener is not None:
+            return
+        log_queue: queue.Queue = queue.Queue(LOG_QUEUE_SIZE)
+        _queue_handler = DroppingQueueHandler(log_queue)
+        root = logging.getLogger()
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        root.addHandler(_queue_handler)
+        root.setLevel(level or LOG_LEVEL)
+        _listener = logging.handlers.QueueListener(log_queue, _build_stream_handler(), respect_handler_level=True)
+        _listener.start()
+        atexit.register(shutdown_logging)
+
+
+def shutdown_logging():
+    """Flush queued records and stop the listener thread."""
+    global _listener
+    with _lock:
+        listener, _listener = _listener, None
+    if listener is not None:
+        listener.stop()
+
+
+def _restart_listener_in_child():
+    # The listener thread does not survive fork(), and the parent's queue may have been
+    # locked mid-put at that moment; pre-forked workers get a fresh queue and listener.
+    global _listener
+    if _listener is None or _queue_handler is None:
+        return
+    _queue_handler.queue = queue.Queue(LOG_QUEUE_SIZE)
+    _listener = logging.handlers.QueueListener(
+        _queue_handler.queue, _build_stream_handler(), respect_handler_level=True
+    )
+    _listener.start()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_restart_listener_in_child)
+
+
+def log_payload(logger: logging.Logger, api: Any, payload: Any):
+    """Log a response payload for LOG_PAYLOAD_SAMPLE of calls; the rest cost one random()."""
+    if LOG_PAYLOAD_SAMPLE <= 0 or random.random() >= LOG_PAYLOAD_SAMPLE:
+        return
+    text = repr(payload)
+    if len(text) > LOG_PAYLOAD_MAX_CHARS:
+        text = text[:LOG_PAYLOAD_MAX_CHARS] + "...(truncated)"
+    logger.info("Response payload for %s: %s", api, text, extra={"api": api})
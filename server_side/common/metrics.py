@@ -0,0 +1,377 @@
+"""
+Prometheus-style instrumentation shared by every tier.
+
+Counters and histograms live in one process-wide registry and are rendered in
+the Prometheus text exposition format. REST apps serve them at `/metrics` on
+their own port (instrument_app); the TCP servers and the gRPC DB service start a
+small HTTP listener for it (start_metrics_server). With `--workers N` every
+worker has its own registry, so each one listens on `port + SERVER_WORKER_ID`.
+
+What is recorded:
+- marketplace_requests_total / marketplace_request_errors_total /
+  marketplace_request_duration_seconds, labelled by tier and API (TCP api name,
+  REST route template, gRPC method);
+- marketplace_db_pool_wait_seconds / marketplace_db_query_seconds, labelled by
+  database, from Database_Connection and AsyncDatabase_Connection;
+- marketplace_db_reads_total / marketplace_db_replica_lag_seconds, from read
+  replica routing (data_access_layer.replicas).
+"""
+
+import bisect
+import logging
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import grpc
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[Any], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _fmt(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labelvalues: Any, amount: float = 1.0):
+        key = tuple(str(v) for v in labelvalues)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, *labelvalues: Any) -> float:
+        with self._lock:
+            return self._values.get(tuple(str(v) for v in labelvalues), 0.0)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            lines.append(f"{self.name}{_labels(self.labelnames, key)} {_fmt(value)}")
+        return lines
+
+
+class Gauge(Counter):
+    """A value that can go down as well as up; the last set() wins."""
+
+    def set(self, value: float, *labelvalues: Any):
+        key = tuple(str(v) for v in labelvalues)
+        with self._lock:
+            self._values[key] = float(value)
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        lines[1] = f"# TYPE {self.name} gauge"
+        return lines
+
+
+class Histogram:
+    """Fixed-bucket histogram; buckets are upper bounds in seconds."""
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        # labels -> [per-bucket counts (+Inf last), sum]
+        self._series: Dict[Tuple[str, ...], List[Any]] = {}
+
+    def observe(self, value: float, *labelvalues: Any):
+        key = tuple(str(v) for v in labelvalues)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def count(self, *labelvalues: Any) -> int:
+        with self._lock:
+            series = self._series.get(tuple(str(v) for v in labelvalues))
+            return sum(series[0]) if series else 0
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted((key, (list(s[0]), s[1])) for key, s in self._series.items())
+        for key, (counts, total) in items:
+            cumulative = 0
+            for bound, n in zip(self.buckets + (float("inf"),), counts):
+                cumulative += n
+                le = f'le="{_fmt(bound)}"'
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, key)} {_fmt(total)}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, key)} {cumulative}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: List[Any] = []
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics)
+        lines: List[str] = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+REQUESTS = REGISTRY.register(Counter(
+    "marketplace_requests_total", "Requests handled, by tier and API.", ("tier", "api")))
+ERRORS = REGISTRY.register(Counter(
+    "marketplace_request_errors_total", "Requests that ended in an error, by tier, API and error code.",
+    ("tier", "api", "code")))
+LATENCY = REGISTRY.register(Histogram(
+    "marketplace_request_duration_seconds", "Time spent handling a request, by tier and API.", ("tier", "api")))
+DB_POOL_WAIT = REGISTRY.register(Histogram(
+    "marketplace_db_pool_wait_seconds", "Time spent waiting for a pooled DB connection.", ("db",)))
+DB_QUERY = REGISTRY.register(Histogram(
+    "marketplace_db_query_seconds", "Time spent running a statement on a checked-out connection.", ("db",)))
+
+
+def observe_request(tier: str, api: str, seconds: float, error_code: Optional[str] = None):
+    REQUESTS.inc(tier, api)
+    LATENCY.observe(seconds, tier, api)
+    if error_code is not None:
+        ERRORS.inc(tier, api, error_code)
+
+
+def observe_db(db: Optional[str], wait_seconds: float, query_seconds: float):
+    DB_POOL_WAIT.observe(wait_seconds, db or "")
+    DB_QUERY.observe(query_seconds, db or "")
+
+
+# --- TCP handlers ---
+def instrument_handlers(tier: str, handlers: Dict[str, Callable]) -> Dict[str, Callable]:
+    """Return a copy of a HANDLERS table whose entries record count, errors and latency."""
+
+    def wrap(api: str, handler: Callable) -> Callable:
+        def instrumented(request, dbs):
+            started = time.perf_counter()
+            code = None
+            try:
+                return handler(request, dbs)
+            except ValueError:
+                code = "CLIENT_ERROR"
+                raise
+            except Exception:
+                code = "SERVER_ERROR"
+                raise
+            finally:
+                observe_request(tier, api, time.perf_counter() - started, code)
+
+        instrumented.__name__ = getattr(handler, "__name__", api)
+        instrumented.__wrapped__ = handler
+        return instrumented
+
+    return {api: wrap(api, handler) for api, handler in handlers.items()}
+
+
+# --- REST ---
+def instrument_app(app, tier: str):
+    """Time every route of a FastAPI app by its path template and add GET /metrics."""
+    from fastapi.responses import PlainTextResponse
+
+    @app.middleware("http")
+    async def _record_metrics(request, call_next):
+        started = time.perf_counter()
+        status = 500
+        try:
+            response = await call_next(request)
+            status = response.status_code
+            return response
+        finally:
+            route = request.scope.get("route")
+            api = f"{request.method} {route.path}" if route is not None else "UNMATCHED"
+            if api != "GET /metrics":
+                code = str(status) if status >= 400 else None
+                observe_request(tier, api, time.perf_counter() - started, code)
+
+    @app.get("/metrics", include_in_schema=False)
+    def metrics():
+        return PlainTextResponse(REGISTRY.render(), media_type=CONTENT_TYPE)
+
+    return app
+
+
+# --- gRPC ---
+def _method_name(handler_call_details) -> str:
+    return handler_call_details.method.rsplit("/", 1)[-1]
+
+
+def _status_code(context, exc: Optional[BaseException]) -> Optional[str]:
+    code = context.code() if hasattr(context, "code") else None
+    if code is not None and code != grpc.StatusCode.OK:
+        return code.name
+    if exc is not None:
+        return grpc.StatusCode.UNKNOWN.name
+    return None
+
+
+def _replace_behavior(handler, unary_unary=None, unary_stream=None):
+    if handler.unary_unary and unary_unary:
+        return grpc.unary_unary_rpc_method_handler(
+            unary_unary(handler.unary_unary),
+            request_deserializer=handler.request_deserializer,
+            response_serializer=handler.response_serializer,
+        )
+    if handler.unary_stream and unary_stream:
+        return grpc.unary_stream_rpc_method_handler(
+            unary_stream(handler.unary_stream),
+            request_deserializer=handler.request_deserializer,
+            response_serializer=handler.response_serializer,
+        )
+    return handler
+
+
+class GrpcMetricsInterceptor(grpc.ServerInterceptor):
+    """Records every unary and server-streaming RPC of a grpc.server."""
+
+    def __init__(self, tier: str = "grpc"):
+        self.tier = tier
+
+    def intercept_service(self, continuation, handler_call_details):
+        handler = continuation(handler_call_details)
+        if handler is None:
+            return None
+        api = _method_name(handler_call_details)
+        tier = self.tier
+
+        def unary_unary(behavior):
+            def wrapper(request, context):
+                started = time.perf_counter()
+                exc = None
+                try:
+                    return behavior(request, context)
+                except BaseException as e:
+                    exc = e
+                    raise
+                finally:
+                    observe_request(tier, api, time.perf_counter() - started, _status_code(context, exc))
+            return wrapper
+
+        def unary_stream(behavior):
+            def wrapper(request, context):
+                started = time.perf_counter()
+                exc = None
+                try:
+                    yield from behavior(request, context)
+                except BaseException as e:
+                    exc = e
+                    raise
+                finally:
+                    observe_request(tier, api, time.perf_counter() - started, _status_code(context, exc))
+            return wrapper
+
+        return _replace_behavior(handler, unary_unary, unary_stream)
+
+
+class AsyncGrpcMetricsInterceptor(grpc.aio.ServerInterceptor):
+    """grpc.aio counterpart of GrpcMetricsInterceptor."""
+
+    def __init__(self, tier: str = "grpc"):
+        self.tier = tier
+
+    async def intercept_service(self, continuation, handler_call_details):
+        handler = await continuation(handler_call_details)
+        if handler is None:
+            return None
+        api = _method_name(handler_call_details)
+        tier = self.tier
+
+        def unary_unary(behavior):
+            async def wrapper(request, context):
+                started = time.perf_counter()
+                exc = None
+                try:
+                    return await behavior(request, context)
+                except BaseException as e:
+                    exc = e
+                    raise
+                finally:
+                    observe_request(tier, api, time.perf_counter() - started, _status_code(context, exc))
+            return wrapper
+
+        def unary_stream(behavior):
+            async def wrapper(request, context):
+                started = time.perf_counter()
+                exc = None
+                try:
+                    async for response in behavior(request, context):
+                        yield response
+                except BaseException as e:
+                    exc = e
+                    raise
+                finally:
+                    observe_request(tier, api, time.perf_counter() - started, _status_code(context, exc))
+            return wrapper
+
+        return _replace_behavior(handler, unary_unary, unary_stream)
+
+
+# --- HTTP exposition for the non-HTTP tiers ---
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?", 1)[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = REGISTRY.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_metrics_server(port: int, host: str = "0.0.0.0") -> Optional[ThreadingHTTPServer]:
+    """Serve GET /metrics on a daemon thread; the port is offset by SERVER_WORKER_ID under --workers."""
+    port += int(os.getenv("SERVER_WORKER_ID", "0"))
+    try:
+        httpd = ThreadingHTTPServer((host, port), _MetricsHandler)
+    except OSError as exc:
+        logger.warning("Metrics endpoint not started on %s:%s: %s", host, port, exc)
+        return None
+    httpd.daemon_threads = True
+    threading.Thread(target=httpd.serve_forever, name="metrics-http", daemon=True).start()
+    logger.info("Metrics on http://%s:%s/metrics", host, port)
+    return httpd
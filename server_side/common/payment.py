@@ -0,0 +1,159 @@
+"""
+Process-wide client for the SOAP financial service.
+
+The zeep Client (and its parsed WSDL) is built once and reused; HTTP goes
+through a pooled keep-alive requests.Session. A small circuit breaker stops
+sending traffic to the service for a while after repeated failures.
+"""
+
+import logging
+import os
+import threading
+import time
+from typing import Callable
+
+import requests
+from requests.adapters import HTTPAdapter
+from zeep import Client as SoapClient
+from zeep.cache import InMemoryCache
+from zeep.transports import Transport
+
+logger = logging.getLogger(__name__)
+
+FINANCIAL_SERVICE_WSDL = os.getenv("FINANCIAL_SERVICE_WSDL", "http://localhost:8002/?wsdl")
+PAYMENT_TIMEOUT = float(os.getenv("PAYMENT_TIMEOUT", "5"))
+PAYMENT_POOL_SIZE = int(os.getenv("PAYMENT_POOL_SIZE", "32"))
+PAYMENT_WSDL_CACHE_TTL = int(os.getenv("PAYMENT_WSDL_CACHE_TTL", "3600"))
+PAYMENT_CB_FAILURES = int(os.getenv("PAYMENT_CB_FAILURES", "5"))
+PAYMENT_CB_RESET = float(os.getenv("PAYMENT_CB_RESET", "30"))
+
+
+class PaymentServiceUnavailable(Exception):
+    pass
+
+
+class CircuitBreaker:
+    """closed -> open after `failure_threshold` consecutive failures; one trial call after `reset_timeout`."""
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            if time.monotonic() - self._opened_at >= self.reset_timeout:
+                return "half-open"
+            return "open"
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if time.monotonic() - self._opened_at < self.reset_timeout or self._trial_in_flight:
+                return False
+            self._trial_in_flight = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._trial_in_flight or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+            self._trial_in_flight = False
+
+
+class PaymentClient:
+
+    def __init__(
+        self,
+        wsdl: str = FINANCIAL_SERVICE_WSDL,
+        timeout: float = PAYMENT_TIMEOUT,
+        pool_size: int = PAYMENT_POOL_SIZE,
+        breaker: CircuitBreaker | None = None,
+    ):
+        self.wsdl = wsdl
+        self.timeout = timeout
+        self.pool_size = pool_size
+        self.breaker = breaker or CircuitBreaker(PAYMENT_CB_FAILURES, PAYMENT_CB_RESET)
+        self._lock = threading.Lock()
+        self._client = None
+
+    def _build(self) -> SoapClient:
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        transport = Transport(
+            session=session,
+            cache=InMemoryCache(timeout=PAYMENT_WSDL_CACHE_TTL),
+            timeout=self.timeout,
+            operation_timeout=self.timeout,
+        )
+        return SoapClient(self.wsdl, transport=transport)
+
+    def _get_client(self) -> SoapClient:
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    self._client = self._build()
+        return self._client
+
+    def authorize(self, username: str, card_number: str, expiration_date: str, security_code: str) -> bool:
+        """True if approved, False if declined; raises PaymentServiceUnavailable otherwise."""
+        if not self.breaker.allow():
+            raise PaymentServiceUnavailable("circuit open")
+        try:
+            approved = self._get_client().service.AuthorizePayment(
+                username=username,
+                card_number=card_number,
+                expiration_date=expiration_date,
+                security_code=security_code,
+            )
+        except Exception as exc:
+            self.breaker.record_failure()
+            logger.warning("Payment service call failed: %s", exc)
+            raise PaymentServiceUnavailable(str(exc)) from exc
+        self.breaker.record_success()
+        return bool(approved)
+
+    def close(self):
+        with self._lock:
+            if self._client is not None:
+                self._client.transport.session.close()
+                self._client = None
+
+
+_default_client: PaymentClient | None = None
+_default_lock = threading.Lock()
+
+
+def get_payment_client() -> PaymentClient:
+    global _default_client
+    if _default_client is None:
+        with _default_lock:
+            if _default_client is None:
+                _default_client = PaymentClient()
+    return _default_client
+
+
+def card_authorizer(card) -> Callable[[], bool]:
+    """One deferred authorize() call for a card message (name, card_number, expiration_date, security_code)."""
+    return lambda: get_payment_client().authorize(
+        username=card.name,
+        card_number=card.card_number,
+        expiration_date=card.expiration_date,
+        security_code=card.security_code,
+    )
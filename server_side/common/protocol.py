@@ -4,9 +4,14 @@ Request:
     "type": "request",
     "api": "<ApiName>",
     "session_id": "<optional session id>",
+    "request_id": <optional int or string>,
     "payload": {...}
 }
 
+A request that carries a request_id may be answered out of order; its
+response/error echoes the same request_id. Requests without one are answered
+in the order they were sent, as before.
+
 Response:
 {
     "type": "response",
@@ -56,17 +61,24 @@ def validate_request(request: Dict[str, Any]) -> Dict[str, Any]:
     return request
 
 
-def build_response(api: str, payload: Dict[str, Any], session_id: Optional[str] = None) -> Dict[str, Any]:
-    return {
+def build_response(
+    api: str, payload: Dict[str, Any], session_id: Optional[str] = None, request_id: Any = None
+) -> Dict[str, Any]:
+    response = {
         "type": "response",
         "api": api,
         "session_id": session_id,
         "payload": payload,
     }
+    if request_id is not None:
+        response["request_id"] = request_id
+    return response
 
 
-def build_error(api: str, code: str, message: str, session_id: Optional[str] = None) -> Dict[str, Any]:
-    return {
+def build_error(
+    api: str, code: str, message: str, session_id: Optional[str] = None, request_id: Any = None
+) -> Dict[str, Any]:
+    error = {
         "type": "error",
         "api": api,
         "session_id": session_id,
@@ -75,3 +87,6 @@ def build_error(api: str, code: str, message: str, session_id: Optional[str] = N
             "message": message,
         },
     }
+    if request_id is not None:
+        error["request_id"] = request_id
+    return error
@@ -1,29 +1,54 @@
 # non-blocking server for seller interface
+import asyncio
 import logging
 import os
 import socket
 import sys
+from concurrent.futures import ThreadPoolExecutor, wait
 from pathlib import Path
-from threading import Thread
-from typing import Any, Dict
+from threading import BoundedSemaphore, Condition, Lock, Thread
+from typing import Any, Dict, Tuple
 
 # for `server_side.*` imports resolve
 REPO_ROOT = Path(__file__).resolve().parents[2]
 if str(REPO_ROOT) not in sys.path:
     sys.path.insert(0, str(REPO_ROOT))
 
+from server_side.common.logging_config import configure_logging
 from server_side.common.protocol import (
     build_error,
     build_response,
     validate_request,
     ServerProtocolError,
 )
-from server_side.common.transport import LengthPrefixedJSONConnection
+from server_side.common.transport import (
+    AsyncLengthPrefixedJSONConnection,
+    LengthPrefixedJSONConnection,
+)
 from server_side.data_access_layer.db import Database_Connection
+from server_side.data_access_layer.credentials import close_hash_pool
+from server_side.data_access_layer.session_cache import close_session_caches
 
-logging.basicConfig(level=logging.INFO)
+configure_logging()
 logger = logging.getLogger(__name__)
 
+# asyncio engine: handlers are blocking (psycopg2), so they run on a bounded
+# thread pool sized to the DB pools; sockets themselves cost no threads.
+ASYNC_MAX_WORKERS = int(os.getenv("SERVER_ASYNC_MAX_WORKERS", "16"))
+ASYNC_MAX_PENDING = int(os.getenv("SERVER_ASYNC_MAX_PENDING", "256"))
+ASYNC_BACKLOG = int(os.getenv("SERVER_ASYNC_BACKLOG", "4096"))
+# Requests carrying a request_id are handled concurrently and answered as they
+# finish; this caps how many one connection may have in flight before the
+# server stops reading from it. The threaded engine runs them on a shared pool.
+PIPELINE_MAX_INFLIGHT = int(os.getenv("SERVER_PIPELINE_MAX_INFLIGHT", "32"))
+PIPELINE_WORKERS = int(os.getenv("SERVER_PIPELINE_WORKERS", "16"))
+# On stop, wait this long for requests already being handled before the DB pools close.
+DRAIN_TIMEOUT = float(os.getenv("SERVER_DRAIN_TIMEOUT", "10"))
+
+
+def _request_id(message) -> Any:
+    return message.get("request_id") if isinstance(message, dict) else None
+
 
 def _safe_close(resource):
     if resource:
@@ -34,22 +59,34 @@ def _safe_close(resource):
 
 
 class Server:
-    def __init__(self, host: str, port: int, timeout: float = 5.0):
+    def __init__(self, host: str, port: int, timeout: float = 5.0, reuse_port: bool = False):
         self.host = host
         self.port = port
         self.timeout = 1.0
+        self.reuse_port = reuse_port
         self._running = True
+        self._pipeline_pool = None
+        self._pipeline_lock = Lock()
+        self._active = 0
+        self._idle = Condition()
         self._setup()
 
         self.db_conns = {
-            "customer": Database_Connection(os.getenv("CUSTOMER_DB_NAME", "customer-database")),
-            "product": Database_Connection(os.getenv("PRODUCT_DB_NAME", "product-database")),
+            "customer": Database_Connection(
+                os.getenv("CUSTOMER_DB_NAME", "customer-database"), replicas=os.getenv("CUSTOMER_PGREPLICAS")
+            ),
+            "product": Database_Connection(
+                os.getenv("PRODUCT_DB_NAME", "product-database"), replicas=os.getenv("PRODUCT_PGREPLICAS")
+            ),
         }
 
     def _setup(self):
         self.server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         self.server_socket.settimeout(self.timeout)
         self.server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        if self.reuse_port:
+            # Pre-forked workers each bind the same port; the kernel spreads connections across them.
+            self.server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
         self.server_socket.bind((self.host, self.port))
         self.server_socket.listen()
         logger.info("Server listening on %s:%s", self.host, self.port)
@@ -57,10 +94,21 @@ class Server:
     def stop(self):
         self._running = False
         _safe_close(self.server_socket)
+        if self._pipeline_pool is not None:
+            self._pipeline_pool.shutdown(wait=False, cancel_futures=True)
+        self._drain(DRAIN_TIMEOUT)
+        # Write back pending session touches before the pools go away
+        close_session_caches()
+        close_hash_pool()
         # Close any registered DB connections/pools
         for db in getattr(self, "db_conns", {}).values():
             _safe_close(db)
 
+    def _drain(self, timeout: float):
+        with self._idle:
+            if not self._idle.wait_for(lambda: self._active == 0, timeout=timeout):
+                logger.warning("Stopping with %s request(s) still in progress", self._active)
+
     def start(self):
         try:
             while self._running:
@@ -73,7 +121,7 @@ class Server:
                         break
                     raise
 
-                logger.info("Accepted connection from %s", addr)
+                logger.debug("Accepted connection from %s", addr)
                 client_thread = Thread(
                     target=self.handle_client, args=(client_socket, addr), daemon=True
                 )
@@ -85,49 +133,187 @@ class Server:
 
     def handle_client(self, client_socket: socket.socket, addr):
         conn = LengthPrefixedJSONConnection(client_socket)
+        send_lock = Lock()
+        inflight = BoundedSemaphore(PIPELINE_MAX_INFLIGHT)
+        pipelined = set()
+        pipelined_lock = Lock()
+
+        def _finished(future):
+            with pipelined_lock:
+                pipelined.discard(future)
+            inflight.release()
+
         with client_socket:
             while True:
                 try:
                     message = conn.recv_message()
-                    logger.debug("Received message from %s: %s", addr, message)
-                    request = validate_request(message)
-                    response = self.process_request(request)
-                except ServerProtocolError as exc:
-                    logger.warning("Protocol error from %s: %s", addr, exc)
-                    response = build_error(
-                        api=message.get("api", "UNKNOWN") if isinstance(message, dict) else "UNKNOWN",
-                        code=exc.code,
-                        message=exc.message,
-                        session_id=message.get("session_id") if isinstance(message, dict) else None,
-                    )
+                except (ConnectionError, OSError):
+                    logger.debug("Client %s disconnected", addr)
+                    break
+                except ValueError as exc:
+                    response, keep_open = build_error(api="UNKNOWN", code="BAD_REQUEST", message=str(exc)), True
+                else:
+                    if _request_id(message) is not None:
+                        inflight.acquire()
+                        future = self._get_pipeline_pool().submit(
+                            self._serve_pipelined, conn, send_lock, message, addr
+                        )
+                        with pipelined_lock:
+                            pipelined.add(future)
+                        future.add_done_callback(_finished)
+                        continue
+                    response, keep_open = self.dispatch(message, addr)
+
+                try:
+                    with send_lock:
+                        conn.send_message(response)
                 except ConnectionError:
-                    logger.info("Client %s disconnected", addr)
+                    logger.debug("Client %s disconnected during send", addr)
+                    break
+                if not keep_open:
                     break
-                except Exception as exc:
-                    logger.exception("Unexpected server error for %s", addr)
-                    response = build_error(
-                        api=message.get("api", "UNKNOWN") if isinstance(message, dict) else "UNKNOWN",
-                        code="SERVER_ERROR",
-                        message=str(exc),
-                        session_id=message.get("session_id") if isinstance(message, dict) else None,
+            # Let pipelined requests that are still running answer before the socket closes.
+            with pipelined_lock:
+                still_running = list(pipelined)
+            wait(still_running)
+
+    def _get_pipeline_pool(self) -> ThreadPoolExecutor:
+        if self._pipeline_pool is None:
+            with self._pipeline_lock:
+                if self._pipeline_pool is None:
+                    self._pipeline_pool = ThreadPoolExecutor(
+                        max_workers=PIPELINE_WORKERS, thread_name_prefix="pipeline"
                     )
-                    try:
-                        conn.send_message(response)
-                    finally:
-                        break
+        return self._pipeline_pool
+
+    def _serve_pipelined(self, conn: LengthPrefixedJSONConnection, send_lock: Lock, message, addr):
+        response, keep_open = self.dispatch(message, addr)
+        try:
+            with send_lock:
+                conn.send_message(response)
+            if not keep_open:
+                conn.sock.shutdown(socket.SHUT_RDWR)
+        except (ConnectionError, OSError):
+            logger.debug("Client %s disconnected during send", addr)
+
+    def dispatch(self, message: Dict[str, Any], addr) -> Tuple[Dict[str, Any], bool]:
+        """Turn one decoded message into a response.
+
+        Returns (response, keep_open); keep_open is False after an unexpected
+        server error, in which case the connection is closed once the error is sent.
+        """
+        api = message.get("api", "UNKNOWN") if isinstance(message, dict) else "UNKNOWN"
+        session_id = message.get("session_id") if isinstance(message, dict) else None
+        request_id = _request_id(message)
+        with self._idle:
+            self._active += 1
+        try:
+            logger.debug("Received message from %s: %s", addr, message)
+            request = validate_request(message)
+            response = self.process_request(request)
+            if request_id is not None:
+                response["request_id"] = request_id
+            return response, True
+        except ServerProtocolError as exc:
+            logger.warning("Protocol error from %s: %s", addr, exc)
+            return build_error(
+                api=api, code=exc.code, message=exc.message, session_id=session_id, request_id=request_id
+            ), True
+        except Exception as exc:
+            logger.exception("Unexpected server error for %s", addr)
+            return build_error(
+                api=api, code="SERVER_ERROR", message=str(exc), session_id=session_id, request_id=request_id
+            ), False
+        finally:
+            with self._idle:
+                self._active -= 1
+                if self._active == 0:
+                    self._idle.notify_all()
+
+    # --- asyncio engine ---
+    def start_async(self, max_workers: int | None = None, max_pending: int | None = None):
+        """Serve with a single event loop instead of one thread per client.
+
+        Idle connections only cost a coroutine; requests are handed to a bounded
+        thread pool because the handlers block on the database.
+        """
+        try:
+            asyncio.run(self._serve_async(max_workers or ASYNC_MAX_WORKERS, max_pending or ASYNC_MAX_PENDING))
+        except KeyboardInterrupt:
+            logger.info("Shutting down server.")
+        finally:
+            self.stop()
+
+    async def _serve_async(self, max_workers: int, max_pending: int):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="handler")
+        # Caps requests queued for the executor; readers wait (and TCP backpressures) beyond it.
+        self._pending = asyncio.Semaphore(max_pending)
+        self.server_socket.setblocking(False)
+        self.server_socket.listen(ASYNC_BACKLOG)
+        try:
+            server = await asyncio.start_server(self.handle_client_async, sock=self.server_socket)
+            logger.info("Async engine serving on %s:%s (workers=%s)", self.host, self.port, max_workers)
+            async with server:
+                await server.serve_forever()
+        finally:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
+    async def handle_client_async(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        addr = writer.get_extra_info("peername")
+        conn = AsyncLengthPrefixedJSONConnection(reader, writer)
+        loop = asyncio.get_running_loop()
+        send_lock = asyncio.Lock()
+        inflight = asyncio.Semaphore(PIPELINE_MAX_INFLIGHT)
+        pipelined = set()
+        try:
+            while True:
+                try:
+                    message = await conn.recv_message()
+                except ConnectionError:
+                    logger.debug("Client %s disconnected", addr)
+                    break
+                except ValueError as exc:
+                    response, keep_open = build_error(api="UNKNOWN", code="BAD_REQUEST", message=str(exc)), True
+                else:
+                    if _request_id(message) is not None:
+                        await inflight.acquire()
+                        task = loop.create_task(self._serve_pipelined_async(conn, send_lock, message, addr))
+                        pipelined.add(task)
+                        task.add_done_callback(lambda t: (pipelined.discard(t), inflight.release()))
+                        continue
+                    async with self._pending:
+                        response, keep_open = await loop.run_in_executor(self._executor, self.dispatch, message, addr)
 
                 try:
-                    conn.send_message(response)
+                    async with send_lock:
+                        await conn.send_message(response)
                 except ConnectionError:
-                    logger.info("Client %s disconnected during send", addr)
+                    logger.debug("Client %s disconnected during send", addr)
+                    break
+                if not keep_open:
                     break
+        finally:
+            if pipelined:
+                await asyncio.gather(*pipelined, return_exceptions=True)
+            await conn.close()
+
+    async def _serve_pipelined_async(self, conn: AsyncLengthPrefixedJSONConnection, send_lock: asyncio.Lock, message, addr):
+        loop = asyncio.get_running_loop()
+        async with self._pending:
+            response, keep_open = await loop.run_in_executor(self._executor, self.dispatch, message, addr)
+        try:
+            async with send_lock:
+                await conn.send_message(response)
+            if not keep_open:
+                conn.writer.close()
+        except (ConnectionError, OSError):
+            logger.debug("Client %s disconnected during send", addr)
 
     def process_request(self, request: Dict[str, Any]) -> Dict[str, Any]:
         api = request["api"]
         payload = request["payload"]
         session_id = request.get("session_id")
 
-        print("debug")
         # Placeholder. To be overrided
         return build_response(
             api=api,
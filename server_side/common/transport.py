@@ -1,13 +1,84 @@
+import asyncio
 import json
 import socket
 import struct
 from typing import Any, Dict
 
+try:
+    import msgpack
+except ImportError:  # optional: JSON is always available
+    msgpack = None
+
+# A client may open a connection with HANDSHAKE_MAGIC followed by one codec id
+# byte; the server answers with the id of the codec it will use (JSON if the
+# requested one is unknown or not installed). The magic can never be a valid
+# length prefix (its first byte would mean a >4 GiB message), so clients that
+# skip the handshake are served JSON exactly as before.
+HANDSHAKE_MAGIC = b"\xffMKC"
+CODEC_JSON = 0
+CODEC_MSGPACK = 1
+
+
+class JSONCodec:
+    id = CODEC_JSON
+    name = "json"
+
+    @staticmethod
+    def encode(message: Dict[str, Any]) -> bytes:
+        try:
+            return json.dumps(message, separators=(",", ":")).encode("utf-8")
+        except (TypeError, ValueError) as exc:
+            raise ValueError(f"Unable to encode message as JSON: {exc}") from exc
+
+    @staticmethod
+    def decode(payload: bytes) -> Dict[str, Any]:
+        try:
+            return json.loads(payload.decode("utf-8"))
+        except (ValueError, UnicodeDecodeError) as exc:
+            raise ValueError(f"Invalid JSON payload: {exc}") from exc
+
+
+class MsgpackCodec:
+    id = CODEC_MSGPACK
+    name = "msgpack"
+
+    @staticmethod
+    def encode(message: Dict[str, Any]) -> bytes:
+        try:
+            return msgpack.packb(message, use_bin_type=True)
+        except (TypeError, ValueError, OverflowError) as exc:
+            raise ValueError(f"Unable to encode message as MessagePack: {exc}") from exc
+
+    @staticmethod
+    def decode(payload: bytes) -> Dict[str, Any]:
+        try:
+            return msgpack.unpackb(payload, raw=False, strict_map_key=False)
+        except Exception as exc:
+            raise ValueError(f"Invalid MessagePack payload: {exc}") from exc
+
+
+CODECS = {JSONCodec.id: JSONCodec}
+if msgpack is not None:
+    CODECS[MsgpackCodec.id] = MsgpackCodec
+CODECS_BY_NAME = {codec.name: codec for codec in (JSONCodec, MsgpackCodec)}
+
+
+def encode_message(message: Dict[str, Any], codec=JSONCodec) -> bytes:
+    payload = codec.encode(message)
+    return struct.pack("!I", len(payload)) + payload
+
+
+def decode_message(payload: bytes, codec=JSONCodec) -> Dict[str, Any]:
+    return codec.decode(payload)
+
 
 class LengthPrefixedJSONConnection:
+    """Length-prefixed messages over a socket; JSON unless the client negotiates another codec."""
 
     def __init__(self, sock: socket.socket):
         self.sock = sock
+        self.codec = JSONCodec
+        self._first = True
 
     def _recv_all(self, n: int) -> bytes:
         chunks = []
@@ -31,18 +102,65 @@ class LengthPrefixedJSONConnection:
     # --- Public API ---
     def recv_message(self) -> Dict[str, Any]:
         length_prefix = self._recv_all(4)
+        if self._first:
+            self._first = False
+            if length_prefix == HANDSHAKE_MAGIC:
+                self.codec = CODECS.get(self._recv_all(1)[0], JSONCodec)
+                self._send_all(bytes([self.codec.id]))
+                length_prefix = self._recv_all(4)
         msg_length = struct.unpack("!I", length_prefix)[0]
-        payload = self._recv_all(msg_length)
-        try:
-            return json.loads(payload.decode("utf-8"))
-        except (ValueError, UnicodeDecodeError) as exc:
-            raise ValueError(f"Invalid JSON payload: {exc}") from exc
+        return decode_message(self._recv_all(msg_length), self.codec)
 
     def send_message(self, message: Dict[str, Any]):
+        self._send_all(encode_message(message, self.codec))
+
+
+class AsyncLengthPrefixedJSONConnection:
+    """Same framing as LengthPrefixedJSONConnection, over asyncio streams."""
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+        self.codec = JSONCodec
+        self._first = True
+
+    async def _recv_all(self, n: int) -> bytes:
         try:
-            payload = json.dumps(message).encode("utf-8")
-        except (TypeError, ValueError) as exc:
-            raise ValueError(f"Unable to encode message as JSON: {exc}") from exc
+            return await self.reader.readexactly(n)
+        except asyncio.IncompleteReadError as exc:
+            raise ConnectionError("Socket connection broken") from exc
+
+    # --- Public API ---
+    async def recv_message(self) -> Dict[str, Any]:
+        length_prefix = await self._recv_all(4)
+        if self._first:
+            self._first = False
+            if length_prefix == HANDSHAKE_MAGIC:
+                self.codec = CODECS.get((await self._recv_all(1))[0], JSONCodec)
+                self.writer.write(bytes([self.codec.id]))
+                await self.writer.drain()
+                length_prefix = await self._recv_all(4)
+        msg_length = struct.unpack("!I", length_prefix)[0]
+        return decode_message(await self._recv_all(msg_length), self.codec)
+
+    async def send_message(self, message: Dict[str, Any]):
+        self.writer.write(encode_message(message, self.codec))
+        await self.writer.drain()
 
-        prefix = struct.pack("!I", len(payload))
-        self._send_all(prefix + payload)
+    async def request_codec(self, name: str):
+        """Client side of the handshake; returns the codec the server accepted."""
+        codec = CODECS_BY_NAME.get(name)
+        if codec is None or codec.id not in CODECS:
+            raise ValueError(f"Codec {name!r} is not available")
+        self._first = False
+        self.writer.write(HANDSHAKE_MAGIC + bytes([codec.id]))
+        await self.writer.drain()
+        self.codec = CODECS.get((await self._recv_all(1))[0], JSONCodec)
+        return self.codec
+
+    async def close(self):
+        self.writer.close()
+        try:
+            await self.writer.wait_closed()
+        except (ConnectionError, OSError):
+            pass
@@ -0,0 +1,139 @@
+"""
+Pre-fork supervisor for the TCP servers (`run.py buyer-server --workers N`).
+
+The parent process never serves traffic. It forks N workers; each one builds its
+own server (listening socket bound with SO_REUSEPORT, its own DB pools and
+session cache) so the kernel spreads new connections across processes and
+handler code is no longer bound by a single GIL. Workers that die are
+restarted, with a growing delay if they keep dying right after start. Each
+worker sees its slot (0..N-1) in SERVER_WORKER_ID; a restarted worker keeps
+its slot, so per-worker ports (e.g. metrics) stay stable.
+SIGTERM/SIGINT on the parent stops every worker gracefully, then kills any
+that outlive SERVER_WORKER_SHUTDOWN_TIMEOUT.
+"""
+
+import logging
+import os
+import signal
+import socket
+import time
+from typing import Callable, Dict, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+WORKER_SHUTDOWN_TIMEOUT = float(os.getenv("SERVER_WORKER_SHUTDOWN_TIMEOUT", "30"))
+# A worker exiting sooner than this after its start counts as a crash loop and delays the next restart.
+WORKER_MIN_UPTIME = float(os.getenv("SERVER_WORKER_MIN_UPTIME", "1"))
+WORKER_MAX_RESTART_DELAY = float(os.getenv("SERVER_WORKER_MAX_RESTART_DELAY", "30"))
+
+
+def _stop_worker(signum, frame):
+    # Only the first signal interrupts; a second one must not cut the drain in Server.stop() short.
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    raise KeyboardInterrupt
+
+
+class WorkerSupervisor:
+    """
+    Runs `serve(make_server())` in `workers` forked processes. `make_server` is
+    called in the child, after the fork, so no sockets, pools or threads are
+    shared between workers.
+    """
+
+    def __init__(self, make_server: Callable[[], object], serve: Callable[[object], None], workers: int):
+        if workers < 1:
+            raise ValueError("workers must be >= 1")
+        if not hasattr(os, "fork") or not hasattr(socket, "SO_REUSEPORT"):
+            raise RuntimeError("--workers needs fork() and SO_REUSEPORT (Linux/macOS)")
+        self.make_server = make_server
+        self.serve = serve
+        self.workers = workers
+        self._children: Dict[int, Tuple[int, float]] = {}  # pid -> (slot, start time)
+        self._stopping = False
+        self._restart_delay = 0.0
+        self._to_restart: List[int] = []
+        self._restart_at = 0.0
+
+    def run(self):
+        signal.signal(signal.SIGTERM, self._request_stop)
+        signal.signal(signal.SIGINT, self._request_stop)
+        logger.info("Supervisor %s starting %s workers", os.getpid(), self.workers)
+        for slot in range(self.workers):
+            self._spawn(slot)
+        try:
+            while not self._stopping:
+                self._reap()
+                while self._to_restart and not self._stopping and time.monotonic() >= self._restart_at:
+                    self._spawn(self._to_restart.pop(0))
+                time.sleep(0.2)
+        finally:
+            self._shutdown()
+
+    def _request_stop(self, signum, frame):
+        self._stopping = True
+
+    def _spawn(self, slot: int):
+        pid = os.fork()
+        if pid == 0:
+            os.environ["SERVER_WORKER_ID"] = str(slot)
+            os._exit(self._run_worker())
+        self._children[pid] = (slot, time.monotonic())
+        logger.info("Started worker %s (slot %s)", pid, slot)
+
+    def _run_worker(self) -> int:
+        signal.signal(signal.SIGTERM, _stop_worker)
+        signal.signal(signal.SIGINT, _stop_worker)
+        try:
+            self.serve(self.make_server())
+        except KeyboardInterrupt:
+            pass
+        except Exception:
+            logger.exception("Worker %s failed", os.getpid())
+            return 1
+        return 0
+
+    def _reap(self):
+        while self._children:
+            pid, status = os.waitpid(-1, os.WNOHANG)
+            if pid == 0:
+                return
+            child = self._children.pop(pid, None)
+            if child is None or self._stopping:
+                continue
+            slot, started = child
+            now = time.monotonic()
+            if now - started < WORKER_MIN_UPTIME:
+                self._restart_delay = min(max(self._restart_delay * 2, 0.5), WORKER_MAX_RESTART_DELAY)
+            else:
+                self._restart_delay = 0.0
+            logger.warning(
+                "Worker %s exited (status %s); restarting in %.1fs",
+                pid, os.waitstatus_to_exitcode(status), self._restart_delay,
+            )
+            self._to_restart.append(slot)
+            self._restart_at = now + self._restart_delay
+
+    def _shutdown(self):
+        logger.info("Stopping %s workers", len(self._children))
+        for pid in list(self._children):
+            self._signal(pid, signal.SIGTERM)
+        deadline = time.monotonic() + WORKER_SHUTDOWN_TIMEOUT
+        while self._children and time.monotonic() < deadline:
+            pid, _ = os.waitpid(-1, os.WNOHANG)
+            if pid == 0:
+                time.sleep(0.1)
+            else:
+                self._children.pop(pid, None)
+        for pid in list(self._children):
+            logger.warning("Worker %s did not stop in %ss; killing it", pid, WORKER_SHUTDOWN_TIMEOUT)
+            self._signal(pid, signal.SIGKILL)
+            os.waitpid(pid, 0)
+        self._children.clear()
+
+    @staticmethod
+    def _signal(pid: int, sig):
+        try:
+            os.kill(pid, sig)
+        except ProcessLookupError:
+            pass
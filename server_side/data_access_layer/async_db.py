@@ -0,0 +1,209 @@
+import asyncio
+import logging
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import Any, Hashable, Optional
+
+from server_side.common.metrics import observe_db
+from server_side.data_access_layer.replicas import LAG_SQL, Replica, ReplicaRouter, parse_replicas
+from server_side.data_access_layer.statements import Statement, run_async
+
+try:
+    import psycopg
+    from psycopg import conninfo as _conninfo
+    from psycopg_pool import AsyncConnectionPool, PoolTimeout
+except ImportError:  # optional: only the asyncio DB service needs psycopg 3
+    AsyncConnectionPool = None
+
+try:
+    from dotenv import load_dotenv
+    load_dotenv()
+except Exception:
+    pass
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncDatabase_Connection:
+    """
+    asyncio counterpart of Database_Connection, backed by psycopg 3's
+    AsyncConnectionPool. psycopg 3 uses the same %s placeholders and list ->
+    array adaptation as psycopg2, so queries are shared verbatim. Read replicas
+    are routed exactly as in Database_Connection (data_access_layer.replicas).
+    """
+
+    def __init__(
+        self,
+        db_name: str | None = None,
+        host: str | None = None,
+        port: int | None = None,
+        user: str | None = None,
+        password: str | None = None,
+        replicas: Any = None,
+    ):
+        if AsyncConnectionPool is None:
+            raise RuntimeError("The asyncio DB service needs psycopg 3: pip install 'psycopg[binary,pool]'")
+        self.host = host or os.getenv("PGHOST", "localhost")
+        self.port = int(port or os.getenv("PGPORT", "5434"))
+        self.db_name = db_name
+        self.user = user or os.getenv("PGUSER", "postgres")
+        self.password = password or os.getenv("PGPASSWORD")
+        if not self.password:
+            raise RuntimeError("PGPASSWORD not set. Store it in .env or environment variables.")
+        self.DB_POOL = None
+        self.replicas: Optional[ReplicaRouter] = None
+        self._replica_hosts = parse_replicas(os.getenv("PGREPLICAS") if replicas is None else replicas, self.port)
+        self._probe_task: Optional[asyncio.Task] = None
+
+    def _conninfo(self, host: str, port: int) -> str:
+        return _conninfo.make_conninfo(
+            host=host,
+            port=port,
+            dbname=self.db_name,
+            user=self.user,
+            password=self.password,
+        )
+
+    async def open(self):
+        logger.info("Connecting to DB at %s:%s with user %s (async)...", self.host, self.port, self.user)
+        self.DB_POOL = AsyncConnectionPool(
+            self._conninfo(self.host, self.port),
+            min_size=int(os.getenv("DB_POOL_MIN", "1")),
+            max_size=int(os.getenv("DB_POOL_MAX", "15")),
+            timeout=float(os.getenv("DB_POOL_TIMEOUT", "30")),
+            max_lifetime=float(os.getenv("DB_POOL_MAX_LIFETIME", "3600")),
+            check=AsyncConnectionPool.check_connection,
+            open=False,
+        )
+        await self.DB_POOL.open()
+        if self._replica_hosts:
+            await self._open_replicas()
+
+    # --- Replicas ---
+    async def _open_replicas(self):
+        replicas = [Replica(host, port) for host, port in self._replica_hosts]
+        self.replicas = ReplicaRouter(self.db_name, replicas)
+        for replica in replicas:
+            # min_size=0: an unreachable replica never blocks startup; a busy replica
+            # pool spills reads to the primary after one check interval.
+            replica.pool = AsyncConnectionPool(
+                self._conninfo(replica.host, replica.port),
+                min_size=0,
+                max_size=int(os.getenv("DB_POOL_MAX", "15")),
+                timeout=self.replicas.check_interval,
+                max_lifetime=float(os.getenv("DB_POOL_MAX_LIFETIME", "3600")),
+                check=AsyncConnectionPool.check_connection,
+                open=False,
+            )
+            await replica.pool.open()
+            await self._probe(replica)
+        logger.info("Read replicas for %s: %s", self.db_name, ", ".join(r.name for r in replicas))
+        self._probe_task = asyncio.create_task(self._probe_loop())
+
+    async def _probe(self, replica: Replica):
+        try:
+            if replica.probe_conn is None or replica.probe_conn.closed:
+                replica.probe_conn = await psycopg.AsyncConnection.connect(
+                    self._conninfo(replica.host, replica.port),
+                    autocommit=True,
+                    connect_timeout=max(1, int(self.replicas.check_interval)),
+                )
+            cur = await replica.probe_conn.execute(LAG_SQL, (self.replicas.receiver_timeout,))
+            lag = float((await cur.fetchone())[0])
+        except psycopg.Error as e:
+            if replica.probe_conn is not None:
+                await replica.probe_conn.close()
+                replica.probe_conn = None
+            self.replicas.record_probe(replica, None, e)
+        else:
+            self.replicas.record_probe(replica, lag)
+
+    async def _probe_loop(self):
+        while True:
+            await asyncio.sleep(self.replicas.check_interval)
+            for replica in self.replicas.replicas:
+                await self._probe(replica)
+
+    # --- Queries ---
+    async def _run(self, pool, query: str | Statement, params, fetch: bool):
+        # The pool commits on clean exit and rolls back on error.
+        started = time.perf_counter()
+        acquired = None
+        try:
+            async with pool.connection() as conn:
+                acquired = time.perf_counter()
+                async with conn.cursor() as cur:
+                    if isinstance(query, Statement):
+                        await run_async(cur, query, params)
+                    else:
+                        await cur.execute(query, params)
+                    return await cur.fetchall() if fetch else None
+        finally:
+            if acquired is not None:
+                observe_db(self.db_name, acquired - started, time.perf_counter() - acquired)
+
+    async def execute(
+        self,
+        query: str | Statement,
+        params=None,
+        fetch: bool = False,
+        replica: bool = False,
+        session: Optional[Hashable] = None,
+    ):
+        """Same contract as Database_Connection.execute, including `replica` and `session`."""
+        if replica and self.replicas is not None:
+            target = self.replicas.choose(session)
+            if target is not None:
+                try:
+                    return await self._run(target.pool, query, params, fetch)
+                except PoolTimeout:
+                    pass
+                except (psycopg.OperationalError, psycopg.InterfaceError) as e:
+                    self.replicas.mark_down(target, e)
+        result = await self._run(self.DB_POOL, query, params, fetch)
+        if session is not None and not replica:
+            self.note_write(session)
+        return result
+
+    def note_write(self, session: Hashable):
+        """Start the read-your-writes window for `session` without running a statement."""
+        if self.replicas is not None:
+            self.replicas.note_write(session)
+
+    @asynccontextmanager
+    async def transaction(self, session: Optional[Hashable] = None):
+        """Yield a cursor whose statements commit together (or roll back on error)."""
+        started = time.perf_counter()
+        acquired = None
+        try:
+            async with self.DB_POOL.connection() as conn:
+                acquired = time.perf_counter()
+                async with conn.cursor() as cur:
+                    yield cur
+        finally:
+            if acquired is not None:
+                observe_db(self.db_name, acquired - started, time.perf_counter() - acquired)
+        if session is not None:
+            self.note_write(session)
+
+    def pool_stats(self) -> dict:
+        stats = self.DB_POOL.get_stats() if self.DB_POOL else {}
+        if self.replicas is not None:
+            stats["replicas"] = self.replicas.stats()
+        return stats
+
+    async def close(self):
+        if self._probe_task is not None:
+            self._probe_task.cancel()
+            self._probe_task = None
+        if self.replicas is not None:
+            for replica in self.replicas.replicas:
+                await replica.pool.close()
+                if replica.probe_conn is not None:
+                    await replica.probe_conn.close()
+        if self.DB_POOL:
+            try:
+                await self.DB_POOL.close()
+            finally:
+                self.DB_POOL = None
@@ -0,0 +1,347 @@
+"""
+Password hashing and checking for login and account creation.
+
+Passwords used to be stored and compared in plain text. They are now stored as
+scrypt hashes ("scrypt$N$r$p$salt$hash"; cost tunable with PASSWORD_SCRYPT_N /
+_R / _P). scrypt is deliberately slow and memory-hard, so it never runs on a
+request thread: hashes are computed in a process pool of PASSWORD_HASH_WORKERS
+processes (0: inline, e.g. where processes cannot be spawned). At most
+PASSWORD_HASH_QUEUE hashes may be queued or running per process. Beyond that,
+callers get CredentialsBusy at once instead of waiting behind a login storm.
+
+Login (Credentials.login):
+
+- the stored passwords of every account with that username are fetched
+  (statements.ACCOUNT_PASSWORD; usernames are not unique) and the given
+  password is checked against each in the pool, oldest account first, until
+  one matches. An unknown username is checked against a dummy hash, so it costs
+  the same KDF and its response time does not reveal that it does not exist;
+- a stored value that is still plain text, or hashed with older cost
+  parameters, is rehashed in the same pool job and written back
+  (statements.REHASH_PASSWORD, only if it is unchanged), so existing accounts
+  move to the current KDF as their owners log in;
+- the session is then created by statements.LOGIN, matching the stored hash.
+
+A successful check is remembered for PASSWORD_CACHE_TTL seconds (up to
+PASSWORD_CACHE_MAX accounts) as an HMAC of the password under a per-process
+random key, together with the stored hash it was checked against. A repeated
+login with the same password then skips both the fetch and the KDF: it is just
+statements.LOGIN with the remembered hash. If the password changed in the
+meantime that statement matches no row, and the full check runs again.
+
+Credentials and AsyncCredentials run the same decision logic
+(Credentials._login_steps); they only differ in how they run its queries and
+pool jobs.
+
+Checks are counted in marketplace_password_checks_total{result}.
+"""
+
+import asyncio
+import base64
+import hashlib
+import hmac
+import multiprocessing
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Callable, Dict, Generator, Optional, Tuple
+
+from server_side.common.metrics import REGISTRY, Counter
+from server_side.data_access_layer import statements
+from server_side.data_access_layer.session_cache import new_session_id
+
+PASSWORD_SCRYPT_N = int(os.getenv("PASSWORD_SCRYPT_N", str(2 ** 14)))
+PASSWORD_SCRYPT_R = int(os.getenv("PASSWORD_SCRYPT_R", "8"))
+PASSWORD_SCRYPT_P = int(os.getenv("PASSWORD_SCRYPT_P", "1"))
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+PASSWORD_HASH_QUEUE = int(os.getenv("PASSWORD_HASH_QUEUE", "64"))
+PASSWORD_CACHE_TTL = float(os.getenv("PASSWORD_CACHE_TTL", "300"))
+PASSWORD_CACHE_MAX = int(os.getenv("PASSWORD_CACHE_MAX", "10000"))
+
+SCHEME = "scrypt"
+SALT_BYTES = 16
+HASH_BYTES = 32
+
+PASSWORD_CHECKS = REGISTRY.register(Counter(
+    "marketplace_password_checks_total",
+    "Password checks by result (cached, verified, rehashed, rejected), and hashes refused (busy).",
+    ("result",),
+))
+
+
+class CredentialsBusy(Exception):
+    """The password hashing queue is full; the caller should retry later."""
+
+
+# --- KDF (runs in the worker processes; module level so it can be pickled) ---
+def _b64(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+
+def _unb64(text: str) -> bytes:
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+def _scrypt(password: str, salt: bytes, n: int, r: int, p: int) -> bytes:
+    return hashlib.scrypt(
+        password.encode("utf-8"), salt=salt, n=n, r=r, p=p,
+        maxmem=256 * n * r + 1024 * 1024, dklen=HASH_BYTES,
+    )
+
+
+def hash_password(password: str, n: int = PASSWORD_SCRYPT_N, r: int = PASSWORD_SCRYPT_R, p: int = PASSWORD_SCRYPT_P) -> str:
+    salt = secrets.token_bytes(SALT_BYTES)
+    return f"{SCHEME}${n}${r}${p}${_b64(salt)}${_b64(_scrypt(password, salt, n, r, p))}"
+
+
+# Checked when no account has the username. Current cost parameters, and no password derives to all zeros.
+_DUMMY_HASH = f"{SCHEME}${PASSWORD_SCRYPT_N}${PASSWORD_SCRYPT_R}${PASSWORD_SCRYPT_P}${_b64(bytes(SALT_BYTES))}${_b64(bytes(HASH_BYTES))}"
+
+
+def needs_rehash(stored: str) -> bool:
+    """True for plain-text passwords and hashes made with other cost parameters."""
+    return not stored.startswith(f"{SCHEME}${PASSWORD_SCRYPT_N}${PASSWORD_SCRYPT_R}${PASSWORD_SCRYPT_P}$")
+
+
+def verify_password(password: str, stored: str) -> Tuple[bool, Optional[str]]:
+    """(whether `password` matches `stored`, a new hash to store if it should be rehashed)."""
+    parts = stored.split("$")
+    if len(parts) == 6 and parts[0] == SCHEME:
+        try:
+            n, r, p = int(parts[1]), int(parts[2]), int(parts[3])
+            ok = hmac.compare_digest(_scrypt(password, _unb64(parts[4]), n, r, p), _unb64(parts[5]))
+        except ValueError:
+            ok = False
+    else:
+        # Accounts created before hashing: plain text until their next login
+        ok = hmac.compare_digest(password.encode("utf-8"), stored.encode("utf-8"))
+    if not ok:
+        return False, None
+    return True, hash_password(password) if needs_rehash(stored) else None
+
+
+def _watch_parent(parent_pid: int):
+    """Pool initializer: exit once the serving process is gone (e.g. killed by SIGTERM without cleanup)."""
+    def watch():
+        while os.getppid() == parent_pid:
+            time.sleep(1)
+        os._exit(0)
+
+    threading.Thread(target=watch, name="hash-worker-watchdog", daemon=True).start()
+
+
+# --- Worker pool ---
+class _HashPool:
+    """Process pool for the KDF with a cap on queued + running jobs."""
+
+    def __init__(self, workers: int = PASSWORD_HASH_WORKERS, max_pending: int = PASSWORD_HASH_QUEUE):
+        self.workers = workers
+        self._slots = threading.BoundedSemaphore(max(1, max_pending))
+        self._lock = threading.Lock()
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # spawn, not fork: the servers are threaded. Spawned workers import the
+                # entry-point script again, so it must keep its `if __name__ == "__main__"` guard.
+                self._executor = ProcessPoolExecutor(
+                    self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_watch_parent,
+                    initargs=(os.getpid(),),
+                )
+            return self._executor
+
+    def submit(self, fn: Callable, *args) -> Future:
+        if not self._slots.acquire(blocking=False):
+            PASSWORD_CHECKS.inc("busy")
+            raise CredentialsBusy("password hashing queue is full")
+        try:
+            if self.workers <= 0:
+                future: Future = Future()
+                try:
+                    future.set_result(fn(*args))
+                except Exception as e:
+                    future.set_exception(e)
+            else:
+                future = self._get_executor().submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def close(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+_pool = _HashPool()
+
+
+class _Entry:
+    __slots__ = ("stored", "digest", "expires_at")
+
+    def __init__(self, stored: str, digest: bytes, expires_at: float):
+        self.stored = stored
+        self.digest = digest
+        self.expires_at = expires_at
+
+
+class Credentials:
+    """Account creation and login against one customer DB connection."""
+
+    def __init__(self, customer_db, ttl: float = PASSWORD_CACHE_TTL, max_entries: int = PASSWORD_CACHE_MAX):
+        self.db = customer_db
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._key = secrets.token_bytes(32)
+        self._lock = threading.Lock()
+        # (role, username) -> the last stored hash a password was verified against
+        self._entries: "OrderedDict[Tuple[str, str], _Entry]" = OrderedDict()
+
+    # --- verified-credential cache (shared with AsyncCredentials) ---
+    def _digest(self, password: str) -> bytes:
+        return hmac.new(self._key, password.encode("utf-8"), hashlib.sha256).digest()
+
+    def _cached(self, role: str, username: str, password: str) -> Optional[str]:
+        """The stored hash `password` was last verified against, if still trusted."""
+        if self.ttl <= 0:
+            return None
+        key = (role, username)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry.expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            if not hmac.compare_digest(entry.digest, self._digest(password)):
+                return None
+            self._entries.move_to_end(key)
+            return entry.stored
+
+    def _remember(self, role: str, username: str, password: str, stored: str):
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            self._entries[(role, username)] = _Entry(stored, self._digest(password), time.monotonic() + self.ttl)
+            self._entries.move_to_end((role, username))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _forget(self, role: str, username: str):
+        with self._lock:
+            self._entries.pop((role, username), None)
+
+    def _login_steps(self, role: str, username: str, password: str) -> Generator[Tuple[Any, Any], Any, Any]:
+        """
+        The login decision, for both classes. Yields (Statement, params) for a
+        query (sent back its rows) or (function, args) for a pool job (sent back
+        its result); returns (session_id, user_id) or None.
+        """
+        stored = self._cached(role, username, password)
+        if stored is not None:
+            rows = yield statements.LOGIN[role], (new_session_id(), username, stored)
+            if rows:
+                PASSWORD_CHECKS.inc("cached")
+                return rows[0]
+            self._forget(role, username)
+
+        # Usernames are not unique, so the password is checked against each account
+        # with that name, oldest first. A concurrent login may rehash the matching
+        # account first; then check against its new hash.
+        for _ in range(2):
+            rows = (yield statements.ACCOUNT_PASSWORD[role], (username,)) or []
+            for user_id, stored in rows:
+                ok, new_hash = yield verify_password, (password, stored)
+                if ok:
+                    break
+            else:
+                if not rows:
+                    yield verify_password, (password, _DUMMY_HASH)
+                PASSWORD_CHECKS.inc("rejected")
+                return None
+            if new_hash is None:
+                break
+            if (yield statements.REHASH_PASSWORD[role], (new_hash, user_id, stored)):
+                stored = new_hash
+                break
+        rows = yield statements.LOGIN[role], (new_session_id(), username, stored)
+        if not rows:
+            PASSWORD_CHECKS.inc("rejected")
+            return None
+        PASSWORD_CHECKS.inc("verified" if new_hash is None else "rehashed")
+        self._remember(role, username, password, stored)
+        return rows[0]
+
+    # --- public API ---
+    def hash(self, password: str) -> str:
+        """Hash a new account's password in the worker pool. Raises CredentialsBusy."""
+        return _pool.submit(hash_password, password).result()
+
+    def create_account(self, role: str, username: str, password: str) -> Optional[int]:
+        rows = self.db.execute(statements.CREATE_ACCOUNT[role], (username, self.hash(password)), fetch=True)
+        return rows[0][0] if rows else None
+
+    def login(self, role: str, username: str, password: str) -> Optional[Tuple[str, int]]:
+        """Check the password and create a session: (session_id, user_id), or None. Raises CredentialsBusy."""
+        steps = self._login_steps(role, username, password)
+        result = None
+        try:
+            while True:
+                op, args = steps.send(result)
+                if isinstance(op, statements.Statement):
+                    result = self.db.execute(op, args, fetch=True)
+                else:
+                    result = _pool.submit(op, *args).result()
+        except StopIteration as done:
+            return done.value
+
+
+class AsyncCredentials(Credentials):
+    """Credentials for the asyncio DB service: awaited queries and pool jobs."""
+
+    async def hash(self, password: str) -> str:
+        return await asyncio.wrap_future(_pool.submit(hash_password, password))
+
+    async def create_account(self, role: str, username: str, password: str) -> Optional[int]:
+        rows = await self.db.execute(statements.CREATE_ACCOUNT[role], (username, await self.hash(password)), fetch=True)
+        return rows[0][0] if rows else None
+
+    async def login(self, role: str, username: str, password: str) -> Optional[Tuple[str, int]]:
+        steps = self._login_steps(role, username, password)
+        result = None
+        try:
+            while True:
+                op, args = steps.send(result)
+                if isinstance(op, statements.Statement):
+                    result = await self.db.execute(op, args, fetch=True)
+                else:
+                    result = await asyncio.wrap_future(_pool.submit(op, *args))
+        except StopIteration as done:
+            return done.value
+
+
+_credentials: Dict[int, Credentials] = {}
+_credentials_lock = threading.Lock()
+
+
+def get_credentials(customer_db) -> Credentials:
+    """Process-wide Credentials for a given customer DB connection."""
+    with _credentials_lock:
+        creds = _credentials.get(id(customer_db))
+        if creds is None or creds.db is not customer_db:
+            creds = Credentials(customer_db)
+            _credentials[id(customer_db)] = creds
+        return creds
+
+
+def close_hash_pool():
+    _pool.close()
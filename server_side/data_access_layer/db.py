@@ -1,5 +1,16 @@
+import logging
 import os
-from psycopg2.pool import SimpleConnectionPool
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Hashable, Optional
+
+import psycopg2
+
+from server_side.common.metrics import observe_db
+from server_side.data_access_layer.pool import ConnectionPool, PoolTimeout
+from server_side.data_access_layer.replicas import LAG_SQL, Replica, ReplicaRouter, parse_replicas
+from server_side.data_access_layer.statements import Statement, StatementConnection, run
 
 try:
     from dotenv import load_dotenv
@@ -7,7 +18,16 @@ try:
 except Exception:
     pass
 
+logger = logging.getLogger(__name__)
+
 class Database_Connection:
+    """
+    Pooled psycopg2 access to one database: a primary plus optional read replicas.
+
+    Reads passed with `replica=True` may be served by a replica; everything else
+    runs on the primary. See data_access_layer.replicas for routing, lag checks
+    and the read-your-writes `session` key.
+    """
 
     def __init__(
         self,
@@ -16,6 +36,7 @@ class Database_Connection:
         port: int | None = None,
         user: str | None = None,
         password: str | None = None,
+        replicas: Any = None,
     ):
         self.host = host or os.getenv("PGHOST", "localhost")
         self.port = int(port or os.getenv("PGPORT", "5434"))
@@ -25,36 +46,159 @@ class Database_Connection:
         if not self.password:
             raise RuntimeError("PGPASSWORD not set. Store it in .env or environment variables.")
         self.DB_POOL = None
-        print(f"Connecting to DB at {self.host}:{self.port} with user {self.user}...")
+        self.replicas: Optional[ReplicaRouter] = None
+        self._probe_stop = threading.Event()
+        logger.info("Connecting to DB at %s:%s with user %s...", self.host, self.port, self.user)
         self._connect()
+        replica_hosts = parse_replicas(os.getenv("PGREPLICAS") if replicas is None else replicas, self.port)
+        if replica_hosts:
+            self._connect_replicas(replica_hosts)
+
+    def _dsn(self, host: str, port: int) -> dict:
+        return {"host": host, "port": port, "dbname": self.db_name, "user": self.user, "password": self.password}
 
     def _connect(self):
-        self.DB_POOL = SimpleConnectionPool(
-            minconn=1,
-            maxconn=15,
-            host=self.host,
-            port=self.port,
-            dbname=self.db_name,
-            user=self.user,
-            password=self.password,
+        self.DB_POOL = ConnectionPool(
+            minconn=int(os.getenv("DB_POOL_MIN", "1")),
+            maxconn=int(os.getenv("DB_POOL_MAX", "15")),
+            timeout=float(os.getenv("DB_POOL_TIMEOUT", "30")),
+            max_lifetime=float(os.getenv("DB_POOL_MAX_LIFETIME", "3600")),
+            health_check_after=float(os.getenv("DB_POOL_HEALTHCHECK_AFTER", "30")),
+            connection_factory=StatementConnection,
+            **self._dsn(self.host, self.port),
         )
 
-    def execute(self, query: str, params=None, fetch: bool = False):
-        conn = self.DB_POOL.getconn()
+    # --- Replicas ---
+    def _connect_replicas(self, replica_hosts):
+        replicas = [Replica(host, port) for host, port in replica_hosts]
+        self.replicas = ReplicaRouter(self.db_name, replicas)
+        for replica in replicas:
+            # Opened lazily, so an unreachable replica never blocks startup; a busy
+            # replica pool spills reads to the primary after one check interval.
+            replica.pool = ConnectionPool(
+                minconn=0,
+                maxconn=int(os.getenv("DB_POOL_MAX", "15")),
+                timeout=self.replicas.check_interval,
+                max_lifetime=float(os.getenv("DB_POOL_MAX_LIFETIME", "3600")),
+                health_check_after=float(os.getenv("DB_POOL_HEALTHCHECK_AFTER", "30")),
+                connection_factory=StatementConnection,
+                **self._dsn(replica.host, replica.port),
+            )
+            self._probe(replica)
+        logger.info("Read replicas for %s: %s", self.db_name, ", ".join(r.name for r in replicas))
+        threading.Thread(target=self._probe_loop, name=f"replica-probe-{self.db_name}", daemon=True).start()
+
+    def _probe(self, replica: Replica):
+        try:
+            if replica.probe_conn is None or replica.probe_conn.closed:
+                replica.probe_conn = psycopg2.connect(
+                    connect_timeout=max(1, int(self.replicas.check_interval)),
+                    **self._dsn(replica.host, replica.port),
+                )
+                replica.probe_conn.autocommit = True
+            with replica.probe_conn.cursor() as cur:
+                cur.execute(LAG_SQL, (self.replicas.receiver_timeout,))
+                lag = float(cur.fetchone()[0])
+        except psycopg2.Error as e:
+            if replica.probe_conn is not None:
+                replica.probe_conn.close()
+                replica.probe_conn = None
+            self.replicas.record_probe(replica, None, e)
+        else:
+            self.replicas.record_probe(replica, lag)
+
+    def _probe_loop(self):
+        while not self._probe_stop.wait(self.replicas.check_interval):
+            for replica in self.replicas.replicas:
+                self._probe(replica)
+
+    # --- Queries ---
+    def _run(self, pool: ConnectionPool, query: str | Statement, params, fetch: bool):
+        started = time.perf_counter()
+        conn = pool.getconn()
+        acquired = time.perf_counter()
+        broken = False
         try:
             with conn, conn.cursor() as cur:
-                cur.execute(query, params)
+                if isinstance(query, Statement):
+                    run(cur, query, params)
+                else:
+                    cur.execute(query, params)
                 return cur.fetchall() if fetch else None
+        except (psycopg2.OperationalError, psycopg2.InterfaceError):
+            broken = True
+            raise
         finally:
-            self.DB_POOL.putconn(conn)
+            pool.putconn(conn, close=broken)
+            observe_db(self.db_name, acquired - started, time.perf_counter() - acquired)
+
+    def execute(
+        self,
+        query: str | Statement,
+        params=None,
+        fetch: bool = False,
+        replica: bool = False,
+        session: Optional[Hashable] = None,
+    ):
+        """
+        Run one statement in its own transaction; a Statement runs as a prepared statement.
+
+        `replica=True` marks a read that may be served by a replica. `session` names the
+        writer for read-your-writes: a write records it, a replica read honours it.
+        """
+        if replica and self.replicas is not None:
+            target = self.replicas.choose(session)
+            if target is not None:
+                try:
+                    return self._run(target.pool, query, params, fetch)
+                except PoolTimeout:
+                    pass
+                except (psycopg2.OperationalError, psycopg2.InterfaceError) as e:
+                    self.replicas.mark_down(target, e)
+        result = self._run(self.DB_POOL, query, params, fetch)
+        if session is not None and not replica:
+            self.note_write(session)
+        return result
+
+    def note_write(self, session: Hashable):
+        """Start the read-your-writes window for `session` without running a statement."""
+        if self.replicas is not None:
+            self.replicas.note_write(session)
+
+    @contextmanager
+    def transaction(self, session: Optional[Hashable] = None):
+        """Yield a cursor whose statements commit together (or roll back on error)."""
+        started = time.perf_counter()
+        conn = self.DB_POOL.getconn()
+        acquired = time.perf_counter()
+        broken = False
+        try:
+            with conn, conn.cursor() as cur:
+                yield cur
+        except (psycopg2.OperationalError, psycopg2.InterfaceError):
+            broken = True
+            raise
+        finally:
+            self.DB_POOL.putconn(conn, close=broken)
+            observe_db(self.db_name, acquired - started, time.perf_counter() - acquired)
+        if session is not None:
+            self.note_write(session)
+
+    def pool_stats(self) -> dict:
+        stats = self.DB_POOL.stats() if self.DB_POOL else {}
+        if self.replicas is not None:
+            stats["replicas"] = self.replicas.stats()
+        return stats
 
     def close(self):
+        self._probe_stop.set()
+        if self.replicas is not None:
+            for replica in self.replicas.replicas:
+                replica.pool.closeall()
+                if replica.probe_conn is not None:
+                    replica.probe_conn.close()
         if self.DB_POOL:
             try:
                 self.DB_POOL.closeall()
             finally:
                 self.DB_POOL = None
-
-
-            
-            
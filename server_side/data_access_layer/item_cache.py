@@ -0,0 +1,380 @@
+"""
+Read-through cache for single-item lookups (statements.GET_ITEM rows).
+
+GetItem is on the hot path of browsing and of every add-to-cart stock check, and
+most calls ask for the same popular items. ItemCache answers them from a backend
+and only queries the product DB on a miss. Every write that changes an item's
+price, stock or existence calls invalidate(), so the process that made the
+change never serves the old row.
+
+Backends:
+- LocalBackend (default): per-process dict with per-entry TTL and LRU eviction.
+  Other processes (e.g. the TCP seller server vs. the TCP buyer server) only
+  see a change once their copy expires, i.e. within ITEM_CACHE_TTL.
+- RedisBackend: set ITEM_CACHE_URL=redis://host:6379/0 (needs `redis`). All
+  processes share one cache, so an invalidation is seen everywhere at once.
+  Any object with get/set/delete/get_many/set_many (and the a-prefixed
+  variants for the asyncio DB service) can be passed as `backend=`.
+
+get_many() serves a batch (GetItems, cart display) the same way: one backend get_many (a single MGET on Redis), one
+GET_ITEMS query for all of its misses, and one set_many (a single pipeline).
+
+A load that races with an invalidation is not stored. After an invalidation,
+reloads of that item stay on the primary for the replica read-your-writes window
+(see data_access_layer.replicas), so a lagging replica cannot re-cache the old row.
+
+Env: ITEM_CACHE_TTL seconds (10; 0 disables the cache), ITEM_CACHE_MAX entries
+(50000), ITEM_CACHE_URL.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from server_side.common.metrics import REGISTRY, Counter
+from server_side.data_access_layer import statements
+
+try:
+    import redis
+    import redis.asyncio as redis_asyncio
+except ImportError:  # optional: only needed for a shared ITEM_CACHE_URL
+    redis = None
+
+ITEM_CACHE_TTL = float(os.getenv("ITEM_CACHE_TTL", "10"))
+ITEM_CACHE_MAX = int(os.getenv("ITEM_CACHE_MAX", "50000"))
+ITEM_CACHE_URL = os.getenv("ITEM_CACHE_URL", "")
+
+CACHE_LOOKUPS = REGISTRY.register(Counter(
+    "marketplace_item_cache_lookups_total", "Item cache lookups, by result (hit, miss).", ("result",)))
+
+logger = logging.getLogger(__name__)
+
+
+def _key(item_id: Any) -> str:
+    return f"item:{int(item_id)}"
+
+
+class LocalBackend:
+    """Thread-safe in-process store: per-entry expiry plus LRU eviction past `max_entries`."""
+
+    shared = False
+
+    def __init__(self, max_entries: int = ITEM_CACHE_MAX):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        # key -> (expires_at monotonic, value)
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key: str, value: Any, ttl: float):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, *keys: str):
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def get_many(self, keys: List[str]) -> List[Optional[Any]]:
+        return [self.get(key) for key in keys]
+
+    def set_many(self, values: Dict[str, Any], ttl: float):
+        for key, value in values.items():
+            self.set(key, value, ttl)
+
+    # In memory, so the asyncio variants never block the loop.
+    async def aget(self, key: str) -> Optional[Any]:
+        return self.get(key)
+
+    async def aset(self, key: str, value: Any, ttl: float):
+        self.set(key, value, ttl)
+
+    async def adelete(self, *keys: str):
+        self.delete(*keys)
+
+    async def aget_many(self, keys: List[str]) -> List[Optional[Any]]:
+        return self.get_many(keys)
+
+    async def aset_many(self, values: Dict[str, Any], ttl: float):
+        self.set_many(values, ttl)
+
+
+class RedisBackend:
+    """Shared store in Redis; values are JSON so any process (or language) can read them."""
+
+    shared = True
+
+    def __init__(self, url: str):
+        if redis is None:
+            raise RuntimeError("ITEM_CACHE_URL needs the redis package: pip install redis")
+        self.url = url
+        self._client = redis.Redis.from_url(url)
+        self._aclient = None
+
+    def _async_client(self):
+        # Created lazily so it binds to the running event loop.
+        if self._aclient is None:
+            self._aclient = redis_asyncio.Redis.from_url(self.url)
+        return self._aclient
+
+    def get(self, key: str) -> Optional[Any]:
+        raw = self._client.get(key)
+        return json.loads(raw) if raw is not None else None
+
+    def set(self, key: str, value: Any, ttl: float):
+        self._client.set(key, json.dumps(value), px=max(1, int(ttl * 1000)))
+
+    def delete(self, *keys: str):
+        if keys:
+            self._client.delete(*keys)
+
+    def get_many(self, keys: List[str]) -> List[Optional[Any]]:
+        if not keys:
+            return []
+        return [json.loads(raw) if raw is not None else None for raw in self._client.mget(keys)]
+
+    def set_many(self, values: Dict[str, Any], ttl: float):
+        if not values:
+            return
+        px = max(1, int(ttl * 1000))
+        with self._client.pipeline(transaction=False) as pipe:
+            for key, value in values.items():
+                pipe.set(key, json.dumps(value), px=px)
+            pipe.execute()
+
+    async def aget(self, key: str) -> Optional[Any]:
+        raw = await self._async_client().get(key)
+        return json.loads(raw) if raw is not None else None
+
+    async def aset(self, key: str, value: Any, ttl: float):
+        await self._async_client().set(key, json.dumps(value), px=max(1, int(ttl * 1000)))
+
+    async def adelete(self, *keys: str):
+        if keys:
+            await self._async_client().delete(*keys)
+
+    async def aget_many(self, keys: List[str]) -> List[Optional[Any]]:
+        if not keys:
+            return []
+        raws = await self._async_client().mget(keys)
+        return [json.loads(raw) if raw is not None else None for raw in raws]
+
+    async def aset_many(self, values: Dict[str, Any], ttl: float):
+        if not values:
+            return
+        px = max(1, int(ttl * 1000))
+        async with self._async_client().pipeline(transaction=False) as pipe:
+            for key, value in values.items():
+                pipe.set(key, json.dumps(value), px=px)
+            await pipe.execute()
+
+
+def _build_backend(url: str = ITEM_CACHE_URL, max_entries: int = ITEM_CACHE_MAX):
+    if url:
+        logger.info("Item cache backend: %s", url.split("@")[-1])
+        return RedisBackend(url)
+    return LocalBackend(max_entries)
+
+
+class ItemCache:
+    """
+    GET_ITEM rows by item_id, read through to the product DB.
+
+    Rows are returned exactly as Database_Connection returns them; a shared backend
+    stores them as JSON and the price is turned back into a Decimal on the way out.
+    """
+
+    def __init__(self, product_db, backend=None, ttl: float = ITEM_CACHE_TTL):
+        self.db = product_db
+        self.backend = backend if backend is not None else _build_backend()
+        self.ttl = ttl
+        # Bumped by every invalidation; a load that saw it change does not store its row.
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    # --- row encoding (shared backends only) ---
+    def _dump(self, row) -> Any:
+        if not self.backend.shared:
+            return row
+        row = list(row)
+        row[5] = str(row[5]) if row[5] is not None else None
+        return row
+
+    def _load(self, value) -> Any:
+        if not self.backend.shared:
+            return value
+        value[5] = Decimal(value[5]) if value[5] is not None else None
+        return tuple(value)
+
+    def _start_load(self) -> int:
+        with self._lock:
+            return self._generation
+
+    def _still_current(self, generation: int) -> bool:
+        with self._lock:
+            return generation == self._generation
+
+    def _note_invalidation(self, item_ids) -> list:
+        keys = [_key(i) for i in item_ids]
+        with self._lock:
+            self._generation += 1
+        for item_id in item_ids:
+            self.db.note_write(("item", int(item_id)))
+        return keys
+
+    def _found_cached(self, found: Dict[int, Any], ids: List[int], values: List[Optional[Any]]):
+        for item_id, cached in zip(ids, values):
+            if cached is not None:
+                found[item_id] = self._load(cached)
+
+    def _batch_session(self, item_ids: List[int]) -> Optional[tuple]:
+        """The read-your-writes key of a recently changed item in the batch, if any (reads it from the primary)."""
+        router = getattr(self.db, "replicas", None)
+        if router is not None:
+            for item_id in item_ids:
+                if router.wrote_recently(("item", item_id)):
+                    return ("item", item_id)
+        return None
+
+    # --- public API ---
+    def get(self, item_id: Any):
+        """The item's GET_ITEM row, or None if it does not exist."""
+        if self.ttl <= 0:
+            return self._fetch(item_id)
+        key = _key(item_id)
+        cached = self.backend.get(key)
+        if cached is not None:
+            CACHE_LOOKUPS.inc("hit")
+            return self._load(cached)
+        CACHE_LOOKUPS.inc("miss")
+        generation = self._start_load()
+        row = self._fetch(item_id)
+        if row is not None and self._still_current(generation):
+            self.backend.set(key, self._dump(row), self.ttl)
+        return row
+
+    def _fetch(self, item_id: Any):
+        rows = self.db.execute(
+            statements.GET_ITEM,
+            (item_id,),
+            fetch=True,
+            replica=True,
+            session=("item", int(item_id)),
+        )
+        return rows[0] if rows else None
+
+    def get_many(self, item_ids: Iterable[Any]) -> Dict[int, Any]:
+        """item_id -> GET_ITEM row for the items that exist."""
+        ids = list(dict.fromkeys(int(i) for i in item_ids))
+        found: Dict[int, Any] = {}
+        if self.ttl > 0:
+            self._found_cached(found, ids, self.backend.get_many([_key(i) for i in ids]))
+            CACHE_LOOKUPS.inc("hit", amount=len(found))
+            CACHE_LOOKUPS.inc("miss", amount=len(ids) - len(found))
+        missing = [i for i in ids if i not in found]
+        if not missing:
+            return found
+        generation = self._start_load()
+        rows = self.db.execute(
+            statements.GET_ITEMS,
+            (missing,),
+            fetch=True,
+            replica=True,
+            session=self._batch_session(missing),
+        ) or []
+        for row in rows:
+            found[row[0]] = row
+        if rows and self.ttl > 0 and self._still_current(generation):
+            self.backend.set_many({_key(row[0]): self._dump(row) for row in rows}, self.ttl)
+        return found
+
+    def invalidate(self, *item_ids: Any):
+        self.backend.delete(*self._note_invalidation(item_ids))
+
+
+class AsyncItemCache(ItemCache):
+    """ItemCache for the asyncio DB service: awaited backend calls and queries."""
+
+    async def get(self, item_id: Any):
+        if self.ttl <= 0:
+            return await self._fetch(item_id)
+        key = _key(item_id)
+        cached = await self.backend.aget(key)
+        if cached is not None:
+            CACHE_LOOKUPS.inc("hit")
+            return self._load(cached)
+        CACHE_LOOKUPS.inc("miss")
+        generation = self._start_load()
+        row = await self._fetch(item_id)
+        if row is not None and self._still_current(generation):
+            await self.backend.aset(key, self._dump(row), self.ttl)
+        return row
+
+    async def _fetch(self, item_id: Any):
+        rows = await self.db.execute(
+            statements.GET_ITEM,
+            (item_id,),
+            fetch=True,
+            replica=True,
+            session=("item", int(item_id)),
+        )
+        return rows[0] if rows else None
+
+    async def get_many(self, item_ids: Iterable[Any]) -> Dict[int, Any]:
+        ids = list(dict.fromkeys(int(i) for i in item_ids))
+        found: Dict[int, Any] = {}
+        if self.ttl > 0:
+            self._found_cached(found, ids, await self.backend.aget_many([_key(i) for i in ids]))
+            CACHE_LOOKUPS.inc("hit", amount=len(found))
+            CACHE_LOOKUPS.inc("miss", amount=len(ids) - len(found))
+        missing = [i for i in ids if i not in found]
+        if not missing:
+            return found
+        generation = self._start_load()
+        rows = await self.db.execute(
+            statements.GET_ITEMS,
+            (missing,),
+            fetch=True,
+            replica=True,
+            session=self._batch_session(missing),
+        ) or []
+        for row in rows:
+            found[row[0]] = row
+        if rows and self.ttl > 0 and self._still_current(generation):
+            await self.backend.aset_many({_key(row[0]): self._dump(row) for row in rows}, self.ttl)
+        return found
+
+    async def invalidate(self, *item_ids: Any):
+        await self.backend.adelete(*self._note_invalidation(item_ids))
+
+
+_caches: Dict[int, ItemCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_item_cache(product_db) -> ItemCache:
+    """Process-wide cache for a given product DB connection."""
+    with _caches_lock:
+        cache = _caches.get(id(product_db))
+        if cache is None or cache.db is not product_db:
+            cache = ItemCache(product_db)
+            _caches[id(product_db)] = cache
+        return cache
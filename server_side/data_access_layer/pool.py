@@ -0,0 +1,190 @@
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Tuple
+
+import psycopg2
+from psycopg2 import extensions
+from psycopg2.pool import PoolError
+
+
+class PoolTimeout(PoolError):
+    pass
+
+
+class ConnectionPool:
+    """
+    Thread-safe, bounded psycopg2 connection pool.
+
+    Unlike psycopg2's SimpleConnectionPool, callers past `maxconn` block on a
+    condition variable (FIFO-ish) until a connection is returned or `timeout`
+    elapses. Idle connections are health checked before reuse and recycled
+    after `max_lifetime` seconds.
+    """
+
+    def __init__(
+        self,
+        minconn: int,
+        maxconn: int,
+        timeout: float = 30.0,
+        max_lifetime: float = 3600.0,
+        health_check_after: float = 30.0,
+        **dsn: Any,
+    ):
+        if minconn < 0 or maxconn < 1 or minconn > maxconn:
+            raise ValueError(f"invalid pool sizing min={minconn} max={maxconn}")
+        self.minconn = minconn
+        self.maxconn = maxconn
+        self.timeout = timeout
+        self.max_lifetime = max_lifetime
+        self.health_check_after = health_check_after
+        self._dsn = dsn
+
+        self._cond = threading.Condition()
+        # (connection, created_at, last_used_at)
+        self._idle: Deque[Tuple[Any, float, float]] = deque()
+        self._created: Dict[int, float] = {}
+        self._reserved = 0
+        self._in_use = 0
+        self._waiters = 0
+        self._closed = False
+
+        self._checkouts = 0
+        self._timeouts = 0
+        self._recycled = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+        for _ in range(minconn):
+            conn = psycopg2.connect(**self._dsn)
+            now = time.monotonic()
+            self._created[id(conn)] = now
+            self._idle.append((conn, now, now))
+
+    # --- internals ---
+    def _discard(self, conn):
+        self._created.pop(id(conn), None)
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def _size(self) -> int:
+        return len(self._created) + self._reserved
+
+    def _healthy(self, conn, created_at: float, last_used: float) -> bool:
+        now = time.monotonic()
+        if conn.closed or now - created_at > self.max_lifetime:
+            return False
+        if now - last_used < self.health_check_after:
+            return True
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+
+    # --- public API ---
+    def getconn(self, timeout: float | None = None):
+        timeout = self.timeout if timeout is None else timeout
+        start = time.monotonic()
+        deadline = start + timeout
+        conn = None
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise PoolError("connection pool is closed")
+                if self._idle:
+                    conn, created_at, last_used = self._idle.popleft()
+                    break
+                if self._size() < self.maxconn:
+                    # Reserve the slot now; the connect itself happens outside the lock.
+                    self._reserved += 1
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._timeouts += 1
+                    raise PoolTimeout(
+                        f"no connection available within {timeout:.1f}s "
+                        f"(in_use={self._in_use}, max={self.maxconn})"
+                    )
+                self._waiters += 1
+                try:
+                    self._cond.wait(remaining)
+                finally:
+                    self._waiters -= 1
+            self._in_use += 1
+
+        reserved = conn is None
+        try:
+            if conn is not None and not self._healthy(conn, created_at, last_used):
+                with self._cond:
+                    self._recycled += 1
+                    self._discard(conn)
+                    self._reserved += 1
+                    reserved = True
+                conn = None
+            if conn is None:
+                conn = psycopg2.connect(**self._dsn)
+        except Exception:
+            with self._cond:
+                self._in_use -= 1
+                if reserved:
+                    self._reserved -= 1
+                self._cond.notify()
+            raise
+
+        waited = time.monotonic() - start
+        with self._cond:
+            if reserved:
+                self._reserved -= 1
+                self._created[id(conn)] = time.monotonic()
+            self._checkouts += 1
+            self._wait_total += waited
+            self._wait_max = max(self._wait_max, waited)
+        return conn
+
+    def putconn(self, conn, close: bool = False):
+        if not close and not conn.closed:
+            status = conn.info.transaction_status
+            if status == extensions.TRANSACTION_STATUS_UNKNOWN:
+                close = True
+            elif status != extensions.TRANSACTION_STATUS_IDLE:
+                try:
+                    conn.rollback()
+                except psycopg2.Error:
+                    close = True
+        with self._cond:
+            self._in_use -= 1
+            created_at = self._created.get(id(conn))
+            if close or conn.closed or created_at is None or self._closed:
+                self._discard(conn)
+            else:
+                self._idle.append((conn, created_at, time.monotonic()))
+            self._cond.notify()
+
+    def closeall(self):
+        with self._cond:
+            self._closed = True
+            while self._idle:
+                conn, _, _ = self._idle.popleft()
+                self._discard(conn)
+            self._cond.notify_all()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "size": self._size(),
+                "idle": len(self._idle),
+                "in_use": self._in_use,
+                "waiters": self._waiters,
+                "max": self.maxconn,
+                "checkouts": self._checkouts,
+                "timeouts": self._timeouts,
+                "recycled": self._recycled,
+                "wait_time_total": self._wait_total,
+                "wait_time_avg": self._wait_total / self._checkouts if self._checkouts else 0.0,
+                "wait_time_max": self._wait_max,
+            }
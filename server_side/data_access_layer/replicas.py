@@ -0,0 +1,218 @@
+"""
+Read-replica routing for Database_Connection and AsyncDatabase_Connection.
+
+A connection can be given streaming-replica addresses (`host[:port]`, comma
+separated) next to its primary. Writes and transactions always run on the
+primary. A read passed with `replica=True` runs on a replica, picked
+round-robin, as long as one is usable:
+
+- healthy: its last lag probe succeeded and no read on it has failed since;
+- fresh: its last measured replay lag is within DB_REPLICA_MAX_LAG.
+
+A replica counts as caught up (lag 0) only while its WAL receiver is streaming
+and has heard from the primary within DB_REPLICA_RECEIVER_TIMEOUT. Without a
+live receiver, its lag is the age of the last replayed transaction, so a
+replica cut off from the primary drops out once that passes the max lag.
+Reading pg_stat_wal_receiver needs superuser or pg_read_all_stats. Without it,
+lag is always the replay age, and replicas of an idle primary drop out too.
+
+Otherwise the read runs on the primary. A read that fails on a replica with a
+connection error marks that replica down and is retried once on the primary.
+The next successful probe brings the replica back.
+
+Read-your-writes: a write can pass a `session` key, e.g. ("buyer", 7). For
+DB_READ_YOUR_WRITES seconds after that write, reads with the same key go to
+the primary, so a client sees its own cart or listing change at once even
+while replicas catch up. The default window is max lag + check interval. After
+that, every usable replica has been probed since the write with at most max lag
+behind, so it has replayed the write. Keys live in process memory, so the
+guarantee holds within one DB service or TCP worker process.
+
+Env:
+- PGREPLICAS: replicas for every database, unless the caller passes its own
+  (the DB service reads CUSTOMER_PGREPLICAS / PRODUCT_PGREPLICAS first)
+- DB_REPLICA_MAX_LAG (5 seconds)
+- DB_REPLICA_CHECK_INTERVAL (2 seconds between lag probes)
+- DB_REPLICA_RECEIVER_TIMEOUT (60 seconds, wal_receiver_timeout's default)
+- DB_READ_YOUR_WRITES (seconds; 0 turns it off)
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+from server_side.common.metrics import REGISTRY, Counter, Gauge
+
+DB_REPLICA_MAX_LAG = float(os.getenv("DB_REPLICA_MAX_LAG", "5"))
+DB_REPLICA_CHECK_INTERVAL = float(os.getenv("DB_REPLICA_CHECK_INTERVAL", "2"))
+DB_REPLICA_RECEIVER_TIMEOUT = float(os.getenv("DB_REPLICA_RECEIVER_TIMEOUT", "60"))
+DB_READ_YOUR_WRITES = float(os.getenv("DB_READ_YOUR_WRITES", str(DB_REPLICA_MAX_LAG + DB_REPLICA_CHECK_INTERVAL)))
+# Bound on remembered writer keys; the oldest are forgotten first
+RECENT_WRITES_MAX = 100000
+
+# Replay lag in seconds; the parameter is the receiver timeout. A replica that
+# is streaming and has replayed everything it received is current even if the
+# primary has been idle (pg_last_xact_replay_timestamp then keeps aging). One
+# whose receiver is gone has replayed everything it received too, but is not
+# current, so it gets the replay age (infinite if nothing was ever replayed).
+# A server that is not in recovery has no lag at all.
+LAG_SQL = """
+SELECT CASE
+    WHEN NOT pg_is_in_recovery() THEN 0
+    WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() AND EXISTS (
+        SELECT 1 FROM pg_stat_wal_receiver
+        WHERE status = 'streaming' AND last_msg_receipt_time > now() - make_interval(secs => %s)
+    ) THEN 0
+    ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())::float8, 'Infinity'::float8)
+END
+"""
+
+READS = REGISTRY.register(Counter(
+    "marketplace_db_reads_total", "Replica-eligible reads, by database and the server that ran them.",
+    ("db", "target")))
+REPLICA_LAG = REGISTRY.register(Gauge(
+    "marketplace_db_replica_lag_seconds", "Replay lag measured by the last successful probe.", ("db", "replica")))
+
+logger = logging.getLogger(__name__)
+
+
+def parse_replicas(spec: Any, default_port: int) -> List[Tuple[str, int]]:
+    """`"db2:5432, db3"` (or a list of such entries) -> [("db2", 5432), ("db3", default_port)]."""
+    parts = spec.split(",") if isinstance(spec, str) else list(spec or ())
+    replicas = []
+    for part in parts:
+        part = part.strip()
+        if not part:
+            continue
+        host, sep, port = part.rpartition(":")
+        if sep and port.isdigit():
+            replicas.append((host, int(port)))
+        else:
+            replicas.append((part, default_port))
+    return replicas
+
+
+class Replica:
+    """One replica's routing state. `pool` and `probe_conn` are owned by the connection class."""
+
+    def __init__(self, host: str, port: int):
+        self.host = host
+        self.port = port
+        self.name = f"{host}:{port}"
+        self.pool: Any = None
+        self.probe_conn: Any = None
+        self.healthy = False
+        self.lag: Optional[float] = None
+        self.checked_at = 0.0
+        self.last_error: Optional[str] = None
+
+    def usable(self, max_lag: float) -> bool:
+        return self.healthy and self.lag is not None and self.lag <= max_lag
+
+
+class ReplicaRouter:
+    """Thread-safe replica choice plus the read-your-writes window; engine agnostic."""
+
+    def __init__(
+        self,
+        db_name: Optional[str],
+        replicas: List[Replica],
+        max_lag: float = DB_REPLICA_MAX_LAG,
+        check_interval: float = DB_REPLICA_CHECK_INTERVAL,
+        read_your_writes: float = DB_READ_YOUR_WRITES,
+        receiver_timeout: float = DB_REPLICA_RECEIVER_TIMEOUT,
+    ):
+        self.db_name = db_name or ""
+        self.replicas = replicas
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self.read_your_writes = read_your_writes
+        self.receiver_timeout = receiver_timeout
+        self._lock = threading.Lock()
+        self._next = 0
+        # session key -> monotonic deadline; every deadline is now + the same window,
+        # so insertion order is expiry order and pruning only ever looks at the front.
+        self._recent_writes: "OrderedDict[Hashable, float]" = OrderedDict()
+
+    def choose(self, session: Optional[Hashable] = None) -> Optional[Replica]:
+        """The replica to read from, or None to read from the primary."""
+        if session is not None and self.wrote_recently(session):
+            READS.inc(self.db_name, "primary")
+            return None
+        with self._lock:
+            count = len(self.replicas)
+            for offset in range(count):
+                replica = self.replicas[(self._next + offset) % count]
+                if replica.usable(self.max_lag):
+                    self._next = (self._next + offset + 1) % count
+                    READS.inc(self.db_name, replica.name)
+                    return replica
+        READS.inc(self.db_name, "primary")
+        return None
+
+    def note_write(self, session: Hashable):
+        if self.read_your_writes <= 0:
+            return
+        now = time.monotonic()
+        with self._lock:
+            self._recent_writes[session] = now + self.read_your_writes
+            self._recent_writes.move_to_end(session)
+            while self._recent_writes:
+                oldest = next(iter(self._recent_writes.values()))
+                if oldest > now and len(self._recent_writes) <= RECENT_WRITES_MAX:
+                    break
+                self._recent_writes.popitem(last=False)
+
+    def wrote_recently(self, session: Hashable) -> bool:
+        with self._lock:
+            until = self._recent_writes.get(session)
+        return until is not None and until > time.monotonic()
+
+    def record_probe(self, replica: Replica, lag: Optional[float], error: Optional[BaseException] = None):
+        first_probe = not replica.checked_at
+        was_usable = replica.usable(self.max_lag)
+        replica.checked_at = time.monotonic()
+        if error is None:
+            replica.healthy = True
+            replica.lag = lag
+            replica.last_error = None
+            REPLICA_LAG.set(lag, self.db_name, replica.name)
+        else:
+            replica.healthy = False
+            replica.last_error = str(error).strip()
+        if first_probe or replica.usable(self.max_lag) != was_usable:
+            self._log_state(replica)
+
+    def mark_down(self, replica: Replica, error: BaseException):
+        """A read failed on this replica; keep it out of rotation until the next good probe."""
+        was_usable = replica.usable(self.max_lag)
+        replica.healthy = False
+        replica.last_error = str(error).strip()
+        if was_usable:
+            self._log_state(replica)
+
+    def _log_state(self, replica: Replica):
+        if replica.usable(self.max_lag):
+            logger.info("Replica %s for %s is back in rotation (lag %.2fs)", replica.name, self.db_name, replica.lag)
+        elif replica.healthy:
+            logger.warning(
+                "Replica %s for %s is %.2fs behind (max %.2fs); reading from the primary",
+                replica.name, self.db_name, replica.lag, self.max_lag,
+            )
+        else:
+            logger.warning("Replica %s for %s is down: %s", replica.name, self.db_name, replica.last_error)
+
+    def stats(self) -> List[Dict[str, Any]]:
+        return [
+            {
+                "replica": r.name,
+                "healthy": r.healthy,
+                "usable": r.usable(self.max_lag),
+                "lag": r.lag,
+                "last_error": r.last_error,
+            }
+            for r in self.replicas
+        ]
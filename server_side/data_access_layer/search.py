@@ -0,0 +1,161 @@
+"""
+Item search shared by the TCP buyer server and both gRPC DB services.
+
+Matching is index-backed: `keywords && query` uses the GIN index on
+items.keywords, and item names are matched through the generated `name_tsv`
+tsvector column and its GIN index (see database/create_dbs.sh). Results are
+ranked by how many query keywords an item matches (in its keyword list or its
+name), ties broken by item_id, and paged with a keyset cursor on that order.
+
+The score depends on the query, so it cannot be indexed: every page of a
+keyword search scores and sorts all matching rows, and its cost grows with
+the number of matches, not with the page depth. A search without keywords
+scores every item 0 and seeks on item_id, so its pages cost the same at
+any depth.
+"""
+
+import os
+import re
+from typing import Any, List, Optional, Sequence, Tuple
+
+from server_side.data_access_layer.statements import Statement, dynamic_statement
+
+SEARCH_DEFAULT_LIMIT = int(os.getenv("SEARCH_DEFAULT_LIMIT", "100"))
+SEARCH_MAX_LIMIT = int(os.getenv("SEARCH_MAX_LIMIT", "1000"))
+
+_COLUMNS = "i.item_id, i.item_name, i.category, i.keywords, i.condition_is_new, i.sale_price, i.quantity, i.seller_id"
+
+# Number of query keywords an item matches; %s is the keyword array.
+_SCORE_SQL = """
+    (SELECT count(*) FROM unnest(%s::text[]) AS k(word)
+     WHERE k.word = ANY(i.keywords) OR i.name_tsv @@ plainto_tsquery('simple', k.word))::int
+"""
+
+_NON_WORD = re.compile(r"[^\w]+")
+
+
+def clamp_limit(limit: Any) -> int:
+    if not limit or int(limit) <= 0:
+        return SEARCH_DEFAULT_LIMIT
+    return min(int(limit), SEARCH_MAX_LIMIT)
+
+
+def _normalize_keywords(keywords: Optional[Sequence[str]]) -> List[str]:
+    words = []
+    for kw in keywords or []:
+        kw = str(kw).strip()
+        if kw and kw not in words:
+            words.append(kw)
+    return words
+
+
+def _name_query(words: List[str]) -> str:
+    # websearch_to_tsquery never raises on user input; "or" joins the words into one OR query.
+    terms = [_NON_WORD.sub(" ", w).strip() for w in words]
+    return " or ".join(t for t in terms if t)
+
+
+def parse_cursor(cursor: Any) -> Optional[Tuple[int, int]]:
+    if not cursor:
+        return None
+    try:
+        score, item_id = str(cursor).split(":", 1)
+        return int(score), int(item_id)
+    except ValueError:
+        raise ValueError("Invalid cursor")
+
+
+def search_key(
+    category: Optional[int],
+    keywords: Optional[Sequence[str]],
+    cursor: Any = None,
+    limit: Any = None,
+    in_stock_only: bool = False,
+) -> Tuple[Optional[int], Tuple[str, ...], bool, str, int]:
+    """
+    Normalized identity of one result page, for caching. Keyword order and
+    duplicates do not change the ranking, so the keywords are de-duplicated and sorted.
+    """
+    after = parse_cursor(cursor)
+    return (
+        category,
+        tuple(sorted(_normalize_keywords(keywords))),
+        bool(in_stock_only),
+        f"{after[0]}:{after[1]}" if after else "",
+        clamp_limit(limit),
+    )
+
+
+def build_query(
+    category: Optional[int],
+    keywords: Optional[Sequence[str]],
+    cursor: Any = None,
+    limit: Any = None,
+    in_stock_only: bool = False,
+) -> Tuple[Statement, Tuple[Any, ...], int]:
+    """
+    One page of ranked results: returns (statement, params, limit). The
+    statement fetches `limit + 1` rows (item columns, then score) so page_rows
+    can tell whether another page follows. Each combination of filters is its
+    own named statement, so every shape is prepared once per connection.
+    """
+    limit = clamp_limit(limit)
+    after = parse_cursor(cursor)
+    words = _normalize_keywords(keywords)
+
+    clauses: List[str] = []
+    params: List[Any] = []
+    if words:
+        params.append(words)
+    if category is not None:
+        clauses.append("i.category = %s")
+        params.append(category)
+    if in_stock_only:
+        clauses.append("i.quantity > 0")
+    if words:
+        name_query = _name_query(words)
+        if name_query:
+            clauses.append("(i.keywords && %s::text[] OR i.name_tsv @@ websearch_to_tsquery('simple', %s))")
+            params.extend([words, name_query])
+        else:
+            clauses.append("i.keywords && %s::text[]")
+            params.append(words)
+    if not words:
+        # Every row scores 0, so the order is plain item_id and a page seeks straight to the cursor.
+        if after is not None:
+            clauses.append("i.item_id > %s")
+            params.append(after[1])
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        query = f"SELECT {_COLUMNS}, 0 AS score FROM items i {where} ORDER BY i.item_id LIMIT %s"
+        params.append(limit + 1)
+        return dynamic_statement("search_items", query), tuple(params), limit
+
+    where = f"WHERE {' AND '.join(clauses)}"
+    query = f"SELECT * FROM (SELECT {_COLUMNS}, {_SCORE_SQL} AS score FROM items i {where}) ranked"
+    if after is not None:
+        query += " WHERE score < %s OR (score = %s AND item_id > %s)"
+        params.extend([after[0], after[0], after[1]])
+    query += " ORDER BY score DESC, item_id LIMIT %s"
+    params.append(limit + 1)
+    return dynamic_statement("search_items", query), tuple(params), limit
+
+
+def page_rows(rows: List[Any], limit: int) -> Tuple[List[Any], Optional[str]]:
+    """Split a `limit + 1` fetch into (page, next_cursor); next_cursor is None on the last page."""
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        return rows, f"{last[8]}:{last[0]}"
+    return rows, None
+
+
+def search_items(
+    db,
+    category: Optional[int],
+    keywords: Optional[Sequence[str]],
+    cursor: Any = None,
+    limit: Any = None,
+    in_stock_only: bool = False,
+) -> Tuple[List[Any], Optional[str]]:
+    query, params, limit = build_query(category, keywords, cursor, limit, in_stock_only)
+    return page_rows(db.execute(query, params, fetch=True, replica=True) or [], limit)
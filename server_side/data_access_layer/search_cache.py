@@ -0,0 +1,242 @@
+"""
+Stale-while-revalidate cache for search result pages.
+
+Buyers repeat the same category + keyword searches, and each one ranks every
+matching row of `items`. SearchCache keeps result pages keyed by
+search.search_key: category, sorted keywords, stock filter, cursor and page
+size.
+
+- younger than SEARCH_CACHE_TTL: served as is;
+- older, but within SEARCH_CACHE_STALE more seconds: served as is, and a single
+  background refresh per key re-runs the query;
+- older than that, or absent: the query runs inline.
+
+Registering an item or changing its price or stock drops every cached page of
+its category, plus the all-category pages, in the process that made the
+change. Other processes see the change once their pages go stale. Checkout stock
+decrements are not tracked; quantities shown in results may lag by up to
+TTL + STALE, and add-to-cart / checkout re-check stock anyway.
+
+Memory is bounded by SEARCH_CACHE_MAX pages (LRU). Lookups are counted in
+marketplace_search_cache_lookups_total{result="hit|stale|miss"}.
+"""
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+from server_side.common.metrics import REGISTRY, Counter
+from server_side.data_access_layer import search
+
+SEARCH_CACHE_TTL = float(os.getenv("SEARCH_CACHE_TTL", "5"))
+SEARCH_CACHE_STALE = float(os.getenv("SEARCH_CACHE_STALE", "30"))
+SEARCH_CACHE_MAX = int(os.getenv("SEARCH_CACHE_MAX", "2000"))
+SEARCH_CACHE_REFRESH_WORKERS = int(os.getenv("SEARCH_CACHE_REFRESH_WORKERS", "2"))
+
+CACHE_LOOKUPS = REGISTRY.register(Counter(
+    "marketplace_search_cache_lookups_total", "Search cache lookups, by result (hit, stale, miss).", ("result",)))
+
+logger = logging.getLogger(__name__)
+
+Page = Tuple[List[Any], Optional[str]]
+
+
+class _Entry:
+    __slots__ = ("page", "fetched_at")
+
+    def __init__(self, page: Page, now: float):
+        self.page = page
+        self.fetched_at = now
+
+
+class SearchCache:
+    """Result pages of search.search_items for one product DB connection."""
+
+    def __init__(
+        self,
+        product_db,
+        ttl: float = SEARCH_CACHE_TTL,
+        stale: float = SEARCH_CACHE_STALE,
+        max_entries: int = SEARCH_CACHE_MAX,
+    ):
+        self.db = product_db
+        self.ttl = ttl
+        self.stale = stale
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[tuple, _Entry]" = OrderedDict()
+        # category -> cached keys of that category (None: searches across all categories)
+        self._by_category: Dict[Optional[int], Set[tuple]] = {}
+        self._refreshing: Set[tuple] = set()
+        # Bumped by every invalidation; a load that saw it change does not store its page.
+        self._generation = 0
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    # --- in-memory bookkeeping (shared with AsyncSearchCache) ---
+    def _lookup(self, key: tuple) -> Tuple[Optional[Page], bool]:
+        """(page or None, whether the caller should start a background refresh)."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                age = now - entry.fetched_at
+                if age <= self.ttl + self.stale:
+                    self._entries.move_to_end(key)
+                    if age <= self.ttl:
+                        CACHE_LOOKUPS.inc("hit")
+                        return entry.page, False
+                    CACHE_LOOKUPS.inc("stale")
+                    if key in self._refreshing:
+                        return entry.page, False
+                    self._refreshing.add(key)
+                    return entry.page, True
+                self._remove(key)
+            CACHE_LOOKUPS.inc("miss")
+            return None, False
+
+    def _current_generation(self) -> int:
+        with self._lock:
+            return self._generation
+
+    def _store(self, key: tuple, page: Optional[Page], generation: int):
+        with self._lock:
+            self._refreshing.discard(key)
+            if page is None or generation != self._generation:
+                return
+            self._entries[key] = _Entry(page, time.monotonic())
+            self._entries.move_to_end(key)
+            self._by_category.setdefault(key[0], set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+
+    def _remove(self, key: tuple):
+        self._entries.pop(key, None)
+        keys = self._by_category.get(key[0])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_category[key[0]]
+
+    def invalidate_category(self, category: Optional[int]):
+        """Drop every cached page that could contain an item of `category`."""
+        with self._lock:
+            self._generation += 1
+            for cat in {category, None}:
+                for key in list(self._by_category.get(cat, ())):
+                    self._remove(key)
+
+    # --- public API ---
+    def search(
+        self,
+        category: Optional[int],
+        keywords: Optional[Sequence[str]],
+        cursor: Any = None,
+        limit: Any = None,
+        in_stock_only: bool = False,
+    ) -> Page:
+        """Same result as search.search_items, served from the cache where possible."""
+        key = search.search_key(category, keywords, cursor, limit, in_stock_only)
+        if self.ttl <= 0:
+            return self._load(key)
+        page, refresh = self._lookup(key)
+        if page is None:
+            generation = self._current_generation()
+            page = self._load(key)
+            self._store(key, page, generation)
+        elif refresh:
+            self._refresher().submit(self._refresh, key)
+        return page
+
+    def _refresher(self) -> ThreadPoolExecutor:
+        # Created on first use (the asyncio cache never needs it), once even when threads race here.
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(SEARCH_CACHE_REFRESH_WORKERS, thread_name_prefix="search-refresh")
+            return self._executor
+
+    def _load(self, key: tuple) -> Page:
+        category, words, in_stock_only, cursor, limit = key
+        return search.search_items(self.db, category, list(words), cursor or None, limit, in_stock_only)
+
+    def _refresh(self, key: tuple):
+        generation = self._current_generation()
+        page = None
+        try:
+            page = self._load(key)
+        except Exception:
+            logger.exception("Background search refresh failed")
+        self._store(key, page, generation)
+
+    def close(self):
+        with self._lock:
+            executor = self._executor
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+class AsyncSearchCache(SearchCache):
+    """SearchCache for the asyncio DB service: inline loads are awaited, refreshes run as tasks."""
+
+    def __init__(self, product_db, **kwargs):
+        super().__init__(product_db, **kwargs)
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def search(
+        self,
+        category: Optional[int],
+        keywords: Optional[Sequence[str]],
+        cursor: Any = None,
+        limit: Any = None,
+        in_stock_only: bool = False,
+    ) -> Page:
+        key = search.search_key(category, keywords, cursor, limit, in_stock_only)
+        if self.ttl <= 0:
+            return await self._load(key)
+        page, refresh = self._lookup(key)
+        if page is None:
+            generation = self._current_generation()
+            page = await self._load(key)
+            self._store(key, page, generation)
+        elif refresh:
+            task = asyncio.get_running_loop().create_task(self._refresh(key))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        return page
+
+    async def _load(self, key: tuple) -> Page:
+        category, words, in_stock_only, cursor, limit = key
+        query, params, limit = search.build_query(category, list(words), cursor or None, limit, in_stock_only)
+        rows = await self.db.execute(query, params, fetch=True, replica=True) or []
+        return search.page_rows(rows, limit)
+
+    async def _refresh(self, key: tuple):
+        generation = self._current_generation()
+        page = None
+        try:
+            page = await self._load(key)
+        except Exception:
+            logger.exception("Background search refresh failed")
+        self._store(key, page, generation)
+
+    async def close(self):
+        for task in list(self._tasks):
+            task.cancel()
+
+
+_caches: Dict[int, SearchCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_search_cache(product_db) -> SearchCache:
+    """Process-wide cache for a given product DB connection."""
+    with _caches_lock:
+        cache = _caches.get(id(product_db))
+        if cache is None or cache.db is not product_db:
+            cache = SearchCache(product_db)
+            _caches[id(product_db)] = cache
+        return cache
@@ -0,0 +1,229 @@
+import asyncio
+import logging
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Dict, Optional, Tuple
+
+from server_side.common.metrics import REGISTRY, Counter
+from server_side.data_access_layer import statements
+from server_side.data_access_layer.db import Database_Connection
+
+logger = logging.getLogger(__name__)
+
+# Sessions expire after this much inactivity (same rule as statements.TOUCH_SESSION).
+SESSION_TIMEOUT = 5 * 60
+# How long a cached session is trusted before it is re-verified against the DB,
+# which bounds how stale a logout performed by another process can be.
+SESSION_CACHE_TTL = float(os.getenv("SESSION_CACHE_TTL", "30"))
+SESSION_CACHE_MAX = int(os.getenv("SESSION_CACHE_MAX", "100000"))
+SESSION_FLUSH_INTERVAL = float(os.getenv("SESSION_FLUSH_INTERVAL", "5"))
+# Random bytes per session id (URL-safe base64 encoded, so 43 characters)
+SESSION_TOKEN_BYTES = 32
+
+CACHE_LOOKUPS = REGISTRY.register(Counter(
+    "marketplace_session_cache_lookups_total", "Session cache lookups, by result (hit, miss).", ("result",)))
+
+
+def new_session_id() -> str:
+    """An unguessable session id for statements.LOGIN."""
+    return secrets.token_urlsafe(SESSION_TOKEN_BYTES)
+
+
+def _decode_role(role) -> str:
+    if isinstance(role, memoryview):
+        role = role.tobytes()
+    if isinstance(role, bytes):
+        role = role.decode("utf-8")
+    return role
+
+
+class _Entry:
+    __slots__ = ("user_id", "role", "verified_at", "last_access")
+
+    def __init__(self, user_id: int, role: str, now: float):
+        self.user_id = user_id
+        self.role = role
+        self.verified_at = now
+        self.last_access = now
+
+
+class SessionCache:
+    """
+    In-process cache in front of the `sessions` table.
+
+    Hits are answered from memory and only record the access time; touches are
+    coalesced and written back in one batched UPDATE every `flush_interval`
+    seconds. Misses, entries older than `ttl` and entries that look expired
+    locally fall through to the authoritative UPDATE ... RETURNING.
+    """
+
+    def __init__(
+        self,
+        customer_db,
+        ttl: float = SESSION_CACHE_TTL,
+        max_entries: int = SESSION_CACHE_MAX,
+        flush_interval: float = SESSION_FLUSH_INTERVAL,
+    ):
+        self.db = customer_db
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        # session_id -> wall-clock time of the latest access not yet written to the DB
+        self._dirty: Dict[str, datetime] = {}
+        self._start_flusher()
+
+    def _start_flusher(self):
+        self._stop = threading.Event()
+        self._flusher = threading.Thread(target=self._flush_loop, name="session-flush", daemon=True)
+        self._flusher.start()
+
+    # --- in-memory bookkeeping (shared with AsyncSessionCache) ---
+    def _lookup(self, key: str, now: float) -> Optional[Tuple[int, str]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if now - entry.last_access <= SESSION_TIMEOUT and now - entry.verified_at <= self.ttl:
+                    entry.last_access = now
+                    self._entries.move_to_end(key)
+                    self._dirty[key] = datetime.now(timezone.utc)
+                    CACHE_LOOKUPS.inc("hit")
+                    return entry.user_id, entry.role
+                del self._entries[key]
+            CACHE_LOOKUPS.inc("miss")
+        return None
+
+    def _store(self, key: str, rows, now: float) -> Optional[Tuple[int, str]]:
+        if not rows:
+            self.invalidate(key)
+            return None
+        user_id, role = rows[0]
+        role = _decode_role(role)
+        with self._lock:
+            self._entries[key] = _Entry(user_id, role, now)
+            self._entries.move_to_end(key)
+            self._dirty.pop(key, None)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return user_id, role
+
+    def _take_pending(self):
+        with self._lock:
+            if not self._dirty:
+                return None, None, None
+            pending, self._dirty = self._dirty, {}
+        return pending, list(pending), list(pending.values())
+
+    def _restore_pending(self, pending: Dict[str, datetime]):
+        logger.exception("Failed to flush %d session touches", len(pending))
+        with self._lock:
+            for key, ts in pending.items():
+                self._dirty.setdefault(key, ts)
+
+    # --- public API ---
+    def verify(self, session_id) -> Optional[Tuple[int, str]]:
+        """Return (user_id, role) for a live session and record the access, else None."""
+        key = str(session_id)
+        now = time.monotonic()
+        hit = self._lookup(key, now)
+        if hit is not None:
+            return hit
+        return self._store(key, self.db.execute(statements.TOUCH_SESSION, (key,), fetch=True), now)
+
+    def add(self, session_id, user_id: int, role: str):
+        """Cache a session that was just created, so its first request skips the DB."""
+        self._store(str(session_id), [(user_id, role)], time.monotonic())
+
+    def invalidate(self, session_id):
+        key = str(session_id)
+        with self._lock:
+            self._entries.pop(key, None)
+            self._dirty.pop(key, None)
+
+    def invalidate_user(self, user_id: int, role: str):
+        with self._lock:
+            stale = [k for k, e in self._entries.items() if e.user_id == user_id and e.role == role]
+            for key in stale:
+                del self._entries[key]
+                self._dirty.pop(key, None)
+
+    def flush(self):
+        pending, ids, stamps = self._take_pending()
+        if not pending:
+            return
+        try:
+            self.db.execute(statements.FLUSH_SESSION_TOUCHES, (ids, stamps), fetch=False)
+        except Exception:
+            self._restore_pending(pending)
+
+    def _flush_loop(self):
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+
+    def close(self):
+        self._stop.set()
+        self.flush()
+
+
+class AsyncSessionCache(SessionCache):
+    """SessionCache for the asyncio DB service: same bookkeeping, awaited queries, flush task on the loop."""
+
+    def _start_flusher(self):
+        self._task = None
+
+    def start(self):
+        self._task = asyncio.get_running_loop().create_task(self._flush_loop())
+
+    async def verify(self, session_id) -> Optional[Tuple[int, str]]:
+        key = str(session_id)
+        now = time.monotonic()
+        hit = self._lookup(key, now)
+        if hit is not None:
+            return hit
+        return self._store(key, await self.db.execute(statements.TOUCH_SESSION, (key,), fetch=True), now)
+
+    async def flush(self):
+        pending, ids, stamps = self._take_pending()
+        if not pending:
+            return
+        try:
+            await self.db.execute(statements.FLUSH_SESSION_TOUCHES, (ids, stamps), fetch=False)
+        except Exception:
+            self._restore_pending(pending)
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+        await self.flush()
+
+
+_caches: Dict[int, SessionCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_session_cache(customer_db: Database_Connection) -> SessionCache:
+    """Process-wide cache for a given customer DB connection."""
+    with _caches_lock:
+        cache = _caches.get(id(customer_db))
+        if cache is None or cache.db is not customer_db:
+            cache = SessionCache(customer_db)
+            _caches[id(customer_db)] = cache
+        return cache
+
+
+def close_session_caches():
+    with _caches_lock:
+        caches = list(_caches.values())
+        _caches.clear()
+    for cache in caches:
+        cache.close()
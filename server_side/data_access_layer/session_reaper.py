@@ -0,0 +1,327 @@
+"""
+Background deletion of expired sessions and the carts they leave behind.
+
+TOUCH_SESSION only filters out sessions idle longer than SESSION_TIMEOUT;
+nothing deleted them, so `sessions` and its indexes grew with every login.
+The DB service runs a SessionReaper every SESSION_REAPER_INTERVAL seconds:
+
+- sessions idle for more than SESSION_TIMEOUT + SESSION_REAPER_GRACE are
+  deleted in batches of SESSION_REAPER_BATCH rows, each batch its own short
+  transaction (statements.REAP_SESSIONS);
+- the unsaved cart_items of each reaped buyer session are then deleted from the
+  product DB. Saved carts belong to the buyer, not to a session, and are kept.
+
+The grace covers touches still buffered in a SessionCache (written back every
+SESSION_FLUSH_INTERVAL), so a session in active use is never reaped.
+
+Partitioned layout (optional; `python database/migrate.py --partition-sessions`):
+`sessions` is range-partitioned on last_access_timestamp into hourly partitions
+named sessions_pYYYYMMDDHH (UTC), plus sessions_default. A touch moves a
+session into the current hour's partition, so once a partition's upper bound
+is older than the expiry cutoff, every row in it has expired. The reaper then
+drops the whole partition instead of deleting rows. Each cycle also creates the
+partitions for the next SESSION_PARTITIONS_AHEAD hours. Rows that end up in
+sessions_default (the reaper was stopped for longer than that) are removed by
+the batch delete. A partition whose DROP waits past its lock_timeout (a
+long transaction still reads it) is skipped and retried on the next cycle.
+
+Cart deletes that fail are retried on the next cycle. If the process dies
+between the two deletes, those unsaved cart rows stay behind; no live session
+can reach them.
+
+Reaped rows are counted in marketplace_sessions_reaped_total{method} and
+marketplace_cart_items_reaped_total.
+"""
+
+import asyncio
+import logging
+import os
+import re
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, List, Optional, Tuple
+
+from psycopg2 import errors as pg2_errors
+
+from server_side.common.metrics import REGISTRY, Counter
+from server_side.data_access_layer import statements
+from server_side.data_access_layer.session_cache import SESSION_TIMEOUT
+
+try:
+    from psycopg import errors as pg3_errors
+except ImportError:  # optional: only the asyncio DB service needs psycopg 3
+    pg3_errors = None
+
+SESSION_REAPER_INTERVAL = float(os.getenv("SESSION_REAPER_INTERVAL", "60"))
+SESSION_REAPER_BATCH = int(os.getenv("SESSION_REAPER_BATCH", "500"))
+SESSION_REAPER_GRACE = float(os.getenv("SESSION_REAPER_GRACE", "60"))
+SESSION_PARTITIONS_AHEAD = int(os.getenv("SESSION_PARTITIONS_AHEAD", "3"))
+
+PARTITION_WIDTH = timedelta(hours=1)
+_PARTITION_NAME = re.compile(r"^sessions_p(\d{10})$")
+# pg_try_advisory_xact_lock key: one process at a time changes partitions
+PARTITION_LOCK_KEY = 0x73657373
+
+# Whether `sessions` is partitioned, the DB clock, and the current partitions
+LAYOUT_SQL = """
+SELECT c.relkind = 'p', NOW(), ARRAY(
+    SELECT ch.relname::text FROM pg_inherits i JOIN pg_class ch ON ch.oid = i.inhrelid
+    WHERE i.inhparent = c.oid
+)
+FROM pg_class c
+WHERE c.oid = to_regclass('sessions')
+"""
+
+SESSIONS_REAPED = REGISTRY.register(Counter(
+    "marketplace_sessions_reaped_total", "Expired sessions removed, by method (delete, partition).", ("method",)))
+CARTS_REAPED = REGISTRY.register(Counter(
+    "marketplace_cart_items_reaped_total", "Unsaved cart rows removed along with their expired session."))
+
+logger = logging.getLogger(__name__)
+
+
+# --- Partition naming (shared with database/migrate.py) ---
+def partition_start(moment: datetime) -> datetime:
+    """Start of the hourly partition holding `moment`, in UTC."""
+    return moment.astimezone(timezone.utc).replace(minute=0, second=0, microsecond=0)
+
+
+def partition_name(start: datetime) -> str:
+    return f"sessions_p{start:%Y%m%d%H}"
+
+
+def create_partition_sql(start: datetime) -> str:
+    end = start + PARTITION_WIDTH
+    return (
+        f"CREATE TABLE IF NOT EXISTS {partition_name(start)} PARTITION OF sessions "
+        f"FOR VALUES FROM ('{start:%Y-%m-%d %H:%M:%S}+00') TO ('{end:%Y-%m-%d %H:%M:%S}+00')"
+    )
+
+
+def upcoming_partitions(now: datetime, ahead: int = SESSION_PARTITIONS_AHEAD) -> List[datetime]:
+    first = partition_start(now)
+    return [first + PARTITION_WIDTH * i for i in range(ahead + 1)]
+
+
+def expired_partitions(names: Iterable[str], cutoff: datetime) -> List[str]:
+    """Hourly partitions whose whole range is older than `cutoff`, oldest first."""
+    expired = []
+    for name in sorted(names):
+        match = _PARTITION_NAME.match(name)
+        if not match:
+            continue
+        start = datetime.strptime(match.group(1), "%Y%m%d%H").replace(tzinfo=timezone.utc)
+        if start + PARTITION_WIDTH <= cutoff:
+            expired.append(name)
+    return expired
+
+
+def _buyer_sessions(rows) -> Tuple[List[int], List[str]]:
+    """(buyer_ids, session_ids) of the buyer sessions among (session_id, user_id, role) rows."""
+    buyer_ids, session_ids = [], []
+    for session_id, user_id, role in rows:
+        if role == "buyer":
+            buyer_ids.append(user_id)
+            session_ids.append(str(session_id))
+    return buyer_ids, session_ids
+
+
+class SessionReaper:
+    """Deletes expired sessions (and their unsaved carts) on a background thread."""
+
+    def __init__(
+        self,
+        customer_db,
+        product_db,
+        interval: float = SESSION_REAPER_INTERVAL,
+        batch_size: int = SESSION_REAPER_BATCH,
+        grace: float = SESSION_REAPER_GRACE,
+    ):
+        self.customer_db = customer_db
+        self.product_db = product_db
+        self.interval = interval
+        self.batch_size = batch_size
+        self.max_idle = SESSION_TIMEOUT + grace
+        # (buyer_ids, session_ids) whose cart delete failed; retried next cycle
+        self._pending_carts: Tuple[List[int], List[str]] = ([], [])
+        self._start_reaper()
+
+    def _start_reaper(self):
+        self._stop = threading.Event()
+        if self.interval > 0:
+            threading.Thread(target=self._reap_loop, name="session-reaper", daemon=True).start()
+
+    # --- bookkeeping (shared with AsyncSessionReaper) ---
+    def _queue_carts(self, rows):
+        buyer_ids, session_ids = _buyer_sessions(rows)
+        self._pending_carts[0].extend(buyer_ids)
+        self._pending_carts[1].extend(session_ids)
+
+    def _take_carts(self) -> Tuple[List[int], List[str]]:
+        pending, self._pending_carts = self._pending_carts, ([], [])
+        return pending
+
+    def _restore_carts(self, pending: Tuple[List[int], List[str]]):
+        logger.exception("Failed to delete the carts of %d expired sessions", len(pending[0]))
+        self._pending_carts[0].extend(pending[0])
+        self._pending_carts[1].extend(pending[1])
+
+    def _partition_busy(self, name: str):
+        logger.warning("Session partition %s is still in use; dropping it next cycle", name)
+
+    def _plan_partitions(self, layout) -> Tuple[List[datetime], List[str]]:
+        """(partitions to create, partitions to drop) for a LAYOUT_SQL row."""
+        if not layout or not layout[0][0]:
+            return [], []
+        _, now, children = layout[0]
+        children = set(children or ())
+        create = [start for start in upcoming_partitions(now) if partition_name(start) not in children]
+        return create, expired_partitions(children, now - timedelta(seconds=self.max_idle))
+
+    # --- public API ---
+    def reap(self) -> int:
+        """One full pass; returns how many sessions were removed."""
+        reaped = self._maintain_partitions()
+        self._delete_carts()
+        while not self._stop.is_set():
+            rows = self.customer_db.execute(
+                statements.REAP_SESSIONS, (self.max_idle, self.batch_size), fetch=True
+            ) or []
+            SESSIONS_REAPED.inc("delete", amount=len(rows))
+            reaped += len(rows)
+            self._queue_carts(rows)
+            self._delete_carts()
+            if len(rows) < self.batch_size:
+                break
+        if reaped:
+            logger.info("Reaped %d expired sessions", reaped)
+        return reaped
+
+    def _delete_carts(self):
+        pending = self._take_carts()
+        if not pending[0]:
+            return
+        try:
+            rows = self.product_db.execute(statements.REAP_SESSION_CARTS, pending, fetch=True) or []
+        except Exception:
+            self._restore_carts(pending)
+        else:
+            CARTS_REAPED.inc(amount=len(rows))
+
+    def _maintain_partitions(self) -> int:
+        create, drop = self._plan_partitions(self.customer_db.execute(LAYOUT_SQL, fetch=True))
+        for start in create:
+            try:
+                self.customer_db.execute(create_partition_sql(start))
+            except Exception as e:
+                # e.g. rows for that hour already sit in sessions_default; batch deletes cover them
+                logger.warning("Could not create session partition %s: %s", partition_name(start), e)
+        reaped = 0
+        for name in drop:
+            try:
+                with self.customer_db.transaction() as cur:
+                    cur.execute("SELECT pg_try_advisory_xact_lock(%s)", (PARTITION_LOCK_KEY,))
+                    if not cur.fetchone()[0]:
+                        break
+                    cur.execute("SET LOCAL lock_timeout = '2s'")
+                    cur.execute(f"SELECT session_id, user_id, role FROM {name}")
+                    rows = cur.fetchall()
+                    cur.execute(f"DROP TABLE IF EXISTS {name}")
+            except pg2_errors.LockNotAvailable:
+                self._partition_busy(name)
+                continue
+            logger.info("Dropped expired session partition %s (%d sessions)", name, len(rows))
+            SESSIONS_REAPED.inc("partition", amount=len(rows))
+            reaped += len(rows)
+            self._queue_carts(rows)
+        return reaped
+
+    def _reap_loop(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.reap()
+            except Exception:
+                logger.exception("Session reaper pass failed")
+
+    def close(self):
+        self._stop.set()
+
+
+class AsyncSessionReaper(SessionReaper):
+    """SessionReaper for the asyncio DB service: awaited queries, a task on the loop."""
+
+    def _start_reaper(self):
+        self._stop = threading.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self.interval > 0:
+            self._task = asyncio.get_running_loop().create_task(self._reap_loop())
+
+    async def reap(self) -> int:
+        reaped = await self._maintain_partitions()
+        await self._delete_carts()
+        while not self._stop.is_set():
+            rows = await self.customer_db.execute(
+                statements.REAP_SESSIONS, (self.max_idle, self.batch_size), fetch=True
+            ) or []
+            SESSIONS_REAPED.inc("delete", amount=len(rows))
+            reaped += len(rows)
+            self._queue_carts(rows)
+            await self._delete_carts()
+            if len(rows) < self.batch_size:
+                break
+        if reaped:
+            logger.info("Reaped %d expired sessions", reaped)
+        return reaped
+
+    async def _delete_carts(self):
+        pending = self._take_carts()
+        if not pending[0]:
+            return
+        try:
+            rows = await self.product_db.execute(statements.REAP_SESSION_CARTS, pending, fetch=True) or []
+        except Exception:
+            self._restore_carts(pending)
+        else:
+            CARTS_REAPED.inc(amount=len(rows))
+
+    async def _maintain_partitions(self) -> int:
+        create, drop = self._plan_partitions(await self.customer_db.execute(LAYOUT_SQL, fetch=True))
+        for start in create:
+            try:
+                await self.customer_db.execute(create_partition_sql(start))
+            except Exception as e:
+                logger.warning("Could not create session partition %s: %s", partition_name(start), e)
+        reaped = 0
+        for name in drop:
+            try:
+                async with self.customer_db.transaction() as cur:
+                    await cur.execute("SELECT pg_try_advisory_xact_lock(%s)", (PARTITION_LOCK_KEY,))
+                    if not (await cur.fetchone())[0]:
+                        break
+                    await cur.execute("SET LOCAL lock_timeout = '2s'")
+                    await cur.execute(f"SELECT session_id, user_id, role FROM {name}")
+                    rows = await cur.fetchall()
+                    await cur.execute(f"DROP TABLE IF EXISTS {name}")
+            except pg3_errors.LockNotAvailable:
+                self._partition_busy(name)
+                continue
+            logger.info("Dropped expired session partition %s (%d sessions)", name, len(rows))
+            SESSIONS_REAPED.inc("partition", amount=len(rows))
+            reaped += len(rows)
+            self._queue_carts(rows)
+        return reaped
+
+    async def _reap_loop(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.reap()
+            except Exception:
+                logger.exception("Session reaper pass failed")
+
+    async def close(self):
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
@@ -0,0 +1,493 @@
+"""
+Named SQL statements shared by the TCP handlers, the repositories and both gRPC
+DB services.
+
+Every fixed query is declared once here as a Statement. Passing a Statement
+(instead of SQL text) to Database_Connection.execute runs it as a server-side
+prepared statement. It is PREPAREd the first time a pooled connection sees it,
+then EXECUTEd by name, so Postgres parses and plans it once per connection
+instead of on every call. AsyncDatabase_Connection gets the same effect from
+psycopg 3's `prepare=True`. Run time is recorded per statement name
+(marketplace_db_statement_seconds on /metrics).
+
+Set DB_PREPARED_STATEMENTS=0 to send plain SQL instead, e.g. behind a
+transaction-pooling proxy that does not keep session state.
+"""
+
+import hashlib
+import os
+import re
+import threading
+import time
+from typing import Any, Dict, Generator, Optional, Tuple
+
+from psycopg2 import extensions
+
+from server_side.common.metrics import REGISTRY, Histogram
+
+PREPARED_STATEMENTS = os.getenv("DB_PREPARED_STATEMENTS", "1") != "0"
+# Longest id / line list accepted for GET_ITEMS, ADD_TO_CART_BATCH and UPDATE_CART_BATCH
+BATCH_MAX_ITEMS = int(os.getenv("BATCH_MAX_ITEMS", "1000"))
+
+STATEMENT_SECONDS = REGISTRY.register(Histogram(
+    "marketplace_db_statement_seconds", "Time spent executing a named statement.", ("statement",)))
+
+_PLACEHOLDER = re.compile(r"%s")
+
+
+class Statement:
+    """One named query. `sql` uses %s placeholders, exactly as passed to a cursor."""
+
+    __slots__ = ("name", "sql", "param_count", "prepare_sql", "execute_sql")
+
+    def __init__(self, name: str, sql: str):
+        self.name = name
+        self.sql = sql
+        self.param_count = len(_PLACEHOLDER.findall(sql))
+        counter = iter(range(1, self.param_count + 1))
+        self.prepare_sql = f"PREPARE {name} AS {_PLACEHOLDER.sub(lambda _: f'${next(counter)}', sql)}"
+        args = ", ".join(["%s"] * self.param_count)
+        self.execute_sql = f"EXECUTE {name} ({args})" if args else f"EXECUTE {name}"
+
+    def __repr__(self) -> str:
+        return f"Statement({self.name!r})"
+
+
+STATEMENTS: Dict[str, Statement] = {}
+_registry_lock = threading.Lock()
+
+
+def statement(name: str, sql: str) -> Statement:
+    """Register a statement; re-registering a name with different SQL is an error."""
+    sql = sql.strip()
+    with _registry_lock:
+        existing = STATEMENTS.get(name)
+        if existing is not None:
+            if existing.sql != sql:
+                raise ValueError(f"statement {name!r} already registered with different SQL")
+            return existing
+        stmt = STATEMENTS[name] = Statement(name, sql)
+        return stmt
+
+
+def dynamic_statement(prefix: str, sql: str) -> Statement:
+    """Statement for SQL built at runtime from a small set of shapes (e.g. search filters)."""
+    digest = hashlib.sha1(sql.strip().encode("utf-8")).hexdigest()[:10]
+    return statement(f"{prefix}_{digest}", sql)
+
+
+class StatementConnection(extensions.connection):
+    """psycopg2 connection that remembers which statements it has PREPAREd."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.prepared = set()
+
+
+def run(cur, stmt: Statement, params=None):
+    """Execute `stmt` on a psycopg2 cursor, preparing it on this connection first if needed."""
+    started = time.perf_counter()
+    try:
+        prepared: Optional[set] = getattr(cur.connection, "prepared", None)
+        if not PREPARED_STATEMENTS or prepared is None:
+            cur.execute(stmt.sql, params)
+            return
+        if stmt.name not in prepared:
+            # PREPARE is session state, not transactional: it survives a rollback.
+            cur.execute(stmt.prepare_sql)
+            prepared.add(stmt.name)
+        cur.execute(stmt.execute_sql, params)
+    finally:
+        STATEMENT_SECONDS.observe(time.perf_counter() - started, stmt.name)
+
+
+async def run_async(cur, stmt: Statement, params=None):
+    """Execute `stmt` on a psycopg 3 async cursor; psycopg prepares and caches it per connection."""
+    started = time.perf_counter()
+    try:
+        await cur.execute(stmt.sql, params, prepare=PREPARED_STATEMENTS)
+    finally:
+        STATEMENT_SECONDS.observe(time.perf_counter() - started, stmt.name)
+
+
+# A statement sequence written once for both drivers: a generator that yields
+# (Statement, params), is sent back the fetched rows (None if the statement
+# returns none) and returns its result. Run it inside a transaction.
+Steps = Generator[Tuple[Statement, Any], Any, Any]
+
+
+def run_steps(cur, steps: Steps) -> Any:
+    """Drive `steps` on a psycopg2 cursor; returns the generator's result."""
+    rows = None
+    try:
+        while True:
+            stmt, params = steps.send(rows)
+            run(cur, stmt, params)
+            rows = cur.fetchall() if cur.description is not None else None
+    except StopIteration as done:
+        return done.value
+
+
+async def run_steps_async(cur, steps: Steps) -> Any:
+    """Drive `steps` on a psycopg 3 async cursor; returns the generator's result."""
+    rows = None
+    try:
+        while True:
+            stmt, params = steps.send(rows)
+            await run_async(cur, stmt, params)
+            rows = await cur.fetchall() if cur.description is not None else None
+    except StopIteration as done:
+        return done.value
+
+
+# ---------- Accounts ----------
+CREATE_BUYER = statement(
+    "create_buyer",
+    "INSERT INTO buyers (username, password, items_purchased) VALUES (%s, %s, 0) RETURNING buyer_id",
+)
+CREATE_SELLER = statement(
+    "create_seller",
+    "INSERT INTO sellers (username, password) VALUES (%s, %s) RETURNING seller_id",
+)
+# db_service CreateAccount inserts buyers without items_purchased (column default)
+CREATE_ACCOUNT = {
+    "buyer": statement(
+        "create_account_buyer",
+        "INSERT INTO buyers (username, password) VALUES (%s, %s) RETURNING buyer_id",
+    ),
+    "seller": CREATE_SELLER,
+}
+# Stored password (a credentials.py hash, or plain text until the next login)
+# Params: (username,); returns (user_id, password) for every account with that
+# username, oldest first (usernames are not unique)
+ACCOUNT_PASSWORD = {
+    role: statement(
+        f"account_password_{role}",
+        f"SELECT {role}_id, password FROM {role}s WHERE username = %s ORDER BY {role}_id",
+    )
+    for role in ("buyer", "seller")
+}
+# Rehash on login, only if the stored value is still the one that was checked.
+# Params: (new hash, user_id, old stored value); returns a row if it was replaced.
+REHASH_PASSWORD = {
+    role: statement(
+        f"rehash_password_{role}",
+        f"UPDATE {role}s SET password = %s WHERE {role}_id = %s AND password = %s RETURNING {role}_id",
+    )
+    for role in ("buyer", "seller")
+}
+# Creates the session if the stored password still matches, in one round trip.
+# Params: (new session id, username, stored password); returns (session_id, user_id),
+# or no row for an unknown username or a password changed since it was checked.
+LOGIN = {
+    role: statement(
+        f"login_{role}",
+        f"""
+        INSERT INTO sessions (session_id, role, user_id, last_access_timestamp)
+        SELECT %s, '{role}', {role}_id, NOW()
+        FROM {role}s
+        WHERE username = %s AND password = %s
+        LIMIT 1
+        RETURNING session_id, user_id
+        """,
+    )
+    for role in ("buyer", "seller")
+}
+
+# ---------- Sessions ----------
+SESSION_OWNER = statement(
+    "session_owner",
+    "SELECT user_id, role FROM sessions WHERE session_id = %s",
+)
+# Atomic touch: refreshes an unexpired session and returns its owner in one round trip.
+TOUCH_SESSION = statement(
+    "touch_session",
+    """
+    UPDATE sessions
+    SET last_access_timestamp = NOW()
+    WHERE session_id = %s
+      AND last_access_timestamp > NOW() - INTERVAL '5 minutes'
+    RETURNING user_id, role
+    """,
+)
+FLUSH_SESSION_TOUCHES = statement(
+    "flush_session_touches",
+    """
+    UPDATE sessions AS s
+    SET last_access_timestamp = GREATEST(s.last_access_timestamp, v.ts)
+    FROM unnest(%s::text[], %s::timestamptz[]) AS v(session_id, ts)
+    WHERE s.session_id = v.session_id
+    """,
+)
+DELETE_SESSION = statement(
+    "delete_session",
+    "DELETE FROM sessions WHERE session_id = %s",
+)
+DELETE_USER_SESSIONS = statement(
+    "delete_user_sessions",
+    "DELETE FROM sessions WHERE user_id = %s AND role = %s",
+)
+# Session reaper: one batch of sessions idle for more than %s seconds, oldest first.
+# SKIP LOCKED lets several reapers (one per DB service process) run side by side.
+REAP_SESSIONS = statement(
+    "reap_sessions",
+    """
+    WITH doomed AS (
+        SELECT session_id FROM sessions
+        WHERE last_access_timestamp < NOW() - make_interval(secs => %s)
+        ORDER BY last_access_timestamp
+        LIMIT %s
+        FOR UPDATE SKIP LOCKED
+    )
+    DELETE FROM sessions AS s
+    USING doomed AS d
+    WHERE s.session_id = d.session_id
+    RETURNING s.session_id, s.user_id, s.role
+    """,
+)
+
+# ---------- Items ----------
+GET_ITEM = statement(
+    "get_item",
+    "SELECT item_id, item_name, category, keywords, condition_is_new, sale_price, quantity, seller_id FROM items WHERE item_id = %s",
+)
+# GET_ITEM rows for an int[] of ids, in no particular order; missing ids have no row
+GET_ITEMS = statement(
+    "get_items",
+    "SELECT item_id, item_name, category, keywords, condition_is_new, sale_price, quantity, seller_id FROM items WHERE item_id = ANY(%s::int[])",
+)
+GET_ITEMS_STOCK = statement(
+    "get_items_stock",
+    "SELECT item_id, quantity FROM items WHERE item_id = ANY(%s::int[])",
+)
+GET_ITEM_SELLER = statement(
+    "get_item_seller",
+    "SELECT seller_id FROM items WHERE item_id = %s",
+)
+REGISTER_ITEM = statement(
+    "register_item",
+    """
+    INSERT INTO items (item_name, category, keywords, condition_is_new, sale_price, quantity, seller_id)
+    VALUES (%s, %s, %s, %s, %s, %s, %s)
+    RETURNING item_id
+    """,
+)
+UPDATE_ITEM_PRICE = statement(
+    "update_item_price",
+    "UPDATE items SET sale_price = %s WHERE item_id = %s AND seller_id = %s RETURNING item_id, category",
+)
+GET_OWNED_ITEM_QUANTITY = statement(
+    "get_owned_item_quantity",
+    "SELECT quantity, category FROM items WHERE item_id = %s AND seller_id = %s",
+)
+SET_OWNED_ITEM_QUANTITY = statement(
+    "set_owned_item_quantity",
+    "UPDATE items SET quantity = %s WHERE item_id = %s AND seller_id = %s",
+)
+SELLER_ITEMS = statement(
+    "seller_items",
+    "SELECT item_id, item_name, category, keywords, condition_is_new, sale_price, quantity FROM items WHERE seller_id = %s",
+)
+SELLER_ITEMS_WITH_SELLER = statement(
+    "seller_items_with_seller",
+    "SELECT item_id, item_name, category, keywords, condition_is_new, sale_price, quantity, seller_id FROM items WHERE seller_id = %s",
+)
+LOCK_ITEMS = statement(
+    "lock_items",
+    "SELECT item_id FROM items WHERE item_id = ANY(%s) ORDER BY item_id FOR UPDATE",
+)
+DECREMENT_STOCK = statement(
+    "decrement_stock",
+    """
+    UPDATE items AS i
+    SET quantity = i.quantity - c.qty
+    FROM unnest(%s::int[], %s::int[]) AS c(item_id, qty)
+    WHERE i.item_id = c.item_id AND i.quantity >= c.qty
+    RETURNING i.item_id, c.qty, i.seller_id
+    """,
+)
+# Index 1 counts positive feedback, 2 negative
+ITEM_FEEDBACK = {
+    idx: statement(
+        f"item_feedback_{idx}",
+        f"UPDATE items SET item_feedback[{idx}] = item_feedback[{idx}] + 1 WHERE item_id = %s",
+    )
+    for idx in (1, 2)
+}
+
+# ---------- Cart ----------
+ADD_TO_CART = statement(
+    "add_to_cart",
+    """
+    INSERT INTO cart_items (buyer_id, session_id, item_id, quantity, is_saved)
+    VALUES (%s, %s, %s, %s, FALSE)
+    ON CONFLICT (buyer_id, session_id, item_id, is_saved) DO UPDATE
+    SET quantity = cart_items.quantity + EXCLUDED.quantity
+    """,
+)
+# ADD_TO_CART for many lines: (buyer_id, session_id, item_ids int[], quantities int[]).
+# Repeated item_ids are summed first; ON CONFLICT cannot touch one row twice.
+ADD_TO_CART_BATCH = statement(
+    "add_to_cart_batch",
+    """
+    INSERT INTO cart_items (buyer_id, session_id, item_id, quantity, is_saved)
+    SELECT %s, %s, b.item_id, SUM(b.quantity), FALSE
+    FROM unnest(%s::int[], %s::int[]) AS b(item_id, quantity)
+    GROUP BY b.item_id
+    ON CONFLICT (buyer_id, session_id, item_id, is_saved) DO UPDATE
+    SET quantity = cart_items.quantity + EXCLUDED.quantity
+    """,
+)
+# SET_CART_ITEM_QUANTITY / DELETE_CART_ITEM for many lines in one statement:
+# (buyer_id, session_id, item_ids int[], quantities int[]). A quantity <= 0
+# removes the line; for a repeated item_id the last one wins. Lines not in the
+# cart are not added.
+UPDATE_CART_BATCH = statement(
+    "update_cart_batch",
+    """
+    WITH b AS (
+        SELECT DISTINCT ON (u.item_id) %s::int AS buyer_id, %s::text AS session_id, u.item_id, u.quantity
+        FROM unnest(%s::int[], %s::int[]) WITH ORDINALITY AS u(item_id, quantity, n)
+        ORDER BY u.item_id, u.n DESC
+    ), removed AS (
+        DELETE FROM cart_items c
+        USING b
+        WHERE c.buyer_id = b.buyer_id AND c.session_id = b.session_id AND c.item_id = b.item_id
+          AND c.is_saved = FALSE AND b.quantity <= 0
+    )
+    UPDATE cart_items c
+    SET quantity = b.quantity
+    FROM b
+    WHERE c.buyer_id = b.buyer_id AND c.session_id = b.session_id AND c.item_id = b.item_id
+      AND c.is_saved = FALSE AND b.quantity > 0
+    """,
+)
+CART_ITEM_QUANTITY = statement(
+    "cart_item_quantity",
+    "SELECT quantity FROM cart_items WHERE buyer_id = %s AND session_id = %s AND item_id = %s AND is_saved = FALSE",
+)
+DELETE_CART_ITEM = statement(
+    "delete_cart_item",
+    "DELETE FROM cart_items WHERE buyer_id = %s AND session_id = %s AND item_id = %s AND is_saved = FALSE",
+)
+SET_CART_ITEM_QUANTITY = statement(
+    "set_cart_item_quantity",
+    "UPDATE cart_items SET quantity = %s WHERE buyer_id = %s AND session_id = %s AND item_id = %s AND is_saved = FALSE",
+)
+SAVE_CART = statement(
+    "save_cart",
+    """
+    INSERT INTO cart_items (buyer_id, session_id, item_id, quantity, is_saved)
+    SELECT buyer_id, '', item_id, quantity, TRUE
+    FROM cart_items
+    WHERE buyer_id = %s AND session_id = %s AND is_saved = FALSE
+    ON CONFLICT (buyer_id, session_id, item_id, is_saved)
+    DO UPDATE SET quantity = cart_items.quantity + EXCLUDED.quantity
+    """,
+)
+DELETE_UNSAVED_CARTS = statement(
+    "delete_unsaved_carts",
+    "DELETE FROM cart_items WHERE buyer_id = %s AND is_saved = FALSE",
+)
+CLEAR_SESSION_CART = statement(
+    "clear_session_cart",
+    "DELETE FROM cart_items WHERE buyer_id = %s AND session_id = %s AND is_saved = FALSE",
+)
+CLEAR_SAVED_CART = statement(
+    "clear_saved_cart",
+    "DELETE FROM cart_items WHERE buyer_id = %s AND is_saved = TRUE",
+)
+LIST_SESSION_CART = statement(
+    "list_session_cart",
+    "SELECT item_id, quantity FROM cart_items WHERE buyer_id = %s AND session_id = %s AND is_saved = FALSE",
+)
+LIST_SAVED_CART = statement(
+    "list_saved_cart",
+    "SELECT item_id, quantity FROM cart_items WHERE buyer_id = %s AND is_saved = TRUE",
+)
+LIST_SAVED_CART_WITH_STOCK = statement(
+    "list_saved_cart_with_stock",
+    """
+    SELECT c.item_id, c.quantity, i.quantity
+    FROM cart_items c
+    LEFT JOIN items i ON i.item_id = c.item_id
+    WHERE c.buyer_id = %s AND c.is_saved = TRUE
+    ORDER BY c.item_id
+    """,
+)
+CLAIM_SAVED_CART = statement(
+    "claim_saved_cart",
+    "DELETE FROM cart_items WHERE buyer_id = %s AND is_saved = TRUE RETURNING item_id, quantity",
+)
+# Unsaved carts of reaped sessions, as parallel (buyer_id, session_id) arrays
+REAP_SESSION_CARTS = statement(
+    "reap_session_carts",
+    """
+    DELETE FROM cart_items AS c
+    USING unnest(%s::int[], %s::text[]) AS s(buyer_id, session_id)
+    WHERE c.buyer_id = s.buyer_id AND c.session_id = s.session_id AND c.is_saved = FALSE
+    RETURNING c.cart_item_id
+    """,
+)
+
+# ---------- Feedback / ratings ----------
+SELLER_FEEDBACK = statement(
+    "seller_feedback",
+    "SELECT seller_feedback FROM sellers WHERE seller_id = %s",
+)
+RECORD_SELLER_FEEDBACK = statement(
+    "record_seller_feedback",
+    """
+    UPDATE sellers
+    SET seller_feedback = ARRAY[
+        COALESCE(seller_feedback[1], 0) + CASE WHEN %s THEN 1 ELSE 0 END,
+        COALESCE(seller_feedback[2], 0) + CASE WHEN %s THEN 0 ELSE 1 END
+    ]
+    WHERE seller_id = %s
+    """,
+)
+SELLER_FEEDBACK_INCREMENT = {
+    idx: statement(
+        f"seller_feedback_{idx}",
+        f"UPDATE sellers SET seller_feedback[{idx}] = seller_feedback[{idx}] + 1 WHERE seller_id = %s",
+    )
+    for idx in (1, 2)
+}
+
+# ---------- Purchases ----------
+CREATE_PURCHASE = statement(
+    "create_purchase",
+    "INSERT INTO purchases (buyer_id, item_id, quantity) VALUES (%s, %s, %s)",
+)
+CREATE_PURCHASES = statement(
+    "create_purchases",
+    """
+    INSERT INTO purchases (buyer_id, item_id, quantity)
+    SELECT %s, c.item_id, c.qty FROM unnest(%s::int[], %s::int[]) AS c(item_id, qty)
+    """,
+)
+BUYER_PURCHASES = statement(
+    "buyer_purchases",
+    "SELECT item_id, quantity, purchased_at FROM purchases WHERE buyer_id = %s ORDER BY purchased_at DESC",
+)
+BUYER_PURCHASES_UNORDERED = statement(
+    "buyer_purchases_unordered",
+    "SELECT item_id, quantity, purchased_at FROM purchases WHERE buyer_id = %s",
+)
+ADD_ITEMS_PURCHASED = statement(
+    "add_items_purchased",
+    "UPDATE buyers SET items_purchased = items_purchased + %s WHERE buyer_id = %s",
+)
+ADD_ITEMS_SOLD = statement(
+    "add_items_sold",
+    "UPDATE sellers SET items_sold = items_sold + %s WHERE seller_id = %s",
+)
+ADD_ITEMS_SOLD_BATCH = statement(
+    "add_items_sold_batch",
+    """
+    UPDATE sellers AS s
+    SET items_sold = COALESCE(s.items_sold, 0) + v.qty
+    FROM unnest(%s::int[], %s::int[]) AS v(seller_id, qty)
+    WHERE s.seller_id = v.seller_id
+    """,
+)
@@ -1,3 +1,4 @@
+import logging
 import os
 import grpc
 from concurrent import futures
@@ -15,6 +16,16 @@ if str(REPO_ROOT) not in sys.path:
 from protos import database_pb2
 from protos import database_pb2_grpc
 from server_side.data_access_layer.db import Database_Connection
+from server_side.buyer_interface import buyer_repository
+from server_side.data_access_layer import statements
+from server_side.data_access_layer.credentials import CredentialsBusy, close_hash_pool, get_credentials
+from server_side.data_access_layer.item_cache import get_item_cache
+from server_side.data_access_layer.search_cache import get_search_cache
+from server_side.data_access_layer.session_cache import get_session_cache
+from server_side.data_access_layer.session_reaper import SessionReaper
+from server_side.common.metrics import GrpcMetricsInterceptor, start_metrics_server
+from server_side.common.payment import PaymentServiceUnavailable, card_authorizer
+from server_side.common.logging_config import configure_logging
 
 try:
     from dotenv import load_dotenv
@@ -22,6 +33,8 @@ try:
 except Exception:
     pass
 
+logger = logging.getLogger(__name__)
+
 class DatabaseServiceServicer(database_pb2_grpc.DatabaseServiceServicer):
     def __init__(self):
         # Customer DB connection (defaults to PG* envs)
@@ -31,6 +44,7 @@ class DatabaseServiceServicer(database_pb2_grpc.DatabaseServiceServicer):
             port=int(os.getenv("CUSTOMER_PGPORT") or os.getenv("PGPORT", "5434")),
             user=os.getenv("CUSTOMER_PGUSER") or os.getenv("PGUSER", "postgres"),
             password=os.getenv("CUSTOMER_PGPASSWORD") or os.getenv("PGPASSWORD"),
+            replicas=os.getenv("CUSTOMER_PGREPLICAS"),
         )
         # Product DB connection (can point to a different host)
         self.product_db = Database_Connection(
@@ -39,119 +53,110 @@ class DatabaseServiceServicer(database_pb2_grpc.DatabaseServiceServicer):
             port=int(os.getenv("PRODUCT_PGPORT") or os.getenv("PGPORT", "5434")),
             user=os.getenv("PRODUCT_PGUSER") or os.getenv("PGUSER", "postgres"),
             password=os.getenv("PRODUCT_PGPASSWORD") or os.getenv("PGPASSWORD"),
+            replicas=os.getenv("PRODUCT_PGREPLICAS"),
         )
+        self.credentials = get_credentials(self.customer_db)
+        self.sessions = get_session_cache(self.customer_db)
+        self.items = get_item_cache(self.product_db)
+        self.searches = get_search_cache(self.product_db)
+        self.reaper = SessionReaper(self.customer_db, self.product_db)
+
+    def close(self):
+        self.reaper.close()
+        # Writes back buffered session touches, so it runs before the pools close
+        self.sessions.close()
+        self.searches.close()
+        close_hash_pool()
+        self.customer_db.close()
+        self.product_db.close()
 
     # --- Account / Session Operations ---
     def CreateAccount(self, request, context):
-        table = "buyers" if request.role == "buyer" else "sellers"
-        id_col = "buyer_id" if request.role == "buyer" else "seller_id"
-        
+        role = "buyer" if request.role == "buyer" else "seller"
+
         try:
-            rows = self.customer_db.execute(
-                f"INSERT INTO {table} (username, password) VALUES (%s, %s) RETURNING {id_col}",
-                (request.username, request.password),
-                fetch=True
-            )
-            user_id = rows[0][0] if rows else 0
-            return database_pb2.CreateAccountResponse(user_id=user_id)
+            user_id = self.credentials.create_account(role, request.username, request.password)
+        except CredentialsBusy as e:
+            context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED, str(e))
         except Exception as e:
             context.abort(grpc.StatusCode.ALREADY_EXISTS, str(e))
+        return database_pb2.CreateAccountResponse(user_id=user_id or 0)
 
     def AuthenticateUser(self, request, context):
-        table = "buyers" if request.role == "buyer" else "sellers"
-        id_col = "buyer_id" if request.role == "buyer" else "seller_id"
-        
-        rows = self.customer_db.execute(
-            f"SELECT {id_col} FROM {table} WHERE username = %s AND password = %s",
-            (request.username, request.password),
-            fetch=True
-        )
-        if not rows:
+        role = "buyer" if request.role == "buyer" else "seller"
+
+        # Password checked in the hashing pool (or the verified-credential cache), then one session insert
+        try:
+            row = self.credentials.login(role, request.username, request.password)
+        except CredentialsBusy as e:
+            context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED, str(e))
+        if row is None:
             context.abort(grpc.StatusCode.UNAUTHENTICATED, "Invalid username or password")
-            
-        user_id = rows[0][0]
-        
-        # Create session
-        self.customer_db.execute(
-            "INSERT INTO sessions (role, user_id, last_access_timestamp) VALUES (%s, %s, NOW())",
-            (request.role, user_id),
-            fetch=False
-        )
-        
-        rows = self.customer_db.execute(
-            "SELECT session_id FROM sessions WHERE role = %s AND user_id = %s ORDER BY last_access_timestamp DESC LIMIT 1",
-            (request.role, user_id),
-            fetch=True
-        )
-        session_id = str(rows[0][0]) if rows else ""
+
+        session_id, user_id = row
+        self.sessions.add(session_id, user_id, role)
         return database_pb2.AuthenticateResponse(user_id=user_id, session_id=session_id)
 
     def VerifySession(self, request, context):
-        # Atomic Touch Logic from PA1
-        rows = self.customer_db.execute(
-            """
-            UPDATE sessions 
-            SET last_access_timestamp = NOW() 
-            WHERE session_id = %s 
-              AND last_access_timestamp > NOW() - INTERVAL '5 minutes'
-            RETURNING user_id, role
-            """,
-            (request.session_id,),
-            fetch=True
-        )
-        if not rows:
+        # Cached; misses use the Atomic Touch Logic from PA1
+        row = self.sessions.verify(request.session_id)
+        if not row:
             context.abort(grpc.StatusCode.UNAUTHENTICATED, "Session invalid or expired")
             
-        user_id, role = rows[0]
+        user_id, role = row
         return database_pb2.VerifySessionResponse(user_id=user_id, role=role)
 
     def DeleteSessions(self, request, context):
         if request.scope == "all":
             self.customer_db.execute(
-                "DELETE FROM sessions WHERE user_id = %s AND role = %s",
+                statements.DELETE_USER_SESSIONS,
                 (request.user_id, request.role),
                 fetch=False
             )
+            self.sessions.invalidate_user(request.user_id, request.role)
         else:
             self.customer_db.execute(
-                "DELETE FROM sessions WHERE session_id = %s",
+                statements.DELETE_SESSION,
                 (request.session_id,),
                 fetch=False
             )
+            self.sessions.invalidate(request.session_id)
         return database_pb2.Empty()
 
     # --- Item Operations ---
-    def SearchItems(self, request, context):
-        query = "SELECT item_id, item_name, category, keywords, condition_is_new, sale_price, quantity, seller_id FROM items WHERE quantity > 0"
-        params = []
-        
-        if request.category != 0:
-            query += " AND category = %s"
-            params.append(request.category)
-            
-        if request.keywords:
-            # Better Search Semantics: matches ANY of the keywords
-            query += " AND keywords && %s"
-            params.append(list(request.keywords))
-            
-        rows = self.product_db.execute(query, tuple(params), fetch=True) or []
+    def _search_page(self, request, cursor, context):
+        try:
+            rows, next_cursor = self.searches.search(
+                request.category or None, request.keywords, cursor, request.limit, in_stock_only=True
+            )
+        except ValueError as e:
+            context.abort(grpc.StatusCode.INVALID_ARGUMENT, str(e))
         items = []
         for r in rows:
             items.append(database_pb2.Item(
                 item_id=r[0], item_name=r[1], category=r[2], keywords=r[3],
                 condition_is_new=r[4], price=float(r[5]), quantity=r[6], seller_id=r[7]
             ))
-        return database_pb2.SearchItemsResponse(items=items)
+        return database_pb2.SearchItemsResponse(items=items, next_cursor=next_cursor or "")
+
+    def SearchItems(self, request, context):
+        # Ranked keyset pagination: pass next_cursor back as cursor for the next page.
+        return self._search_page(request, request.cursor, context)
+
+    def StreamSearchItems(self, request, context):
+        # Same pages as SearchItems, pushed one message per page until the result set is exhausted.
+        cursor = request.cursor
+        while context.is_active():
+            page = self._search_page(request, cursor, context)
+            yield page
+            if not page.next_cursor:
+                return
+            cursor = page.next_cursor
 
     def GetItem(self, request, context):
-        rows = self.product_db.execute(
-            "SELECT item_id, item_name, category, keywords, condition_is_new, sale_price, quantity, seller_id FROM items WHERE item_id = %s",
-            (request.item_id,),
-            fetch=True
-        )
-        if not rows:
+        r = self.items.get(request.item_id)
+        if r is None:
             context.abort(grpc.StatusCode.NOT_FOUND, "Item not found")
-        r = rows[0]
         return database_pb2.Item(
             item_id=r[0], item_name=r[1], category=r[2], keywords=r[3],
             condition_is_new=r[4], price=float(r[5]), quantity=r[6], seller_id=r[7]
@@ -160,30 +165,33 @@ class DatabaseServiceServicer(database_pb2_grpc.DatabaseServiceServicer):
     def RegisterItem(self, request, context):
         condition_is_new = request.condition.lower() in ("new", "brand new", "mint")
         rows = self.product_db.execute(
-            """
-            INSERT INTO items (item_name, category, keywords, condition_is_new, sale_price, quantity, seller_id)
-            VALUES (%s, %s, %s, %s, %s, %s, %s)
-            RETURNING item_id
-            """,
+            statements.REGISTER_ITEM,
             (request.item_name, request.category, list(request.keywords), condition_is_new, request.price, request.quantity, request.seller_id),
-            fetch=True
+            fetch=True,
+            session=("seller", request.seller_id),
         )
         item_id = rows[0][0] if rows else 0
+        if item_id:
+            self.items.invalidate(item_id)
+            self.searches.invalidate_category(request.category)
         return database_pb2.RegisterItemResponse(item_id=item_id)
 
     def UpdateItemPrice(self, request, context):
         rows = self.product_db.execute(
-            "UPDATE items SET sale_price = %s WHERE item_id = %s AND seller_id = %s RETURNING item_id",
+            statements.UPDATE_ITEM_PRICE,
             (request.price, request.item_id, request.seller_id),
-            fetch=True
+            fetch=True,
+            session=("seller", request.seller_id),
         )
         if not rows:
             context.abort(grpc.StatusCode.NOT_FOUND, "Item not found or unauthorized")
+        self.items.invalidate(request.item_id)
+        self.searches.invalidate_category(rows[0][1])
         return database_pb2.Empty()
 
     def UpdateItemQuantity(self, request, context):
         rows = self.product_db.execute(
-            "SELECT quantity FROM items WHERE item_id = %s AND seller_id = %s",
+            statements.GET_OWNED_ITEM_QUANTITY,
             (request.item_id, request.seller_id),
             fetch=True
         )
@@ -196,17 +204,22 @@ class DatabaseServiceServicer(database_pb2_grpc.DatabaseServiceServicer):
             context.abort(grpc.StatusCode.FAILED_PRECONDITION, "Insufficient quantity")
             
         self.product_db.execute(
-            "UPDATE items SET quantity = %s WHERE item_id = %s AND seller_id = %s",
+            statements.SET_OWNED_ITEM_QUANTITY,
             (new_qty, request.item_id, request.seller_id),
-            fetch=False
+            fetch=False,
+            session=("seller", request.seller_id),
         )
+        self.items.invalidate(request.item_id)
+        self.searches.invalidate_category(rows[0][1])
         return database_pb2.UpdateItemQuantityResponse(new_quantity=new_qty)
 
     def GetItemsBySeller(self, request, context):
         rows = self.product_db.execute(
-            "SELECT item_id, item_name, category, keywords, condition_is_new, sale_price, quantity, seller_id FROM items WHERE seller_id = %s",
+            statements.SELLER_ITEMS_WITH_SELLER,
             (request.seller_id,),
-            fetch=True
+            fetch=True,
+            replica=True,
+            session=("seller", request.seller_id),
         ) or []
         items = []
         for r in rows:
@@ -216,31 +229,49 @@ class DatabaseServiceServicer(database_pb2_grpc.DatabaseServiceServicer):
             ))
         return database_pb2.SearchItemsResponse(items=items)
 
+    def GetItems(self, request, context):
+        if len(request.item_ids) > statements.BATCH_MAX_ITEMS:
+            context.abort(grpc.StatusCode.INVALID_ARGUMENT, f"at most {statements.BATCH_MAX_ITEMS} item ids")
+        if request.fresh:
+            # Stock validation: straight from the primary, never a cached or replica row
+            found = self.product_db.execute(statements.GET_ITEMS, (list(request.item_ids),), fetch=True)
+            rows = {r[0]: r for r in found}
+        else:
+            # Item cache first; every miss is fetched by one GET_ITEMS (= ANY) query
+            rows = self.items.get_many(request.item_ids)
+        items = []
+        for item_id in dict.fromkeys(request.item_ids):
+            r = rows.get(item_id)
+            if r is None:
+                continue
+            items.append(database_pb2.Item(
+                item_id=r[0], item_name=r[1], category=r[2], keywords=r[3],
+                condition_is_new=r[4], price=float(r[5]), quantity=r[6], seller_id=r[7]
+            ))
+        return database_pb2.SearchItemsResponse(items=items)
+
     # --- Cart Operations ---
     def AddToCart(self, request, context):
         self.product_db.execute(
-            """
-            INSERT INTO cart_items (buyer_id, session_id, item_id, quantity, is_saved)
-            VALUES (%s, %s, %s, %s, FALSE)
-            ON CONFLICT (buyer_id, session_id, item_id, is_saved) DO UPDATE 
-            SET quantity = cart_items.quantity + EXCLUDED.quantity
-            """,
+            statements.ADD_TO_CART,
             (request.buyer_id, request.session_id, request.item_id, request.quantity),
-            fetch=False
+            fetch=False,
+            session=("buyer", request.buyer_id),
         )
         return database_pb2.Empty()
 
     def RemoveFromCart(self, request, context):
         self.product_db.execute(
-            "DELETE FROM cart_items WHERE buyer_id = %s AND session_id = %s AND item_id = %s AND is_saved = FALSE",
+            statements.DELETE_CART_ITEM,
             (request.buyer_id, request.session_id, request.item_id),
-            fetch=False
+            fetch=False,
+            session=("buyer", request.buyer_id),
         )
         return database_pb2.Empty()
 
     def GetCartItemQuantity(self, request, context):
         row = self.product_db.execute(
-            "SELECT quantity FROM cart_items WHERE buyer_id = %s AND session_id = %s AND item_id = %s AND is_saved = FALSE",
+            statements.CART_ITEM_QUANTITY,
             (request.buyer_id, request.session_id, request.item_id),
             fetch=True
         )
@@ -250,68 +281,57 @@ class DatabaseServiceServicer(database_pb2_grpc.DatabaseServiceServicer):
     def UpdateCartItem(self, request, context):
         if request.quantity <= 0:
             self.product_db.execute(
-                "DELETE FROM cart_items WHERE buyer_id = %s AND session_id = %s AND item_id = %s AND is_saved = FALSE",
+                statements.DELETE_CART_ITEM,
                 (request.buyer_id, request.session_id, request.item_id),
-                fetch=False
+                fetch=False,
+                session=("buyer", request.buyer_id),
             )
         else:
             self.product_db.execute(
-                "UPDATE cart_items SET quantity = %s WHERE buyer_id = %s AND session_id = %s AND item_id = %s AND is_saved = FALSE",
+                statements.SET_CART_ITEM_QUANTITY,
                 (request.quantity, request.buyer_id, request.session_id, request.item_id),
-                fetch=False
+                fetch=False,
+                session=("buyer", request.buyer_id),
             )
         return database_pb2.Empty()
 
     def SaveCart(self, request, context):
-        # Move this session's cart to the shared saved cart (session_id='')
-        self.product_db.execute(
-            """
-            INSERT INTO cart_items (buyer_id, session_id, item_id, quantity, is_saved)
-            SELECT buyer_id, '', item_id, quantity, TRUE
-            FROM cart_items
-            WHERE buyer_id = %s AND session_id = %s AND is_saved = FALSE
-            ON CONFLICT (buyer_id, session_id, item_id, is_saved)
-            DO UPDATE SET quantity = cart_items.quantity + EXCLUDED.quantity
-            """,
-            (request.buyer_id, request.session_id),
-            fetch=False
-        )
-        # Clear all unsaved carts for this buyer across every session
-        self.product_db.execute(
-            "DELETE FROM cart_items WHERE buyer_id = %s AND is_saved = FALSE",
-            (request.buyer_id,),
-            fetch=False
-        )
+        # Move this session's cart to the shared saved cart and clear unsaved carts, in one transaction
+        buyer_repository.save_cart(self.product_db, request.buyer_id, request.session_id)
         return database_pb2.Empty()
 
     def ClearCart(self, request, context):
         self.product_db.execute(
-            "DELETE FROM cart_items WHERE buyer_id = %s AND session_id = %s AND is_saved = FALSE",
+            statements.CLEAR_SESSION_CART,
             (request.buyer_id, request.session_id),
-            fetch=False
+            fetch=False,
+            session=("buyer", request.buyer_id),
         )
         return database_pb2.Empty()
 
     def ListCart(self, request, context):
         rows = self.product_db.execute(
-            "SELECT item_id, quantity FROM cart_items WHERE buyer_id = %s AND session_id = %s AND is_saved = FALSE",
+            statements.LIST_SESSION_CART,
             (request.buyer_id, request.session_id),
-            fetch=True
+            fetch=True,
+            replica=True,
+            session=("buyer", request.buyer_id),
         ) or []
         items = [database_pb2.CartItem(item_id=r[0], quantity=r[1]) for r in rows]
         return database_pb2.CartListResponse(items=items)
 
     def DeleteUnsavedCart(self, request, context):
         self.product_db.execute(
-            "DELETE FROM cart_items WHERE buyer_id = %s AND session_id = %s AND is_saved = FALSE",
+            statements.CLEAR_SESSION_CART,
             (request.buyer_id, request.session_id),
-            fetch=False
+            fetch=False,
+            session=("buyer", request.buyer_id),
         )
         return database_pb2.Empty()
 
     def ListSavedCart(self, request, context):
         rows = self.product_db.execute(
-            "SELECT item_id, quantity FROM cart_items WHERE buyer_id = %s AND is_saved = TRUE",
+            statements.LIST_SAVED_CART,
             (request.buyer_id,),
             fetch=True
         ) or []
@@ -320,18 +340,46 @@ class DatabaseServiceServicer(database_pb2_grpc.DatabaseServiceServicer):
 
     def ClearSavedCart(self, request, context):
         self.product_db.execute(
-            "DELETE FROM cart_items WHERE buyer_id = %s AND is_saved = TRUE",
+            statements.CLEAR_SAVED_CART,
             (request.buyer_id,),
-            fetch=False
+            fetch=False,
+            session=("buyer", request.buyer_id),
         )
         return database_pb2.Empty()
 
+    def AddToCartBatch(self, request, context):
+        if len(request.items) > statements.BATCH_MAX_ITEMS:
+            context.abort(grpc.StatusCode.INVALID_ARGUMENT, f"at most {statements.BATCH_MAX_ITEMS} cart lines")
+        # One INSERT ... SELECT FROM unnest(...) for every line
+        if request.items:
+            self.product_db.execute(
+                statements.ADD_TO_CART_BATCH,
+                (request.buyer_id, request.session_id,
+                 [i.item_id for i in request.items], [i.quantity for i in request.items]),
+                fetch=False,
+                session=("buyer", request.buyer_id),
+            )
+        return database_pb2.Empty()
+
+    def UpdateCartBatch(self, request, context):
+        if len(request.items) > statements.BATCH_MAX_ITEMS:
+            context.abort(grpc.StatusCode.INVALID_ARGUMENT, f"at most {statements.BATCH_MAX_ITEMS} cart lines")
+        if request.items:
+            self.product_db.execute(
+                statements.UPDATE_CART_BATCH,
+                (request.buyer_id, request.session_id,
+                 [i.item_id for i in request.items], [i.quantity for i in request.items]),
+                fetch=False,
+                session=("buyer", request.buyer_id),
+            )
+        return database_pb2.Empty()
+
     # --- Feedback / Rating ---
     def ProvideFeedback(self, request, context):
         # Update Item Feedback
         col = "thumbs_up" if request.is_positive else "thumbs_down"
         # We need to find the seller_id first for the combined update or handle them separately
-        rows = self.product_db.execute("SELECT seller_id FROM items WHERE item_id = %s", (request.item_id,), fetch=True)
+        rows = self.product_db.execute(statements.GET_ITEM_SELLER, (request.item_id,), fetch=True)
         if not rows:
             context.abort(grpc.StatusCode.NOT_FOUND, "Item not found")
         seller_id = rows[0][0]
@@ -341,24 +389,27 @@ class DatabaseServiceServicer(database_pb2_grpc.DatabaseServiceServicer):
         # Assuming schema: item_feedback INTEGER[] DEFAULT ARRAY[0, 0]
         idx = 1 if request.is_positive else 2
         self.product_db.execute(
-            f"UPDATE items SET item_feedback[{idx}] = item_feedback[{idx}] + 1 WHERE item_id = %s",
+            statements.ITEM_FEEDBACK[idx],
             (request.item_id,),
             fetch=False
         )
         
         # Requirement: "Seller feedback: <integer number of thumbs up, integer number of thumbs down>"
         self.customer_db.execute(
-            f"UPDATE sellers SET seller_feedback[{idx}] = seller_feedback[{idx}] + 1 WHERE seller_id = %s",
+            statements.SELLER_FEEDBACK_INCREMENT[idx],
             (seller_id,),
-            fetch=False
+            fetch=False,
+            session=("seller", seller_id),
         )
         return database_pb2.Empty()
 
     def GetSellerRating(self, request, context):
         rows = self.customer_db.execute(
-            "SELECT seller_feedback FROM sellers WHERE seller_id = %s",
+            statements.SELLER_FEEDBACK,
             (request.seller_id,),
-            fetch=True
+            fetch=True,
+            replica=True,
+            session=("seller", request.seller_id),
         )
         if not rows:
             return database_pb2.SellerRatingResponse(pos=0, neg=0)
@@ -368,45 +419,93 @@ class DatabaseServiceServicer(database_pb2_grpc.DatabaseServiceServicer):
     # --- Purchases ---
     def GetPurchaseHistory(self, request, context):
         rows = self.product_db.execute(
-            "SELECT item_id, quantity, purchased_at FROM purchases WHERE buyer_id = %s",
+            statements.BUYER_PURCHASES_UNORDERED,
             (request.buyer_id,),
-            fetch=True
+            fetch=True,
+            replica=True,
+            session=("buyer", request.buyer_id),
         ) or []
         records = [database_pb2.PurchaseRecord(item_id=r[0], quantity=r[1], purchased_at=str(r[2])) for r in rows]
         return database_pb2.PurchaseHistoryResponse(records=records)
 
     def CreatePurchase(self, request, context):
         self.product_db.execute(
-            "INSERT INTO purchases (buyer_id, item_id, quantity) VALUES (%s, %s, %s)",
+            statements.CREATE_PURCHASE,
             (request.buyer_id, request.item_id, request.quantity),
-            fetch=False
+            fetch=False,
+            session=("buyer", request.buyer_id),
         )
         # Requirement: update items_purchased for buyer and items_sold for seller
         self.customer_db.execute(
-            "UPDATE buyers SET items_purchased = items_purchased + %s WHERE buyer_id = %s",
+            statements.ADD_ITEMS_PURCHASED,
             (request.quantity, request.buyer_id),
             fetch=False
         )
         # Find seller
-        rows = self.product_db.execute("SELECT seller_id FROM items WHERE item_id = %s", (request.item_id,), fetch=True)
+        rows = self.product_db.execute(statements.GET_ITEM_SELLER, (request.item_id,), fetch=True)
         if rows:
             seller_id = rows[0][0]
             self.customer_db.execute(
-                "UPDATE sellers SET items_sold = items_sold + %s WHERE seller_id = %s",
+                statements.ADD_ITEMS_SOLD,
                 (request.quantity, seller_id),
                 fetch=False
             )
         return database_pb2.Empty()
 
-def serve():
-    server = grpc.server(futures.ThreadPoolExecutor(max_workers=10))
-    database_pb2_grpc.add_DatabaseServiceServicer_to_server(DatabaseServiceServicer(), server)
+    def Checkout(self, request, context):
+        # Whole saved cart in one product-DB transaction (see buyer_repository.checkout_saved_cart);
+        # a card in the request is charged inside it, so a failed checkout is never charged
+        authorize = card_authorizer(request.card) if request.HasField("card") else None
+        try:
+            if request.validate_only:
+                lines = buyer_repository.list_saved_cart_with_stock(self.product_db, request.buyer_id)
+                if not lines:
+                    raise ValueError("CART_NOT_SAVED")
+                buyer_repository.check_cart_stock(lines)
+                items = [database_pb2.CartItem(item_id=r[0], quantity=r[1]) for r in lines]
+                return database_pb2.CheckoutResponse(items=items)
+            purchased = buyer_repository.checkout_saved_cart(self.product_db, request.buyer_id, authorize)
+        except ValueError as e:
+            context.abort(grpc.StatusCode.FAILED_PRECONDITION, str(e))
+        except PaymentServiceUnavailable as e:
+            context.abort(grpc.StatusCode.UNAVAILABLE, f"PAYMENT_SERVICE_UNAVAILABLE:{e}")
+        buyer_repository.record_purchase_counts(self.customer_db, request.buyer_id, purchased)
+        items = [database_pb2.CartItem(item_id=r[0], quantity=r[1]) for r in purchased]
+        return database_pb2.CheckoutResponse(items=items)
+
+def serve(max_workers: int = 10, metrics_port: int | None = None):
+    if metrics_port:
+        start_metrics_server(metrics_port)
+    server = grpc.server(
+        futures.ThreadPoolExecutor(max_workers=max_workers),
+        interceptors=[GrpcMetricsInterceptor()],
+    )
+    servicer = DatabaseServiceServicer()
+    database_pb2_grpc.add_DatabaseServiceServicer_to_server(servicer, server)
     port = os.getenv("DB_SERVICE_PORT", "50051")
     bind_addr = os.getenv("DB_SERVICE_BIND", f"0.0.0.0:{port}")
     server.add_insecure_port(bind_addr)
-    print(f"Database gRPC Service starting on {bind_addr}...")
+    logger.info("Database gRPC Service starting on %s...", bind_addr)
     server.start()
-    server.wait_for_termination()
+    try:
+        server.wait_for_termination()
+    finally:
+        server.stop(grace=5).wait()
+        servicer.close()
 
 if __name__ == '__main__':
-    serve()
+    import argparse
+    parser = argparse.ArgumentParser(description="Run the gRPC database service.")
+    parser.add_argument("--engine", choices=("thread", "aio"), default="thread",
+                        help="thread pool + psycopg2 (default) or grpc.aio + async psycopg 3 pool")
+    parser.add_argument("--max-workers", type=int, default=10, help="RPC threads for --engine thread")
+    parser.add_argument("--metrics-port", type=int, default=int(os.getenv("DB_SERVICE_METRICS_PORT", "0")),
+                        help="serve Prometheus metrics at http://0.0.0.0:PORT/metrics (0 = off)")
+    args = parser.parse_args()
+    configure_logging()
+    if args.engine == "aio":
+        import asyncio
+        from server_side.db_service_aio import serve_aio
+        asyncio.run(serve_aio(args.metrics_port))
+    else:
+        serve(args.max_workers, args.metrics_port)
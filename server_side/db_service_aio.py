@@ -0,0 +1,493 @@
+import asyncio
+import logging
+import os
+import grpc
+
+# Add generated directory to sys.path
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'generated'))
+# Ensure repo root is on path for server_side imports
+from pathlib import Path
+REPO_ROOT = Path(__file__).resolve().parent.parent
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from protos import database_pb2
+from protos import database_pb2_grpc
+from server_side.buyer_interface import buyer_repository
+from server_side.data_access_layer import statements
+from server_side.data_access_layer.async_db import AsyncDatabase_Connection
+from server_side.data_access_layer.credentials import AsyncCredentials, CredentialsBusy, close_hash_pool
+from server_side.data_access_layer.item_cache import AsyncItemCache
+from server_side.data_access_layer.search_cache import AsyncSearchCache
+from server_side.data_access_layer.session_cache import AsyncSessionCache
+from server_side.data_access_layer.session_reaper import AsyncSessionReaper
+from server_side.common.metrics import AsyncGrpcMetricsInterceptor, start_metrics_server
+from server_side.common.payment import PaymentServiceUnavailable, card_authorizer
+from server_side.common.logging_config import configure_logging
+
+try:
+    from dotenv import load_dotenv
+    load_dotenv()
+except Exception:
+    pass
+
+logger = logging.getLogger(__name__)
+
+
+def _item(r):
+    return database_pb2.Item(
+        item_id=r[0], item_name=r[1], category=r[2], keywords=r[3],
+        condition_is_new=r[4], price=float(r[5]), quantity=r[6], seller_id=r[7]
+    )
+
+
+class AsyncDatabaseServiceServicer(database_pb2_grpc.DatabaseServiceServicer):
+    """
+    grpc.aio implementation of DatabaseService on an async Postgres pool.
+
+    Same RPC semantics and SQL as DatabaseServiceServicer, but no RPC holds a
+    thread while it waits on Postgres, so hundreds can be in flight at once.
+    Call `await start()` before serving.
+    """
+
+    def __init__(self):
+        self.customer_db = AsyncDatabase_Connection(
+            os.getenv("CUSTOMER_DB_NAME", "customer-database"),
+            host=os.getenv("CUSTOMER_PGHOST") or os.getenv("PGHOST", "localhost"),
+            port=int(os.getenv("CUSTOMER_PGPORT") or os.getenv("PGPORT", "5434")),
+            user=os.getenv("CUSTOMER_PGUSER") or os.getenv("PGUSER", "postgres"),
+            password=os.getenv("CUSTOMER_PGPASSWORD") or os.getenv("PGPASSWORD"),
+            replicas=os.getenv("CUSTOMER_PGREPLICAS"),
+        )
+        self.product_db = AsyncDatabase_Connection(
+            os.getenv("PRODUCT_DB_NAME", "product-database"),
+            host=os.getenv("PRODUCT_PGHOST") or os.getenv("PGHOST", "localhost"),
+            port=int(os.getenv("PRODUCT_PGPORT") or os.getenv("PGPORT", "5434")),
+            user=os.getenv("PRODUCT_PGUSER") or os.getenv("PGUSER", "postgres"),
+            password=os.getenv("PRODUCT_PGPASSWORD") or os.getenv("PGPASSWORD"),
+            replicas=os.getenv("PRODUCT_PGREPLICAS"),
+        )
+        self.credentials = AsyncCredentials(self.customer_db)
+        self.sessions = AsyncSessionCache(self.customer_db)
+        self.items = AsyncItemCache(self.product_db)
+        self.searches = AsyncSearchCache(self.product_db)
+        self.reaper = AsyncSessionReaper(self.customer_db, self.product_db)
+
+    async def start(self):
+        await self.customer_db.open()
+        await self.product_db.open()
+        self.sessions.start()
+        self.reaper.start()
+
+    async def close(self):
+        await self.reaper.close()
+        await self.sessions.close()
+        await self.searches.close()
+        close_hash_pool()
+        await self.customer_db.close()
+        await self.product_db.close()
+
+    # --- Account / Session Operations ---
+    async def CreateAccount(self, request, context):
+        role = "buyer" if request.role == "buyer" else "seller"
+
+        try:
+            user_id = await self.credentials.create_account(role, request.username, request.password)
+        except CredentialsBusy as e:
+            await context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED, str(e))
+        except Exception as e:
+            await context.abort(grpc.StatusCode.ALREADY_EXISTS, str(e))
+        return database_pb2.CreateAccountResponse(user_id=user_id or 0)
+
+    async def AuthenticateUser(self, request, context):
+        role = "buyer" if request.role == "buyer" else "seller"
+
+        # Password checked in the hashing pool (or the verified-credential cache), then one session insert
+        try:
+            row = await self.credentials.login(role, request.username, request.password)
+        except CredentialsBusy as e:
+            await context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED, str(e))
+        if row is None:
+            await context.abort(grpc.StatusCode.UNAUTHENTICATED, "Invalid username or password")
+
+        session_id, user_id = row
+        self.sessions.add(session_id, user_id, role)
+        return database_pb2.AuthenticateResponse(user_id=user_id, session_id=session_id)
+
+    async def VerifySession(self, request, context):
+        row = await self.sessions.verify(request.session_id)
+        if not row:
+            await context.abort(grpc.StatusCode.UNAUTHENTICATED, "Session invalid or expired")
+
+        user_id, role = row
+        return database_pb2.VerifySessionResponse(user_id=user_id, role=role)
+
+    async def DeleteSessions(self, request, context):
+        if request.scope == "all":
+            await self.customer_db.execute(
+                statements.DELETE_USER_SESSIONS,
+                (request.user_id, request.role),
+                fetch=False
+            )
+            self.sessions.invalidate_user(request.user_id, request.role)
+        else:
+            await self.customer_db.execute(
+                statements.DELETE_SESSION,
+                (request.session_id,),
+                fetch=False
+            )
+            self.sessions.invalidate(request.session_id)
+        return database_pb2.Empty()
+
+    # --- Item Operations ---
+    async def _search_page(self, request, cursor, context):
+        try:
+            rows, next_cursor = await self.searches.search(
+                request.category or None, request.keywords, cursor, request.limit, in_stock_only=True
+            )
+        except ValueError as e:
+            await context.abort(grpc.StatusCode.INVALID_ARGUMENT, str(e))
+        return database_pb2.SearchItemsResponse(items=[_item(r) for r in rows], next_cursor=next_cursor or "")
+
+    async def SearchItems(self, request, context):
+        return await self._search_page(request, request.cursor, context)
+
+    async def StreamSearchItems(self, request, context):
+        cursor = request.cursor
+        while not context.done():
+            page = await self._search_page(request, cursor, context)
+            yield page
+            if not page.next_cursor:
+                return
+            cursor = page.next_cursor
+
+    async def GetItem(self, request, context):
+        row = await self.items.get(request.item_id)
+        if row is None:
+            await context.abort(grpc.StatusCode.NOT_FOUND, "Item not found")
+        return _item(row)
+
+    async def GetItems(self, request, context):
+        if len(request.item_ids) > statements.BATCH_MAX_ITEMS:
+            await context.abort(grpc.StatusCode.INVALID_ARGUMENT, f"at most {statements.BATCH_MAX_ITEMS} item ids")
+        if request.fresh:
+            found = await self.product_db.execute(statements.GET_ITEMS, (list(request.item_ids),), fetch=True)
+            rows = {r[0]: r for r in found}
+        else:
+            rows = await self.items.get_many(request.item_ids)
+        items = [_item(rows[i]) for i in dict.fromkeys(request.item_ids) if i in rows]
+        return database_pb2.SearchItemsResponse(items=items)
+
+    async def RegisterItem(self, request, context):
+        condition_is_new = request.condition.lower() in ("new", "brand new", "mint")
+        rows = await self.product_db.execute(
+            statements.REGISTER_ITEM,
+            (request.item_name, request.category, list(request.keywords), condition_is_new, request.price, request.quantity, request.seller_id),
+            fetch=True,
+            session=("seller", request.seller_id),
+        )
+        item_id = rows[0][0] if rows else 0
+        if item_id:
+            await self.items.invalidate(item_id)
+            self.searches.invalidate_category(request.category)
+        return database_pb2.RegisterItemResponse(item_id=item_id)
+
+    async def UpdateItemPrice(self, request, context):
+        rows = await self.product_db.execute(
+            statements.UPDATE_ITEM_PRICE,
+            (request.price, request.item_id, request.seller_id),
+            fetch=True,
+            session=("seller", request.seller_id),
+        )
+        if not rows:
+            await context.abort(grpc.StatusCode.NOT_FOUND, "Item not found or unauthorized")
+        await self.items.invalidate(request.item_id)
+        self.searches.invalidate_category(rows[0][1])
+        return database_pb2.Empty()
+
+    async def UpdateItemQuantity(self, request, context):
+        rows = await self.product_db.execute(
+            statements.GET_OWNED_ITEM_QUANTITY,
+            (request.item_id, request.seller_id),
+            fetch=True
+        )
+        if not rows:
+            await context.abort(grpc.StatusCode.NOT_FOUND, "Item not found or unauthorized")
+
+        new_qty = rows[0][0] - request.quantity_delta
+        if new_qty < 0:
+            await context.abort(grpc.StatusCode.FAILED_PRECONDITION, "Insufficient quantity")
+
+        await self.product_db.execute(
+            statements.SET_OWNED_ITEM_QUANTITY,
+            (new_qty, request.item_id, request.seller_id),
+            fetch=False,
+            session=("seller", request.seller_id),
+        )
+        await self.items.invalidate(request.item_id)
+        self.searches.invalidate_category(rows[0][1])
+        return database_pb2.UpdateItemQuantityResponse(new_quantity=new_qty)
+
+    async def GetItemsBySeller(self, request, context):
+        rows = await self.product_db.execute(
+            statements.SELLER_ITEMS_WITH_SELLER,
+            (request.seller_id,),
+            fetch=True,
+            replica=True,
+            session=("seller", request.seller_id),
+        ) or []
+        return database_pb2.SearchItemsResponse(items=[_item(r) for r in rows])
+
+    # --- Cart Operations ---
+    async def AddToCart(self, request, context):
+        await self.product_db.execute(
+            statements.ADD_TO_CART,
+            (request.buyer_id, request.session_id, request.item_id, request.quantity),
+            fetch=False,
+            session=("buyer", request.buyer_id),
+        )
+        return database_pb2.Empty()
+
+    async def RemoveFromCart(self, request, context):
+        await self.product_db.execute(
+            statements.DELETE_CART_ITEM,
+            (request.buyer_id, request.session_id, request.item_id),
+            fetch=False,
+            session=("buyer", request.buyer_id),
+        )
+        return database_pb2.Empty()
+
+    async def GetCartItemQuantity(self, request, context):
+        row = await self.product_db.execute(
+            statements.CART_ITEM_QUANTITY,
+            (request.buyer_id, request.session_id, request.item_id),
+            fetch=True
+        )
+        qty = row[0][0] if row else 0
+        return database_pb2.QuantityResponse(quantity=qty)
+
+    async def UpdateCartItem(self, request, context):
+        if request.quantity <= 0:
+            await self.product_db.execute(
+                statements.DELETE_CART_ITEM,
+                (request.buyer_id, request.session_id, request.item_id),
+                fetch=False,
+                session=("buyer", request.buyer_id),
+            )
+        else:
+            await self.product_db.execute(
+                statements.SET_CART_ITEM_QUANTITY,
+                (request.quantity, request.buyer_id, request.session_id, request.item_id),
+                fetch=False,
+                session=("buyer", request.buyer_id),
+            )
+        return database_pb2.Empty()
+
+    async def SaveCart(self, request, context):
+        # Move this session's cart to the shared saved cart and clear unsaved carts, in one transaction
+        async with self.product_db.transaction(session=("buyer", request.buyer_id)) as cur:
+            await statements.run_steps_async(cur, buyer_repository.save_cart_steps(request.buyer_id, request.session_id))
+        return database_pb2.Empty()
+
+    async def ClearCart(self, request, context):
+        await self.product_db.execute(
+            statements.CLEAR_SESSION_CART,
+            (request.buyer_id, request.session_id),
+            fetch=False,
+            session=("buyer", request.buyer_id),
+        )
+        return database_pb2.Empty()
+
+    async def ListCart(self, request, context):
+        rows = await self.product_db.execute(
+            statements.LIST_SESSION_CART,
+            (request.buyer_id, request.session_id),
+            fetch=True,
+            replica=True,
+            session=("buyer", request.buyer_id),
+        ) or []
+        items = [database_pb2.CartItem(item_id=r[0], quantity=r[1]) for r in rows]
+        return database_pb2.CartListResponse(items=items)
+
+    async def DeleteUnsavedCart(self, request, context):
+        await self.product_db.execute(
+            statements.CLEAR_SESSION_CART,
+            (request.buyer_id, request.session_id),
+            fetch=False,
+            session=("buyer", request.buyer_id),
+        )
+        return database_pb2.Empty()
+
+    async def ListSavedCart(self, request, context):
+        rows = await self.product_db.execute(
+            statements.LIST_SAVED_CART,
+            (request.buyer_id,),
+            fetch=True
+        ) or []
+        items = [database_pb2.CartItem(item_id=r[0], quantity=r[1]) for r in rows]
+        return database_pb2.CartListResponse(items=items)
+
+    async def ClearSavedCart(self, request, context):
+        await self.product_db.execute(
+            statements.CLEAR_SAVED_CART,
+            (request.buyer_id,),
+            fetch=False,
+            session=("buyer", request.buyer_id),
+        )
+        return database_pb2.Empty()
+
+    async def AddToCartBatch(self, request, context):
+        if len(request.items) > statements.BATCH_MAX_ITEMS:
+            await context.abort(grpc.StatusCode.INVALID_ARGUMENT, f"at most {statements.BATCH_MAX_ITEMS} cart lines")
+        if request.items:
+            await self.product_db.execute(
+                statements.ADD_TO_CART_BATCH,
+                (request.buyer_id, request.session_id,
+                 [i.item_id for i in request.items], [i.quantity for i in request.items]),
+                fetch=False,
+                session=("buyer", request.buyer_id),
+            )
+        return database_pb2.Empty()
+
+    async def UpdateCartBatch(self, request, context):
+        if len(request.items) > statements.BATCH_MAX_ITEMS:
+            await context.abort(grpc.StatusCode.INVALID_ARGUMENT, f"at most {statements.BATCH_MAX_ITEMS} cart lines")
+        if request.items:
+            await self.product_db.execute(
+                statements.UPDATE_CART_BATCH,
+                (request.buyer_id, request.session_id,
+                 [i.item_id for i in request.items], [i.quantity for i in request.items]),
+                fetch=False,
+                session=("buyer", request.buyer_id),
+            )
+        return database_pb2.Empty()
+
+    # --- Feedback / Rating ---
+    async def ProvideFeedback(self, request, context):
+        rows = await self.product_db.execute(statements.GET_ITEM_SELLER, (request.item_id,), fetch=True)
+        if not rows:
+            await context.abort(grpc.StatusCode.NOT_FOUND, "Item not found")
+        seller_id = rows[0][0]
+
+        idx = 1 if request.is_positive else 2
+        await self.product_db.execute(
+            statements.ITEM_FEEDBACK[idx],
+            (request.item_id,),
+            fetch=False
+        )
+        await self.customer_db.execute(
+            statements.SELLER_FEEDBACK_INCREMENT[idx],
+            (seller_id,),
+            fetch=False,
+            session=("seller", seller_id),
+        )
+        return database_pb2.Empty()
+
+    async def GetSellerRating(self, request, context):
+        rows = await self.customer_db.execute(
+            statements.SELLER_FEEDBACK,
+            (request.seller_id,),
+            fetch=True,
+            replica=True,
+            session=("seller", request.seller_id),
+        )
+        if not rows:
+            return database_pb2.SellerRatingResponse(pos=0, neg=0)
+        feedback = rows[0][0]
+        return database_pb2.SellerRatingResponse(pos=feedback[0], neg=feedback[1])
+
+    # --- Purchases ---
+    async def GetPurchaseHistory(self, request, context):
+        rows = await self.product_db.execute(
+            statements.BUYER_PURCHASES_UNORDERED,
+            (request.buyer_id,),
+            fetch=True,
+            replica=True,
+            session=("buyer", request.buyer_id),
+        ) or []
+        records = [database_pb2.PurchaseRecord(item_id=r[0], quantity=r[1], purchased_at=str(r[2])) for r in rows]
+        return database_pb2.PurchaseHistoryResponse(records=records)
+
+    async def CreatePurchase(self, request, context):
+        await self.product_db.execute(
+            statements.CREATE_PURCHASE,
+            (request.buyer_id, request.item_id, request.quantity),
+            fetch=False,
+            session=("buyer", request.buyer_id),
+        )
+        await self.customer_db.execute(
+            statements.ADD_ITEMS_PURCHASED,
+            (request.quantity, request.buyer_id),
+            fetch=False
+        )
+        rows = await self.product_db.execute(statements.GET_ITEM_SELLER, (request.item_id,), fetch=True)
+        if rows:
+            await self.customer_db.execute(
+                statements.ADD_ITEMS_SOLD,
+                (request.quantity, rows[0][0]),
+                fetch=False
+            )
+        return database_pb2.Empty()
+
+    async def Checkout(self, request, context):
+        # Same statements as buyer_repository.checkout_saved_cart / record_purchase_counts
+        if request.validate_only:
+            lines = await self.product_db.execute(
+                statements.LIST_SAVED_CART_WITH_STOCK,
+                (request.buyer_id,),
+                fetch=True
+            ) or []
+            try:
+                if not lines:
+                    raise ValueError("CART_NOT_SAVED")
+                buyer_repository.check_cart_stock(lines)
+            except ValueError as e:
+                await context.abort(grpc.StatusCode.FAILED_PRECONDITION, str(e))
+            items = [database_pb2.CartItem(item_id=r[0], quantity=r[1]) for r in lines]
+            return database_pb2.CheckoutResponse(items=items)
+
+        authorize = card_authorizer(request.card) if request.HasField("card") else None
+        try:
+            purchased = await self._checkout_saved_cart(request.buyer_id, authorize)
+        except ValueError as e:
+            await context.abort(grpc.StatusCode.FAILED_PRECONDITION, str(e))
+        except PaymentServiceUnavailable as e:
+            await context.abort(grpc.StatusCode.UNAVAILABLE, f"PAYMENT_SERVICE_UNAVAILABLE:{e}")
+        await self.items.invalidate(*(r[0] for r in purchased))
+        async with self.customer_db.transaction() as cur:
+            await statements.run_steps_async(cur, buyer_repository.purchase_count_steps(request.buyer_id, purchased))
+        items = [database_pb2.CartItem(item_id=r[0], quantity=r[1]) for r in purchased]
+        return database_pb2.CheckoutResponse(items=items)
+
+    async def _checkout_saved_cart(self, buyer_id: int, authorize=None):
+        async with self.product_db.transaction(session=("buyer", buyer_id)) as cur:
+            purchased = await statements.run_steps_async(cur, buyer_repository.checkout_steps(buyer_id))
+            # zeep is blocking; the payment runs on a thread while the transaction stays open
+            if authorize is not None and not await asyncio.to_thread(authorize):
+                raise ValueError("PAYMENT_DECLINED")
+        return purchased
+
+
+async def serve_aio(metrics_port: int | None = None):
+    if metrics_port:
+        start_metrics_server(metrics_port)
+    servicer = AsyncDatabaseServiceServicer()
+    await servicer.start()
+    server = grpc.aio.server(interceptors=[AsyncGrpcMetricsInterceptor()])
+    database_pb2_grpc.add_DatabaseServiceServicer_to_server(servicer, server)
+    port = os.getenv("DB_SERVICE_PORT", "50051")
+    bind_addr = os.getenv("DB_SERVICE_BIND", f"0.0.0.0:{port}")
+    server.add_insecure_port(bind_addr)
+    logger.info("Database gRPC Service (asyncio) starting on %s...", bind_addr)
+    await server.start()
+    try:
+        await server.wait_for_termination()
+    finally:
+        await server.stop(grace=5)
+        await servicer.close()
+
+
+if __name__ == '__main__':
+    configure_logging()
+    asyncio.run(serve_aio())
@@ -1,19 +1,37 @@
+import logging
 import os
 import random
+import sys
+from pathlib import Path
 from spyne import Application, rpc, ServiceBase, Unicode, Boolean
 from spyne.protocol.soap import Soap11
 from spyne.server.wsgi import WsgiApplication
-from wsgiref.simple_server import make_server
+from wsgiref.simple_server import WSGIRequestHandler, make_server
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from server_side.common.logging_config import configure_logging
+
+logger = logging.getLogger(__name__)
 
 class FinancialTransactionService(ServiceBase):
     @rpc(Unicode, Unicode, Unicode, Unicode, _returns=Boolean)
     def AuthorizePayment(self, username, card_number, expiration_date, security_code):
-        print(f"Auth request for {username} (Card: {card_number})")
+        # Never log the card number itself
+        logger.debug("Auth request for %s (card ending %s)", username, (card_number or "")[-4:])
         # 90% probability of Success
         approved = random.random() < 0.9
         # Stateless: no DB persistence for financial transactions
         return approved
 
+class _QuietHandler(WSGIRequestHandler):
+    # wsgiref writes an access line to stderr per request; send it through logging at DEBUG
+    def log_message(self, format, *args):
+        logger.debug("%s %s", self.address_string(), format % args)
+
+
 application = Application(
     [FinancialTransactionService],
     tns='marketplace.financial.soap',
@@ -22,8 +40,9 @@ application = Application(
 )
 
 if __name__ == '__main__':
+    configure_logging()
     wsgi_app = WsgiApplication(application)
-    server = make_server('0.0.0.0', 8002, wsgi_app)
-    print("SOAP Financial Service starting on port 8002...")
-    print("WSDL is available at: http://localhost:8002/?wsdl")
+    server = make_server('0.0.0.0', 8002, wsgi_app, handler_class=_QuietHandler)
+    logger.info("SOAP Financial Service starting on port 8002...")
+    logger.info("WSDL is available at: http://localhost:8002/?wsdl")
     server.serve_forever()
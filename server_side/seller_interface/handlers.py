@@ -1,7 +1,12 @@
 import os
 from typing import Any, Dict, Iterable, Tuple
 
+from server_side.data_access_layer import statements
+from server_side.data_access_layer.credentials import get_credentials
 from server_side.data_access_layer.db import Database_Connection
+from server_side.data_access_layer.item_cache import get_item_cache
+from server_side.data_access_layer.search_cache import get_search_cache
+from server_side.data_access_layer.session_cache import get_session_cache
 
 # "single", "all" - determines whether logout invalidates only the current session or all sessions
 LOGOUT_SCOPE = os.getenv("LOGOUT_SCOPE", "single").lower()
@@ -27,16 +32,18 @@ def _fetch_one(db: Database_Connection, query: str, params: Tuple[Any, ...]):
 def _delete_sessions(db: Database_Connection, session_id: str, user_id: int, role: str):
     if LOGOUT_SCOPE == "all":
         db.execute(
-            "DELETE FROM sessions WHERE user_id = %s AND role = %s",
+            statements.DELETE_USER_SESSIONS,
             (user_id, role),
             fetch=False,
         )
+        get_session_cache(db).invalidate_user(user_id, role)
     else:  # default to single-session logout
         db.execute(
-            "DELETE FROM sessions WHERE session_id = %s",
+            statements.DELETE_SESSION,
             (session_id,),
             fetch=False,
         )
+        get_session_cache(db).invalidate(session_id)
 
 
 def handle_create_account(request: Dict[str, Any], dbs: Dict[str, Database_Connection]) -> Dict[str, Any]:
@@ -46,14 +53,7 @@ def handle_create_account(request: Dict[str, Any], dbs: Dict[str, Database_Conne
     password = payload["password"]
 
     customer_db = _get_db(dbs, "customer")
-
-    rows = customer_db.execute(
-        "INSERT INTO sellers (username, password) VALUES (%s, %s) RETURNING seller_id",
-        (username, password),
-        fetch=True,
-    )
-
-    seller_id = rows[0][0] if rows else None
+    seller_id = get_credentials(customer_db).create_account("seller", username, password)
 
     return {"seller_id": seller_id}
 
@@ -65,30 +65,13 @@ def handle_login(request: Dict[str, Any], dbs: Dict[str, Database_Connection]) -
 
     customer_db = _get_db(dbs, "customer")
 
-    rows = customer_db.execute(
-        "SELECT seller_id FROM sellers WHERE username = %s AND password = %s",
-        (username, password),
-        fetch=True,
-    )
-
-    if not rows:
+    # Password checked in the hashing pool (or the verified-credential cache), then one session insert
+    row = get_credentials(customer_db).login("seller", username, password)
+    if row is None:
         raise ValueError("invalid username or password")
-    
-    seller_id = rows[0][0]
 
-    customer_db.execute(
-        "INSERT INTO sessions (role, user_id, last_access_timestamp) VALUES (%s, %s, NOW())",
-        ("seller", seller_id),
-        fetch=False,
-    )
-
-    rows = customer_db.execute(
-        "SELECT session_id FROM sessions WHERE role = %s AND user_id = %s ORDER BY last_access_timestamp DESC LIMIT 1",
-        ("seller", seller_id),
-        fetch=True,
-    )
-
-    session_id = rows[0][0] if rows else None
+    session_id, seller_id = row
+    get_session_cache(customer_db).add(session_id, seller_id, "seller")
 
     return {"session_id": session_id, "seller_id": seller_id}
 
@@ -101,7 +84,7 @@ def handle_logout(request: Dict[str, Any], dbs: Dict[str, Database_Connection])
     db = _get_db(dbs, "customer")
 
     rows = db.execute(
-        "SELECT user_id, role FROM sessions WHERE session_id = %s",
+        statements.SESSION_OWNER,
         (session_id,),
         fetch=True,
     )
@@ -126,9 +109,11 @@ def handle_get_seller_rating(request: Dict[str, Any], dbs: Dict[str, Database_Co
 
     customer_db = _get_db(dbs, "customer")
     rows = customer_db.execute(
-        "SELECT seller_feedback FROM sellers WHERE seller_id = %s",
+        statements.SELLER_FEEDBACK,
         (seller_id,),
         fetch=True,
+        replica=True,
+        session=("seller", seller_id),
     )
     rating = None
     if rows:
@@ -146,31 +131,16 @@ def _require_seller_session(dbs: Dict[str, Database_Connection], session_id: str
     if not session_id:
         raise ValueError("session_id required")
     customer_db = _get_db(dbs, "customer")
-    
-    # Use the same Atomic Touch logic here
-    rows = customer_db.execute(
-        """
-        UPDATE sessions 
-        SET last_access_timestamp = NOW() 
-        WHERE session_id = %s 
-          AND last_access_timestamp > NOW() - INTERVAL '5 minutes'
-        RETURNING user_id, role
-        """,
-        (session_id,),
-        fetch=True,
-    )
-    
-    if not rows:
-        # If no rows are returned, it means the session either 
-        # didn't exist OR it was older than 5 minutes.
+
+    # Served from the session cache; misses fall back to the atomic touch in the DB
+    row = get_session_cache(customer_db).verify(session_id)
+
+    if not row:
+        # The session either didn't exist OR it was older than 5 minutes.
         raise ValueError("session invalid or expired")
-        
-    user_id, role = rows[0]
-    
-    # Convert role from DB format if necessary (Postgres might return it as bytes)
-    if isinstance(role, (memoryview, bytes)):
-        role = role.tobytes().decode("utf-8") if isinstance(role, memoryview) else role.decode("utf-8")
-        
+
+    user_id, role = row
+
     if role != "seller":
         raise ValueError("invalid role for this operation")
         
@@ -198,16 +168,16 @@ def handle_register_item_for_sale(request: Dict[str, Any], dbs: Dict[str, Databa
     condition_is_new = condition in ("new", "brand new", "mint")
 
     rows = product_db.execute(
-        """
-        INSERT INTO items (item_name, category, keywords, condition_is_new, sale_price, quantity, seller_id)
-        VALUES (%s, %s, %s, %s, %s, %s, %s)
-        RETURNING item_id
-        """,
+        statements.REGISTER_ITEM,
         (item_name, category, keywords, condition_is_new, price, quantity, seller_id),
         fetch=True,
+        session=("seller", seller_id),
     )
 
     item_id = rows[0][0] if rows else None
+    if item_id is not None:
+        get_item_cache(product_db).invalidate(item_id)
+        get_search_cache(product_db).invalidate_category(category)
     return {"item_id": item_id}
 
 
@@ -222,12 +192,15 @@ def handle_change_item_price(request: Dict[str, Any], dbs: Dict[str, Database_Co
     product_db = _get_db(dbs, "product")
 
     rows = product_db.execute(
-        "UPDATE items SET sale_price = %s WHERE item_id = %s AND seller_id = %s RETURNING item_id",
+        statements.UPDATE_ITEM_PRICE,
         (new_price, item_id, seller_id),
         fetch=True,
+        session=("seller", seller_id),
     )
     if not rows:
         raise ValueError("item not found or not owned by seller")
+    get_item_cache(product_db).invalidate(item_id)
+    get_search_cache(product_db).invalidate_category(rows[0][1])
 
     return {"status": "success"}
 
@@ -243,7 +216,7 @@ def handle_update_units_for_sale(request: Dict[str, Any], dbs: Dict[str, Databas
     product_db = _get_db(dbs, "product")
 
     rows = product_db.execute(
-        "SELECT quantity FROM items WHERE item_id = %s AND seller_id = %s",
+        statements.GET_OWNED_ITEM_QUANTITY,
         (item_id, seller_id),
         fetch=True,
     )
@@ -257,10 +230,13 @@ def handle_update_units_for_sale(request: Dict[str, Any], dbs: Dict[str, Databas
         raise ValueError("INSUFFICIENT_QUANTITY")
 
     product_db.execute(
-        "UPDATE items SET quantity = %s WHERE item_id = %s AND seller_id = %s",
+        statements.SET_OWNED_ITEM_QUANTITY,
         (new_qty, item_id, seller_id),
         fetch=False,
+        session=("seller", seller_id),
     )
+    get_item_cache(product_db).invalidate(item_id)
+    get_search_cache(product_db).invalidate_category(rows[0][1])
 
     return {"status": "success", "quantity": new_qty}
 
@@ -272,9 +248,11 @@ def handle_display_items_for_sale(request: Dict[str, Any], dbs: Dict[str, Databa
     product_db = _get_db(dbs, "product")
 
     rows = product_db.execute(
-        "SELECT item_id, item_name, category, keywords, condition_is_new, sale_price, quantity FROM items WHERE seller_id = %s",
+        statements.SELLER_ITEMS,
         (seller_id,),
         fetch=True,
+        replica=True,
+        session=("seller", seller_id),
     ) or []
 
     items = [
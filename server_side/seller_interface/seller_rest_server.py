@@ -1,5 +1,7 @@
 import os
 import sys
+from contextlib import asynccontextmanager
+
 import grpc
 from typing import List, Optional
 from fastapi import FastAPI, Header, HTTPException, Body
@@ -12,12 +14,32 @@ sys.path.append(os.path.join(REPO_ROOT, 'generated'))
 from protos import database_pb2
 from protos import database_pb2_grpc
 
-app = FastAPI(title="Marketplace Seller API")
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+from server_side.common.logging_config import configure_logging
+from server_side.common.metrics import instrument_app
+
+configure_logging()
 
-# gRPC Setup
+# gRPC Setup: one grpc.aio channel per process, opened/closed with the app
 DB_SERVICE_ADDR = os.getenv("DB_SERVICE_ADDR", "localhost:50051")
-channel = grpc.insecure_channel(DB_SERVICE_ADDR)
-db_stub = database_pb2_grpc.DatabaseServiceStub(channel)
+db_stub: Optional[database_pb2_grpc.DatabaseServiceStub] = None
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global db_stub
+    channel = grpc.aio.insecure_channel(DB_SERVICE_ADDR)
+    db_stub = database_pb2_grpc.DatabaseServiceStub(channel)
+    try:
+        yield
+    finally:
+        db_stub = None
+        await channel.close()
+
+
+app = FastAPI(title="Marketplace Seller API", lifespan=lifespan)
+instrument_app(app, "rest_seller")
 
 # --- Models ---
 class CreateAccountModel(BaseModel):
@@ -43,11 +65,11 @@ class UpdateQuantityModel(BaseModel):
     quantity_delta: int
 
 # --- Helpers ---
-def verify_session(session_id: str):
+async def verify_session(session_id: str):
     if not session_id:
         raise HTTPException(status_code=401, detail="Session ID required")
     try:
-        resp = db_stub.VerifySession(database_pb2.VerifySessionRequest(session_id=session_id))
+        resp = await db_stub.VerifySession(database_pb2.VerifySessionRequest(session_id=session_id))
         return resp.user_id, resp.role
     except grpc.RpcError as e:
         if e.code() == grpc.StatusCode.UNAUTHENTICATED:
@@ -57,45 +79,49 @@ def verify_session(session_id: str):
 # --- Endpoints ---
 
 @app.post("/seller/account")
-def create_account(data: CreateAccountModel):
+async def create_account(data: CreateAccountModel):
     try:
-        resp = db_stub.CreateAccount(database_pb2.CreateAccountRequest(
+        resp = await db_stub.CreateAccount(database_pb2.CreateAccountRequest(
             role="seller", username=data.username, password=data.password
         ))
         return {"seller_id": resp.user_id}
     except grpc.RpcError as e:
+        if e.code() == grpc.StatusCode.RESOURCE_EXHAUSTED:
+            raise HTTPException(status_code=503, detail="Server busy, retry later")
         raise HTTPException(status_code=400, detail=e.details())
 
 @app.post("/seller/login")
-def login(data: LoginModel):
+async def login(data: LoginModel):
     try:
-        resp = db_stub.AuthenticateUser(database_pb2.AuthenticateRequest(
+        resp = await db_stub.AuthenticateUser(database_pb2.AuthenticateRequest(
             role="seller", username=data.username, password=data.password
         ))
         return {"session_id": resp.session_id, "seller_id": resp.user_id}
     except grpc.RpcError as e:
+        if e.code() == grpc.StatusCode.RESOURCE_EXHAUSTED:
+            raise HTTPException(status_code=503, detail="Server busy, retry later")
         raise HTTPException(status_code=401, detail=e.details())
 
 @app.post("/seller/logout")
-def logout(x_session_id: str = Header(None)):
-    user_id, role = verify_session(x_session_id)
-    db_stub.DeleteSessions(database_pb2.DeleteSessionsRequest(
+async def logout(x_session_id: str = Header(None)):
+    user_id, role = await verify_session(x_session_id)
+    await db_stub.DeleteSessions(database_pb2.DeleteSessionsRequest(
         session_id=x_session_id, user_id=user_id, role=role, scope="single"
     ))
     return {"status": "success"}
 
 @app.get("/seller/rating")
-def get_seller_rating(x_session_id: str = Header(None)):
-    user_id, _ = verify_session(x_session_id)
-    resp = db_stub.GetSellerRating(database_pb2.GetSellerRatingRequest(seller_id=user_id))
+async def get_seller_rating(x_session_id: str = Header(None)):
+    user_id, _ = await verify_session(x_session_id)
+    resp = await db_stub.GetSellerRating(database_pb2.GetSellerRatingRequest(seller_id=user_id))
     total = resp.pos + resp.neg
     rating = float(resp.pos) / total if total > 0 else 0.0
     return {"rating": rating, "pos": int(resp.pos), "neg": int(resp.neg)}
 
 @app.post("/seller/items")
-def register_item(data: RegisterItemModel, x_session_id: str = Header(None)):
-    user_id, _ = verify_session(x_session_id)
-    resp = db_stub.RegisterItem(database_pb2.RegisterItemRequest(
+async def register_item(data: RegisterItemModel, x_session_id: str = Header(None)):
+    user_id, _ = await verify_session(x_session_id)
+    resp = await db_stub.RegisterItem(database_pb2.RegisterItemRequest(
         item_name=data.item_name,
         category=data.category,
         keywords=data.keywords,
@@ -107,10 +133,10 @@ def register_item(data: RegisterItemModel, x_session_id: str = Header(None)):
     return {"item_id": resp.item_id}
 
 @app.put("/seller/items/{item_id}/price")
-def update_price(item_id: int, data: UpdatePriceModel, x_session_id: str = Header(None)):
-    user_id, _ = verify_session(x_session_id)
+async def update_price(item_id: int, data: UpdatePriceModel, x_session_id: str = Header(None)):
+    user_id, _ = await verify_session(x_session_id)
     try:
-        db_stub.UpdateItemPrice(database_pb2.UpdateItemPriceRequest(
+        await db_stub.UpdateItemPrice(database_pb2.UpdateItemPriceRequest(
             item_id=item_id, seller_id=user_id, price=data.price
         ))
         return {"status": "success"}
@@ -120,10 +146,10 @@ def update_price(item_id: int, data: UpdatePriceModel, x_session_id: str = Heade
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.put("/seller/items/{item_id}/quantity")
-def update_quantity(item_id: int, data: UpdateQuantityModel, x_session_id: str = Header(None)):
-    user_id, _ = verify_session(x_session_id)
+async def update_quantity(item_id: int, data: UpdateQuantityModel, x_session_id: str = Header(None)):
+    user_id, _ = await verify_session(x_session_id)
     try:
-        resp = db_stub.UpdateItemQuantity(database_pb2.UpdateItemQuantityRequest(
+        resp = await db_stub.UpdateItemQuantity(database_pb2.UpdateItemQuantityRequest(
             item_id=item_id, seller_id=user_id, quantity_delta=data.quantity_delta
         ))
         return {"status": "success", "new_quantity": resp.new_quantity}
@@ -135,9 +161,9 @@ def update_quantity(item_id: int, data: UpdateQuantityModel, x_session_id: str =
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/seller/items")
-def display_items(x_session_id: str = Header(None)):
-    user_id, _ = verify_session(x_session_id)
-    resp = db_stub.GetItemsBySeller(database_pb2.GetItemsBySellerRequest(seller_id=user_id))
+async def display_items(x_session_id: str = Header(None)):
+    user_id, _ = await verify_session(x_session_id)
+    resp = await db_stub.GetItemsBySeller(database_pb2.GetItemsBySellerRequest(seller_id=user_id))
     items = []
     for item in resp.items:
         items.append({
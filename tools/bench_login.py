@@ -0,0 +1,259 @@
+"""
+Login-storm benchmark for the session-creation pipeline, straight against Postgres.
+
+Pipelines:
+ - legacy: SELECT the account, INSERT the session, then SELECT the user's latest
+   session (3 round trips; the last one can return a concurrent login's session)
+ - single: statements.LOGIN, credential check + INSERT ... RETURNING (1 round trip)
+ - kdf:    credentials.Credentials.login with the verified-credential cache off:
+   fetch the stored hash, scrypt in the hashing process pool, then statements.LOGIN
+ - cached: credentials.Credentials.login as the DB service runs it; after the
+   first login of an account, a cache hit is statements.LOGIN alone
+
+legacy and single compare the stored hash directly in SQL, i.e. they measure
+the session pipeline without the KDF. kdf and cached are what a login costs now.
+Keep --concurrency at or below PASSWORD_HASH_QUEUE, or kdf logins get
+CredentialsBusy.
+
+`--concurrency` threads each log in `--logins` times as random accounts drawn
+from `--accounts` freshly created buyers, through one Database_Connection pool
+sized to the thread count. Both pipelines run on the same accounts and pool.
+Fewer accounts than threads means the same account logs in concurrently; the
+legacy pipeline then sometimes hands out another login's session, which is
+reported as `wrong_session`.
+
+Metrics (per pipeline):
+ - login latency mean / p50 / p90 / p99 / max
+ - logins per second
+ - wrong_session: logins whose returned session is not the one they created
+
+The accounts and sessions it creates are deleted afterwards.
+
+Prerequisites:
+ - customer database migrated (python database/migrate.py)
+ - same PG* / CUSTOMER_* env as the DB service
+
+Run:
+    python tools/bench_login.py --concurrency 32 --logins 200
+    python tools/bench_login.py --accounts 4 --out results/login.json
+    python tools/bench_login.py --pipelines single,kdf,cached
+"""
+
+from __future__ import annotations
+
+import argparse
+import concurrent.futures
+import json
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+# for `server_side.*` imports resolve
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from loadgen import LatencyHistogram
+from server_side.data_access_layer import statements
+from server_side.data_access_layer.credentials import Credentials, close_hash_pool, hash_password
+from server_side.data_access_layer.session_cache import new_session_id
+
+PASSWORD = "pass123"
+# Hashed once; every benchmark account stores this value
+PASSWORD_HASH = hash_password(PASSWORD)
+# Credentials instances of the kdf / cached pipelines, built in main()
+CREDENTIALS: Dict[str, Credentials] = {}
+
+# The pipeline AuthenticateUser and both login handlers used before statements.LOGIN
+LEGACY_AUTHENTICATE = statements.statement(
+    "bench_legacy_authenticate",
+    "SELECT buyer_id FROM buyers WHERE username = %s AND password = %s",
+)
+LEGACY_CREATE_SESSION = statements.statement(
+    "bench_legacy_create_session",
+    "INSERT INTO sessions (session_id, role, user_id, last_access_timestamp) VALUES (%s, 'buyer', %s, NOW())",
+)
+LEGACY_LATEST_SESSION = statements.statement(
+    "bench_legacy_latest_session",
+    "SELECT session_id FROM sessions WHERE role = 'buyer' AND user_id = %s ORDER BY last_access_timestamp DESC LIMIT 1",
+)
+
+
+# ------------- Pipelines -------------
+
+def login_legacy(db, username: str) -> Tuple[str, str]:
+    """(session created, session returned to the client)."""
+    rows = db.execute(LEGACY_AUTHENTICATE, (username, PASSWORD_HASH), fetch=True)
+    buyer_id = rows[0][0]
+    created = new_session_id()
+    db.execute(LEGACY_CREATE_SESSION, (created, buyer_id))
+    rows = db.execute(LEGACY_LATEST_SESSION, (buyer_id,), fetch=True)
+    return created, rows[0][0]
+
+
+def login_single(db, username: str) -> Tuple[str, str]:
+    created = new_session_id()
+    rows = db.execute(statements.LOGIN["buyer"], (created, username, PASSWORD_HASH), fetch=True)
+    return created, rows[0][0]
+
+
+def login_kdf(db, username: str) -> Tuple[str, str]:
+    session_id, _ = CREDENTIALS["kdf"].login("buyer", username, PASSWORD)
+    return session_id, session_id
+
+
+def login_cached(db, username: str) -> Tuple[str, str]:
+    session_id, _ = CREDENTIALS["cached"].login("buyer", username, PASSWORD)
+    return session_id, session_id
+
+
+PIPELINES: Dict[str, Callable] = {
+    "legacy": login_legacy,
+    "single": login_single,
+    "kdf": login_kdf,
+    "cached": login_cached,
+}
+
+
+# ------------- Runner -------------
+
+def run_pipeline(db, login: Callable, usernames: List[str], concurrency: int, logins: int, seed: int) -> Dict[str, object]:
+    histograms = [LatencyHistogram() for _ in range(concurrency)]
+    wrong = [0] * concurrency
+    start_gate = threading.Barrier(concurrency + 1)
+
+    def worker(idx: int):
+        rng = random.Random(seed + idx)
+        hist = histograms[idx]
+        start_gate.wait()
+        for _ in range(logins):
+            name = rng.choice(usernames)
+            t0 = time.perf_counter()
+            created, returned = login(db, name)
+            hist.record(time.perf_counter() - t0)
+            if returned != created:
+                wrong[idx] += 1
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=concurrency) as pool:
+        futures = [pool.submit(worker, i) for i in range(concurrency)]
+        start_gate.wait()
+        t0 = time.perf_counter()
+        for fut in futures:
+            fut.result()
+        elapsed = time.perf_counter() - t0
+
+    total = LatencyHistogram()
+    for hist in histograms:
+        total.merge(hist)
+    return {
+        **total.to_dict(),
+        "logins_per_s": total.count / elapsed if elapsed > 0 else 0.0,
+        "wrong_session": sum(wrong),
+    }
+
+
+def create_accounts(db, count: int) -> Tuple[List[str], List[int]]:
+    tag = uuid.uuid4().hex[:8]
+    usernames, ids = [], []
+    for i in range(count):
+        name = f"bench_login_{tag}_{i}"
+        rows = db.execute(statements.CREATE_BUYER, (name, PASSWORD_HASH), fetch=True)
+        usernames.append(name)
+        ids.append(rows[0][0])
+    return usernames, ids
+
+
+def cleanup(db, buyer_ids: List[int]):
+    db.execute("DELETE FROM sessions WHERE role = 'buyer' AND user_id = ANY(%s)", (buyer_ids,))
+    db.execute("DELETE FROM buyers WHERE buyer_id = ANY(%s)", (buyer_ids,))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Login-storm benchmark: session pipelines and password checks")
+    parser.add_argument("--concurrency", type=int, default=32, help="threads logging in at once")
+    parser.add_argument("--logins", type=int, default=200, help="logins per thread per pipeline")
+    parser.add_argument("--accounts", type=int, default=64, help="buyer accounts to log in as")
+    parser.add_argument("--warmup", type=int, default=20, help="untimed logins per thread before each pipeline")
+    parser.add_argument("--pipelines", default="legacy,single", help="comma-separated, run in this order")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--out", help="write the JSON result here (default: stdout)")
+    args = parser.parse_args()
+
+    pipelines = [p.strip() for p in args.pipelines.split(",") if p.strip()]
+    unknown = [p for p in pipelines if p not in PIPELINES]
+    if unknown:
+        parser.error(f"unknown pipeline {unknown[0]!r}; choose from {', '.join(PIPELINES)}")
+
+    # One pooled connection per thread, so the pool never adds queueing of its own.
+    os.environ["DB_POOL_MAX"] = str(args.concurrency)
+    from server_side.data_access_layer.db import Database_Connection
+
+    db = Database_Connection(
+        os.getenv("CUSTOMER_DB_NAME", "customer-database"),
+        host=os.getenv("CUSTOMER_PGHOST") or os.getenv("PGHOST", "localhost"),
+        port=int(os.getenv("CUSTOMER_PGPORT") or os.getenv("PGPORT", "5434")),
+        user=os.getenv("CUSTOMER_PGUSER") or os.getenv("PGUSER", "postgres"),
+        password=os.getenv("CUSTOMER_PGPASSWORD") or os.getenv("PGPASSWORD"),
+    )
+    CREDENTIALS["kdf"] = Credentials(db, ttl=0)
+    CREDENTIALS["cached"] = Credentials(db)
+    usernames, buyer_ids = create_accounts(db, args.accounts)
+    results: Dict[str, object] = {}
+    try:
+        for name in pipelines:
+            login = PIPELINES[name]
+            if args.warmup > 0:
+                run_pipeline(db, login, usernames, args.concurrency, args.warmup, args.seed)
+            results[name] = run_pipeline(db, login, usernames, args.concurrency, args.logins, args.seed)
+            r = results[name]
+            print(
+                f"{name:<7} n={r['count']:<6} {r['logins_per_s']:8.1f} logins/s | "
+                f"mean {r['mean_ms']:.2f} p50 {r['p50_ms']:.2f} p90 {r['p90_ms']:.2f} "
+                f"p99 {r['p99_ms']:.2f} max {r['max_ms']:.2f} ms | wrong_session {r['wrong_session']}",
+                file=sys.stderr,
+            )
+    finally:
+        cleanup(db, buyer_ids)
+        db.close()
+        close_hash_pool()
+
+    if "legacy" in results and "single" in results:
+        legacy, single = results["legacy"], results["single"]
+        print(
+            f"single vs legacy: p50 {legacy['p50_ms'] / single['p50_ms']:.2f}x faster, "
+            f"throughput {single['logins_per_s'] / legacy['logins_per_s']:.2f}x",
+            file=sys.stderr,
+        )
+    if "kdf" in results and "cached" in results:
+        kdf, cached = results["kdf"], results["cached"]
+        print(
+            f"cached vs kdf: p99 {kdf['p99_ms']:.2f} -> {cached['p99_ms']:.2f} ms, "
+            f"throughput {cached['logins_per_s'] / kdf['logins_per_s']:.2f}x",
+            file=sys.stderr,
+        )
+
+    text = json.dumps({
+        "config": {
+            "concurrency": args.concurrency,
+            "logins_per_thread": args.logins,
+            "accounts": args.accounts,
+            "warmup_per_thread": args.warmup,
+            "seed": args.seed,
+        },
+        "pipelines": results,
+    }, indent=2)
+    if args.out:
+        out = Path(args.out)
+        out.parent.mkdir(parents=True, exist_ok=True)
+        out.write_text(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,840 @@
+"""
+Open-loop load generator for the marketplace tiers (TCP, REST, gRPC).
+
+Unlike bench.py / bench_part_2.py (closed loop: one thread per client, each
+waiting for its previous call), requests are issued on a fixed schedule at
+`--rate` per second regardless of how fast the server answers. Latency is
+measured from each request's scheduled start, so queueing delay on an
+overloaded server shows up in the percentiles instead of silently lowering
+the offered load (coordinated omission).
+
+Each run has a warmup phase (results discarded) followed by a steady-state
+phase. Requests are drawn from a weighted mix of buyer and seller APIs.
+A few mix entries are short sequences, timed as one request:
+ - logout:   log in as a buyer account kept for this op, then log out. Logout
+             drops the buyer's unsaved carts in every session, so the buyers
+             the other ops use are left alone.
+ - remove_from_cart: remove one unit of an item this session added; when its
+             cart is empty, add one first
+ - purchase: add one item to the cart, save the cart, then check out. On tcp
+             and rest this calls the financial service, so it must be running
+             (its mock declines about 1 in 10 payments, counted as errors);
+             grpc calls Checkout directly, without payment.
+
+Metrics (steady state, overall and per API):
+ - latency p50 / p90 / p99 / p999 / max (scheduled start -> response)
+ - service time percentiles (actual send -> response)
+ - achieved throughput, errors, requests dropped at `--max-inflight`
+
+Prerequisites:
+ - tcp:  buyer/seller TCP servers running (default: localhost:8081 / 8080)
+ - rest: buyer/seller REST servers running (default: localhost:8001 / 8000); needs httpx
+ - grpc: DB service running (default: DB_SERVICE_ADDR or localhost:50051)
+
+Run:
+    python tools/loadgen.py tcp --rate 500 --duration 30 --out results/tcp.json
+    python tools/loadgen.py rest --rate 200 --mix search_items=50,get_item=50
+    python tools/loadgen.py grpc --rate 2000 --connections 16 --arrival poisson
+    python tools/loadgen.py tcp --rate 300 --mix login=100     # login storm (opt-in op)
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import contextlib
+import json
+import math
+import os
+import random
+import sys
+import time
+import uuid
+from collections import Counter
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List
+
+# for `client_side.*` / `server_side.*` imports resolve
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+sys.path.append(str(REPO_ROOT / "generated"))
+
+from client_side.common.protocol import build_request, extract_payload
+from server_side.common.transport import AsyncLengthPrefixedJSONConnection
+
+DEFAULT_MIX = {
+    "search_items": 30,
+    "get_item": 25,
+    "add_to_cart": 10,
+    "display_cart": 10,
+    "seller_rating": 5,
+    "purchases": 5,
+    "display_items": 10,
+    "change_price": 5,
+    "remove_from_cart": 3,
+    "save_cart": 3,
+    "clear_cart": 1,
+    "feedback": 2,
+    "purchase": 2,
+    "logout": 1,
+    "register_item": 1,
+    "update_units": 2,
+}
+# Not in the default mix; ask for them with --mix, e.g. --mix login=100 for a login storm.
+OPT_IN_OPS = {"login"}
+
+PASSWORD = "pass123"
+ITEM_KEYWORDS = ["bench", "load"]
+CARD = {"name": "Load Test", "card_number": "4111111111111111", "expiration_date": "12/30", "security_code": "123"}
+
+
+def _new_item(i: int) -> dict:
+    return {
+        "item_name": f"LoadItem {i}", "category": 1, "keywords": ITEM_KEYWORDS,
+        "condition": "New", "price": 10.0, "quantity": 1_000_000,
+    }
+
+
+# ------------- Histogram -------------
+
+class LatencyHistogram:
+    """
+    Log-bucketed latency histogram: constant memory, ~1% relative error on
+    percentiles regardless of how many samples are recorded.
+    """
+
+    GROWTH = 1.01
+    FLOOR = 1e-6  # seconds; everything below lands in bucket 0
+
+    def __init__(self):
+        self.buckets: Counter = Counter()
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = 0.0
+
+    def record(self, seconds: float):
+        if seconds <= self.FLOOR:
+            idx = 0
+        else:
+            idx = int(math.log(seconds / self.FLOOR, self.GROWTH)) + 1
+        self.buckets[idx] += 1
+        self.count += 1
+        self.total += seconds
+        self.min = min(self.min, seconds)
+        self.max = max(self.max, seconds)
+
+    def merge(self, other: "LatencyHistogram"):
+        self.buckets.update(other.buckets)
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def percentile(self, q: float) -> float:
+        if not self.count:
+            return 0.0
+        rank = max(1, math.ceil(q * self.count))
+        seen = 0
+        for idx in sorted(self.buckets):
+            seen += self.buckets[idx]
+            if seen >= rank:
+                upper = self.FLOOR * self.GROWTH ** idx
+                return min(max(upper, self.min), self.max)
+        return self.max
+
+    def to_dict(self) -> Dict[str, float]:
+        ms = 1000.0
+        return {
+            "count": self.count,
+            "mean_ms": self.total / self.count * ms if self.count else 0.0,
+            "min_ms": self.min * ms if self.count else 0.0,
+            "p50_ms": self.percentile(0.50) * ms,
+            "p90_ms": self.percentile(0.90) * ms,
+            "p99_ms": self.percentile(0.99) * ms,
+            "p999_ms": self.percentile(0.999) * ms,
+            "max_ms": self.max * ms,
+        }
+
+
+class OpStats:
+    def __init__(self):
+        self.latency = LatencyHistogram()
+        self.service = LatencyHistogram()
+        self.errors: Counter = Counter()
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            "latency": self.latency.to_dict(),
+            "service_time": self.service.to_dict(),
+            "errors": sum(self.errors.values()),
+            "error_kinds": dict(self.errors.most_common(5)),
+        }
+
+
+class Recorder:
+    def __init__(self):
+        self.ops: Dict[str, OpStats] = {}
+        self.issued = 0
+        self.dropped = 0
+
+    def op(self, name: str) -> OpStats:
+        stats = self.ops.get(name)
+        if stats is None:
+            stats = self.ops[name] = OpStats()
+        return stats
+
+    def summary(self, duration: float, offered_rate: float) -> Dict[str, object]:
+        overall = OpStats()
+        for stats in self.ops.values():
+            overall.latency.merge(stats.latency)
+            overall.service.merge(stats.service)
+            overall.errors.update(stats.errors)
+        completed = overall.latency.count
+        errors = sum(overall.errors.values())
+        return {
+            "duration_s": duration,
+            "offered_rate": offered_rate,
+            "issued": self.issued,
+            "completed": completed,
+            "errors": errors,
+            "dropped": self.dropped,
+            "achieved_rate": (completed - errors) / duration if duration > 0 else 0.0,
+            **overall.to_dict(),
+            "ops": {name: stats.to_dict() for name, stats in sorted(self.ops.items())},
+        }
+
+
+# ------------- Drivers -------------
+
+class Driver:
+    """One tier under test: `setup` creates users/items, `ops` maps mix names to coroutines."""
+
+    name = ""
+
+    def __init__(self, args: argparse.Namespace):
+        self.args = args
+        self.rng = random.Random(args.seed)
+        self.item_ids: List[int] = []
+        self.seller_ids: List[int] = []
+        self.buyer_creds: List[dict] = []
+        self.logout_creds: dict = {}
+        self.ops: Dict[str, Callable[[], Awaitable[object]]] = {}
+
+    async def setup(self):
+        raise NotImplementedError
+
+    async def close(self):
+        pass
+
+    def _item(self) -> int:
+        return self.rng.choice(self.item_ids)
+
+    def _seller(self) -> int:
+        return self.rng.choice(self.seller_ids)
+
+    def _creds(self) -> dict:
+        return self.rng.choice(self.buyer_creds)
+
+    # A buyer session's cart is tracked as a list of item ids, one per unit
+    # added, so remove_from_cart picks a line that is actually there.
+    def _cart_add(self, cart: List[int]) -> int:
+        item_id = self._item()
+        cart.append(item_id)
+        return item_id
+
+    def _cart_take(self, cart: List[int], whole_line: bool = False) -> int:
+        item_id = cart.pop(self.rng.randrange(len(cart)))
+        if whole_line:
+            cart[:] = [i for i in cart if i != item_id]
+        return item_id
+
+    @staticmethod
+    def _cart_clear(cart: List[int]) -> dict:
+        cart.clear()
+        return {}
+
+
+class TCPDriver(Driver):
+    name = "tcp"
+
+    def __init__(self, args):
+        super().__init__(args)
+        self.buyers: asyncio.Queue = asyncio.Queue()
+        self.sellers: asyncio.Queue = asyncio.Queue()
+        self._conns: List[AsyncLengthPrefixedJSONConnection] = []
+        self.ops = {
+            "search_items": lambda: self._buyer("SearchItemsForSale", {"category": 1, "keywords": ITEM_KEYWORDS[:1], "limit": 20}),
+            "get_item": lambda: self._buyer("GetItem", {"item_id": self._item()}),
+            "add_to_cart": lambda: self._buyer("AddItemToCart", lambda cart: {"item_id": self._cart_add(cart), "quantity": 1}),
+            "display_cart": lambda: self._buyer("DisplayCart", {}),
+            "seller_rating": lambda: self._buyer("GetSellerRating", {"seller_id": self._seller()}),
+            "purchases": lambda: self._buyer("GetBuyerPurchases", {}),
+            "display_items": lambda: self._seller_call("DisplayItemsForSale", {}),
+            "change_price": lambda: self._seller_call(
+                "ChangeItemPrice", lambda own: {"item_id": self.rng.choice(own), "price": round(self.rng.uniform(5, 50), 2)}
+            ),
+            "remove_from_cart": lambda: self._remove_from_cart(),
+            "save_cart": lambda: self._buyer("SaveCart", self._cart_clear),
+            "clear_cart": lambda: self._buyer("ClearCart", self._cart_clear),
+            "feedback": lambda: self._buyer("ProvideFeedback", {"item_id": self._item(), "is_positive": self.rng.random() < 0.8}),
+            "purchase": lambda: self._buyer_seq(
+                ("AddItemToCart", lambda cart: {"item_id": self._cart_add(cart), "quantity": 1}),
+                ("SaveCart", self._cart_clear),
+                ("MakePurchase", CARD),
+            ),
+            "logout": lambda: self._logout(),
+            "register_item": lambda: self._register_item(),
+            "update_units": lambda: self._seller_call(
+                "UpdateUnitsForSale", lambda own: {"item_id": self.rng.choice(own), "quantity": 1}
+            ),
+            "login": lambda: self._buyer("Login", self._creds()),
+        }
+
+    async def _connect(self, host: str, port: int) -> AsyncLengthPrefixedJSONConnection:
+        reader, writer = await asyncio.open_connection(host, port)
+        conn = AsyncLengthPrefixedJSONConnection(reader, writer)
+        self._conns.append(conn)
+        if self.args.codec != "json":
+            await conn.request_codec(self.args.codec)
+        return conn
+
+    @staticmethod
+    async def _call(conn, api: str, session_id, payload: dict) -> dict:
+        await conn.send_message(build_request(api=api, session_id=session_id, payload=payload))
+        return extract_payload(await conn.recv_message())
+
+    async def _login(self, conn, role: str) -> tuple:
+        username = f"{role}_{uuid.uuid4().hex[:8]}"
+        creds = {"username": username, "password": PASSWORD}
+        await self._call(conn, "CreateAccount", None, creds)
+        resp = await self._call(conn, "Login", None, creds)
+        if role == "buyer":
+            self.buyer_creds.append(creds)
+        return resp["session_id"], resp.get(f"{role}_id")
+
+    async def _setup_seller(self):
+        conn = await self._connect(self.args.seller_host, self.args.seller_port)
+        session_id, seller_id = await self._login(conn, "seller")
+        own = []
+        for i in range(self.args.items):
+            resp = await self._call(conn, "RegisterItemForSale", session_id, _new_item(i))
+            own.append(int(resp["item_id"]))
+        self.item_ids.extend(own)
+        if seller_id is not None:
+            self.seller_ids.append(int(seller_id))
+        self.sellers.put_nowait((conn, session_id, own))
+
+    async def _setup_buyer(self):
+        conn = await self._connect(self.args.buyer_host, self.args.buyer_port)
+        session_id, _ = await self._login(conn, "buyer")
+        self.buyers.put_nowait((conn, session_id, []))
+
+    async def setup(self):
+        await asyncio.gather(*(self._setup_seller() for _ in range(self.args.connections)))
+        await asyncio.gather(*(self._setup_buyer() for _ in range(self.args.connections)))
+        await self._login(self._conns[-1], "buyer")
+        self.logout_creds = self.buyer_creds.pop()
+        if not self.seller_ids:
+            self.seller_ids = [1]
+
+    @contextlib.asynccontextmanager
+    async def _hold(self, pool: asyncio.Queue):
+        # One request in flight per connection; waiting for a free one counts toward latency.
+        entry = await pool.get()
+        try:
+            yield entry
+        finally:
+            pool.put_nowait(entry)
+
+    async def _on(self, pool: asyncio.Queue, api: str, payload):
+        async with self._hold(pool) as (conn, session_id, own):
+            return await self._call(conn, api, session_id, payload(own) if callable(payload) else payload)
+
+    def _buyer(self, api: str, payload: dict):
+        return self._on(self.buyers, api, payload)
+
+    def _seller_call(self, api: str, payload: dict):
+        return self._on(self.sellers, api, payload)
+
+    async def _buyer_seq(self, *calls):
+        async with self._hold(self.buyers) as (conn, session_id, cart):
+            for api, payload in calls:
+                resp = await self._call(conn, api, session_id, payload(cart) if callable(payload) else payload)
+            return resp
+
+    async def _remove_from_cart(self):
+        async with self._hold(self.buyers) as (conn, session_id, cart):
+            if not cart:
+                await self._call(conn, "AddItemToCart", session_id, {"item_id": self._cart_add(cart), "quantity": 1})
+            return await self._call(conn, "RemoveItemFromCart", session_id, {"item_id": self._cart_take(cart), "quantity": 1})
+
+    async def _logout(self):
+        async with self._hold(self.buyers) as (conn, _, _):
+            resp = await self._call(conn, "Login", None, self.logout_creds)
+            return await self._call(conn, "Logout", resp["session_id"], {})
+
+    async def _register_item(self):
+        async with self._hold(self.sellers) as (conn, session_id, own):
+            resp = await self._call(conn, "RegisterItemForSale", session_id, _new_item(len(own)))
+            own.append(int(resp["item_id"]))
+            return resp
+
+    async def close(self):
+        for conn in self._conns:
+            await conn.close()
+
+
+class RESTDriver(Driver):
+    name = "rest"
+
+    def __init__(self, args):
+        super().__init__(args)
+        try:
+            import httpx
+        except ImportError:
+            raise SystemExit("The rest tier needs httpx: pip install httpx")
+        # Sized independently of --connections (sessions): a small pool would queue requests client-side.
+        limits = httpx.Limits(max_connections=args.http_pool, max_keepalive_connections=args.http_pool)
+        timeout = httpx.Timeout(args.timeout)
+        self.buyer_http = httpx.AsyncClient(base_url=f"http://{args.buyer_host}:{args.buyer_port}", limits=limits, timeout=timeout)
+        self.seller_http = httpx.AsyncClient(base_url=f"http://{args.seller_host}:{args.seller_port}", limits=limits, timeout=timeout)
+        self.buyer_sessions: List[str] = []
+        self.seller_sessions: List[str] = []
+        self.owned: List[tuple] = []  # (item_id, seller session) for seller-scoped updates
+        self.carts: Dict[str, List[int]] = {}
+        self.ops = {
+            "search_items": lambda: self._get(self.buyer_http, "/buyer/items", params={"category": 1, "keywords": ITEM_KEYWORDS[0], "limit": 20}),
+            "get_item": lambda: self._get(self.buyer_http, f"/buyer/items/{self._item()}"),
+            "add_to_cart": lambda: self._add_to_cart(self._buyer_session()),
+            "display_cart": lambda: self._get(self.buyer_http, "/buyer/cart", session=self._buyer_session()),
+            "seller_rating": lambda: self._get(self.buyer_http, f"/seller/{self._seller()}/rating"),
+            "purchases": lambda: self._get(self.buyer_http, "/buyer/purchases", session=self._buyer_session()),
+            "display_items": lambda: self._get(self.seller_http, "/seller/items", session=self._seller_session()),
+            "change_price": lambda: self._change_price(),
+            "remove_from_cart": lambda: self._remove_from_cart(),
+            "save_cart": lambda: self._save_cart(self._buyer_session()),
+            "clear_cart": lambda: self._clear_cart(),
+            "feedback": lambda: self._send(
+                self.buyer_http, "POST", "/buyer/feedback", self._buyer_session(),
+                {"item_id": self._item(), "is_positive": self.rng.random() < 0.8},
+            ),
+            "purchase": lambda: self._purchase(),
+            "logout": lambda: self._logout(),
+            "register_item": lambda: self._register_item(),
+            "update_units": lambda: self._update_units(),
+            "login": lambda: self._send(self.buyer_http, "POST", "/buyer/login", None, self._creds()),
+        }
+
+    def _buyer_session(self) -> str:
+        return self.rng.choice(self.buyer_sessions)
+
+    def _seller_session(self) -> str:
+        return self.rng.choice(self.seller_sessions)
+
+    def _change_price(self):
+        item_id, session = self.rng.choice(self.owned)
+        return self._send(
+            self.seller_http, "PUT", f"/seller/items/{item_id}/price", session,
+            {"price": round(self.rng.uniform(5, 50), 2)},
+        )
+
+    def _update_units(self):
+        item_id, session = self.rng.choice(self.owned)
+        return self._send(self.seller_http, "PUT", f"/seller/items/{item_id}/quantity", session, {"quantity_delta": 1})
+
+    async def _register_item(self):
+        session = self._seller_session()
+        resp = await self._send(self.seller_http, "POST", "/seller/items", session, _new_item(len(self.owned)))
+        self.owned.append((int(resp["item_id"]), session))
+        return resp
+
+    def _add_to_cart(self, session: str):
+        item_id = self._cart_add(self.carts[session])
+        return self._send(self.buyer_http, "POST", "/buyer/cart", session, {"item_id": item_id, "quantity": 1})
+
+    async def _remove_from_cart(self):
+        # DELETE /buyer/cart/{item_id} drops the whole line
+        session = self._buyer_session()
+        if not self.carts[session]:
+            await self._add_to_cart(session)
+        item_id = self._cart_take(self.carts[session], whole_line=True)
+        return await self._send(self.buyer_http, "DELETE", f"/buyer/cart/{item_id}", session, None)
+
+    def _clear_cart(self):
+        session = self._buyer_session()
+        self._cart_clear(self.carts[session])
+        return self._send(self.buyer_http, "DELETE", "/buyer/cart/clear", session, None)
+
+    def _save_cart(self, session: str):
+        # Saving moves the session's cart into the saved cart
+        self._cart_clear(self.carts[session])
+        return self._send(self.buyer_http, "POST", "/buyer/cart/save", session, None)
+
+    async def _purchase(self):
+        session = self._buyer_session()
+        await self._add_to_cart(session)
+        await self._save_cart(session)
+        return await self._send(self.buyer_http, "POST", "/buyer/purchase", session, CARD)
+
+    async def _logout(self):
+        data = await self._send(self.buyer_http, "POST", "/buyer/login", None, self.logout_creds)
+        return await self._send(self.buyer_http, "POST", "/buyer/logout", data["session_id"], None)
+
+    @staticmethod
+    def _headers(session):
+        return {"X-Session-ID": session} if session else None
+
+    async def _get(self, http, path: str, params=None, session=None):
+        resp = await http.get(path, params=params, headers=self._headers(session))
+        resp.raise_for_status()
+        return resp.json()
+
+    async def _send(self, http, method: str, path: str, session, body: dict):
+        resp = await http.request(method, path, json=body, headers=self._headers(session))
+        resp.raise_for_status()
+        return resp.json()
+
+    async def _login(self, http, role: str) -> dict:
+        creds = {"username": f"{role}_{uuid.uuid4().hex[:8]}", "password": PASSWORD}
+        (await http.post(f"/{role}/account", json=creds)).raise_for_status()
+        resp = await http.post(f"/{role}/login", json=creds)
+        resp.raise_for_status()
+        if role == "buyer":
+            self.buyer_creds.append(creds)
+        return resp.json()
+
+    async def _setup_seller(self):
+        data = await self._login(self.seller_http, "seller")
+        self.seller_sessions.append(data["session_id"])
+        self.seller_ids.append(int(data["seller_id"]))
+        for i in range(self.args.items):
+            resp = await self._send(self.seller_http, "POST", "/seller/items", data["session_id"], _new_item(i))
+            self.item_ids.append(int(resp["item_id"]))
+            self.owned.append((int(resp["item_id"]), data["session_id"]))
+
+    async def _setup_buyer(self):
+        data = await self._login(self.buyer_http, "buyer")
+        self.buyer_sessions.append(data["session_id"])
+        self.carts[data["session_id"]] = []
+
+    async def setup(self):
+        await asyncio.gather(*(self._setup_seller() for _ in range(self.args.connections)))
+        await asyncio.gather(*(self._setup_buyer() for _ in range(self.args.connections)))
+        await self._login(self.buyer_http, "buyer")
+        self.logout_creds = self.buyer_creds.pop()
+
+    async def close(self):
+        await self.buyer_http.aclose()
+        await self.seller_http.aclose()
+
+
+class GRPCDriver(Driver):
+    name = "grpc"
+
+    def __init__(self, args):
+        super().__init__(args)
+        import grpc
+        from protos import database_pb2, database_pb2_grpc
+
+        self.pb = database_pb2
+        # Several channels (= HTTP/2 connections) so one connection's flow control isn't the bottleneck.
+        self.channels = [grpc.aio.insecure_channel(args.grpc_addr) for _ in range(max(1, args.channels))]
+        self.stubs = [database_pb2_grpc.DatabaseServiceStub(ch) for ch in self.channels]
+        self.buyers: List[tuple] = []
+        self.owned: List[tuple] = []  # (item_id, seller_id) for seller-scoped updates
+        self.carts: Dict[str, List[int]] = {}
+        pb = self.pb
+        self.ops = {
+            "search_items": lambda: self._stub().SearchItems(pb.SearchItemsRequest(category=1, keywords=ITEM_KEYWORDS[:1], limit=20)),
+            "get_item": lambda: self._stub().GetItem(pb.GetItemRequest(item_id=self._item())),
+            "add_to_cart": lambda: self._add_to_cart(self._buyer()),
+            "display_cart": lambda: self._stub().ListCart(pb.ListCartRequest(**self._buyer())),
+            "seller_rating": lambda: self._stub().GetSellerRating(pb.GetSellerRatingRequest(seller_id=self._seller())),
+            "purchases": lambda: self._stub().GetPurchaseHistory(pb.GetPurchaseHistoryRequest(buyer_id=self._buyer()["buyer_id"])),
+            "display_items": lambda: self._stub().GetItemsBySeller(pb.GetItemsBySellerRequest(seller_id=self._seller())),
+            "change_price": lambda: self._change_price(),
+            "remove_from_cart": lambda: self._remove_from_cart(),
+            "save_cart": lambda: self._save_cart(self._buyer()),
+            "clear_cart": lambda: self._clear_cart(),
+            "feedback": lambda: self._stub().ProvideFeedback(pb.ProvideFeedbackRequest(
+                item_id=self._item(), buyer_id=self._buyer()["buyer_id"], is_positive=self.rng.random() < 0.8
+            )),
+            "purchase": lambda: self._purchase(),
+            "logout": lambda: self._logout(),
+            "register_item": lambda: self._register_item(),
+            "update_units": lambda: self._update_units(),
+            "login": lambda: self._stub().AuthenticateUser(pb.AuthenticateRequest(role="buyer", **self._creds())),
+        }
+
+    def _stub(self):
+        return self.rng.choice(self.stubs)
+
+    def _buyer(self) -> dict:
+        buyer_id, session_id = self.rng.choice(self.buyers)
+        return {"buyer_id": buyer_id, "session_id": session_id}
+
+    def _change_price(self):
+        item_id, seller_id = self.rng.choice(self.owned)
+        return self._stub().UpdateItemPrice(self.pb.UpdateItemPriceRequest(
+            item_id=item_id, seller_id=seller_id, price=round(self.rng.uniform(5, 50), 2)
+        ))
+
+    def _update_units(self):
+        item_id, seller_id = self.rng.choice(self.owned)
+        return self._stub().UpdateItemQuantity(self.pb.UpdateItemQuantityRequest(
+            item_id=item_id, seller_id=seller_id, quantity_delta=1
+        ))
+
+    async def _register_item(self):
+        seller_id = self._seller()
+        resp = await self._stub().RegisterItem(self.pb.RegisterItemRequest(**_new_item(len(self.owned)), seller_id=seller_id))
+        self.owned.append((resp.item_id, seller_id))
+        return resp
+
+    def _add_to_cart(self, buyer: dict):
+        item_id = self._cart_add(self.carts[buyer["session_id"]])
+        return self._stub().AddToCart(self.pb.AddToCartRequest(**buyer, item_id=item_id, quantity=1))
+
+    async def _remove_from_cart(self):
+        # RemoveFromCart drops the whole line
+        buyer = self._buyer()
+        if not self.carts[buyer["session_id"]]:
+            await self._add_to_cart(buyer)
+        item_id = self._cart_take(self.carts[buyer["session_id"]], whole_line=True)
+        return await self._stub().RemoveFromCart(self.pb.RemoveFromCartRequest(**buyer, item_id=item_id))
+
+    def _clear_cart(self):
+        buyer = self._buyer()
+        self._cart_clear(self.carts[buyer["session_id"]])
+        return self._stub().ClearCart(self.pb.ClearCartRequest(**buyer))
+
+    def _save_cart(self, buyer: dict):
+        # Saving moves the session's cart into the saved cart
+        self._cart_clear(self.carts[buyer["session_id"]])
+        return self._stub().SaveCart(self.pb.SaveCartRequest(**buyer))
+
+    async def _purchase(self):
+        buyer = self._buyer()
+        await self._add_to_cart(buyer)
+        await self._save_cart(buyer)
+        return await self._stub().Checkout(self.pb.CheckoutRequest(buyer_id=buyer["buyer_id"]))
+
+    async def _logout(self):
+        stub = self._stub()
+        auth = await stub.AuthenticateUser(self.pb.AuthenticateRequest(role="buyer", **self.logout_creds))
+        return await stub.DeleteSessions(self.pb.DeleteSessionsRequest(
+            session_id=auth.session_id, user_id=auth.user_id, role="buyer", scope="single"
+        ))
+
+    async def _login(self, role: str):
+        username = f"{role}_{uuid.uuid4().hex[:8]}"
+        await self.stubs[0].CreateAccount(self.pb.CreateAccountRequest(role=role, username=username, password=PASSWORD))
+        if role == "buyer":
+            self.buyer_creds.append({"username": username, "password": PASSWORD})
+        return await self.stubs[0].AuthenticateUser(self.pb.AuthenticateRequest(role=role, username=username, password=PASSWORD))
+
+    async def _setup_seller(self):
+        auth = await self._login("seller")
+        self.seller_ids.append(auth.user_id)
+        for i in range(self.args.items):
+            resp = await self.stubs[0].RegisterItem(self.pb.RegisterItemRequest(**_new_item(i), seller_id=auth.user_id))
+            self.item_ids.append(resp.item_id)
+            self.owned.append((resp.item_id, auth.user_id))
+
+    async def _setup_buyer(self):
+        auth = await self._login("buyer")
+        self.buyers.append((auth.user_id, auth.session_id))
+        self.carts[auth.session_id] = []
+
+    async def setup(self):
+        await asyncio.gather(*(self._setup_seller() for _ in range(self.args.connections)))
+        await asyncio.gather(*(self._setup_buyer() for _ in range(self.args.connections)))
+        await self._login("buyer")
+        self.logout_creds = self.buyer_creds.pop()
+
+    async def close(self):
+        for ch in self.channels:
+            await ch.close()
+
+
+DRIVERS = {"tcp": TCPDriver, "rest": RESTDriver, "grpc": GRPCDriver}
+
+
+# ------------- Load loop -------------
+
+async def _issue(driver: Driver, op: str, intended: float, recorder: Recorder | None):
+    loop = asyncio.get_running_loop()
+    sent = loop.time()
+    error = None
+    try:
+        await driver.ops[op]()
+    except Exception as exc:
+        error = type(exc).__name__ if not str(exc) else f"{type(exc).__name__}: {str(exc)[:80]}"
+    done = loop.time()
+    if recorder is not None:
+        stats = recorder.op(op)
+        stats.latency.record(done - intended)
+        stats.service.record(done - sent)
+        if error:
+            stats.errors[error] += 1
+
+
+async def run_phase(driver: Driver, mix: Dict[str, int], duration: float, recorder: Recorder | None) -> None:
+    """Issue requests on the arrival schedule for `duration` seconds, then drain in-flight ones."""
+    args = driver.args
+    loop = asyncio.get_running_loop()
+    names = list(mix)
+    weights = [mix[n] for n in names]
+    rng = random.Random(args.seed + (1 if recorder is None else 2))
+    interval = 1.0 / args.rate
+    inflight: set = set()
+
+    start = loop.time()
+    end = start + duration
+    intended = start
+    while intended < end:
+        delay = intended - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        op = rng.choices(names, weights)[0]
+        if recorder is not None:
+            recorder.issued += 1
+        if len(inflight) >= args.max_inflight:
+            if recorder is not None:
+                recorder.dropped += 1
+        else:
+            task = asyncio.create_task(_issue(driver, op, intended, recorder))
+            inflight.add(task)
+            task.add_done_callback(inflight.discard)
+        intended += rng.expovariate(args.rate) if args.arrival == "poisson" else interval
+
+    if inflight:
+        await asyncio.wait(inflight, timeout=args.timeout)
+
+
+def parse_mix(spec: str | None) -> Dict[str, int]:
+    if not spec:
+        return dict(DEFAULT_MIX)
+    mix: Dict[str, int] = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in DEFAULT_MIX and name not in OPT_IN_OPS:
+            raise SystemExit(f"unknown op {name!r}; choose from {', '.join([*DEFAULT_MIX, *sorted(OPT_IN_OPS)])}")
+        mix[name] = int(weight or 1)
+    return {k: v for k, v in mix.items() if v > 0}
+
+
+async def run(args: argparse.Namespace) -> Dict[str, object]:
+    mix = parse_mix(args.mix)
+    driver = DRIVERS[args.tier](args)
+    try:
+        print(f"[{args.tier}] setting up {args.connections} buyers/sellers, {args.items} items each...", file=sys.stderr)
+        await driver.setup()
+        started_at = datetime.now(timezone.utc).isoformat()
+        if args.warmup > 0:
+            print(f"[{args.tier}] warmup {args.warmup:.0f}s at {args.rate:g} req/s", file=sys.stderr)
+            await run_phase(driver, mix, args.warmup, None)
+        print(f"[{args.tier}] steady state {args.duration:.0f}s at {args.rate:g} req/s", file=sys.stderr)
+        recorder = Recorder()
+        t0 = time.perf_counter()
+        await run_phase(driver, mix, args.duration, recorder)
+        # Include the drain after the last arrival so achieved_rate isn't inflated.
+        elapsed = max(time.perf_counter() - t0, args.duration)
+    finally:
+        await driver.close()
+
+    return {
+        "tier": args.tier,
+        "started_at": started_at,
+        "config": {
+            "rate": args.rate,
+            "arrival": args.arrival,
+            "warmup_s": args.warmup,
+            "duration_s": args.duration,
+            "connections": args.connections,
+            "items_per_seller": args.items,
+            "max_inflight": args.max_inflight,
+            "codec": args.codec,
+            "seed": args.seed,
+            "mix": mix,
+            "target": _target(args),
+        },
+        "steady": recorder.summary(elapsed, args.rate),
+    }
+
+
+def _target(args) -> Dict[str, object]:
+    if args.tier == "grpc":
+        return {"grpc_addr": args.grpc_addr}
+    return {
+        "buyer": f"{args.buyer_host}:{args.buyer_port}",
+        "seller": f"{args.seller_host}:{args.seller_port}",
+    }
+
+
+def _print_summary(result: Dict[str, object]):
+    steady = result["steady"]
+    lat = steady["latency"]
+    print(
+        f"[{result['tier']}] {steady['completed']} requests, {steady['errors']} errors, "
+        f"{steady['dropped']} dropped, {steady['achieved_rate']:.1f} ok/s | "
+        f"p50 {lat['p50_ms']:.2f}ms p90 {lat['p90_ms']:.2f}ms p99 {lat['p99_ms']:.2f}ms "
+        f"p999 {lat['p999_ms']:.2f}ms max {lat['max_ms']:.2f}ms",
+        file=sys.stderr,
+    )
+    for name, op in steady["ops"].items():
+        ol = op["latency"]
+        print(
+            f"    {name:<16} n={ol['count']:<7} err={op['errors']:<5} "
+            f"p50 {ol['p50_ms']:.2f} p99 {ol['p99_ms']:.2f} p999 {ol['p999_ms']:.2f} ms",
+            file=sys.stderr,
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Open-loop load generator with latency percentiles")
+    parser.add_argument("tier", choices=sorted(DRIVERS), help="which interface to drive")
+    parser.add_argument("--rate", type=float, default=200.0, help="offered load, requests per second")
+    parser.add_argument("--arrival", choices=["constant", "poisson"], default="constant")
+    parser.add_argument("--warmup", type=float, default=5.0, help="seconds of load before measuring")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds of steady-state measurement")
+    parser.add_argument("--connections", type=int, default=16, help="buyer and seller sessions/connections each")
+    parser.add_argument("--channels", type=int, default=4, help="gRPC channels (grpc tier)")
+    parser.add_argument("--codec", choices=["json", "msgpack"], default="json", help="wire codec negotiated per connection (tcp tier)")
+    parser.add_argument("--http-pool", type=int, default=256, help="HTTP keep-alive connections per server (rest tier)")
+    parser.add_argument("--items", type=int, default=5, help="items registered per seller during setup")
+    parser.add_argument("--max-inflight", type=int, default=10000, help="arrivals past this many outstanding requests are dropped")
+    parser.add_argument("--timeout", type=float, default=30.0, help="per-request timeout (rest) and drain timeout")
+    parser.add_argument("--mix", help="weighted ops, e.g. search_items=30,get_item=20 (default: all ops)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--buyer-host", default="127.0.0.1")
+    parser.add_argument("--buyer-port", type=int)
+    parser.add_argument("--seller-host", default="127.0.0.1")
+    parser.add_argument("--seller-port", type=int)
+    parser.add_argument("--grpc-addr", default=os.getenv("DB_SERVICE_ADDR", "localhost:50051"))
+    parser.add_argument("--out", help="write the JSON result here (default: stdout)")
+    args = parser.parse_args()
+
+    if args.rate <= 0:
+        parser.error("--rate must be positive")
+    default_ports = {"tcp": (8081, 8080), "rest": (8001, 8000), "grpc": (0, 0)}[args.tier]
+    args.buyer_port = args.buyer_port or default_ports[0]
+    args.seller_port = args.seller_port or default_ports[1]
+
+    result = asyncio.run(run(args))
+    _print_summary(result)
+    text = json.dumps(result, indent=2)
+    if args.out:
+        out = Path(args.out)
+        out.parent.mkdir(parents=True, exist_ok=True)
+        out.write_text(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()